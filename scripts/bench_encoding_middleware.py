@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""エンコーディング検証ミドルウェアのベンチマーク
+
+旧実装（BaseHTTPMiddleware）と現行実装（素のASGI）を、
+何もしない下流アプリを包んだ状態でASGIとして直接呼び出し、1リクエストあたりの時間を比較する。
+HTTPクライアントやルーティングの時間を含まないため、ミドルウェア自体の差だけが出る。
+
+使用例:
+    python scripts/bench_encoding_middleware.py
+    python scripts/bench_encoding_middleware.py --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse, PlainTextResponse  # noqa: E402
+
+from middleware.encoding import EncodingValidationMiddleware, detect_mojibake  # noqa: E402
+
+
+class LegacyEncodingValidationMiddleware(BaseHTTPMiddleware):
+    """比較用の旧実装（BaseHTTPMiddleware、フォームのみ全値を検証）"""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method in ("POST", "PUT", "PATCH"):
+            content_type = request.headers.get("content-type", "")
+            if "application/x-www-form-urlencoded" in content_type:
+                body = await request.body()
+                try:
+                    params = parse_qs(body.decode('utf-8'), keep_blank_values=True)
+                    for key, values in params.items():
+                        for value in values:
+                            if detect_mojibake(value):
+                                return JSONResponse(status_code=400, content={"detail": key})
+                except UnicodeDecodeError:
+                    return JSONResponse(status_code=400, content={"detail": "decode"})
+
+                async def receive():
+                    return {"type": "http.request", "body": body}
+                request._receive = receive
+        return await call_next(request)
+
+
+async def downstream(scope, receive, send):
+    """ボディを読み切って200を返す下流アプリ"""
+    if scope["method"] != "GET":
+        while True:
+            message = await receive()
+            if not message.get("more_body", False):
+                break
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def _form(fields: int, value: str) -> bytes:
+    return urlencode({f"field{i}": value for i in range(fields)}).encode()
+
+
+# (名前, メソッド, パス, Content-Type, ボディ)
+CASES = [
+    ("GET", "GET", "/work-logs/grid", None, b""),
+    ("form ASCII", "POST", "/work-logs", "application/x-www-form-urlencoded", _form(40, "1.5")),
+    ("form 日本語", "POST", "/users", "application/x-www-form-urlencoded", _form(40, "田中太郎")),
+    ("form 日本語(生UTF-8)", "POST", "/users", "application/x-www-form-urlencoded",
+     "&".join(f"field{i}=田中太郎" for i in range(40)).encode()),
+    ("JSON /api/v1 日本語", "POST", "/api/v1/issues", "application/json",
+     json.dumps([{"cd": f"I{i:03}", "name": "画面設計"} for i in range(40)], ensure_ascii=False).encode()),
+]
+
+
+async def _run(app, method: str, path: str, content_type: str | None, body: bytes) -> int:
+    headers = [(b"content-type", content_type.encode())] if content_type else []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _bench(app, case, requests: int) -> float:
+    """1リクエストあたりの平均時間（マイクロ秒）"""
+    _, method, path, content_type, body = case
+    for _ in range(min(200, requests)):
+        await _run(app, method, path, content_type, body)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _run(app, method, path, content_type, body)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main_async(requests: int):
+    apps = {
+        "legacy": LegacyEncodingValidationMiddleware(downstream),
+        "asgi": EncodingValidationMiddleware(downstream),
+        "none": downstream,
+    }
+    print(f"{'case':<24}{'none':>10}{'legacy':>10}{'asgi':>10}{'speedup':>10}   (µs/request, {requests} requests)")
+    for case in CASES:
+        times = {name: await _bench(app, case, requests) for name, app in apps.items()}
+        speedup = times["legacy"] / times["asgi"] if times["asgi"] else 0
+        print(f"{case[0]:<24}{times['none']:>10.1f}{times['legacy']:>10.1f}{times['asgi']:>10.1f}{speedup:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="エンコーディング検証ミドルウェアのベンチマーク")
+    parser.add_argument("--requests", type=int, default=5000, help="ケースごとのリクエスト数")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+
+if __name__ == "__main__":
+    main()
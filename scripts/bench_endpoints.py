@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""主要エンドポイントのベンチマーク
+
+規模（small / medium / large）ごとに決定的な合成データのDBを generate_data.py で作成し、
+アプリ（ミドルウェアを含む）をASGIとしてプロセス内で呼び出して各エンドポイントの応答時間を計測する。
+結果はJSONに書き出し、保存済みのベースラインがあれば中央値を比較して悪化したケースを示す。
+
+合成データは同じ規模・シードなら常に同じ内容になる（日付も固定の DATASET_END を基準にする）。
+作成したDBは data/bench/ に残し、次回以降は再利用する（--rebuild で作り直し）。
+
+使用例:
+    python scripts/bench_endpoints.py --scale small
+    python scripts/bench_endpoints.py --scale medium --save-baseline
+    python scripts/bench_endpoints.py --scale medium --max-regression 0.2   # 20%以上の悪化で終了コード1
+    python scripts/bench_endpoints.py --scale large --only work_logs_grid_week --repeat 5
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from datetime import date, datetime
+from pathlib import Path
+
+from generate_data import PRESETS, load
+
+ROOT = Path(__file__).parent.parent
+BENCH_DIR = ROOT / "data" / "bench"
+
+sys.path.insert(0, str(ROOT / "src"))
+
+# 合成データの最終日（実行日に依存しないよう固定）
+DATASET_END = date(2026, 3, 31)
+
+# 計測するリクエスト: 名前 -> パス
+CASES = {
+    "work_logs_grid_week": "/work-logs/grid?view=week&week=2026-03-16",
+    "work_logs_grid_week_user": "/work-logs/grid?view=week&week=2026-03-16&user=1",
+    "work_logs_grid_month": "/work-logs/grid?view=month&month=2026-03&project=1",
+    "monthly_assignments_detail": "/monthly-assignments/grid?mode=detail&month=2026-03",
+    "users_list": "/users/list",
+    "users_list_search": "/users/list?q=U00",
+    "search_users": "/search/users?q=U001",
+    "search_projects": "/search/projects?q=PJ0",
+    "search_issues": "/search/issues?q=I001",
+    "project_detail": "/projects/1",
+    "api_work_logs": "/api/v1/work-logs?start_date=2026-03-01&end_date=2026-03-31&limit=1000",
+}
+
+# 比較表で悪化として示す中央値の悪化率（--max-regression 指定時はその値）
+DEFAULT_REGRESSION_MARK = 0.1
+
+def dataset_counts(path: Path) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("user", "project", "issue", "task", "task_assignee", "monthly_assignment", "work_log")
+        }
+    finally:
+        conn.close()
+
+
+def measure(client, path: str, warmup: int, repeat: int) -> dict:
+    """1ケースの計測（時間はミリ秒、firstは最初の1回＝キャッシュ未構築時）"""
+    times = []
+    size = 0
+    for i in range(warmup + repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"{path}: HTTP {response.status_code}")
+        if i == 0:
+            first = elapsed
+            size = len(response.content)
+        if i >= warmup:
+            times.append(elapsed)
+    times.sort()
+    return {
+        "first": round(first, 3),
+        "min": round(times[0], 3),
+        "median": round(statistics.median(times), 3),
+        "p95": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "mean": round(statistics.fmean(times), 3),
+        "bytes": size,
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """ベースラインとの中央値の比較を表示し、悪化したケース名を返す"""
+    if baseline["meta"]["scale"] != results["meta"]["scale"]:
+        print(f"\n※ ベースラインの規模（{baseline['meta']['scale']}）が異なるため比較しません")
+        return []
+    print(f"\n{'case':<30}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = []
+    for name, current in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<30}{'-':>12}{current['median']:>10.2f}ms{'new':>10}")
+            continue
+        change = current["median"] / base["median"] - 1 if base["median"] else 0.0
+        mark = ""
+        if change > max_regression:
+            regressions.append(name)
+            mark = "  ← 悪化"
+        print(f"{name:<30}{base['median']:>10.2f}ms{current['median']:>10.2f}ms{change:>+9.1%}{mark}")
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主要エンドポイントのベンチマーク")
+    parser.add_argument("--scale", choices=PRESETS, default="small", help="データ規模")
+    parser.add_argument("--months", type=int, help="実績の月数（規模の既定値を上書き）")
+    parser.add_argument("--seed", type=int, default=1, help="合成データのシード")
+    parser.add_argument("--rebuild", action="store_true", help="合成データのDBを作り直す")
+    parser.add_argument("--warmup", type=int, default=2, help="計測前の実行回数（キャッシュの構築）")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数")
+    parser.add_argument("--only", nargs="+", choices=CASES, help="計測するケース")
+    parser.add_argument("--output", type=Path, help="結果のJSON 既定: data/bench/results-<規模>.json")
+    parser.add_argument("--baseline", type=Path, help="比較するベースライン 既定: data/bench/baseline-<規模>.json")
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="中央値の悪化率がこれを超えたケースがあれば終了コード1（例: 0.2）")
+    args = parser.parse_args()
+
+    scale = replace(PRESETS[args.scale], end=DATASET_END)
+    if args.months:
+        scale = replace(scale, months=args.months)
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    db_path = BENCH_DIR / f"{args.scale}-{scale.months}m-seed{args.seed}.db"
+
+    # DBのパスはアプリのimport時に決まるため、importより前に設定する
+    os.environ["DATABASE_PATH"] = str(db_path)
+    os.environ.setdefault("METRICS_DIR", str(BENCH_DIR / "metrics"))
+    from fastapi.testclient import TestClient
+    from main import app
+
+    if args.rebuild or not db_path.exists():
+        print(f"合成データを作成: {db_path.name}")
+        start = time.perf_counter()
+        load(db_path, scale, args.seed, reset=True, progress=lambda message: None)
+        print(f"  {time.perf_counter() - start:.1f}秒")
+    counts = dataset_counts(db_path)
+    print("  " + ", ".join(f"{table} {count:,}" for table, count in counts.items()))
+
+    results = {
+        "meta": {
+            "scale": args.scale, "seed": args.seed, "months": scale.months, "counts": counts,
+            "warmup": args.warmup, "repeat": args.repeat,
+            "commit": _git_commit(), "python": platform.python_version(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": {},
+    }
+    print(f"\n{'case':<30}{'first':>10}{'median':>10}{'p95':>10}{'bytes':>10}   (ms)")
+    with TestClient(app) as client:
+        for name in args.only or CASES:
+            r = measure(client, CASES[name], args.warmup, args.repeat)
+            results["results"][name] = r
+            print(f"{name:<30}{r['first']:>10.2f}{r['median']:>10.2f}{r['p95']:>10.2f}{r['bytes']:>10}")
+
+    output = args.output or BENCH_DIR / f"results-{args.scale}.json"
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"\n結果: {output}")
+
+    baseline_path = args.baseline or BENCH_DIR / f"baseline-{args.scale}.json"
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    regressions = []
+    if baseline:
+        regressions = compare(
+            results, baseline,
+            DEFAULT_REGRESSION_MARK if args.max_regression is None else args.max_regression
+        )
+    if args.save_baseline:
+        # --only で一部だけ計測した場合は、同じ規模のベースラインの他のケースを残す
+        if baseline and args.only and baseline["meta"]["scale"] == args.scale:
+            results["results"] = {**baseline["results"], **results["results"]}
+        baseline_path.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+        print(f"ベースラインを保存: {baseline_path}")
+    if args.max_regression is not None and regressions:
+        print(f"\n悪化: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,19 +17,54 @@ curlの代わりにこのスクリプトを使用してAPIにデータを投入
     # 選択肢追加
     python scripts/data_loader.py option create 1 --code member --name "メンバー"
 
-    # JSONファイルから一括投入
+    # JSONファイルから一括投入（8並列、中断しても同じコマンドで再開）
     python scripts/data_loader.py bulk users.json
+    python scripts/data_loader.py bulk org.json --workers 8 --base-url http://localhost:8000
 """
 import argparse
+import html
+import http.client
 import json
+import queue
+import random
+import re
 import sys
+import threading
+import time
 import urllib.request
 import urllib.parse
 import urllib.error
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 BASE_URL = "http://localhost:8001"
 
+# 一括投入のセクション（この順に投入する。後のセクションは前のセクションを参照できる）
+BULK_SECTIONS = ("attr_types", "options", "users", "projects", "issues", "tasks", "task_assignees", "work_logs")
+
+# 再試行するステータス（SQLiteのロック待ち超過などの一時的なエラー）
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BASE_WAIT = 0.5
+RETRY_MAX_WAIT = 30.0
+
+# 一覧取得（cd -> id の解決）の1ページの件数
+API_PAGE_LIMIT = 1000
+
+# チェックポイントを書き出す間隔（完了件数）
+CHECKPOINT_EVERY = 200
+
+# 進捗を表示する間隔（秒）
+PROGRESS_INTERVAL = 2.0
+
+# 最後に表示する失敗の件数
+FAILURE_REPORT_LIMIT = 20
+
+# 属性タイプ・選択肢の一覧（HTML）の行: id, code, name, sort_order
+ATTR_ROW_PATTERN = (
+    r'<tr id="{prefix}-(\d+)">\s*<td class="cd-cell">(.*?)</td>\s*'
+    r'<td class="name-cell">(.*?)</td>\s*<td>(-?\d+)</td>'
+)
+
 
 def api_request(method: str, path: str, data: dict = None) -> tuple[int, str]:
     """APIリクエストを送信（UTF-8保証）
@@ -166,21 +201,374 @@ def cmd_option(args):
             print(f"エラー: {body}")
 
 
+class ApiClient:
+    """keep-aliveの接続を使い回すHTTPクライアント（スレッドセーフ）
+
+    接続はプールに返して再利用し、429・5xx・接続エラーは待ってから再試行する。
+    5xx・接続エラーではサーバー側で処理が完了している場合があるため、作成（POST）の再試行には
+    before_retry で作成済みかを確かめる関数を渡す。
+
+    Args:
+        base_url: 接続先（http://host:port）
+        pool_size: 保持する接続数の上限（ワーカー数に合わせる）
+        retries: 再試行の回数
+        timeout: 1リクエストのタイムアウト（秒）
+    """
+
+    def __init__(self, base_url: str = BASE_URL, pool_size: int = 4, retries: int = 5, timeout: float = 30):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port
+        self.https = url.scheme == "https"
+        self.retries = retries
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method: str, path: str, form: dict = None, json_body=None,
+                before_retry=None) -> tuple[int, str, dict]:
+        """リクエストを送信（UTF-8保証、一時的なエラーは再試行）
+
+        Args:
+            form: フォームとして送るデータ
+            json_body: JSONとして送るデータ
+            before_retry: 5xx・接続エラーの後、再試行の前に呼ぶ関数。(status, body, headers) を返したら
+                再試行せずにそれを結果とする（先の試行がサーバー側でコミット済みだった場合）
+
+        Returns:
+            (status_code, response_body, response_headers)
+        """
+        headers = {}
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode(form).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
+        elif json_body is not None:
+            body = json.dumps(json_body, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+
+        for attempt in range(self.retries + 1):
+            conn = self._connect()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                text = resp.read().decode("utf-8", errors="replace")
+                resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if attempt == self.retries:
+                    return 0, f"接続エラー: {e}", {}
+                time.sleep(_backoff(attempt))
+                if before_retry is not None and (done := before_retry()) is not None:
+                    return done
+                continue
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if resp.status in RETRY_STATUSES and attempt < self.retries:
+                time.sleep(_backoff(attempt, resp_headers.get("retry-after")))
+                if before_retry is not None and resp.status >= 500 and (done := before_retry()) is not None:
+                    return done
+                continue
+            return resp.status, text, resp_headers
+        raise AssertionError("unreachable")
+
+    def get_all(self, path: str) -> list[dict]:
+        """JSON APIの一覧を全ページ取得（X-Next-Cursorを辿る）"""
+        items = []
+        cursor = None
+        separator = "&" if "?" in path else "?"
+        while True:
+            query = f"{separator}limit={API_PAGE_LIMIT}" + (f"&cursor={urllib.parse.quote(cursor)}" if cursor else "")
+            status, body, headers = self.request("GET", path + query)
+            if status != 200:
+                raise RuntimeError(f"GET {path}: {status} {body[:200]}")
+            items.extend(json.loads(body))
+            cursor = headers.get("x-next-cursor")
+            if not cursor:
+                return items
+
+
+def _backoff(attempt: int, retry_after: str | None = None) -> float:
+    """再試行までの待ち時間（Retry-After優先、なければ指数バックオフ＋ゆらぎ）"""
+    if retry_after:
+        try:
+            return min(RETRY_MAX_WAIT, float(retry_after))
+        except ValueError:
+            pass
+    return min(RETRY_MAX_WAIT, RETRY_BASE_WAIT * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class Checkpoint:
+    """セクションごとの完了済み項目（入力中の位置）を記録するファイル
+
+    途中で止まっても、同じ入力で再実行すれば完了済みの項目を飛ばして再開できる。
+    """
+
+    def __init__(self, path: Path, reset: bool = False):
+        self.path = path
+        self._done = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        if path.exists() and not reset:
+            self._done = {section: set(indexes) for section, indexes in json.loads(path.read_text()).items()}
+
+    def done(self, section: str) -> set[int]:
+        return self._done.setdefault(section, set())
+
+    def mark(self, section: str, index: int):
+        with self._lock:
+            self.done(section).add(index)
+            self._dirty += 1
+            if self._dirty >= CHECKPOINT_EVERY:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        data = {section: sorted(indexes) for section, indexes in self._done.items()}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self.path)
+        self._dirty = 0
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+
+class Progress:
+    """件数の進捗表示（一定間隔で1行出力）"""
+
+    def __init__(self, label: str, total: int, skipped: int = 0):
+        self.label = label
+        self.total = total
+        self.skipped = skipped
+        self.ok = 0
+        self.failed = 0
+        self._start = self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, success: bool):
+        with self._lock:
+            if success:
+                self.ok += 1
+            else:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._last >= PROGRESS_INTERVAL:
+                self._last = now
+                self._print(now)
+
+    def finish(self):
+        self._print(time.monotonic())
+
+    def _print(self, now: float):
+        done = self.ok + self.failed
+        elapsed = max(now - self._start, 1e-9)
+        skipped = f" スキップ {self.skipped}" if self.skipped else ""
+        print(f"  {self.label}: {done + self.skipped}/{self.total + self.skipped}"
+              f"（成功 {self.ok} 失敗 {self.failed}{skipped}） {done / elapsed:.1f}件/秒", flush=True)
+
+
+class BulkLoader:
+    """一括投入の実行（セクション単位で、項目は並行に送信）
+
+    Args:
+        client: APIクライアント
+        workers: 同時に送信する数
+        checkpoint: 完了済み項目の記録
+    """
+
+    def __init__(self, client: ApiClient, workers: int, checkpoint: Checkpoint):
+        self.client = client
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.failures = []
+        self._ids = {}
+        self._ids_lock = threading.Lock()
+        self._task_projects = {}
+
+    def run(self, section: str, label: str, items: list, send):
+        """1セクションを投入
+
+        Args:
+            send: 項目 -> (status, body)。ValueErrorは送信前の失敗（参照先が見つからない等）
+        """
+        if not items:
+            return
+        done = self.checkpoint.done(section)
+        pending = [(i, item) for i, item in enumerate(items) if i not in done]
+        progress = Progress(label, len(pending), len(items) - len(pending))
+
+        def task(index, item):
+            try:
+                status, body = send(dict(item))
+            except ValueError as e:
+                status, body = 0, str(e)
+            success = 200 <= status < 300
+            if success:
+                self.checkpoint.mark(section, index)
+            else:
+                self.failures.append((label, index, status, body[:200]))
+            progress.add(success)
+
+        # 送信待ちを一度に作りすぎないよう、同時に抱える数をワーカー数の数倍に抑える
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        running = set()
+        try:
+            for index, item in pending:
+                if len(running) >= self.workers * 4:
+                    finished, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                running.add(pool.submit(task, index, item))
+            for future in running:
+                future.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+            self.checkpoint.save()
+        progress.finish()
+
+    # === cd -> id の解決（親セクションの投入後に一覧を1回取得） ===
+
+    def _lookup(self, kind: str, key: tuple):
+        with self._ids_lock:
+            if kind not in self._ids:
+                self._ids[kind] = self._fetch_ids(kind)
+        try:
+            return self._ids[kind][key]
+        except KeyError:
+            raise ValueError(f"{kind} が見つかりません: {'/'.join(key)}")
+
+    def _fetch_ids(self, kind: str) -> dict:
+        """cd（親のcdを含む）-> id の対応表"""
+        if kind == "user":
+            return {(r["cd"],): r["id"] for r in self.client.get_all("/api/v1/users")}
+        if kind == "project":
+            return {(r["cd"],): r["id"] for r in self.client.get_all("/api/v1/projects")}
+        if kind == "issue":
+            return {(r["project_cd"], r["cd"]): r["id"] for r in self.client.get_all("/api/v1/issues")}
+        return {
+            (r["project_cd"], r["issue_cd"], r["cd"]): r["id"] for r in self.client.get_all("/api/v1/tasks")
+        }
+
+    def created(self, kind: str, item: dict) -> tuple[int, str, dict] | None:
+        """再試行前の確認: 同じcd（属性タイプ・選択肢はcode）の行が既にあれば、作成済みとしての結果を返す
+
+        同じ内容なら先の試行で作成されたとみなして成功（201）とし、
+        内容が異なれば別の行がcdを使っているため再試行せずに失敗（409）とする。
+        """
+        code_key = "code" if kind in ("attr_type", "option") else "cd"
+        try:
+            rows = self._existing(kind, item)
+        except RuntimeError:
+            return None
+        row = next((r for r in rows if r[code_key] == item[code_key]), None)
+        if row is None:
+            return None
+        if any(key in row and row[key] != value for key, value in item.items()):
+            return 409, f"コードは既に別の内容で使われています: {item[code_key]}", {}
+        return 201, json.dumps(row, ensure_ascii=False), {}
+
+    def _existing(self, kind: str, item: dict) -> list[dict]:
+        """作成済みの確認に使う、同じcdを含みうる行の一覧"""
+        if kind == "user":
+            return self.client.get_all(f"/api/v1/users?q={urllib.parse.quote(item['cd'])}")
+        if kind == "project":
+            return self.client.get_all(f"/api/v1/projects?q={urllib.parse.quote(item['cd'])}")
+        if kind == "issue":
+            return self.client.get_all(f"/api/v1/issues?project_id={item['project_id']}")
+        if kind == "task":
+            return self.client.get_all(f"/api/v1/tasks?issue_id={item['issue_id']}")
+        # 属性タイプ・選択肢はJSON APIがないため、画面の一覧（HTML）の行から読み取る
+        if kind == "attr_type":
+            path, prefix = "/user-attribute-types/list", "attr-type"
+        else:
+            path, prefix = f"/user-attribute-types/{item['type_id']}/options/list", "attr-option"
+        status, body, _ = self.client.request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"GET {path}: {status} {body[:200]}")
+        return [
+            {"id": int(m[1]), "code": html.unescape(m[2]), "name": html.unescape(m[3]), "sort_order": int(m[4])}
+            for m in re.finditer(ATTR_ROW_PATTERN.format(prefix=prefix), body)
+        ]
+
+    def task_project(self, task_id: int) -> int:
+        """作業IDから所属プロジェクトのIDを得る（作業ごとに1回だけ取得）"""
+        if task_id not in self._task_projects:
+            status, body, _ = self.client.request("GET", f"/api/v1/tasks/{task_id}")
+            if status != 200:
+                raise ValueError(f"task が見つかりません: {task_id}")
+            self._task_projects[task_id] = json.loads(body)["project_id"]
+        return self._task_projects[task_id]
+
+    def forget(self, kind: str):
+        """親セクションを投入したら、その一覧を取り直す"""
+        self._ids.pop(kind, None)
+
+    def resolve(self, item: dict, kind: str) -> int:
+        """項目の {kind}_id、なければ cd（例: project_cd, issue_cd）から id を得る（cdのキーは項目から外す）"""
+        keys = {"user": ("user_cd",), "project": ("project_cd",),
+                "issue": ("project_cd", "issue_cd"), "task": ("project_cd", "issue_cd", "task_cd")}[kind]
+        if f"{kind}_id" in item:
+            resolved = item.pop(f"{kind}_id")
+        else:
+            resolved = self._lookup(kind, tuple(str(item.get(k, "")) for k in keys))
+        for k in keys:
+            item.pop(k, None)
+        return resolved
+
+
 def cmd_bulk(args):
     """JSONファイルから一括投入
 
-    JSONフォーマット:
+    JSONフォーマット（セクションはすべて任意、この順に投入）:
     {
-        "users": [
-            {"cd": "U001", "name": "田中太郎", "email": "tanaka@example.com", "attrs": {"attr_1": 1}}
-        ],
         "attr_types": [
             {"code": "role", "name": "役職", "sort_order": 0}
         ],
         "options": [
             {"type_id": 1, "code": "member", "name": "メンバー", "sort_order": 0}
+        ],
+        "users": [
+            {"cd": "U001", "name": "田中太郎", "email": "tanaka@example.com", "attrs": {"attr_1": 1}}
+        ],
+        "projects": [
+            {"cd": "PJ001", "name": "基幹刷新", "description": ""}
+        ],
+        "issues": [
+            {"project_cd": "PJ001", "cd": "I001", "name": "画面開発", "status": "open"}
+        ],
+        "tasks": [
+            {"project_cd": "PJ001", "issue_cd": "I001", "cd": "T001", "name": "設計"}
+        ],
+        "task_assignees": [
+            {"user_cd": "U001", "project_cd": "PJ001", "issue_cd": "I001", "task_cd": "T001"}
+        ],
+        "work_logs": [
+            {"user_cd": "U001", "project_cd": "PJ001", "issue_cd": "I001", "task_cd": "T001",
+             "work_date": "2026-01-05", "hours": 7.5}
         ]
     }
+    参照先は *_cd の代わりに project_id / issue_id / task_id / user_id でも指定できる
+    （task_assignees で task_id だけを指定した場合、プロジェクトは作業から求める）。
+    実績は担当の作業にのみ登録できるため、task_assignees で先に担当を割り当てる（割当済みなら何もしない）。
     """
     json_path = Path(args.file)
     if not json_path.exists():
@@ -190,30 +578,109 @@ def cmd_bulk(args):
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    # 属性タイプ
-    for item in data.get("attr_types", []):
-        status, _ = api_request("POST", "/user-attribute-types", item)
-        print(f"属性タイプ '{item['name']}': {status}")
+    client = ApiClient(args.base_url, pool_size=args.workers, retries=args.retries)
+    checkpoint = Checkpoint(args.checkpoint or json_path.with_name(json_path.name + ".checkpoint"), args.restart)
+    loader = BulkLoader(client, args.workers, checkpoint)
+    if any(checkpoint.done(section) for section in BULK_SECTIONS):
+        print(f"チェックポイントから再開: {checkpoint.path}")
 
-    # 選択肢
-    for item in data.get("options", []):
-        type_id = item.pop("type_id")
-        status, _ = api_request("POST", f"/user-attribute-types/{type_id}/options", item)
-        print(f"選択肢 '{item['name']}': {status}")
+    def send_attr_type(item):
+        status, body, _ = client.request(
+            "POST", "/user-attribute-types", form=item, before_retry=lambda: loader.created("attr_type", item)
+        )
+        return status, body
+
+    def send_option(item):
+        form = {k: v for k, v in item.items() if k != "type_id"}
+        status, body, _ = client.request(
+            "POST", f"/user-attribute-types/{item['type_id']}/options", form=form,
+            before_retry=lambda: loader.created("option", item)
+        )
+        return status, body
 
-    # ユーザー
-    for item in data.get("users", []):
+    def send_user(item):
         attrs = item.pop("attrs", {})
         user_data = {**item, **attrs}
-
         if "id" in item:
             # 更新
             user_id = user_data.pop("id")
-            status, _ = api_request("PUT", f"/users/{user_id}", user_data)
+            status, body, _ = client.request("PUT", f"/users/{user_id}", form=user_data)
         else:
             # 新規作成
-            status, _ = api_request("POST", "/users", user_data)
-        print(f"ユーザー '{item['name']}': {status}")
+            status, body, _ = client.request(
+                "POST", "/users", form=user_data, before_retry=lambda: loader.created("user", user_data)
+            )
+        return status, body
+
+    def send_project(item):
+        status, body, _ = client.request(
+            "POST", "/api/v1/projects", json_body=item, before_retry=lambda: loader.created("project", item)
+        )
+        return status, body
+
+    def send_issue(item):
+        item["project_id"] = loader.resolve(item, "project")
+        status, body, _ = client.request(
+            "POST", "/api/v1/issues", json_body=item, before_retry=lambda: loader.created("issue", item)
+        )
+        return status, body
+
+    def send_task(item):
+        item["issue_id"] = loader.resolve(item, "issue")
+        status, body, _ = client.request(
+            "POST", "/api/v1/tasks", json_body=item, before_retry=lambda: loader.created("task", item)
+        )
+        return status, body
+
+    def send_task_assignee(item):
+        project_id = item.get("project_id")
+        if project_id is None:
+            if "task_id" in item and "project_cd" not in item:
+                project_id = loader.task_project(item["task_id"])
+            else:
+                project_id = loader.resolve(dict(item), "project")
+        body = {"task_id": loader.resolve(item, "task"), "user_id": loader.resolve(item, "user")}
+        status, text, _ = client.request("POST", f"/api/v1/projects/{project_id}/assignees/bulk-assign", json_body=body)
+        return status, text
+
+    def send_work_log(item):
+        item["task_id"] = loader.resolve(item, "task")
+        item["user_id"] = loader.resolve(item, "user")
+        status, body, _ = client.request("POST", "/api/v1/work-logs", json_body=item)
+        return status, body
+
+    senders = {
+        "attr_types": ("属性タイプ", send_attr_type, None),
+        "options": ("選択肢", send_option, None),
+        "users": ("ユーザー", send_user, "user"),
+        "projects": ("プロジェクト", send_project, "project"),
+        "issues": ("案件", send_issue, "issue"),
+        "tasks": ("作業", send_task, "task"),
+        "task_assignees": ("担当", send_task_assignee, None),
+        "work_logs": ("実績", send_work_log, None),
+    }
+    start = time.monotonic()
+    try:
+        for section in BULK_SECTIONS:
+            label, send, kind = senders[section]
+            loader.run(section, label, data.get(section, []), send)
+            if kind:
+                loader.forget(kind)
+    except KeyboardInterrupt:
+        checkpoint.save()
+        print(f"\n中断しました。同じコマンドで再開できます（{checkpoint.path}）")
+        sys.exit(130)
+
+    print(f"完了: {time.monotonic() - start:.1f}秒")
+    if loader.failures:
+        checkpoint.save()
+        print(f"失敗 {len(loader.failures)}件（再実行すると失敗した項目のみ送信します: {checkpoint.path}）")
+        order = {senders[section][0]: i for i, section in enumerate(BULK_SECTIONS)}
+        failures = sorted(loader.failures, key=lambda f: (order[f[0]], f[1]))
+        for label, index, status, body in failures[:FAILURE_REPORT_LIMIT]:
+            print(f"  {label}[{index}]: {status} {body}")
+        sys.exit(1)
+    checkpoint.remove()
 
 
 def main():
@@ -278,6 +745,11 @@ def main():
     # bulk コマンド
     bulk_parser = subparsers.add_parser("bulk", help="JSONファイルから一括投入")
     bulk_parser.add_argument("file", help="JSONファイルパス")
+    bulk_parser.add_argument("--base-url", default=BASE_URL, help=f"接続先 既定: {BASE_URL}")
+    bulk_parser.add_argument("--workers", type=int, default=4, help="同時に送信する数 既定: 4")
+    bulk_parser.add_argument("--retries", type=int, default=5, help="429/5xx・接続エラーの再試行回数 既定: 5")
+    bulk_parser.add_argument("--checkpoint", type=Path, help="チェックポイントのパス 既定: <JSONファイル>.checkpoint")
+    bulk_parser.add_argument("--restart", action="store_true", help="チェックポイントを無視して最初から投入")
 
     args = parser.parse_args()
 
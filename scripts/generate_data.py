@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""合成データ生成ツール（負荷試験・ベンチマーク用）
+
+ユーザー・属性・プロジェクト・案件・作業・見積内訳・担当・月次アサイン・実績を
+規模を指定して生成し、SQLiteへ直接書き込む。同じ規模・シードなら常に同じ内容になる。
+
+分布:
+    - プロジェクトの規模（案件数）は偏らせる（少数の大きなプロジェクトと多数の小さなプロジェクト）
+    - 案件は古いものほど完了、新しいものほど未着手が多く、作業の進捗率は状態に応じて決める
+    - 作業の見積時間は対数正規分布（中央値16h）
+    - ユーザーは1〜3プロジェクトを掛け持ちし、四半期ごとに一部のユーザーが異動する
+    - 実績は平日のみ（休暇あり）、1日の合計は7.75h前後で、その月のアサイン比率に沿って1〜3作業に配分
+
+書き込みは executemany でまとめて行い、投入中は WAL・synchronous=OFF にする。
+実績の投入中は work_log のトリガー（更新バージョン・月次集計）と日付のインデックスを外し、
+最後に月次集計を再構築して作り直す（database.work_log_bulk_load）。
+
+使用例:
+    python scripts/generate_data.py --reset
+    python scripts/generate_data.py --preset large --reset
+    python scripts/generate_data.py --users 2000 --projects 150 --months 24 --seed 7 --reset
+    python scripts/generate_data.py --database /tmp/load.db --preset medium --end 2026-03-31 --reset
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(ROOT / "src"))
+
+
+@dataclass(frozen=True)
+class Scale:
+    """生成する規模（案件・作業はそれぞれプロジェクト・案件あたりの平均）
+
+    end: 実績の最終日（Noneは今日）
+    """
+    users: int
+    projects: int
+    issues: int
+    tasks: int
+    months: int
+    end: date | None = None
+
+
+PRESETS = {
+    "small": Scale(users=20, projects=5, issues=8, tasks=6, months=12),
+    "medium": Scale(users=200, projects=30, issues=15, tasks=8, months=12),
+    "large": Scale(users=1000, projects=100, issues=20, tasks=10, months=24),
+}
+
+# 1トランザクションで書き込む実績の行数
+CHUNK_ROWS = 500_000
+
+# 月の標準稼働時間（アサイン時間の基準）
+MONTHLY_HOURS = 160
+
+# 属性タイプ: (コード, 名前, [(選択肢コード, 選択肢名, 比率)])
+ATTRIBUTE_TYPES = [
+    ("dept", "部署", [("dev", "開発", 6), ("qa", "品質保証", 2), ("ops", "運用", 1), ("sales", "営業", 1)]),
+    ("contract", "契約", [("fte", "社員", 6), ("bp", "BP", 3), ("temp", "派遣", 1)]),
+]
+
+SURNAMES = ["佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤",
+            "吉田", "山田", "佐々木", "山口", "松本", "井上", "木村", "林", "斎藤", "清水"]
+GIVEN_NAMES = ["太郎", "花子", "翔太", "美咲", "大輔", "陽子", "健太", "由美", "拓也", "彩",
+               "直樹", "真由美", "亮", "愛", "誠", "恵", "剛", "結衣", "悠斗", "さくら"]
+
+ISSUE_NAMES = ["基盤構築", "画面開発", "API開発", "帳票対応", "データ移行", "性能改善", "障害対応", "保守運用"]
+TASK_PHASES = [("設計", 0.3), ("実装", 0.5), ("テスト", 0.2)]
+
+
+def _weekdays(start: date, end: date) -> list[date]:
+    days = []
+    d = start
+    while d <= end:
+        if d.weekday() < 5:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+def _month_start(d: date, months_back: int) -> date:
+    index = d.year * 12 + d.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _split_hours(rng: random.Random, total: float, count: int) -> list[float]:
+    """合計をcount件に0.25h単位で配分（各0.25h以上）"""
+    quarters = int(total * 4)
+    weights = [rng.random() + 0.3 for _ in range(count)]
+    parts = [max(1, int(quarters * w / sum(weights))) for w in weights]
+    parts[0] += quarters - sum(parts)
+    if parts[0] < 1:
+        return [total]
+    return [q / 4 for q in parts]
+
+
+def _insert_entities(conn: sqlite3.Connection, scale: Scale, rng: random.Random) -> dict:
+    """マスタ（ユーザー・属性・プロジェクト・案件・作業・見積内訳）を投入
+
+    Returns:
+        プロジェクトID -> (作業IDのリスト, 重み)（担当・実績の配分用。進行中の作業ほど重い）
+    """
+    from database import DEFAULT_STATUSES
+
+    user_ids = range(1, scale.users + 1)
+    conn.executemany(
+        "INSERT INTO user (id, cd, name, email, is_active) VALUES (?, ?, ?, ?, ?)",
+        [(i, f"U{i:04d}", rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES), f"u{i:04d}@example.com",
+          int(rng.random() > 0.03)) for i in user_ids],
+    )
+    for type_id, (code, name, options) in enumerate(ATTRIBUTE_TYPES, start=1):
+        conn.execute(
+            "INSERT INTO user_attribute_type (id, code, name, sort_order) VALUES (?, ?, ?, ?)",
+            (type_id, code, name, type_id),
+        )
+        option_ids = []
+        for order, (option_code, option_name, _) in enumerate(options):
+            cursor = conn.execute(
+                "INSERT INTO user_attribute_option (type_id, code, name, sort_order) VALUES (?, ?, ?, ?)",
+                (type_id, option_code, option_name, order),
+            )
+            option_ids.append(cursor.lastrowid)
+        weights = [ratio for _, _, ratio in options]
+        conn.executemany(
+            "INSERT INTO user_attribute (user_id, type_id, option_id) VALUES (?, ?, ?)",
+            [(u, type_id, rng.choices(option_ids, weights)[0]) for u in user_ids],
+        )
+
+    project_ids = range(1, scale.projects + 1)
+    conn.executemany(
+        "INSERT INTO project (id, cd, name, description) VALUES (?, ?, ?, ?)",
+        [(p, f"PJ{p:03d}", f"プロジェクト{p:03d}", f"合成データのプロジェクト{p:03d}") for p in project_ids],
+    )
+    conn.executemany(
+        "INSERT INTO project_status (project_id, code, name, sort_order) VALUES (?, ?, ?, ?)",
+        [(p, code, name, order) for p in project_ids for code, name, order in DEFAULT_STATUSES],
+    )
+
+    # 規模の偏り（順位の-0.7乗、平均が1になるよう正規化）
+    sizes = [1 / (rank ** 0.7) for rank in project_ids]
+    mean_size = sum(sizes) / len(sizes)
+
+    issues, tasks, estimates = [], [], []
+    project_tasks = {}
+    for p, size in zip(project_ids, sizes):
+        issue_count = max(1, round(scale.issues * size / mean_size))
+        task_ids, task_weights = [], []
+        for i in range(1, issue_count + 1):
+            issue_id = len(issues) + 1
+            age = i / issue_count  # 0に近いほど古い
+            if age <= 0.4:
+                status = rng.choices(("closed", "in_progress"), (8, 2))[0]
+            elif age <= 0.8:
+                status = rng.choices(("closed", "in_progress", "open"), (2, 7, 1))[0]
+            else:
+                status = rng.choices(("in_progress", "open"), (3, 7))[0]
+            issues.append((issue_id, f"I{i:03d}", p, f"{rng.choice(ISSUE_NAMES)}{i:03d}", None, status))
+
+            issue_estimate = 0.0
+            task_count = rng.randint(max(1, scale.tasks // 2), max(1, scale.tasks * 3 // 2))
+            for t in range(1, task_count + 1):
+                task_id = len(tasks) + 1
+                estimate = min(400.0, max(0.5, round(rng.lognormvariate(math.log(16), 0.8) * 2) / 2))
+                if status == "closed":
+                    progress = 100
+                elif status == "open":
+                    progress = 0
+                else:
+                    progress = min(90, round(rng.betavariate(2, 2) * 10) * 10)
+                phase = TASK_PHASES[(t - 1) % len(TASK_PHASES)][0]
+                tasks.append((task_id, f"T{t:03d}", issue_id, f"{phase}{t:03d}", None, t, estimate, progress))
+                issue_estimate += estimate
+                task_ids.append(task_id)
+                task_weights.append({"in_progress": 6, "open": 1, "closed": 2}[status])
+            estimates.extend(
+                (issue_id, phase, round(issue_estimate * ratio * 2) / 2, order)
+                for order, (phase, ratio) in enumerate(TASK_PHASES)
+            )
+        project_tasks[p] = (task_ids, task_weights)
+
+    conn.executemany(
+        "INSERT INTO issue (id, cd, project_id, name, description, status) VALUES (?, ?, ?, ?, ?, ?)", issues
+    )
+    conn.executemany(
+        "INSERT INTO task (id, cd, issue_id, name, description, sort_order, estimate_hours, progress_rate) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", tasks
+    )
+    conn.executemany(
+        "INSERT INTO issue_estimate_item (issue_id, name, hours, sort_order) VALUES (?, ?, ?, ?)", estimates
+    )
+    return project_tasks
+
+
+def _plan_assignments(scale: Scale, rng: random.Random, months: list[date], project_tasks: dict) -> dict:
+    """ユーザー × 月ごとのアサイン（プロジェクト -> 比率）と担当作業
+
+    四半期の初めに、初回は全員、以降は約25%のユーザーがプロジェクトを選び直す。
+
+    Returns:
+        ユーザーID -> [(月初, {プロジェクトID: (比率, [作業ID])})]（monthsと同じ順）
+    """
+    project_ids = list(project_tasks)
+    project_weights = [1 / (rank ** 0.7) for rank in range(1, len(project_ids) + 1)]
+    plans = {}
+    for user_id in range(1, scale.users + 1):
+        plan, current = [], None
+        for month in months:
+            if current is None or (month.month % 3 == 1 and rng.random() < 0.25):
+                count = min(len(project_ids), rng.choices((1, 2, 3), (5, 4, 1))[0])
+                chosen = []
+                while len(chosen) < count:
+                    p = rng.choices(project_ids, project_weights)[0]
+                    if p not in chosen:
+                        chosen.append(p)
+                primary = rng.uniform(0.5, 1.0) if count > 1 else 1.0
+                rest = [rng.random() + 0.2 for _ in chosen[1:]]
+                shares = [primary] + [(1 - primary) * r / sum(rest) for r in rest]
+                current = {}
+                for p, share in zip(chosen, shares):
+                    task_ids, weights = project_tasks[p]
+                    picked = set()
+                    for _ in range(min(len(task_ids), rng.randint(2, 5))):
+                        picked.add(rng.choices(task_ids, weights)[0])
+                    current[p] = (share, sorted(picked))
+            plan.append((month, current))
+        plans[user_id] = plan
+    return plans
+
+
+def generate(conn: sqlite3.Connection, scale: Scale, seed: int, chunk: int = CHUNK_ROWS, progress=print) -> dict:
+    """空のスキーマへ合成データを投入（トランザクションは内部で管理）
+
+    Returns:
+        テーブル -> 投入件数
+    """
+    rng = random.Random(seed)
+    end = scale.end or date.today()
+    months = [_month_start(end, back) for back in range(scale.months - 1, -1, -1)]
+    counts = {}
+
+    with conn:
+        project_tasks = _insert_entities(conn, scale, rng)
+        plans = _plan_assignments(scale, rng, months, project_tasks)
+        conn.executemany(
+            "INSERT INTO monthly_assignment (user_id, project_id, year_month, planned_hours) VALUES (?, ?, ?, ?)",
+            [(user_id, p, month.strftime("%Y-%m"), max(10, round(share * MONTHLY_HOURS / 10) * 10))
+             for user_id, plan in plans.items() for month, assignment in plan
+             for p, (share, _) in assignment.items()],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_assignee (task_id, user_id) VALUES (?, ?)",
+            [(task_id, user_id) for user_id, plan in plans.items()
+             for _, assignment in plan for _, task_ids in assignment.values() for task_id in task_ids],
+        )
+    for table in ("user", "project", "issue", "task", "task_assignee", "monthly_assignment"):
+        counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    progress("  " + ", ".join(f"{table} {count:,}" for table, count in counts.items()))
+
+    rows = []
+    written = 0
+
+    def flush():
+        nonlocal rows, written
+        with conn:
+            conn.executemany("INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, ?, ?)", rows)
+        written += len(rows)
+        progress(f"  work_log {written:,}")
+        rows = []
+
+    # 月ごとの営業日（全ユーザー共通）
+    month_days = {
+        month: [d.isoformat() for d in _weekdays(month, min(end, _month_start(month, -1) - timedelta(days=1)))]
+        for month in months
+    }
+    # 重み付きの抽選は累積重みの二分探索で行う（random.choices を行ごとに呼ぶと重みの集計が毎回走る）
+    random_ = rng.random
+    for user_id, plan in plans.items():
+        for month, assignment in plan:
+            # 作業ごとの重み = プロジェクトの比率 / そのプロジェクトの担当作業数
+            task_ids = [task_id for _, tasks in assignment.values() for task_id in tasks]
+            cumulative = list(accumulate(share / len(tasks) for share, tasks in assignment.values() for _ in tasks))
+            weight_total = cumulative[-1]
+            for work_date in month_days[month]:
+                if random_() < 0.05:  # 休暇
+                    continue
+                total = min(12.0, max(2.0, round(rng.gauss(7.75, 1.0) * 4) / 4))
+                r = random_()
+                count = min(len(task_ids), 1 if r < 0.4 else 2 if r < 0.8 else 3)
+                picked = set()
+                while len(picked) < count:
+                    picked.add(task_ids[bisect(cumulative, random_() * weight_total)])
+                if count == 1:
+                    rows.append((picked.pop(), user_id, work_date, total))
+                    continue
+                for task_id, hours in zip(picked, _split_hours(rng, total, count)):
+                    rows.append((task_id, user_id, work_date, hours))
+        if len(rows) >= chunk:
+            flush()
+    if rows:
+        flush()
+    counts["work_log"] = written
+    return counts
+
+
+def load(path: Path, scale: Scale, seed: int, reset: bool = False, chunk: int = CHUNK_ROWS, progress=print) -> dict:
+    """DBファイルを用意して合成データを投入
+
+    アプリのDBパスはimport時に環境変数 DATABASE_PATH から決まるため、pathはそれと一致している必要がある。
+
+    Returns:
+        テーブル -> 投入件数
+    """
+    import database
+    from database import init_db, work_log_bulk_load
+
+    if database.DB_PATH.resolve() != path.resolve():
+        raise ValueError(f"DATABASE_PATH（{database.DB_PATH}）と出力先（{path}）が一致しません")
+    if reset:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+    init_db()
+
+    conn = sqlite3.connect(path)
+    try:
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM user UNION ALL SELECT 1 FROM project)").fetchone()[0]:
+            raise ValueError(f"{path} には既にデータがあります（--reset で作り直してください）")
+        conn.execute("PRAGMA cache_size = -262144")  # 256MB
+        with work_log_bulk_load(conn):
+            counts = generate(conn, scale, seed, chunk, progress)
+            progress("  月次集計を再構築")
+        with conn:
+            conn.execute("UPDATE table_version SET version = version + 1")
+    finally:
+        conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成データ生成（負荷試験・ベンチマーク用）")
+    parser.add_argument("--database", type=Path, help="出力先 既定: 環境変数 DATABASE_PATH または data/app.db")
+    parser.add_argument("--preset", choices=PRESETS, default="small", help="規模の既定値")
+    parser.add_argument("--users", type=int, help="ユーザー数")
+    parser.add_argument("--projects", type=int, help="プロジェクト数")
+    parser.add_argument("--issues", type=int, help="プロジェクトあたりの案件数（平均）")
+    parser.add_argument("--tasks", type=int, help="案件あたりの作業数（平均）")
+    parser.add_argument("--months", type=int, help="実績・アサインの月数")
+    parser.add_argument("--end", type=date.fromisoformat, help="実績の最終日 YYYY-MM-DD 既定: 今日")
+    parser.add_argument("--seed", type=int, default=1, help="乱数のシード")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="1トランザクションで書き込む実績の行数")
+    parser.add_argument("--reset", action="store_true", help="既存のDBファイルを削除して作り直す")
+    args = parser.parse_args()
+
+    overrides = {
+        key: value for key in ("users", "projects", "issues", "tasks", "months", "end")
+        if (value := getattr(args, key)) is not None
+    }
+    scale = replace(PRESETS[args.preset], **overrides)
+
+    # DBのパスはアプリのimport時に決まるため、importより前に設定する
+    if args.database:
+        os.environ["DATABASE_PATH"] = str(args.database)
+    # 投入時のインデックス作成等をスロークエリとして記録しない
+    os.environ.setdefault("SLOW_QUERY_MS", "off")
+    from database import DB_PATH
+
+    print(f"合成データを生成: {DB_PATH}")
+    print(f"  {scale}")
+    start = time.perf_counter()
+    try:
+        counts = load(DB_PATH, scale, args.seed, args.reset, args.chunk)
+    except ValueError as e:
+        sys.exit(str(e))
+    elapsed = time.perf_counter() - start
+    print(f"完了: 実績 {counts['work_log']:,}件 / {elapsed:.1f}秒（{counts['work_log'] / elapsed:,.0f}行/秒）")
+
+
+if __name__ == "__main__":
+    main()
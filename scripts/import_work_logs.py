@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""実績の一括インポート（旧工数管理ツールからの移行用）
+
+CSV / JSONL の実績をAPIを通さずにSQLiteへ直接書き込む。
+入力は1行ずつ読み進め、コード（ユーザー・プロジェクト・案件・作業）からIDへの変換表は最初に1回だけ作る。
+書き込みは executemany でチャンクごとに1トランザクションで行い、投入中は work_log のトリガー・インデックスを外して
+最後に月次集計の再構築とともに作り直す（database.work_log_bulk_load）。
+
+入力の列（CSVはヘッダー行、JSONLは各行のキー）:
+    user_cd, project_cd, issue_cd, task_cd, work_date (YYYY-MM-DD), hours
+
+取り込めなかった行は、入力の行番号と理由を付けて <入力>.rejected.csv / .jsonl に書き出す。
+既定では実績のユーザーを作業の担当者に追加する（アプリでは担当者でないと実績を入力できないため）。
+
+使用例:
+    python scripts/import_work_logs.py old_worklogs.csv
+    python scripts/import_work_logs.py old_worklogs.csv --encoding cp932 --on-conflict skip
+    python scripts/import_work_logs.py export.jsonl --database /tmp/migrated.db --chunk 200000
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(ROOT / "src"))
+
+COLUMNS = ("user_cd", "project_cd", "issue_cd", "task_cd", "work_date", "hours")
+
+# 1トランザクションで書き込む行数
+CHUNK_ROWS = 100_000
+
+# 同じ（作業, ユーザー, 日付）の実績が既にある場合: replace = 上書き、skip = 既存を残す
+INSERT_SQL = {
+    "replace": (
+        "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (task_id, user_id, work_date) DO UPDATE SET hours = excluded.hours"
+    ),
+    "skip": "INSERT OR IGNORE INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, ?, ?)",
+}
+
+
+def read_rows(path: Path, encoding: str):
+    """入力を1行ずつ読む
+
+    Yields:
+        (行番号, {列: 値})（JSONLで解釈できない行は値の代わりにエラーメッセージ）
+    """
+    with path.open(encoding=encoding, newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, f"JSONとして解釈できません: {e.msg}"
+                    continue
+                yield line_no, row if isinstance(row, dict) else "オブジェクトではありません"
+        else:
+            reader = csv.DictReader(f)
+            missing = [c for c in COLUMNS if c not in (reader.fieldnames or ())]
+            if missing:
+                raise ValueError(f"列がありません: {', '.join(missing)}")
+            for row in reader:
+                yield reader.line_num, row
+
+
+class Resolver:
+    """コードからIDへの変換（変換表は最初に1回だけ作る）"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.users = dict(conn.execute("SELECT cd, id FROM user"))
+        self.tasks = {
+            (project_cd, issue_cd, task_cd): task_id
+            for project_cd, issue_cd, task_cd, task_id in conn.execute("""
+                SELECT p.cd, i.cd, t.cd, t.id
+                FROM task t
+                JOIN issue i ON t.issue_id = i.id
+                JOIN project p ON i.project_id = p.id
+            """)
+        }
+
+    def convert(self, row: dict) -> tuple:
+        """1行を (task_id, user_id, work_date, hours) に変換（不正ならValueError）"""
+        values = {c: str(row.get(c) if row.get(c) is not None else "").strip() for c in COLUMNS}
+        empty = [c for c in COLUMNS if not values[c]]
+        if empty:
+            raise ValueError(f"値がありません: {', '.join(empty)}")
+        user_id = self.users.get(values["user_cd"])
+        if user_id is None:
+            raise ValueError(f"ユーザーが見つかりません: {values['user_cd']}")
+        task_id = self.tasks.get((values["project_cd"], values["issue_cd"], values["task_cd"]))
+        if task_id is None:
+            raise ValueError(
+                f"作業が見つかりません: {values['project_cd']}/{values['issue_cd']}/{values['task_cd']}"
+            )
+        try:
+            work_date = date.fromisoformat(values["work_date"]).isoformat()
+        except ValueError:
+            raise ValueError(f"日付が不正です: {values['work_date']}") from None
+        try:
+            hours = float(values["hours"])
+        except ValueError:
+            raise ValueError(f"工数が数値ではありません: {values['hours']}") from None
+        if not 0 < hours <= 24:
+            raise ValueError(f"工数は0より大きく24以下で指定してください: {values['hours']}")
+        return task_id, user_id, work_date, hours
+
+
+class RejectWriter:
+    """取り込めなかった行の書き出し（最初の1件で作成する）"""
+
+    def __init__(self, source: Path):
+        jsonl = source.suffix.lower() in (".jsonl", ".ndjson")
+        self.path = source.with_name(f"{source.stem}.rejected{'.jsonl' if jsonl else '.csv'}")
+        self.jsonl = jsonl
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line_no: int, row, error: str):
+        if self._file is None:
+            self._file = self.path.open("w", encoding="utf-8", newline="")
+            if not self.jsonl:
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(("line", "error", *COLUMNS))
+        self.count += 1
+        row = row if isinstance(row, dict) else {}
+        if self.jsonl:
+            self._file.write(json.dumps({"line": line_no, "error": error, "row": row}, ensure_ascii=False) + "\n")
+        else:
+            self._writer.writerow((line_no, error, *(row.get(c, "") for c in COLUMNS)))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def import_work_logs(conn: sqlite3.Connection, rows, on_conflict: str = "replace", assign: bool = True,
+                     chunk: int = CHUNK_ROWS, rejects: RejectWriter | None = None, progress=print) -> dict:
+    """実績を投入（トランザクションはチャンクごとに内部で管理）
+
+    Args:
+        rows: read_rows() の結果
+        assign: 実績のユーザーを作業の担当者に追加する
+
+    Returns:
+        {read, written, skipped, rejected}（skipped は --on-conflict skip で既存を残した行）
+    """
+    from database import work_log_bulk_load
+
+    resolver = Resolver(conn)
+    insert = INSERT_SQL[on_conflict]
+    counts = {"read": 0, "written": 0, "skipped": 0, "rejected": 0}
+    batch = []
+    assignees = set()
+
+    def flush():
+        with conn:
+            written = conn.executemany(insert, batch).rowcount
+            if assign:
+                conn.executemany("INSERT OR IGNORE INTO task_assignee (task_id, user_id) VALUES (?, ?)", assignees)
+        counts["written"] += written
+        counts["skipped"] += len(batch) - written
+        progress(f"  {counts['read']:,}行 読込 / {counts['written']:,}行 書込 / {counts['rejected']:,}行 除外")
+        batch.clear()
+        assignees.clear()
+
+    with work_log_bulk_load(conn):
+        for line_no, row in rows:
+            counts["read"] += 1
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError(row)
+                values = resolver.convert(row)
+            except ValueError as e:
+                counts["rejected"] += 1
+                if rejects is not None:
+                    rejects.write(line_no, row, str(e))
+                continue
+            batch.append(values)
+            if assign:
+                assignees.add(values[:2])
+            if len(batch) >= chunk:
+                flush()
+        if batch:
+            flush()
+        progress("  月次集計を再構築")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="実績の一括インポート（CSV / JSONL）")
+    parser.add_argument("input", type=Path, help="入力ファイル（拡張子 .jsonl / .ndjson はJSONL、それ以外はCSV）")
+    parser.add_argument("--database", type=Path, help="書き込み先 既定: 環境変数 DATABASE_PATH または data/app.db")
+    parser.add_argument("--encoding", default="utf-8-sig", help="入力の文字コード（例: cp932）")
+    parser.add_argument("--on-conflict", choices=INSERT_SQL, default="replace",
+                        help="同じ作業・ユーザー・日付の実績がある場合（replace: 上書き / skip: 既存を残す）")
+    parser.add_argument("--no-assign", action="store_true", help="実績のユーザーを作業の担当者に追加しない")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="1トランザクションで書き込む行数")
+    args = parser.parse_args()
+
+    # DBのパスはアプリのimport時に決まるため、importより前に設定する
+    if args.database:
+        os.environ["DATABASE_PATH"] = str(args.database)
+    # 投入後のインデックス作成等をスロークエリとして記録しない
+    os.environ.setdefault("SLOW_QUERY_MS", "off")
+    from database import DB_PATH, init_db
+
+    if not args.input.is_file():
+        print(f"入力ファイルがありません: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    init_db()
+    print(f"実績をインポート: {args.input} -> {DB_PATH}")
+    start = time.perf_counter()
+    rejects = RejectWriter(args.input)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        counts = import_work_logs(
+            conn, read_rows(args.input, args.encoding), args.on_conflict, not args.no_assign, args.chunk, rejects
+        )
+    except ValueError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+        rejects.close()
+    skipped = f" / {counts['skipped']:,}行 既存のため省略" if counts["skipped"] else ""
+    print(f"完了: {counts['written']:,}行 書込{skipped} / {counts['rejected']:,}行 除外"
+          f"（{time.perf_counter() - start:.1f}秒）")
+    if rejects.count:
+        print(f"除外した行: {rejects.path}")
+
+
+if __name__ == "__main__":
+    main()
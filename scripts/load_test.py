@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""負荷試験（同時に工数を入力するユーザーを模擬）
+
+1ワーカーのuvicornで何人まで同時に使えるかを調べるためのツール。
+規模（small / medium / large）ごとに generate_data.py で合成データのDBを作り、
+その複製に対してuvicornを起動して、同時ユーザー数を段階的に増やしながら一定時間ずつ負荷をかける。
+
+各仮想ユーザーは合成データのユーザー1人になりきり、次のシナリオを重みに沿って繰り返す:
+    week_grid:       週グリッドを開く（GET /work-logs/grid?view=week、自分の行のみ）
+    cell_edit:       担当作業のセルを編集する（POST /work-logs、一部は0時間＝削除）
+    toggle_assignee: 担当割当をトグルする（POST /projects/{id}/assignees/toggle、
+                     開始時点で担当でない組み合わせのみ使うので実績の入力には影響しない）
+    monthly_detail:  月次アサインの詳細表示を開く（GET /monthly-assignments/grid?mode=detail）
+
+段階ごとにスループット、レイテンシ（p50/p95/p99）、エラー率と "database is locked" の率を表示し、
+結果を data/loadtest/ にJSONで保存する。アプリはロック待ちの超過を500として返すため、
+"database is locked" は起動したサーバーのログから数える（--base-url で既存のサーバーを使う場合は数えない）。
+
+合成データのDBは data/loadtest/ に残して再利用し、計測は毎回その複製に対して行う（書き込みが積み重ならない）。
+
+使用例:
+    python scripts/load_test.py
+    python scripts/load_test.py --scales small medium --concurrency 1 4 16 64 --duration 30
+    python scripts/load_test.py --mix week_grid=1 cell_edit=3 --think-ms 200
+    python scripts/load_test.py --base-url http://localhost:8000 --database data/app.db --concurrency 8
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from bisect import bisect
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+from data_loader import ApiClient
+
+ROOT = Path(__file__).parent.parent
+LOADTEST_DIR = ROOT / "data" / "loadtest"
+
+# 合成データの最終日（実行日に依存しないよう固定）
+DATASET_END = date(2026, 3, 31)
+
+# シナリオ -> 既定の重み
+DEFAULT_MIX = {
+    "week_grid": 40,
+    "cell_edit": 40,
+    "toggle_assignee": 10,
+    "monthly_detail": 10,
+}
+
+# SQLiteのロック待ち超過（サーバーのログのエラー行）
+LOCKED_MESSAGE = "OperationalError: database is locked"
+
+# トグルに使う（開始時点で担当でない）作業・ユーザーの組み合わせの数
+TOGGLE_PAIRS = 500
+
+# サーバーの起動を待つ時間（秒）
+SERVER_START_TIMEOUT = 30.0
+
+
+class Workload:
+    """合成データから作る、仮想ユーザーが操作する対象
+
+    Args:
+        path: 対象のDB（読み取りのみ）
+        end: 操作する期間の最終日（この週・月と前の週・月を操作する）
+        seed: トグルの組み合わせの抽選に使うシード
+    """
+
+    def __init__(self, path: Path, end: date, seed: int = 1):
+        rng = random.Random(seed)
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            assigned = set()
+            self.user_tasks = {}
+            for user_id, task_id in conn.execute("""
+                SELECT ta.user_id, ta.task_id
+                FROM task_assignee ta
+                JOIN user u ON ta.user_id = u.id
+                WHERE u.is_active = 1
+                ORDER BY ta.user_id, ta.task_id
+            """):
+                self.user_tasks.setdefault(user_id, []).append(task_id)
+                assigned.add((task_id, user_id))
+            tasks = conn.execute("""
+                SELECT t.id, i.project_id FROM task t JOIN issue i ON t.issue_id = i.id ORDER BY t.id
+            """).fetchall()
+        finally:
+            conn.close()
+        if not self.user_tasks or not tasks:
+            raise ValueError(f"{path} に担当割当がありません（generate_data.py で作成したDBを指定してください）")
+
+        self.users = list(self.user_tasks)
+        user_ids = self.users
+        pairs = set()
+        for _ in range(TOGGLE_PAIRS * 10):
+            if len(pairs) >= TOGGLE_PAIRS:
+                break
+            task_id, project_id = rng.choice(tasks)
+            user_id = rng.choice(user_ids)
+            if (task_id, user_id) not in assigned:
+                pairs.add((project_id, task_id, user_id))
+        self.toggle_pairs = sorted(pairs)
+
+        monday = end - timedelta(days=end.weekday())
+        self.weeks = [monday - timedelta(weeks=1), monday]
+        first = end.replace(day=1)
+        self.months = [(first - timedelta(days=1)).strftime("%Y-%m"), first.strftime("%Y-%m")]
+
+
+class VirtualUser:
+    """シナリオを繰り返す仮想ユーザー（1スレッド）"""
+
+    def __init__(self, client: ApiClient, workload: Workload, user_id: int, mix: dict, think: float, seed: int):
+        self.client = client
+        self.workload = workload
+        self.user_id = user_id
+        self.tasks = workload.user_tasks[user_id]
+        self.scenarios = list(mix)
+        self.cumulative = list(accumulate(mix.values()))
+        self.think = think
+        self.rng = random.Random(seed)
+        self.records = []
+
+    def run(self, deadline: float):
+        rng = self.rng
+        while time.perf_counter() < deadline:
+            scenario = self.scenarios[bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+            method, path, form = getattr(self, scenario)()
+            start = time.perf_counter()
+            status, _, _ = self.client.request(method, path, form=form)
+            self.records.append((scenario, start, time.perf_counter() - start, status))
+            if self.think:
+                time.sleep(rng.expovariate(1 / self.think))
+
+    def _week(self) -> date:
+        # 大半は今週、たまに先週
+        return self.workload.weeks[-1] if self.rng.random() < 0.8 else self.workload.weeks[0]
+
+    def week_grid(self):
+        return "GET", f"/work-logs/grid?view=week&week={self._week().isoformat()}&user={self.user_id}", None
+
+    def cell_edit(self):
+        rng = self.rng
+        work_date = self._week() + timedelta(days=rng.randrange(5))
+        hours = 0 if rng.random() < 0.1 else rng.randint(1, 32) / 4
+        return "POST", "/work-logs", {
+            "task_id": rng.choice(self.tasks), "user_id": self.user_id,
+            "work_date": work_date.isoformat(), "hours": hours,
+        }
+
+    def toggle_assignee(self):
+        project_id, task_id, user_id = self.rng.choice(self.workload.toggle_pairs)
+        return "POST", f"/projects/{project_id}/assignees/toggle", {"task_id": task_id, "user_id": user_id}
+
+    def monthly_detail(self):
+        month = self.workload.months[-1] if self.rng.random() < 0.8 else self.workload.months[0]
+        return "GET", f"/monthly-assignments/grid?mode=detail&month={month}", None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """最近順位法のパーセンタイル（valuesはソート済み）"""
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def summarize(records: list[tuple], elapsed: float) -> dict:
+    """記録の集計（時間はミリ秒）"""
+    times = sorted(r[2] * 1000 for r in records)
+    errors = sum(1 for r in records if not 200 <= r[3] < 300)
+    if not times:
+        return {"requests": 0, "errors": 0, "rps": 0.0}
+    return {
+        "requests": len(times),
+        "errors": errors,
+        "error_rate": round(errors / len(times), 4),
+        "rps": round(len(times) / elapsed, 2),
+        "p50": round(percentile(times, 0.50), 2),
+        "p95": round(percentile(times, 0.95), 2),
+        "p99": round(percentile(times, 0.99), 2),
+        "max": round(times[-1], 2),
+    }
+
+
+def run_step(base_url: str, workload: Workload, concurrency: int, mix: dict, duration: float, warmup: float,
+             think: float, seed: int) -> tuple[dict, dict, int]:
+    """同時ユーザー数を固定して負荷をかける（開始からwarmup秒間の記録は集計しない）
+
+    Returns:
+        (全体の集計, シナリオ -> 集計, ウォームアップを含むリクエスト数)
+    """
+    client = ApiClient(base_url, pool_size=concurrency, retries=0)
+    users = [
+        VirtualUser(client, workload, workload.users[i % len(workload.users)], mix, think, seed * 1000 + i)
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=user.run, args=(start + warmup + duration,), daemon=True) for user in users
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    measured_from = start + warmup
+    records = [r for user in users for r in user.records if r[1] >= measured_from]
+    by_scenario = {
+        scenario: summarize([r for r in records if r[0] == scenario], duration) for scenario in mix
+    }
+    return summarize(records, duration), by_scenario, sum(len(user.records) for user in users)
+
+
+class Server:
+    """計測対象のuvicorn（1つのDBに対して起動し、ログからロックエラーを数える）"""
+
+    def __init__(self, db_path: Path, port: int, workers: int, log_path: Path):
+        self.port = port
+        self.log_path = log_path
+        self.base_url = f"http://127.0.0.1:{port}"
+        env = {
+            **os.environ,
+            "DATABASE_PATH": str(db_path),
+            "METRICS_DIR": str(db_path.parent / "metrics"),
+        }
+        self._log = log_path.open("w")
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            cwd=ROOT / "src", env=env, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        self._wait_ready()
+
+    def _wait_ready(self):
+        deadline = time.perf_counter() + SERVER_START_TIMEOUT
+        while time.perf_counter() < deadline:
+            if self._process.poll() is not None:
+                self.stop()
+                raise RuntimeError(f"サーバーが起動できませんでした（{self.log_path}）")
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+            try:
+                conn.request("GET", "/")
+                conn.getresponse().read()
+                return
+            except OSError:
+                time.sleep(0.2)
+            finally:
+                conn.close()
+        self.stop()
+        raise RuntimeError(f"サーバーの起動が{SERVER_START_TIMEOUT:.0f}秒以内に終わりませんでした")
+
+    def locked_errors(self) -> int:
+        """これまでのログにある "database is locked" の件数"""
+        self._log.flush()
+        with self.log_path.open(errors="replace") as f:
+            return sum(1 for line in f if LOCKED_MESSAGE in line)
+
+    def stop(self):
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._log.close()
+
+
+def prepare_dataset(scale: str, seed: int, rebuild: bool) -> Path:
+    """合成データのDBを用意し（なければ作成）、計測用の複製のパスを返す"""
+    source = LOADTEST_DIR / f"{scale}-seed{seed}.db"
+    if rebuild or not source.exists():
+        print(f"合成データを作成: {source.name}")
+        # アプリのDBパスはimport時に決まるため、規模ごとに別プロセスで作る
+        subprocess.run(
+            [sys.executable, str(ROOT / "scripts" / "generate_data.py"), "--database", str(source),
+             "--preset", scale, "--end", DATASET_END.isoformat(), "--seed", str(seed), "--reset"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+    work = LOADTEST_DIR / f"{scale}-seed{seed}.work.db"
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{work}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(source, work)
+    return work
+
+
+def _print_header():
+    print(f"{'users':>6}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>9}{'locked':>9}   (ms)")
+
+
+def _print_step(concurrency: int, total: dict, locked_rate: float | None):
+    if not total["requests"]:
+        print(f"{concurrency:>6}{'-':>10}")
+        return
+    locked_rate = "-" if locked_rate is None else f"{locked_rate:.2%}"
+    print(f"{concurrency:>6}{total['rps']:>10.1f}{total['p50']:>10.1f}{total['p95']:>10.1f}{total['p99']:>10.1f}"
+          f"{total['error_rate']:>9.2%}{locked_rate:>9}")
+
+
+def _parse_mix(values: list[str]) -> dict:
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"不明なシナリオ: {name}（{', '.join(DEFAULT_MIX)}）")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"重みが数値ではありません: {value}") from None
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("重みがすべて0です")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def main():
+    from generate_data import PRESETS
+
+    parser = argparse.ArgumentParser(description="負荷試験（同時に工数を入力するユーザーを模擬）")
+    parser.add_argument("--scales", nargs="+", choices=PRESETS, default=["small"], help="データ規模")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32],
+                        help="同時ユーザー数（段階ごとに順に計測）")
+    parser.add_argument("--duration", type=float, default=20, help="1段階の計測時間（秒）")
+    parser.add_argument("--warmup", type=float, default=3, help="各段階の開始から集計しない時間（秒）")
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="操作の間隔の平均（ミリ秒、指数分布） 0なら待たずに次の操作（最大スループットの計測）")
+    parser.add_argument("--mix", nargs="+", metavar="SCENARIO=WEIGHT",
+                        help=f"シナリオの重み 既定: {' '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}")
+    parser.add_argument("--seed", type=int, default=1, help="合成データ・操作のシード")
+    parser.add_argument("--rebuild", action="store_true", help="合成データのDBを作り直す")
+    parser.add_argument("--workers", type=int, default=1, help="uvicornのワーカー数")
+    parser.add_argument("--port", type=int, default=8765, help="起動するuvicornのポート")
+    parser.add_argument("--base-url", help="起動済みのサーバーに負荷をかける（--database でそのDBを指定）")
+    parser.add_argument("--database", type=Path, help="--base-url のサーバーのDB（操作対象の取得に使う）")
+    parser.add_argument("--output", type=Path, help="結果のJSON 既定: data/loadtest/results-<日時>.json")
+    args = parser.parse_args()
+
+    try:
+        mix = _parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if args.base_url and not args.database:
+        parser.error("--base-url には --database が必要です")
+    LOADTEST_DIR.mkdir(parents=True, exist_ok=True)
+
+    results = {
+        "meta": {
+            "concurrency": args.concurrency, "duration": args.duration, "warmup": args.warmup,
+            "think_ms": args.think_ms, "mix": mix, "seed": args.seed, "workers": args.workers,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "runs": [],
+    }
+    targets = [("external", args.database)] if args.base_url else [(scale, None) for scale in args.scales]
+    for scale, db_path in targets:
+        server = None
+        if db_path is None:
+            db_path = prepare_dataset(scale, args.seed, args.rebuild)
+            server = Server(db_path, args.port, args.workers, LOADTEST_DIR / f"server-{scale}.log")
+        base_url = args.base_url or server.base_url
+        try:
+            workload = Workload(db_path, DATASET_END if server else date.today(), args.seed)
+            print(f"\n[{scale}] ユーザー {len(workload.users):,}人  {base_url}")
+            _print_header()
+            for concurrency in args.concurrency:
+                locked_before = server.locked_errors() if server else None
+                total, by_scenario, attempted = run_step(
+                    base_url, workload, concurrency, mix, args.duration, args.warmup,
+                    args.think_ms / 1000, args.seed
+                )
+                # ロックエラーはサーバーのログで数えるため、率はウォームアップ中を含む全リクエストに対して出す
+                locked = server.locked_errors() - locked_before if server else None
+                locked_rate = round(locked / attempted, 4) if locked is not None and attempted else None
+                _print_step(concurrency, total, locked_rate)
+                results["runs"].append({
+                    "scale": scale, "concurrency": concurrency, "total": total,
+                    "locked_errors": locked, "locked_rate": locked_rate, "scenarios": by_scenario,
+                })
+        finally:
+            if server:
+                server.stop()
+
+    output = args.output or LOADTEST_DIR / f"results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"\n結果: {output}")
+
+
+if __name__ == "__main__":
+    main()
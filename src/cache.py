@@ -0,0 +1,193 @@
+"""クエリ結果キャッシュ
+
+責務: テーブル更新バージョンで刻印したクエリ結果のプロセス内保持
+依存: database
+
+書き込みはDBトリガーでtable_versionに記録されるため、
+サービス経由以外（スクリプト・他ワーカー）の更新でも無効化される。
+
+更新バージョンの検知方式（環境変数 CACHE_INVALIDATION）:
+    poll:  常駐接続で PRAGMA data_version を監視し、変化時のみtable_versionを再読込（既定）
+           他の接続・他ワーカーのコミットも検知する。data_versionの確認は常駐接続1本を
+           プロセス内で共有するためロックを取って行い、既定ではキャッシュ参照のたびに確認する。
+           CACHE_POLL_INTERVAL_MS を指定すると確認はその間隔に1回となり、間の参照は
+           メモリ上の辞書読み取りのみになる（このプロセスのコミットはコミット時に再読込するため即時反映、
+           他の接続・他ワーカーのコミットは最大でその間隔だけ遅れて反映）。
+    local: このプロセスのget_db経由のコミット時のみ再読込（単一ワーカー向け）
+           キャッシュ参照時のバージョン確認はメモリ上の辞書読み取りのみになる。
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from database import DB_PATH, get_db, add_commit_hook
+
+CACHE_INVALIDATION = os.getenv("CACHE_INVALIDATION", "poll")
+# pollモードでdata_versionを確認する間隔（ミリ秒、0なら参照のたびに確認）
+CACHE_POLL_INTERVAL_MS = int(os.getenv("CACHE_POLL_INTERVAL_MS", "0"))
+
+
+def read_table_versions(conn) -> dict[str, int]:
+    """接続からテーブル更新バージョンを読み込み（テーブル名 -> バージョン）"""
+    rows = conn.execute("SELECT name, version FROM table_version").fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+class TableVersionWatcher:
+    """テーブル更新バージョンのプロセス内保持
+
+    Args:
+        mode: poll / local
+        poll_interval: pollモードでdata_versionを確認する間隔（秒、0なら参照のたびに確認）
+    """
+
+    def __init__(self, mode: str, poll_interval: float = 0):
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self._versions = None
+        self._project_versions = {}
+        self._data_version = None
+        self._polled_at = 0.0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def get(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        """指定テーブルの更新バージョン（tablesの順序で返す）"""
+        if self.mode == "poll":
+            self._poll()
+        elif self._versions is None:
+            with get_db() as conn:
+                self.reload(conn)
+        versions = self._versions
+        return tuple(versions.get(t, 0) for t in tables)
+
+    def project_version(self, project_id: int) -> int:
+        """プロジェクト単位の更新バージョン（再読込までは読み込んだ値を使う）"""
+        self.get(())
+        # 読み込み中に再読込されたら、破棄された辞書に入るだけで古い値は残らない
+        versions = self._project_versions
+        version = versions.get(project_id)
+        if version is None:
+            if self.mode == "poll":
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT version FROM project_version WHERE project_id = ?", (project_id,)
+                    ).fetchone()
+            else:
+                with get_db() as conn:
+                    row = conn.execute(
+                        "SELECT version FROM project_version WHERE project_id = ?", (project_id,)
+                    ).fetchone()
+            version = row[0] if row else 0
+            versions[project_id] = version
+        return version
+
+    def reload(self, conn):
+        """コミット済みの接続から再読込（プロジェクト単位のバージョンは次の参照時に読み込む）"""
+        self._versions = read_table_versions(conn)
+        self._project_versions = {}
+
+    def committed(self, conn):
+        """このプロセスのコミット時に再読込（pollの間隔を空ける場合に自プロセスの書き込みを即時反映）"""
+        with self._lock:
+            self.reload(conn)
+
+    def _poll(self):
+        """data_versionが変化していれば再読込（他の接続のコミットで変化する、確認はpoll_intervalに1回）"""
+        if self._versions is not None and time.monotonic() - self._polled_at < self.poll_interval:
+            return
+        with self._lock:
+            self._polled_at = time.monotonic()
+            if self._conn is None:
+                self._conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version or self._versions is None:
+                self.reload(self._conn)
+                self._data_version = data_version
+
+
+_watcher = TableVersionWatcher(CACHE_INVALIDATION, CACHE_POLL_INTERVAL_MS / 1000)
+if CACHE_INVALIDATION == "local":
+    add_commit_hook(_watcher.reload)
+elif CACHE_POLL_INTERVAL_MS > 0:
+    add_commit_hook(_watcher.committed)
+
+
+# 名前付きで登録したキャッシュ（ヒット率の集計用、名前 -> キャッシュ）
+_registry = {}
+
+
+def register_cache(name: str, cache):
+    """ヒット率の集計対象に登録（cacheは hits / misses 属性を持つ）"""
+    _registry[name] = cache
+
+
+def cache_stats() -> dict[str, tuple[int, int]]:
+    """登録済みキャッシュのヒット数・ミス数（名前 -> (hits, misses)、このプロセス分）"""
+    return {name: (c.hits, c.misses) for name, c in _registry.items()}
+
+
+def get_table_versions(tables: tuple[str, ...]) -> tuple[int, ...]:
+    """指定テーブルの更新バージョンを取得（tablesの順序で返す）"""
+    return _watcher.get(tables)
+
+
+def get_project_version(project_id: int) -> int:
+    """プロジェクト単位の更新バージョンを取得（配下の案件・作業・見積・実績・ステータスの書き込みで加算）"""
+    return _watcher.project_version(project_id)
+
+
+class VersionedCache:
+    """依存テーブルのバージョンで刻印したキャッシュ
+
+    エントリは (バージョン, 値) で保持し、取得時に依存テーブルの
+    現在バージョンと一致しなければloaderで再取得する。
+    project_key（キー -> プロジェクトID）を指定すると、そのプロジェクト単位のバージョンも刻印する
+    （配下のテーブルはtablesに含めず、他のプロジェクトへの書き込みでは無効化しない）。
+    nameを指定するとヒット率の集計対象に登録する。
+    """
+
+    def __init__(self, tables: tuple[str, ...], maxsize: int = 1024, name: str | None = None,
+                 project_key=None):
+        self.tables = tables
+        self.project_key = project_key
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        if name:
+            register_cache(name, self)
+
+    def get(self, key, loader):
+        """キャッシュ取得（未登録・バージョン不一致ならloader()で再取得）
+
+        バージョンを値より先に読むため、取得中に書き込みがあっても
+        古い値が新しいバージョンで保存されることはない。
+        """
+        stamp = get_table_versions(self.tables)
+        if self.project_key is not None:
+            stamp += (get_project_version(self.project_key(key)),)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = loader()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                # 最も古いエントリを破棄
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (stamp, value)
+        return value
+
+    def invalidate(self, key=None):
+        """エントリを破棄（key省略時は全件）"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -4,10 +4,37 @@ import sqlite3
 from pathlib import Path
 from contextlib import contextmanager
 
+from instrumentation import InstrumentedConnection, connections, current_stats, instrumented
+
 # プロジェクトルートを基準にDBパスを解決（実行ディレクトリに依存しない）
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = Path(os.getenv("DATABASE_PATH", PROJECT_ROOT / "data" / "app.db"))
 
+# 更新バージョンを記録するテーブル（キャッシュ無効化用）
+VERSIONED_TABLES = (
+    "user",
+    "project",
+    "project_status",
+    "issue",
+    "issue_estimate_item",
+    "task",
+    "work_log",
+)
+
+# 全文検索インデックス（FTS5 trigram）対象: テーブル -> 検索列
+FTS_TABLES = {
+    "project": ("cd", "name", "description"),
+    "issue": ("cd", "name", "description"),
+    "task": ("cd", "name", "description"),
+    "user": ("cd", "name", "email"),
+}
+
+# work_logのインデックス（一括投入中は外して最後に作り直す）
+WORK_LOG_INDEXES = (
+    # 日付範囲での全ユーザー取得用（業務終了報告の一括出力など）
+    "CREATE INDEX IF NOT EXISTS idx_work_log_date_user ON work_log (work_date, user_id)",
+)
+
 # デフォルトステータス定義
 DEFAULT_STATUSES = [
     ("open", "未着手", 0),
@@ -16,18 +43,47 @@ DEFAULT_STATUSES = [
 ]
 
 
+# 書き込みをコミットした接続を受け取るフック（キャッシュの更新検知用）
+_commit_hooks = []
+
+
+def add_commit_hook(hook):
+    """書き込みコミット後に呼ばれるフックを登録（hook(conn)、接続はクローズ前）"""
+    _commit_hooks.append(hook)
+
+
 @contextmanager
 def get_db():
-    """DBコネクションのコンテキストマネージャー"""
+    """DBコネクションのコンテキストマネージャー
+
+    リクエストの計測中（instrumentation.collect()内）やスロークエリログの有効時は計測用の接続を開き、
+    接続数・文ごとの時間と取得行数、しきい値を超えた文を記録する。
+    例外時はクローズの前にロールバックする（例外のトレースバックが計測用のカーソルを参照している間は
+    クローズが保留され、未完了の書き込みトランザクションがロックを持ち続けるため）。
+    """
     DB_PATH.parent.mkdir(exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")  # 外部キー制約を有効化
+    if not instrumented():
+        conn = sqlite3.connect(DB_PATH)
+    else:
+        conn = sqlite3.connect(DB_PATH, factory=InstrumentedConnection)
+        conn.stats = stats = current_stats()
+        if stats is not None:
+            stats.connections += 1
+    connections.open()
     try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")  # 外部キー制約を有効化
         yield conn
         conn.commit()
+        if conn.total_changes:
+            for hook in _commit_hooks:
+                hook(conn)
+    except BaseException:
+        conn.rollback()
+        raise
     finally:
         conn.close()
+        connections.close()
 
 
 def init_db():
@@ -163,6 +219,8 @@ def init_db():
                 UNIQUE(task_id, user_id, work_date)
             )
         """)
+        for sql in WORK_LOG_INDEXES:
+            conn.execute(sql)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS user_setting (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -177,6 +235,10 @@ def init_db():
         _migrate_cd(conn)
         _migrate_task_columns(conn)
         _migrate_user_columns(conn)
+        _migrate_table_versions(conn)
+        _migrate_project_versions(conn)
+        _migrate_fts(conn)
+        _migrate_work_log_monthly(conn)
         # 既存プロジェクトにデフォルトステータスがない場合は作成
         _migrate_default_statuses(conn)
 
@@ -213,11 +275,11 @@ def _migrate_default_statuses(conn):
             create_default_statuses(conn, project_id)
 
 
-def create_default_statuses(conn, project_id: int):
-    """プロジェクトにデフォルトステータスを作成"""
+def create_default_statuses(conn, *project_ids: int):
+    """プロジェクト（複数可）にデフォルトステータスを作成"""
     conn.executemany(
         "INSERT INTO project_status (project_id, code, name, sort_order) VALUES (?, ?, ?, ?)",
-        [(project_id, code, name, order) for code, name, order in DEFAULT_STATUSES]
+        [(project_id, code, name, order) for project_id in project_ids for code, name, order in DEFAULT_STATUSES]
     )
 
 
@@ -237,3 +299,282 @@ def _migrate_user_columns(conn):
         conn.execute("ALTER TABLE user ADD COLUMN is_active INTEGER DEFAULT 1")
         # 既存ユーザーは有効に設定
         conn.execute("UPDATE user SET is_active = 1 WHERE is_active IS NULL")
+
+
+def _migrate_table_versions(conn):
+    """テーブル更新バージョンと記録用トリガーを作成
+
+    INSERT/UPDATE/DELETEごとにtable_versionを加算する。
+    サービス経由以外（スクリプト・他ワーカー）の書き込みも記録される。
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO table_version (name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_version SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+
+
+# プロジェクト単位の更新バージョンを加算するテーブル -> 行の属するプロジェクトIDの式（{row} は new / old）
+PROJECT_SCOPED_TABLES = {
+    "issue": "{row}.project_id",
+    "project_status": "{row}.project_id",
+    "issue_estimate_item": "(SELECT project_id FROM issue WHERE id = {row}.issue_id)",
+    "task": "(SELECT project_id FROM issue WHERE id = {row}.issue_id)",
+    "work_log": "(SELECT i.project_id FROM task t JOIN issue i ON t.issue_id = i.id WHERE t.id = {row}.task_id)",
+}
+
+
+def _bump_project_version_sql(project_expr: str) -> str:
+    return f"""
+        INSERT INTO project_version (project_id, version)
+        SELECT pid, 1 FROM (SELECT {project_expr} AS pid) WHERE pid IS NOT NULL
+        ON CONFLICT (project_id) DO UPDATE SET version = version + 1;"""
+
+
+def _migrate_project_versions(conn):
+    """プロジェクト単位の更新バージョンと記録用トリガーを作成
+
+    プロジェクト配下（案件・ステータス・見積・作業・実績）の書き込みで、そのプロジェクトのバージョンだけを加算する。
+    プロジェクト単位のキャッシュ（サマリー等）は、他のプロジェクトへの書き込みでは無効化されない。
+    親の削除に伴う連鎖削除では親を引けないため何もしない（親側のトリガーで加算される）。
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS project_version (
+            project_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    for table, project_expr in PROJECT_SCOPED_TABLES.items():
+        for event, rows in (("INSERT", ("new",)), ("UPDATE", ("old", "new")), ("DELETE", ("old",))):
+            body = "".join(_bump_project_version_sql(project_expr.format(row=row)) for row in rows)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_project_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN{body}
+                END
+            """)
+
+
+def bump_project_versions(conn):
+    """全プロジェクトの更新バージョンを加算（トリガーを外した一括投入の後など）"""
+    conn.execute(
+        "INSERT INTO project_version (project_id, version) SELECT id, 1 FROM project WHERE 1 "
+        "ON CONFLICT (project_id) DO UPDATE SET version = version + 1"
+    )
+
+
+def _migrate_fts(conn):
+    """全文検索用FTS5テーブル（trigram）と同期トリガーを作成
+
+    外部コンテンツ方式（本体テーブルを参照）で、検索列の変更時のみ索引を更新する。
+    新規作成時は既存データから初期索引を構築する。
+    """
+    for table, columns in FTS_TABLES.items():
+        fts = f"{table}_fts"
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ).fetchone()
+        if not exists:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE {fts} USING fts5(
+                    {cols}, content='{table}', content_rowid='id', tokenize='trigram'
+                )
+            """)
+            conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+            BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END
+        """)
+
+
+# 実績の月次集計（ユーザー × プロジェクト × 年月）を差分更新するトリガー
+# 親（作業・案件・プロジェクト）の削除に伴う連鎖削除では親行が先に消えるため、
+# 親側のBEFORE DELETEで減算し、work_log側の減算はプロジェクトを引けない場合に何もしない
+# 0になった行の削除は更新したキーに限る（集計全体を走査しない）
+_WORK_LOG_MONTHLY_TRIGGERS = {
+    "trg_work_log_monthly_insert": """
+        AFTER INSERT ON work_log
+        BEGIN
+            INSERT INTO work_log_monthly (user_id, project_id, year_month, hours)
+            SELECT new.user_id, i.project_id, substr(new.work_date, 1, 7), new.hours
+            FROM task t JOIN issue i ON t.issue_id = i.id
+            WHERE t.id = new.task_id
+            ON CONFLICT (user_id, project_id, year_month) DO UPDATE SET hours = hours + excluded.hours;
+        END""",
+    "trg_work_log_monthly_update": """
+        AFTER UPDATE OF task_id, user_id, work_date, hours ON work_log
+        BEGIN
+            UPDATE work_log_monthly SET hours = hours - old.hours
+            WHERE user_id = old.user_id AND year_month = substr(old.work_date, 1, 7)
+              AND project_id = (SELECT i.project_id FROM task t JOIN issue i ON t.issue_id = i.id WHERE t.id = old.task_id);
+            INSERT INTO work_log_monthly (user_id, project_id, year_month, hours)
+            SELECT new.user_id, i.project_id, substr(new.work_date, 1, 7), new.hours
+            FROM task t JOIN issue i ON t.issue_id = i.id
+            WHERE t.id = new.task_id
+            ON CONFLICT (user_id, project_id, year_month) DO UPDATE SET hours = hours + excluded.hours;
+            DELETE FROM work_log_monthly
+            WHERE user_id = old.user_id AND year_month = substr(old.work_date, 1, 7)
+              AND project_id = (SELECT i.project_id FROM task t JOIN issue i ON t.issue_id = i.id WHERE t.id = old.task_id) AND ABS(hours) < 1e-9;
+            DELETE FROM work_log_monthly
+            WHERE user_id = new.user_id AND year_month = substr(new.work_date, 1, 7)
+              AND project_id = (SELECT i.project_id FROM task t JOIN issue i ON t.issue_id = i.id WHERE t.id = new.task_id) AND ABS(hours) < 1e-9;
+        END""",
+    "trg_work_log_monthly_delete": """
+        AFTER DELETE ON work_log
+        BEGIN
+            UPDATE work_log_monthly SET hours = hours - old.hours
+            WHERE user_id = old.user_id AND year_month = substr(old.work_date, 1, 7)
+              AND project_id = (SELECT i.project_id FROM task t JOIN issue i ON t.issue_id = i.id WHERE t.id = old.task_id);
+            DELETE FROM work_log_monthly
+            WHERE user_id = old.user_id AND year_month = substr(old.work_date, 1, 7)
+              AND project_id = (SELECT i.project_id FROM task t JOIN issue i ON t.issue_id = i.id WHERE t.id = old.task_id) AND ABS(hours) < 1e-9;
+        END""",
+    "trg_work_log_monthly_task_delete": """
+        BEFORE DELETE ON task
+        BEGIN
+            UPDATE work_log_monthly SET hours = hours - s.total
+            FROM (
+                SELECT user_id, substr(work_date, 1, 7) as year_month, SUM(hours) as total
+                FROM work_log WHERE task_id = old.id
+                GROUP BY user_id, substr(work_date, 1, 7)
+            ) s
+            WHERE work_log_monthly.user_id = s.user_id AND work_log_monthly.year_month = s.year_month
+              AND work_log_monthly.project_id = (SELECT project_id FROM issue WHERE id = old.issue_id);
+            DELETE FROM work_log_monthly
+            WHERE (user_id, project_id, year_month) IN (
+                SELECT user_id, (SELECT project_id FROM issue WHERE id = old.issue_id), substr(work_date, 1, 7)
+                FROM work_log WHERE task_id = old.id
+            ) AND ABS(hours) < 1e-9;
+        END""",
+    "trg_work_log_monthly_issue_delete": """
+        BEFORE DELETE ON issue
+        BEGIN
+            UPDATE work_log_monthly SET hours = hours - s.total
+            FROM (
+                SELECT w.user_id, substr(w.work_date, 1, 7) as year_month, SUM(w.hours) as total
+                FROM work_log w JOIN task t ON w.task_id = t.id
+                WHERE t.issue_id = old.id
+                GROUP BY w.user_id, substr(w.work_date, 1, 7)
+            ) s
+            WHERE work_log_monthly.user_id = s.user_id AND work_log_monthly.year_month = s.year_month
+              AND work_log_monthly.project_id = old.project_id;
+            DELETE FROM work_log_monthly
+            WHERE (user_id, project_id, year_month) IN (
+                SELECT w.user_id, old.project_id, substr(w.work_date, 1, 7)
+                FROM work_log w JOIN task t ON w.task_id = t.id
+                WHERE t.issue_id = old.id
+            ) AND ABS(hours) < 1e-9;
+        END""",
+    "trg_work_log_monthly_project_delete": """
+        BEFORE DELETE ON project
+        BEGIN
+            DELETE FROM work_log_monthly WHERE project_id = old.id;
+        END""",
+}
+
+
+def _migrate_work_log_monthly(conn):
+    """実績の月次集計テーブルと差分更新トリガーを作成（新規作成時は全件から構築）"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'work_log_monthly'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS work_log_monthly (
+            user_id INTEGER NOT NULL,
+            project_id INTEGER NOT NULL,
+            year_month TEXT NOT NULL,
+            hours REAL NOT NULL,
+            PRIMARY KEY (user_id, project_id, year_month)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_work_log_monthly_month ON work_log_monthly (year_month)"
+    )
+    # 定義が変わったトリガーは作り直す
+    current = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall())
+    for name, body in _WORK_LOG_MONTHLY_TRIGGERS.items():
+        sql = f"CREATE TRIGGER {name} {body}"
+        if current.get(name) != sql:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(sql)
+    if not exists:
+        rebuild_work_log_monthly(conn)
+
+
+def rebuild_work_log_monthly(conn):
+    """実績の月次集計をwork_logから再構築（トリガー導入前のデータ・不整合の修復用）"""
+    conn.execute("DELETE FROM work_log_monthly")
+    conn.execute("""
+        INSERT INTO work_log_monthly (user_id, project_id, year_month, hours)
+        SELECT w.user_id, i.project_id, substr(w.work_date, 1, 7), SUM(w.hours)
+        FROM work_log w
+        JOIN task t ON w.task_id = t.id
+        JOIN issue i ON t.issue_id = i.id
+        GROUP BY w.user_id, i.project_id, substr(w.work_date, 1, 7)
+        HAVING ABS(SUM(w.hours)) >= 1e-9
+    """)
+
+
+@contextmanager
+def work_log_bulk_load(conn):
+    """実績の一括投入用に、投入中はwork_logのトリガー・インデックスを外す
+
+    投入中は WAL・synchronous=OFF にし、終了時（例外時も）に月次集計を再構築して
+    更新バージョン（テーブル・全プロジェクト）を進め、トリガー・インデックスを作り直して元のジャーナルモードに戻す。
+    connは get_db() 外で開いた接続（投入のトランザクションは呼び出し側で管理）。
+    """
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    for kind, name in conn.execute(
+        "SELECT type, name FROM sqlite_master "
+        "WHERE tbl_name = 'work_log' AND type IN ('trigger', 'index') AND sql IS NOT NULL"
+    ).fetchall():
+        conn.execute(f"DROP {kind.upper()} {name}")
+    try:
+        yield conn
+    finally:
+        # 途中で失敗した場合の未コミット分は捨てる（コミット済みの分は集計に含める）
+        conn.rollback()
+        with conn:
+            rebuild_work_log_monthly(conn)
+            conn.execute("UPDATE table_version SET version = version + 1 WHERE name = 'work_log'")
+            bump_project_versions(conn)
+            _migrate_table_versions(conn)
+            _migrate_project_versions(conn)
+            _migrate_work_log_monthly(conn)
+            for sql in WORK_LOG_INDEXES:
+                conn.execute(sql)
+        conn.execute("PRAGMA optimize")
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
@@ -0,0 +1,245 @@
+"""リクエスト単位の計測
+
+責務: リクエスト中のDB接続数・SQL実行（時間・取得行数）・描画時間と、プロセス内の接続数の記録のみ
+依存: slow_queries
+
+collect() の中で get_db を使うと計測用の接続（InstrumentedConnection）が開かれ、
+文ごとに実行〜取得完了までの時間と取得行数を記録する。
+スロークエリログが有効な場合は collect() の外でも計測用の接続を使い、しきい値超えの文だけを記録する。
+暗黙のトランザクションを開始する書き込みの前には BEGIN IMMEDIATE を明示的に実行し、
+書き込みロックの待ち時間を文の実行時間と分けて記録する（ロックの取得はsqlite3の暗黙のBEGINと同じ）。
+
+記録先はcontextvarで保持するため、FastAPIが同期エンドポイントを
+スレッドプールで実行する場合も同じリクエストの記録に加算される。
+"""
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+from slow_queries import is_lock_wait, is_recorded, slow_query_log
+
+# 1リクエストで保持する文の記録の上限（超えた分は件数・時間のみ集計）
+MAX_STATEMENTS = 500
+
+# sqlite3が暗黙のトランザクションを開始する文
+_IMPLICIT_BEGIN = re.compile(r"\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+@dataclass
+class Statement:
+    """1文の実行記録"""
+    sql: str
+    duration: float = 0.0
+    rows: int = 0
+
+
+@dataclass
+class RequestStats:
+    """1リクエストの計測結果（時間は秒）"""
+    connections: int = 0
+    statements: int = 0
+    rows: int = 0
+    db_time: float = 0.0
+    lock_wait: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    log: list[Statement] = field(default_factory=list)
+
+    def add_statement(self, sql: str, duration: float) -> Statement:
+        entry = Statement(sql, duration)
+        self.statements += 1
+        self.db_time += duration
+        if len(self.log) < MAX_STATEMENTS:
+            self.log.append(entry)
+        return entry
+
+    def add_fetch(self, entry: Statement, duration: float, rows: int):
+        entry.duration += duration
+        entry.rows += rows
+        self.db_time += duration
+        self.rows += rows
+
+    def add_phase(self, name: str, duration: float):
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def slowest(self, limit: int = 10) -> list[Statement]:
+        """時間の長い文（上位limit件）"""
+        return sorted(self.log, key=lambda s: s.duration, reverse=True)[:limit]
+
+
+class ConnectionCounter:
+    """プロセス内のDB接続数（累計・使用中）"""
+
+    def __init__(self):
+        self.opened = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        with self._lock:
+            self.opened += 1
+            self.in_flight += 1
+
+    def close(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+# get_dbで開いた接続の数
+connections = ConnectionCounter()
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    """計測中の記録（計測外はNone）"""
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """ブロック内のDBアクセス・描画時間を記録する
+
+    Yields:
+        RequestStats
+    """
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def timed(phase: str):
+    """関数の実行時間を計測中の記録のphaseに加算するデコレーター（計測外はそのまま呼ぶ）"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add_phase(phase, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """実行・取得の時間と取得行数を記録するカーソル
+
+    接続のstats（リクエストの計測中のみ）に加算し、文全体の時間が
+    スロークエリのしきい値を超えたら slow_query_log に記録する（BEGINはロック待ちとして記録）。
+    """
+
+    _entry = None
+    _slow = None
+
+    def execute(self, sql, parameters=()):
+        self._begin_before_write(sql)
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._executed(sql, parameters, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        self._begin_before_write(sql)
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            first = seq_of_parameters[0] if seq_of_parameters else ()
+            self._executed(sql, first, time.perf_counter() - start)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0)
+            raise
+        self._fetched(start, 1)
+        return row
+
+    def _begin_before_write(self, sql):
+        """暗黙のトランザクションを開始する書き込みなら、先にBEGIN IMMEDIATEを実行する"""
+        conn = self.connection
+        if conn.in_transaction or conn.isolation_level not in ("", "DEFERRED") or not _IMPLICIT_BEGIN.match(sql):
+            return
+        self.execute("BEGIN IMMEDIATE")
+
+    def _executed(self, sql, parameters, duration: float):
+        stats = self.connection.stats
+        self._entry = stats.add_statement(sql, duration) if stats is not None else None
+        if is_lock_wait(sql):
+            if stats is not None:
+                stats.lock_wait += duration
+            if slow_query_log.threshold is not None and duration >= slow_query_log.threshold:
+                slow_query_log.record_lock_wait(sql, duration)
+        self._sql = sql
+        self._parameters = parameters
+        self._duration = duration
+        self._slow = None
+        self._check_slow(0.0)
+
+    def _fetched(self, start: float, rows: int):
+        if self._entry is None and self._slow is None and slow_query_log.threshold is None:
+            return
+        duration = time.perf_counter() - start
+        self._duration += duration
+        if self._entry is not None:
+            self.connection.stats.add_fetch(self._entry, duration, rows)
+        self._check_slow(duration)
+
+    def _check_slow(self, added: float):
+        if self._slow is not None:
+            slow_query_log.extend(self._slow, self._duration, added)
+        elif (slow_query_log.threshold is not None and self._duration >= slow_query_log.threshold
+              and is_recorded(self._sql)):
+            self._slow = slow_query_log.record(self.connection, self._sql, self._parameters, self._duration)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """execute系をInstrumentedCursorで実行する接続（statsはリクエストの計測中のみ設定する）"""
+
+    stats: RequestStats | None = None
+
+    def execute(self, sql, parameters=()):
+        return self.cursor(InstrumentedCursor).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor(InstrumentedCursor).executemany(sql, seq_of_parameters)
+
+
+def instrumented() -> bool:
+    """get_dbで計測用の接続を開くか（リクエストの計測中、またはスロークエリログが有効）"""
+    return _current.get() is not None or slow_query_log.threshold is not None
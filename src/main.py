@@ -5,11 +5,19 @@ from pathlib import Path
 
 from fastapi import FastAPI, Request, Query
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
 
 from database import init_db
-from middleware import EncodingValidationMiddleware
+from metrics import metrics
+from profiling import PROFILING
+from middleware import (
+    EncodingValidationMiddleware,
+    CompressionMiddleware,
+    RequestStatsMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+)
 from routers.common import templates
+from static_assets import PrecompressedStaticFiles
 from services import DashboardService
 from routers import (
     projects_router,
@@ -27,6 +35,9 @@ from routers import (
     user_attribute_types_router,
     user_attribute_options_router,
     user_settings_router,
+    analytics_router,
+    metrics_router,
+    admin_router,
     api_v1_router,
 )
 
@@ -37,12 +48,18 @@ BASE_DIR = Path(__file__).parent
 async def lifespan(app: FastAPI):
     """アプリケーションライフサイクル管理"""
     init_db()
+    metrics.cleanup()
     yield
 
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(EncodingValidationMiddleware)
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestStatsMiddleware)
+app.add_middleware(CompressionMiddleware)
+if PROFILING:
+    app.add_middleware(ProfilingMiddleware)
+app.mount("/static", PrecompressedStaticFiles(directory=BASE_DIR / "static"), name="static")
 
 app.include_router(projects_router)
 app.include_router(users_router)
@@ -59,6 +76,9 @@ app.include_router(task_progress_router)
 app.include_router(user_attribute_types_router)
 app.include_router(user_attribute_options_router)
 app.include_router(user_settings_router)
+app.include_router(analytics_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 app.include_router(api_v1_router)
 
 
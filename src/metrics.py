@@ -0,0 +1,240 @@
+"""メトリクス
+
+責務: リクエスト・DB・キャッシュの計測値のプロセス内集計と、ワーカー間の合算・Prometheus形式の出力のみ
+依存: database, cache, instrumentation
+
+各ワーカーは自分の値を METRICS_DIR/{pid}.json に書き出し（最短 METRICS_FLUSH_INTERVAL 秒間隔）、
+/metrics はディレクトリ内の全ファイルを合算する。uvicornを複数ワーカーで動かしても、
+どのワーカーがスクレイプを受けても同じ合算値を返す（他ワーカー分は書き出し間隔だけ遅れる）。
+
+終了したワーカーのカウンター・ヒストグラムは合算に残し（起動時の cleanup() で削除）、
+使用中の接続数などのゲージは稼働中のワーカー分だけを合算する。
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from cache import cache_stats
+from database import DB_PATH
+from instrumentation import RequestStats, connections
+
+METRICS_DIR = Path(os.getenv("METRICS_DIR", DB_PATH.parent / "metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
+
+# レイテンシのヒストグラムの区切り（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# メトリクス定義: 名前 -> (種類, 説明)
+DEFINITIONS = {
+    "http_requests_total": ("counter", "HTTPリクエスト数"),
+    "http_request_duration_seconds": ("histogram", "HTTPリクエストの処理時間"),
+    "db_connections_total": ("counter", "get_dbで開いたDB接続数"),
+    "db_connections_in_flight": ("gauge", "使用中のDB接続数"),
+    "db_statements_total": ("counter", "リクエスト中に実行したSQL文の数"),
+    "db_rows_total": ("counter", "リクエスト中に取得した行数"),
+    "db_time_seconds_total": ("counter", "リクエスト中のSQL実行・取得時間"),
+    "db_lock_wait_seconds_total": ("counter", "リクエスト中の書き込みロックの待ち時間（BEGIN）"),
+    "cache_requests_total": ("counter", "キャッシュの参照数（result=hit/miss）"),
+    "cache_hit_ratio": ("gauge", "キャッシュのヒット率"),
+    "sqlite_file_size_bytes": ("gauge", "SQLiteのファイルサイズ（file=db/wal/shm）"),
+    "metrics_workers": ("gauge", "メトリクスを書き出している稼働中のワーカー数"),
+}
+
+# 稼働中のワーカー分だけ合算するゲージ
+LIVE_GAUGES = ("db_connections_in_flight",)
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Metrics:
+    """プロセス内のメトリクスとワーカー間の合算
+
+    Args:
+        directory: ワーカーごとの値を書き出すディレクトリ
+        flush_interval: 書き出しの最短間隔（秒）
+    """
+
+    def __init__(self, directory: Path = METRICS_DIR, flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self._counters = {}    # (名前, ラベル) -> 値
+        self._histograms = {}  # (名前, ラベル) -> [区切りごとの件数..., +Inf, 合計]
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, duration: float,
+                        stats: RequestStats | None = None):
+        """1リクエストの結果を記録"""
+        with self._lock:
+            self._inc("http_requests_total", {"method": method, "route": route, "status": str(status)})
+            self._observe("http_request_duration_seconds", {"method": method, "route": route}, duration)
+            if stats is not None:
+                self._inc("db_statements_total", {}, stats.statements)
+                self._inc("db_rows_total", {}, stats.rows)
+                self._inc("db_time_seconds_total", {}, stats.db_time)
+                self._inc("db_lock_wait_seconds_total", {}, stats.lock_wait)
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def _inc(self, name: str, labels: dict, value: float = 1):
+        key = (name, _labels_key(labels))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def _observe(self, name: str, labels: dict, value: float):
+        key = (name, _labels_key(labels))
+        buckets = self._histograms.get(key)
+        if buckets is None:
+            buckets = self._histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[len(LATENCY_BUCKETS)] += 1
+        buckets[-1] += value
+
+    def snapshot(self) -> dict:
+        """このプロセスの値（書き出す内容）"""
+        with self._lock:
+            counters = [[name, dict(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, dict(labels), list(buckets)] for (name, labels), buckets in self._histograms.items()]
+        counters.append(["db_connections_total", {}, connections.opened])
+        for cache, (hits, misses) in cache_stats().items():
+            counters.append(["cache_requests_total", {"cache": cache, "result": "hit"}, hits])
+            counters.append(["cache_requests_total", {"cache": cache, "result": "miss"}, misses])
+        gauges = [["db_connections_in_flight", {}, connections.in_flight]]
+        return {"pid": os.getpid(), "counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def flush(self):
+        """このプロセスの値をファイルに書き出す（一時ファイル + renameで置き換え）"""
+        self._flushed_at = time.monotonic()
+        data = self.snapshot()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{data['pid']}.json"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+
+    def cleanup(self):
+        """終了したワーカーのファイルを削除（起動時に呼ぶ）"""
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*.json"):
+            if path.stem.isdigit() and not _pid_alive(int(path.stem)):
+                path.unlink(missing_ok=True)
+
+    def collect(self) -> dict:
+        """全ワーカーの値を合算
+
+        Returns:
+            {"counters": {(名前, ラベル): 値}, "histograms": {...}, "gauges": {...}, "workers": 稼働数}
+        """
+        self.flush()
+        counters, histograms, gauges = {}, {}, {}
+        workers = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # 削除・置き換えと競合した場合は読み飛ばす
+                continue
+            alive = _pid_alive(data["pid"])
+            workers += alive
+            for name, labels, value in data["counters"]:
+                key = (name, _labels_key(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, buckets in data["histograms"]:
+                key = (name, _labels_key(labels))
+                total = histograms.setdefault(key, [0] * len(buckets))
+                for i, value in enumerate(buckets):
+                    total[i] += value
+            if alive:
+                for name, labels, value in data["gauges"]:
+                    key = (name, _labels_key(labels))
+                    gauges[key] = gauges.get(key, 0) + value
+        return {"counters": counters, "histograms": histograms, "gauges": gauges, "workers": workers}
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式で出力"""
+        data = self.collect()
+        samples = {name: [] for name in DEFINITIONS}
+
+        for (name, labels), value in data["counters"].items():
+            samples[name].append((name, labels, value))
+        for (name, labels), value in data["gauges"].items():
+            samples[name].append((name, labels, value))
+        for (name, labels), buckets in data["histograms"].items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += count
+                samples[name].append((f"{name}_bucket", labels + (("le", str(bound)),), cumulative))
+            samples[name].append((f"{name}_sum", labels, buckets[-1]))
+            samples[name].append((f"{name}_count", labels, cumulative))
+
+        hits = {}
+        for (name, labels), value in data["counters"].items():
+            if name == "cache_requests_total":
+                label_map = dict(labels)
+                hits.setdefault(label_map["cache"], {"hit": 0, "miss": 0})[label_map["result"]] += value
+        for cache, counts in sorted(hits.items()):
+            total = counts["hit"] + counts["miss"]
+            ratio = counts["hit"] / total if total else 0.0
+            samples["cache_hit_ratio"].append(("cache_hit_ratio", (("cache", cache),), ratio))
+
+        for file, path in (("db", DB_PATH), ("wal", Path(f"{DB_PATH}-wal")), ("shm", Path(f"{DB_PATH}-shm"))):
+            size = path.stat().st_size if path.exists() else 0
+            samples["sqlite_file_size_bytes"].append(("sqlite_file_size_bytes", (("file", file),), size))
+        samples["metrics_workers"].append(("metrics_workers", (), data["workers"]))
+
+        lines = []
+        for name, (kind, help_text) in DEFINITIONS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in sorted(samples[name], key=_sample_order):
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _sample_order(sample):
+    """ラベル順に並べ、ヒストグラムは区切りの昇順・_sum・_countの順にする"""
+    name, labels, _ = sample
+    base = tuple(item for item in labels if item[0] != "le")
+    le = dict(labels).get("le")
+    bound = float("inf") if le == "+Inf" else float(le) if le else float("inf")
+    return base, name.endswith("_count"), name.endswith("_sum"), bound
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+# このプロセスのメトリクス
+metrics = Metrics()
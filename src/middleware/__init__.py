@@ -1,4 +1,15 @@
 """ミドルウェアパッケージ"""
 from .encoding import EncodingValidationMiddleware, detect_mojibake
+from .compression import CompressionMiddleware
+from .request_stats import RequestStatsMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
 
-__all__ = ["EncodingValidationMiddleware", "detect_mojibake"]
+__all__ = [
+    "EncodingValidationMiddleware",
+    "detect_mojibake",
+    "CompressionMiddleware",
+    "RequestStatsMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+]
@@ -0,0 +1,213 @@
+"""レスポンス圧縮ミドルウェア
+
+HTML・JSONのレスポンスを、Accept-Encodingに応じてbrotli（導入時のみ）またはgzipで圧縮する。
+グリッドの部分HTMLはセルごとに同じ属性が並ぶため、圧縮で転送量が大きく減る。
+
+設定（環境変数）:
+    COMPRESSION:            使用する方式（優先順、カンマ区切り。"off"で無効）既定: br,gzip
+    COMPRESSION_MIN_SIZE:   圧縮する最小サイズ(bytes) 既定: 1024
+    COMPRESSION_GZIP_LEVEL: gzipの圧縮レベル(1-9) 既定: 6
+    COMPRESSION_BR_QUALITY: brotliの品質(0-11) 既定: 4
+
+ボディが1回で送られるレスポンスはサイズを見て圧縮し、
+ストリーミングのレスポンスはチャンクごとに圧縮してそのまま流す。
+"""
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotliは任意依存（未導入ならgzipのみ）
+    brotli = None
+
+# 圧縮対象のContent-Type
+COMPRESSIBLE_TYPES = (b"text/html", b"application/json")
+
+COMPRESSION = os.getenv("COMPRESSION", "br,gzip")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BR_QUALITY = int(os.getenv("COMPRESSION_BR_QUALITY", "4"))
+
+
+def available_encodings(setting: str = COMPRESSION) -> tuple[str, ...]:
+    """設定のうち、この環境で使える方式（優先順）"""
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    names = [name.strip() for name in setting.split(",")]
+    return tuple(name for name in names if name in supported)
+
+
+def negotiate_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """Accept-Encodingから使う方式を選ぶ（encodingsの優先順、q=0は除外）
+
+    Returns:
+        "br" / "gzip"、該当なしはNone
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in encodings:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """ここまでの入力を出力に含める（ストリーミングでチャンクを滞留させない）"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _append_vary(headers: list, value: bytes):
+    """Varyヘッダーに値を追加（既にあれば何もしない）"""
+    for i, (name, current) in enumerate(headers):
+        if name == b"vary":
+            if value.lower() not in current.lower():
+                headers[i] = (name, current + b", " + value)
+            return
+    headers.append((b"vary", value))
+
+
+class CompressionMiddleware:
+    """HTML・JSONレスポンスを圧縮するミドルウェア（ASGI）
+
+    Args:
+        app: 下流のASGIアプリ
+        encodings: 使用する方式（優先順、カンマ区切り）
+        minimum_size: 圧縮する最小サイズ(bytes)
+        gzip_level: gzipの圧縮レベル
+        brotli_quality: brotliの品質
+    """
+
+    def __init__(self, app, encodings: str = COMPRESSION, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BR_QUALITY):
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding, self.encodings) if accept_encoding else None
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if not self._is_compressible(message["status"], headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                _append_vary(headers, b"Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send({**message, "headers": headers})
+                    return
+                # ボディの最初のチャンクを見るまで保留する
+                start = {**message, "headers": headers}
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                pending, start = start, None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(pending)
+                    await send(message)
+                    return
+                encoder = self._encoder(encoding)
+                headers = [
+                    (name, value) for name, value in pending["headers"]
+                    if name != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**pending, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**pending, "headers": headers})
+
+            if more_body:
+                chunk = encoder.compress(body) + encoder.flush()
+            else:
+                chunk = encoder.compress(body) + encoder.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _is_compressible(status: int, headers: list) -> bool:
+        """圧縮対象のレスポンスか（対象のContent-Typeで、未圧縮・変換禁止でない）"""
+        if status < 200 or status in (204, 304):
+            return False
+        compressible = False
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"cache-control" and b"no-transform" in value.lower():
+                return False
+            if name == b"content-type":
+                compressible = value.lower().startswith(COMPRESSIBLE_TYPES)
+        return compressible
+
+    def _encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
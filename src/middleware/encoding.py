@@ -5,11 +5,35 @@ Windows環境のcurlで発生するMojibake（文字化け）を検出し、
 
 検出パターン:
 - CP932(SHIFT_JIS) → Latin-1解釈 → UTF-8保存 のダブルエンコード
+
+検証対象:
+- POST/PUT/PATCH のフォーム（application/x-www-form-urlencoded）
+- /api/v1 への POST/PUT/PATCH のJSON（application/json）の文字列値
+
+素のASGIミドルウェアとして実装し、対象外のリクエストは何も読まずに下流へ渡す。
+対象のボディも解析前にLatin-1範囲の文字（U+0080〜U+00FF）を含み得るかを判定し、
+含まない場合（ASCIIのみ・日本語のみ等）はフォーム・JSONとして解析しない。
 """
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from urllib.parse import parse_qs
+import json
+import re
+from urllib.parse import parse_qsl
+
+from starlette.responses import JSONResponse
+
+# 検証対象のメソッド
+TARGET_METHODS = frozenset(("POST", "PUT", "PATCH"))
+
+# JSONを検証するパスの接頭辞
+JSON_PATH_PREFIX = "/api/v1"
+
+# Mojibakeの文字（U+0080〜U+00FF）
+_LATIN1_CHAR = re.compile("[\u0080-\u00ff]")
+
+# ASCIIで表現されたLatin-1範囲の文字（UTF-8の先頭バイト %C2/%C3、JSONの \u0080〜\u00FF）
+_FORM_ESCAPED = re.compile(rb"%[cC][23]")
+_JSON_ESCAPED = re.compile(rb"\\u00[89a-fA-F]")
+
+_DECODE_ERROR = "エンコーディングエラー: リクエストボディをUTF-8としてデコードできません。"
 
 
 def detect_mojibake(text: str) -> bool:
@@ -40,39 +64,121 @@ def detect_mojibake(text: str) -> bool:
         return False
 
 
-class EncodingValidationMiddleware(BaseHTTPMiddleware):
-    """POST/PUTリクエストのフォームデータを検証するミドルウェア"""
-
-    async def dispatch(self, request: Request, call_next):
-        if request.method in ("POST", "PUT", "PATCH"):
-            content_type = request.headers.get("content-type", "")
-
-            if "application/x-www-form-urlencoded" in content_type:
-                # フォームデータを読み取り
-                body = await request.body()
-
-                try:
-                    # UTF-8としてデコード
-                    body_str = body.decode('utf-8')
-                    params = parse_qs(body_str, keep_blank_values=True)
-
-                    # 各値をチェック
-                    for key, values in params.items():
-                        for value in values:
-                            if detect_mojibake(value):
-                                return JSONResponse(
-                                    status_code=400,
-                                    content={"detail": f"エンコーディングエラー: フィールド '{key}' に不正な文字が含まれています。UTF-8でデータを送信してください。"}
-                                )
-                except UnicodeDecodeError:
-                    return JSONResponse(
-                        status_code=400,
-                        content={"detail": "エンコーディングエラー: リクエストボディをUTF-8としてデコードできません。"}
-                    )
-
-                # bodyを再設定（FastAPIが再度読めるように）
-                async def receive():
-                    return {"type": "http.request", "body": body}
-                request._receive = receive
-
-        return await call_next(request)
+def _field_error(field: str) -> str:
+    return f"エンコーディングエラー: フィールド '{field}' に不正な文字が含まれています。UTF-8でデータを送信してください。"
+
+
+def _find_form_mojibake(text: str) -> str | None:
+    """フォームボディから文字化けした値のフィールド名を探す（非ASCIIの値のみ検証）"""
+    for key, value in parse_qsl(text, keep_blank_values=True):
+        if not value.isascii() and detect_mojibake(value):
+            return key
+    return None
+
+
+def _find_json_mojibake(value, path: str = "") -> str | None:
+    """JSONの値から文字化けした文字列のパス（例: items[0].name）を探す"""
+    if isinstance(value, str):
+        if not value.isascii() and detect_mojibake(value):
+            return path or "(body)"
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            found = _find_json_mojibake(item, f"{path}.{key}" if path else key)
+            if found:
+                return found
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            found = _find_json_mojibake(item, f"{path}[{i}]")
+            if found:
+                return found
+    return None
+
+
+class EncodingValidationMiddleware:
+    """POST/PUT/PATCHリクエストのフォーム・JSONデータを検証するミドルウェア（ASGI）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in TARGET_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        kind = self._body_kind(scope)
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        # ボディを読み切る（下流には同じ内容を再送する）
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # 受信中に切断された場合はそのまま下流へ伝える
+                await self.app(scope, _replay([message], receive), send)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        error = self._validate(kind, body)
+        if error:
+            response = JSONResponse(status_code=400, content={"detail": error})
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, _replay([{"type": "http.request", "body": body, "more_body": False}], receive), send)
+
+    @staticmethod
+    def _body_kind(scope) -> str | None:
+        """検証するボディの種類（"form" / "json"、対象外はNone）"""
+        content_type = b""
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                content_type = value.lower()
+                break
+        if b"application/x-www-form-urlencoded" in content_type:
+            return "form"
+        if b"application/json" in content_type and scope["path"].startswith(JSON_PATH_PREFIX):
+            return "json"
+        return None
+
+    @staticmethod
+    def _validate(kind: str, body: bytes) -> str | None:
+        """エラーメッセージを返す（問題なしはNone）"""
+        escaped = _FORM_ESCAPED if kind == "form" else _JSON_ESCAPED
+        if body.isascii():
+            if not escaped.search(body):
+                return None
+            text = body.decode('ascii')
+        else:
+            try:
+                text = body.decode('utf-8')
+            except UnicodeDecodeError:
+                return _DECODE_ERROR
+            if not _LATIN1_CHAR.search(text) and not escaped.search(body):
+                return None
+
+        if kind == "form":
+            field = _find_form_mojibake(text)
+        else:
+            try:
+                field = _find_json_mojibake(json.loads(text))
+            except ValueError:
+                # 不正なJSONの扱いはFastAPIの検証に任せる
+                return None
+        return _field_error(field) if field is not None else None
+
+
+def _replay(messages: list[dict], receive):
+    """読み取り済みのメッセージを先に返し、以降は元のreceiveに委ねる"""
+    pending = list(messages)
+
+    async def replay_receive():
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay_receive
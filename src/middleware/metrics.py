@@ -0,0 +1,82 @@
+"""メトリクス記録ミドルウェア
+
+リクエストごとに、ルートのテンプレート（例: /projects/{project_id}）単位で
+件数・処理時間を metrics に記録する。RequestStatsMiddleware の内側に置くと
+同じリクエストのSQL文数・取得行数・DB時間も合わせて記録する。
+"""
+import time
+
+from instrumentation import current_stats
+from metrics import metrics
+
+# ルートに一致しなかったリクエストのラベル（パスをそのまま使うとラベルが際限なく増えるため）
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _route_prefix(scope, route, root_path: str) -> str:
+    """ルートのテンプレートより前のパス（include_routerのprefix）
+
+    FastAPIのバージョンによっては scope["route"] がprefixなしの元のルートになるため、
+    一致したパスパラメータでテンプレートを展開し、実際のパスとの差分をprefixとする。
+    """
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    params = scope.get("path_params", {})
+    try:
+        rendered = route.path_format.format(**{
+            name: route.param_convertors[name].to_string(value) if name in route.param_convertors else value
+            for name, value in params.items()
+        })
+    except (AttributeError, KeyError, ValueError, AssertionError):
+        return ""
+    if path.endswith(rendered):
+        return path[:len(path) - len(rendered)]
+    return ""
+
+
+def route_label(scope, root_path: str = "") -> str:
+    """処理後のscopeからルートのテンプレートを得る（マウントはマウント先のパス）
+
+    Args:
+        scope: 下流で処理済みのscope（ルーティングでrouteやroot_pathが設定される）
+        root_path: 処理前のroot_path
+    """
+    route = scope.get("route")
+    if route is not None:
+        return _route_prefix(scope, route, root_path) + route.path
+    mounted = scope.get("root_path", "")
+    if mounted != root_path:
+        return mounted[len(root_path):]
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """リクエストの件数・処理時間を記録するミドルウェア（ASGI）"""
+
+    def __init__(self, app, registry=metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.registry.observe_request(
+                scope["method"], route_label(scope, root_path), status,
+                time.perf_counter() - start, current_stats()
+            )
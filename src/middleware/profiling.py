@@ -0,0 +1,80 @@
+"""プロファイリングミドルウェア
+
+X-Profile ヘッダーまたは _profile クエリ付きのリクエストだけをサンプリングプロファイラーの下で処理し、
+結果を profiles/ に保存して、保存したファイル名を X-Profile レスポンスヘッダーで返す。
+採取範囲はレスポンス開始（http.response.start）まで。ページはここまでに描画が終わっている。
+
+PROFILING=1 の場合のみ main.py で追加するため、無効時はリクエストごとの処理が一切ない。
+"""
+import time
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+
+from profiling import PROFILES_DIR, PROFILES_MAX, PROFILING_INTERVAL, PROFILING_TOKEN, Sampler, save_profile
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "_profile"
+
+
+def profile_requested(scope, token: str = PROFILING_TOKEN) -> bool:
+    """プロファイル採取の指定があるか（トークン設定時は値が一致する場合のみ）"""
+    value = next((v.decode("latin-1") for k, v in scope["headers"] if k == PROFILE_HEADER), None)
+    if value is None and PROFILE_QUERY.encode() in scope.get("query_string", b""):
+        query = dict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+        value = query.get(PROFILE_QUERY)
+    if value is None:
+        return False
+    return value == token if token else True
+
+
+class ProfilingMiddleware:
+    """指定されたリクエストのプロファイルを採取するミドルウェア（ASGI）
+
+    Args:
+        app: 下流のASGIアプリ
+        token: 採取に必要なトークン（空なら指定があれば採取）
+        interval: サンプリング間隔（秒）
+        directory: 保存先
+        keep: 保持する件数
+    """
+
+    def __init__(self, app, token: str = PROFILING_TOKEN, interval: float = PROFILING_INTERVAL,
+                 directory=PROFILES_DIR, keep: int = PROFILES_MAX):
+        self.app = app
+        self.token = token
+        self.interval = interval
+        self.directory = directory
+        self.keep = keep
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profile_requested(scope, self.token):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler(self.interval)
+        start = time.perf_counter()
+        name = None
+
+        async def finish():
+            nonlocal name
+            if name is None:
+                sampler.stop()
+                name = await run_in_threadpool(
+                    save_profile, sampler, scope["method"], scope["path"],
+                    time.perf_counter() - start, self.directory, self.keep
+                )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                await finish()
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_HEADER, name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await finish()
@@ -0,0 +1,134 @@
+"""リクエスト計測ミドルウェア
+
+各リクエストを instrumentation.collect() の中で処理し、
+DB（接続数・文数・取得行数・時間）と描画の時間を Server-Timing ヘッダーで返す。
+
+設定（環境変数）:
+    REQUEST_STATS:        "off"で無効 既定: on
+    REQUEST_STATS_FOOTER: "1"でHTMLページの末尾に計測結果（時間の長い文）を表示 既定: 無効
+    DB_CONNECTION_WARN:   1リクエストのDB接続数がこれを超えたら警告ログを出す 既定: 10
+"""
+import html
+import logging
+import os
+import time
+
+from instrumentation import RequestStats, collect
+
+REQUEST_STATS = os.getenv("REQUEST_STATS", "on") != "off"
+REQUEST_STATS_FOOTER = os.getenv("REQUEST_STATS_FOOTER", "") == "1"
+DB_CONNECTION_WARN = int(os.getenv("DB_CONNECTION_WARN", "10"))
+
+# フッターに表示する文の件数
+FOOTER_STATEMENTS = 10
+
+logger = logging.getLogger(__name__)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    """Server-Timingヘッダーの値（durはミリ秒）"""
+    parts = [
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.connections} conn, '
+        f'{stats.statements} stmt, {stats.rows} rows"'
+    ]
+    for name, duration in stats.phases.items():
+        parts.append(f"{name};dur={duration * 1000:.1f}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render_footer(stats: RequestStats, total: float) -> str:
+    """計測結果のフッターHTML"""
+    phases = "".join(
+        f" / {html.escape(name)} {duration * 1000:.1f}ms" for name, duration in stats.phases.items()
+    )
+    rows = "".join(
+        f'<tr><td class="num">{s.duration * 1000:.2f}ms</td><td class="num">{s.rows}</td>'
+        f'<td><code>{html.escape(" ".join(s.sql.split()))}</code></td></tr>'
+        for s in stats.slowest(FOOTER_STATEMENTS)
+    )
+    return (
+        '<footer class="request-stats">'
+        f'<div>合計 {total * 1000:.1f}ms / DB {stats.db_time * 1000:.1f}ms'
+        f'（接続 {stats.connections} / 文 {stats.statements} / 行 {stats.rows}）{phases}</div>'
+        f'<table><thead><tr><th>時間</th><th>行</th><th>SQL</th></tr></thead><tbody>{rows}</tbody></table>'
+        '</footer>'
+    )
+
+
+class RequestStatsMiddleware:
+    """リクエスト単位でDBアクセス・描画時間を計測するミドルウェア（ASGI）
+
+    Args:
+        app: 下流のASGIアプリ
+        enabled: 計測するか
+        footer: HTMLページに計測結果のフッターを挿入するか
+        connection_warn: 警告するDB接続数のしきい値
+    """
+
+    def __init__(self, app, enabled: bool = REQUEST_STATS, footer: bool = REQUEST_STATS_FOOTER,
+                 connection_warn: int = DB_CONNECTION_WARN):
+        self.app = app
+        self.enabled = enabled
+        self.footer = footer
+        self.connection_warn = connection_warn
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        pending = None
+
+        with collect() as stats:
+            async def send_wrapper(message):
+                nonlocal pending
+                if message["type"] == "http.response.start":
+                    total = time.perf_counter() - start
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stats, total).encode()))
+                    message = {**message, "headers": headers}
+                    if self.footer and _is_html(headers):
+                        # フッター挿入のためボディの最初のチャンクまで保留する
+                        pending = message
+                        return
+                elif pending is not None and message["type"] == "http.response.body":
+                    start_message, pending = pending, None
+                    if not message.get("more_body", False):
+                        start_message, message = _insert_footer(
+                            start_message, message, stats, time.perf_counter() - start
+                        )
+                    await send(start_message)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if stats.connections > self.connection_warn:
+                    logger.warning(
+                        "%s %s: DB接続 %d回（文 %d、%.1fms）",
+                        scope["method"], scope["path"], stats.connections,
+                        stats.statements, stats.db_time * 1000,
+                    )
+
+
+def _is_html(headers: list) -> bool:
+    for name, value in headers:
+        if name == b"content-type":
+            return value.startswith(b"text/html")
+    return False
+
+
+def _insert_footer(start_message: dict, message: dict, stats: RequestStats, total: float):
+    """ページ全体（</body>を含む）のボディにフッターを挿入し、Content-Lengthを合わせる"""
+    body = message.get("body", b"")
+    pos = body.rfind(b"</body>")
+    if pos < 0:
+        return start_message, message
+    body = body[:pos] + render_footer(stats, total).encode() + body[pos:]
+    headers = [
+        (name, value) for name, value in start_message["headers"] if name != b"content-length"
+    ]
+    headers.append((b"content-length", str(len(body)).encode()))
+    return {**start_message, "headers": headers}, {**message, "body": body}
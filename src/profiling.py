@@ -0,0 +1,190 @@
+"""リクエストのプロファイル
+
+責務: サンプリングプロファイラーの実行と、結果（collapsed stack形式）の保存・一覧のみ
+
+FastAPIは同期エンドポイントをスレッドプールで実行するため、呼び出したスレッドしか見えない
+cProfileではなく、全スレッドのスタックを一定間隔で採取するサンプリング方式を使う。
+アプリのソース（src/配下）のフレームを含むスタックだけを数えるため、待機中のイベントループ等は含まれない。
+同時に処理中の他のリクエストのスタックも含まれるので、負荷の低い時間帯に採取すること。
+
+保存形式は flamegraph.pl / speedscope などがそのまま読める collapsed stack
+（"呼び出し元;...;関数 サンプル数" の行）。
+
+設定（環境変数）:
+    PROFILING:             "1"でプロファイリングミドルウェアを有効化 既定: 無効
+    PROFILING_TOKEN:       指定時は X-Profile ヘッダー / _profile クエリの値がこれと一致した場合のみ採取
+    PROFILING_INTERVAL_MS: サンプリング間隔(ミリ秒) 既定: 1
+    PROFILES_DIR:          保存先 既定: DBと同じディレクトリの profiles/
+    PROFILES_MAX:          保持する件数（超えたら古いものから削除） 既定: 50
+"""
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from database import DB_PATH
+
+PROFILING = os.getenv("PROFILING", "") == "1"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL_MS", "1")) / 1000
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", DB_PATH.parent / "profiles"))
+PROFILES_MAX = int(os.getenv("PROFILES_MAX", "50"))
+
+PROFILE_SUFFIX = ".collapsed"
+
+# 保存ファイル名（一覧・ダウンロード時の検証にも使う）
+PROFILE_NAME_PATTERN = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9]{6}_[A-Z]+_[\w.-]*\.collapsed$")
+
+# アプリのソースのディレクトリ（このディレクトリのフレームを含むスタックだけを数える）
+APP_DIR = str(Path(__file__).parent) + os.sep
+
+
+# ライブラリのフレームの表示名に付ける印（アプリのフレームと区別する）
+LIBRARY_MARK = "~"
+
+
+def _frame_label(code) -> str:
+    """フレームの表示名（関数名とファイル）
+
+    アプリはsrc/からの相対パス、ライブラリは印付きのsys.pathからの相対パス（例: ~starlette/routing.py）
+    """
+    filename = code.co_filename
+    if filename.startswith(APP_DIR):
+        filename = filename[len(APP_DIR):]
+    else:
+        base = max((p for p in sys.path if p and filename.startswith(p + os.sep)), key=len, default="")
+        filename = LIBRARY_MARK + (filename[len(base) + 1:] if base else Path(filename).name)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """全スレッドのスタックを一定間隔で採取するプロファイラー
+
+    Args:
+        interval: サンプリング間隔（秒）
+    """
+
+    def __init__(self, interval: float = PROFILING_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code is _STOP_CODE:
+                        # 停止を待っているスレッド（採取対象外）
+                        in_app = False
+                        break
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    label = self._labels.get(code)
+                    if label is None:
+                        label = self._labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                if in_app:
+                    stack.reverse()
+                    self.stacks[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        """collapsed stack形式（サンプル数の多い順）"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+_STOP_CODE = Sampler.stop.__code__
+
+
+def save_profile(sampler: Sampler, method: str, path: str, duration: float,
+                 directory: Path = PROFILES_DIR, keep: int = PROFILES_MAX) -> str:
+    """プロファイルを保存し、保持件数を超えた古いものを削除
+
+    Returns:
+        保存したファイル名
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^\w-]+", "-", path).strip("-")[:60] or "root"
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    name = f"{stamp}_{method}_{slug}.{int(duration * 1000)}ms{PROFILE_SUFFIX}"
+    (directory / name).write_text(sampler.collapsed())
+
+    for old in list_profiles(directory)[keep:]:
+        (directory / old["name"]).unlink(missing_ok=True)
+    return name
+
+
+def list_profiles(directory: Path = PROFILES_DIR) -> list[dict]:
+    """保存済みプロファイル（新しい順）
+
+    Returns:
+        [{name, size, created_at, samples}]
+    """
+    if not directory.exists():
+        return []
+    profiles = []
+    for path in directory.glob(f"*{PROFILE_SUFFIX}"):
+        if not PROFILE_NAME_PATTERN.match(path.name):
+            continue
+        stat = path.stat()
+        with path.open() as f:
+            samples = sum(int(line.rsplit(" ", 1)[1]) for line in f if line.strip())
+        profiles.append({
+            "name": path.name,
+            "size": stat.st_size,
+            "created_at": stat.st_mtime,
+            "samples": samples,
+        })
+    profiles.sort(key=lambda p: p["name"], reverse=True)
+    return profiles
+
+
+def profile_path(name: str, directory: Path = PROFILES_DIR) -> Path:
+    """プロファイルのパス（不正な名前・存在しなければLookupError）"""
+    path = directory / name
+    if not PROFILE_NAME_PATTERN.match(name) or not path.is_file():
+        raise LookupError("プロファイルが見つかりません")
+    return path
+
+
+def top_functions(name: str, limit: int = 20, directory: Path = PROFILES_DIR) -> list[tuple[str, int, int]]:
+    """アプリ内の関数ごとのサンプル数（自身 = スタックで最も深いアプリの関数、累計 = スタック中に出現）
+
+    Returns:
+        [(関数, 自身, 累計)]（累計の多い順）
+    """
+    own, total = Counter(), Counter()
+    with profile_path(name, directory).open() as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if not stack:
+                continue
+            app_frames = [frame for frame in stack.split(";") if _is_app_frame(frame)]
+            for frame in set(app_frames):
+                total[frame] += int(count)
+            if app_frames:
+                own[app_frames[-1]] += int(count)
+    return [(frame, own[frame], count) for frame, count in total.most_common(limit)]
+
+
+def _is_app_frame(label: str) -> bool:
+    return not label.rsplit(" (", 1)[-1].startswith(LIBRARY_MARK)
@@ -13,6 +13,9 @@ from .search import router as search_router
 from .user_attribute_types import router as user_attribute_types_router
 from .user_attribute_options import router as user_attribute_options_router
 from .user_settings import router as user_settings_router
+from .analytics import router as analytics_router
+from .metrics import router as metrics_router
+from .admin import router as admin_router
 from .api import api_v1_router
 
 __all__ = [
@@ -31,5 +34,8 @@ __all__ = [
     "user_attribute_types_router",
     "user_attribute_options_router",
     "user_settings_router",
+    "analytics_router",
+    "metrics_router",
+    "admin_router",
     "api_v1_router",
 ]
@@ -0,0 +1,113 @@
+"""管理
+
+責務: 運用向けの診断情報（スロークエリログ・プロファイル）のHTML返却のみ
+"""
+from datetime import datetime
+from html import escape
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse
+
+from profiling import PROFILING, PROFILING_TOKEN, list_profiles, profile_path, top_functions
+from slow_queries import slow_query_log
+from .common import templates
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# スロークエリログの並び順: 値 -> 表示名
+SLOW_QUERY_SORTS = {
+    "total": "合計時間",
+    "max": "最大時間",
+    "count": "回数",
+    "recent": "最終記録",
+}
+
+
+def render_slow_queries(sort: str) -> str:
+    """スロークエリログの表（tbody）"""
+    entries = slow_query_log.entries(sort)
+    if not entries:
+        return '<tr><td colspan="5" class="empty-message">記録されたスロークエリはありません</td></tr>'
+
+    rows = []
+    for e in entries:
+        last_seen = datetime.fromtimestamp(e.last_seen).strftime("%Y-%m-%d %H:%M:%S")
+        plan = escape("\n".join(e.plan))
+        rows.append(f'''<tr class="slow-query-row">
+            <td class="num">{e.count}</td>
+            <td class="num">{e.total_time * 1000:.1f}ms<br><span class="text-muted">最大 {e.max_time * 1000:.1f}ms</span></td>
+            <td class="slow-query-sql">
+                <code>{escape(e.normalized)}</code>
+                <div class="text-muted">パラメータ: {escape(e.params) or "なし"}</div>
+                <details><summary>実行例</summary><pre>{escape(e.sql)}</pre></details>
+            </td>
+            <td class="slow-query-plan"><pre>{plan}</pre></td>
+            <td>{last_seen}</td>
+        </tr>''')
+    return "".join(rows)
+
+
+@router.get("/slow-queries", response_class=HTMLResponse)
+def slow_queries_page(request: Request, sort: str = "total"):
+    """スロークエリログページ（このワーカーの記録）"""
+    sort = sort if sort in SLOW_QUERY_SORTS else "total"
+    threshold = slow_query_log.threshold
+    return templates.TemplateResponse(request, "admin_slow_queries.html", {
+        "sorts": SLOW_QUERY_SORTS,
+        "sort": sort,
+        "threshold_ms": None if threshold is None else threshold * 1000,
+        "lock_wait": slow_query_log.lock_wait,
+        "rows": render_slow_queries(sort),
+    })
+
+
+@router.get("/slow-queries/list", response_class=HTMLResponse)
+def slow_queries_list(sort: str = "total"):
+    """スロークエリログの表（並び替え用）"""
+    return HTMLResponse(render_slow_queries(sort if sort in SLOW_QUERY_SORTS else "total"))
+
+
+@router.post("/slow-queries/clear", response_class=HTMLResponse)
+def clear_slow_queries():
+    """スロークエリログを消去"""
+    slow_query_log.clear()
+    return HTMLResponse(render_slow_queries("total"))
+
+
+@router.get("/profiles", response_class=HTMLResponse)
+def profiles_page(request: Request):
+    """保存済みプロファイルの一覧ページ"""
+    profiles = [
+        {**p, "created_at": datetime.fromtimestamp(p["created_at"]).strftime("%Y-%m-%d %H:%M:%S")}
+        for p in list_profiles()
+    ]
+    return templates.TemplateResponse(request, "admin_profiles.html", {
+        "enabled": PROFILING,
+        "token_required": bool(PROFILING_TOKEN),
+        "profiles": profiles,
+    })
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    """プロファイルのダウンロード（collapsed stack形式）"""
+    try:
+        path = profile_path(name)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=name)
+
+
+@router.get("/profiles/{name}/top", response_class=HTMLResponse)
+def profile_top_functions(name: str, limit: int = 20):
+    """プロファイルのアプリ内の関数ごとのサンプル数（表の行）"""
+    try:
+        functions = top_functions(name, limit)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not functions:
+        return HTMLResponse('<tr><td colspan="3" class="empty-message">アプリのフレームはありません</td></tr>')
+    return HTMLResponse("".join(
+        f'<tr><td class="num">{own}</td><td class="num">{total}</td><td><code>{escape(frame)}</code></td></tr>'
+        for frame, own, total in functions
+    ))
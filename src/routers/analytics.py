@@ -0,0 +1,118 @@
+"""分析
+
+責務: HTML生成 + HTTPルーティングのみ
+データ取得はAnalyticsServiceに委譲
+"""
+from html import escape
+
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import HTMLResponse
+from instrumentation import timed
+from services import AnalyticsService, UserAttributeTypeService
+from .common import (
+    templates, get_attribute_type_or_404, get_rate_class,
+    get_month_range, resolve_month_range
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+def _format_hours(hours: float) -> str:
+    return f"{hours:.1f}h" if hours else "-"
+
+
+def _render_cell(planned: float, actual: float, css_class: str = "") -> str:
+    """予定/実績セル（予定があれば消化率で色分け）"""
+    rate_class = get_rate_class(actual / planned * 100) if planned > 0 else ""
+    return f'''<td class="{css_class}" style="padding: 4px 8px; vertical-align: top;">
+        <div class="{rate_class}" style="font-size: 0.75rem;">実績: {_format_hours(actual)}</div>
+        <div style="font-size: 0.75rem; color: var(--text-muted);">予定: {_format_hours(planned)}</div>
+    </td>'''
+
+
+@timed("render")
+def render_pivot(rows: list[dict], months: list[str]) -> str:
+    """属性の選択肢 × プロジェクト（行）× 年月（列）のピボット表HTML生成"""
+    if not rows:
+        return '<p class="empty-message">期間内の予定・実績がありません</p>'
+
+    # 選択肢 -> プロジェクト -> 年月 の順に集約（rowsは選択肢・プロジェクト順）
+    groups = {}
+    for r in rows:
+        group = groups.setdefault(r['option_id'], {'name': r['option_name'], 'projects': {}})
+        project = group['projects'].setdefault(r['project_id'], {
+            'cd': r['project_cd'], 'name': r['project_name'], 'months': {}
+        })
+        project['months'][r['year_month']] = (r['planned_hours'], r['actual_hours'])
+
+    header = "".join(f'<th class="project-header">{m}</th>' for m in months)
+    body = []
+    for group in groups.values():
+        body.append(f'''<tr class="total-row">
+            <td class="total-label" colspan="{len(months) + 2}">{escape(group['name'])}</td>
+        </tr>''')
+        subtotal = {m: [0.0, 0.0] for m in months}
+        for project in group['projects'].values():
+            cells = []
+            row_planned = row_actual = 0.0
+            for m in months:
+                planned, actual = project['months'].get(m, (0.0, 0.0))
+                subtotal[m][0] += planned
+                subtotal[m][1] += actual
+                row_planned += planned
+                row_actual += actual
+                cells.append(_render_cell(planned, actual, "assign-cell"))
+            body.append(f'''<tr class="user-row">
+                <td class="user-name">{escape(project['cd'])} {escape(project['name'])}</td>
+                {"".join(cells)}
+                {_render_cell(row_planned, row_actual, "row-total")}
+            </tr>''')
+        subtotal_cells = "".join(_render_cell(p, a, "col-total") for p, a in subtotal.values())
+        group_planned = sum(p for p, _ in subtotal.values())
+        group_actual = sum(a for _, a in subtotal.values())
+        body.append(f'''<tr class="total-row">
+            <td class="total-label">小計</td>
+            {subtotal_cells}
+            {_render_cell(group_planned, group_actual, "grand-total")}
+        </tr>''')
+
+    return f'''<table class="assign-table">
+        <thead><tr><th class="user-header">プロジェクト</th>{header}<th class="total-header">合計</th></tr></thead>
+        <tbody>{"".join(body)}</tbody>
+    </table>'''
+
+
+@router.get("", response_class=HTMLResponse)
+def page(
+    request: Request,
+    type_id: int = None,
+    start: str = None,
+    end: str = None,
+    user: list[int] = Query(default=[]),
+    project: list[int] = Query(default=[]),
+    issue: list[int] = Query(default=[])
+):
+    """属性別稼働分析ページ"""
+    start_month, end_month = resolve_month_range(start, end)
+    attr_types = UserAttributeTypeService.get_all()
+    if type_id is None and attr_types:
+        type_id = attr_types[0]['id']
+
+    filter_params = {"user": user, "project": project, "issue": issue}
+    return templates.TemplateResponse(request, "analytics.html", {
+        "active": "analytics",
+        "attr_types": attr_types,
+        "type_id": type_id,
+        "start_month": start_month,
+        "end_month": end_month,
+        "filter_params": filter_params,
+    })
+
+
+@router.get("/pivot", response_class=HTMLResponse)
+def get_pivot(type_id: int, start: str = None, end: str = None):
+    """属性の選択肢 × プロジェクト × 年月 のピボット表"""
+    get_attribute_type_or_404(type_id)
+    start_month, end_month = resolve_month_range(start, end)
+    rows = AnalyticsService.get_attribute_utilization(type_id, start_month, end_month)
+    return HTMLResponse(render_pivot(rows, get_month_range(start_month, end_month)))
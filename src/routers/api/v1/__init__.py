@@ -6,6 +6,8 @@ from .users import router as users_router
 from .issues import router as issues_router
 from .tasks import router as tasks_router
 from .work_logs import router as work_logs_router
+from .analytics import router as analytics_router
+from .task_assignees import router as task_assignees_router
 
 router = APIRouter(prefix="/api/v1")
 
@@ -14,3 +16,5 @@ router.include_router(users_router)
 router.include_router(issues_router)
 router.include_router(tasks_router)
 router.include_router(work_logs_router)
+router.include_router(analytics_router)
+router.include_router(task_assignees_router)
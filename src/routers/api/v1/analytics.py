@@ -0,0 +1,20 @@
+"""分析 JSON API"""
+from fastapi import APIRouter, Query
+
+from services import AnalyticsService
+from schemas import AttributeUtilizationOut
+from routers.common import get_attribute_type_or_404, resolve_month_range
+
+router = APIRouter(prefix="/analytics", tags=["api-analytics"])
+
+
+@router.get("/attribute-utilization", response_model=list[AttributeUtilizationOut])
+def attribute_utilization(
+    type_id: int = Query(description="属性タイプID"),
+    start: str = Query(default=None, description="開始月（YYYY-MM、省略時は終了月の11か月前）"),
+    end: str = Query(default=None, description="終了月（YYYY-MM、省略時は今月）")
+):
+    """属性の選択肢 × プロジェクト × 年月 の予定/実績工数"""
+    get_attribute_type_or_404(type_id)
+    start_month, end_month = resolve_month_range(start, end)
+    return AnalyticsService.get_attribute_utilization(type_id, start_month, end_month)
@@ -1,20 +1,46 @@
 """プロジェクト JSON API"""
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
 
 from services import ProjectService
-from schemas import ProjectCreate, ProjectUpdate, ProjectOut, ProjectSummary
+from services.pagination import next_cursor
+from services.batch import BATCH_MAX_ITEMS
+from services.fulltext import resolve_sort
+from schemas import ProjectCreate, ProjectUpdate, ProjectBatchUpdate, BatchResult, ProjectOut, ProjectSummary
+from routers.common import validate_sort_params, set_next_link, API_DEFAULT_LIMIT, API_MAX_LIMIT
 
 router = APIRouter(prefix="/projects", tags=["api-projects"])
 
 
 @router.get("", response_model=list[ProjectOut])
 def list_projects(
-    sort: str = Query(default="cd", description="ソート列"),
+    request: Request,
+    response: Response,
+    sort: str = Query(default="", description="ソート列（未指定時は検索語3文字以上で関連度順rank、それ以外はcd）"),
     order: str = Query(default="asc", description="昇順/降順"),
-    q: str = Query(default="", description="検索キーワード")
+    q: str = Query(default="", description="検索キーワード"),
+    limit: int = Query(default=API_DEFAULT_LIMIT, ge=1, le=API_MAX_LIMIT, description="取得件数"),
+    cursor: str = Query(default=None, description="次ページカーソル（Linkヘッダーのnext）")
 ):
-    """プロジェクト一覧"""
-    return ProjectService.get_all(sort=sort, order=order, q=q)
+    """プロジェクト一覧（続きはLinkヘッダーのrel="next"）"""
+    sort, _ = validate_sort_params(resolve_sort(sort, q), order, {"cd", "name", "description", "rank"})
+    try:
+        rows = ProjectService.get_all(sort=sort, order=order, q=q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_link(request, response, next_cursor(rows, sort, limit))
+    return rows
+
+
+@router.post("/batch", response_model=BatchResult)
+def create_projects_batch(body: list[ProjectCreate] = Body(max_length=BATCH_MAX_ITEMS)):
+    """プロジェクト一括作成（検証に失敗した項目はresultsのerrorで返し、残りを作成）"""
+    return ProjectService.create_many([item.model_dump() for item in body])
+
+
+@router.put("/batch", response_model=BatchResult)
+def update_projects_batch(body: list[ProjectBatchUpdate] = Body(max_length=BATCH_MAX_ITEMS)):
+    """プロジェクト一括更新（検証に失敗した項目はresultsのerrorで返し、残りを更新）"""
+    return ProjectService.update_many([item.model_dump() for item in body])
 
 
 @router.get("/{project_id}", response_model=ProjectOut)
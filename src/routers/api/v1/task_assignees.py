@@ -0,0 +1,65 @@
+"""担当割当 JSON API"""
+from fastapi import APIRouter, HTTPException
+
+from services import TaskAssigneeService
+from schemas import (
+    AssigneeBulkScope, AssigneeCopy, AssigneeBulkResult,
+    AssigneeToggle, AssigneeToggleOut, TaskAssigneesOut,
+)
+from routers.common import get_project_or_404, get_issue_or_404
+
+router = APIRouter(prefix="/projects/{project_id}/assignees", tags=["api-task-assignees"])
+
+
+def _run(operation, *args, **kwargs):
+    """サービスの例外をHTTPエラーに変換して実行"""
+    try:
+        return operation(*args, **kwargs)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/issues/{issue_id}", response_model=list[TaskAssigneesOut])
+def issue_assignees(project_id: int, issue_id: int):
+    """案件の作業と担当ユーザーID（担当割当マトリクスの案件単位の遅延読み込み用）"""
+    get_issue_or_404(project_id, issue_id)
+    return TaskAssigneeService.get_issue_tasks_with_assignees(issue_id)
+
+
+@router.post("/toggle", response_model=AssigneeToggleOut)
+def toggle(project_id: int, body: AssigneeToggle):
+    """担当割当のトグル"""
+    get_project_or_404(project_id)
+    return _run(TaskAssigneeService.toggle, body.task_id, body.user_id, project_id)
+
+
+@router.post("/bulk-assign", response_model=AssigneeBulkResult)
+def bulk_assign(project_id: int, body: AssigneeBulkScope):
+    """範囲内の作業 × ユーザーを一括割当"""
+    get_project_or_404(project_id)
+    added = _run(TaskAssigneeService.bulk_assign, project_id, **body.model_dump())
+    return {"added": added}
+
+
+@router.post("/bulk-unassign", response_model=AssigneeBulkResult)
+def bulk_unassign(project_id: int, body: AssigneeBulkScope):
+    """範囲内の作業 × ユーザーの割当を一括解除"""
+    get_project_or_404(project_id)
+    removed = _run(TaskAssigneeService.bulk_unassign, project_id, **body.model_dump())
+    return {"removed": removed}
+
+
+@router.post("/copy", response_model=AssigneeBulkResult)
+def copy_assignments(project_id: int, body: AssigneeCopy):
+    """他の案件（作業cdで対応付け）またはプロジェクト（案件cd・作業cdで対応付け）の割当をコピー"""
+    get_project_or_404(project_id)
+    if body.source_project_id is not None:
+        if body.source_issue_id is not None or body.target_issue_id is not None:
+            raise HTTPException(status_code=400, detail="コピー元は案件かプロジェクトのどちらかを指定してください")
+        return _run(TaskAssigneeService.copy_from_project, body.source_project_id, project_id, body.replace)
+    if body.source_issue_id is None or body.target_issue_id is None:
+        raise HTTPException(status_code=400, detail="コピー元・コピー先の案件を指定してください")
+    get_issue_or_404(project_id, body.target_issue_id)
+    return _run(TaskAssigneeService.copy_from_issue, body.source_issue_id, body.target_issue_id, body.replace)
@@ -1,28 +1,56 @@
 """作業 JSON API"""
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
 
 from services import TaskService, IssueService
-from schemas import TaskCreate, TaskUpdate, TaskOut, TaskProgressUpdate
+from services.pagination import next_cursor
+from services.batch import BATCH_MAX_ITEMS
+from services.fulltext import resolve_sort
+from schemas import TaskCreate, TaskUpdate, TaskBatchUpdate, BatchResult, TaskOut, TaskProgressUpdate
+from routers.common import validate_sort_params, set_next_link, API_DEFAULT_LIMIT, API_MAX_LIMIT
 
 router = APIRouter(prefix="/tasks", tags=["api-tasks"])
 
 
 @router.get("", response_model=list[TaskOut])
 def list_tasks(
+    request: Request,
+    response: Response,
     issue_id: int = Query(default=None, description="案件ID"),
     project_id: int = Query(default=None, description="プロジェクトID"),
-    sort: str = Query(default="cd", description="ソート列"),
+    sort: str = Query(default="", description="ソート列（未指定時は検索語3文字以上で関連度順rank、それ以外はcd）"),
     order: str = Query(default="asc", description="昇順/降順"),
-    q: str = Query(default="", description="検索キーワード")
+    q: str = Query(default="", description="検索キーワード"),
+    limit: int = Query(default=API_DEFAULT_LIMIT, ge=1, le=API_MAX_LIMIT, description="取得件数"),
+    cursor: str = Query(default=None, description="次ページカーソル（Linkヘッダーのnext）")
 ):
-    """作業一覧"""
-    return TaskService.get_all(
-        issue_id=issue_id,
-        project_id=project_id,
-        sort=sort,
-        order=order,
-        q=q
-    )
+    """作業一覧（続きはLinkヘッダーのrel="next"）"""
+    sort, _ = validate_sort_params(resolve_sort(sort, q), order, {"cd", "name", "description", "rank"})
+    try:
+        rows = TaskService.get_all(
+            issue_id=issue_id,
+            project_id=project_id,
+            sort=sort,
+            order=order,
+            q=q,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_link(request, response, next_cursor(rows, sort, limit))
+    return rows
+
+
+@router.post("/batch", response_model=BatchResult)
+def create_tasks_batch(body: list[TaskCreate] = Body(max_length=BATCH_MAX_ITEMS)):
+    """作業一括作成（検証に失敗した項目はresultsのerrorで返し、残りを作成）"""
+    return TaskService.create_many([item.model_dump() for item in body])
+
+
+@router.put("/batch", response_model=BatchResult)
+def update_tasks_batch(body: list[TaskBatchUpdate] = Body(max_length=BATCH_MAX_ITEMS)):
+    """作業一括更新（検証に失敗した項目はresultsのerrorで返し、残りを更新）"""
+    return TaskService.update_many([item.model_dump() for item in body])
 
 
 @router.get("/{task_id}", response_model=TaskOut)
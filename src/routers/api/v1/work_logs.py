@@ -1,31 +1,44 @@
 """実績 JSON API"""
 from datetime import date
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 
 from services import WorkLogService
+from services.pagination import next_cursor
 from schemas import WorkLogCreate, WorkLogOut
+from routers.common import set_next_link, API_DEFAULT_LIMIT, API_MAX_LIMIT
 
 router = APIRouter(prefix="/work-logs", tags=["api-work-logs"])
 
 
 @router.get("", response_model=list[WorkLogOut])
 def list_work_logs(
+    request: Request,
+    response: Response,
     user_id: int = Query(default=None, description="ユーザーID"),
     task_id: int = Query(default=None, description="作業ID"),
     project_id: int = Query(default=None, description="プロジェクトID"),
     issue_id: int = Query(default=None, description="案件ID"),
     start_date: date = Query(default=None, description="開始日"),
-    end_date: date = Query(default=None, description="終了日")
+    end_date: date = Query(default=None, description="終了日"),
+    limit: int = Query(default=API_DEFAULT_LIMIT, ge=1, le=API_MAX_LIMIT, description="取得件数"),
+    cursor: str = Query(default=None, description="次ページカーソル（Linkヘッダーのnext）")
 ):
-    """実績一覧"""
-    return WorkLogService.get_all(
-        user_id=user_id,
-        task_id=task_id,
-        project_id=project_id,
-        issue_id=issue_id,
-        start_date=start_date,
-        end_date=end_date
-    )
+    """実績一覧（作業日の新しい順、続きはLinkヘッダーのrel="next"）"""
+    try:
+        rows = WorkLogService.get_all(
+            user_id=user_id,
+            task_id=task_id,
+            project_id=project_id,
+            issue_id=issue_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_link(request, response, next_cursor(rows, "work_date", limit))
+    return rows
 
 
 @router.get("/{work_log_id}", response_model=WorkLogOut)
@@ -15,6 +15,10 @@ from .core import (
     validate_sort_params,
     get_rate_class,
     build_like_params,
+    LIST_PAGE_SIZE,
+    API_DEFAULT_LIMIT,
+    API_MAX_LIMIT,
+    set_next_link,
 )
 
 # dates.py - 日付関連
@@ -22,6 +26,9 @@ from .dates import (
     get_current_month,
     parse_month,
     get_prev_next_month,
+    shift_month,
+    get_month_range,
+    resolve_month_range,
     WEEKDAY_NAMES,
     get_week_dates,
     get_prev_next_week,
@@ -45,6 +52,7 @@ from .renders import (
     render_row_label,
     render_edit_actions,
     render_sortable_th,
+    render_load_more_row,
 )
 
 __all__ = [
@@ -58,10 +66,17 @@ __all__ = [
     "validate_sort_params",
     "get_rate_class",
     "build_like_params",
+    "LIST_PAGE_SIZE",
+    "API_DEFAULT_LIMIT",
+    "API_MAX_LIMIT",
+    "set_next_link",
     # dates
     "get_current_month",
     "parse_month",
     "get_prev_next_month",
+    "shift_month",
+    "get_month_range",
+    "resolve_month_range",
     "WEEKDAY_NAMES",
     "get_week_dates",
     "get_prev_next_week",
@@ -79,4 +94,5 @@ __all__ = [
     "render_row_label",
     "render_edit_actions",
     "render_sortable_th",
+    "render_load_more_row",
 ]
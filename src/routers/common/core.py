@@ -4,9 +4,10 @@
 """
 from pathlib import Path
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
 from fastapi.templating import Jinja2Templates
 from services import ProjectService, IssueService, UserService, UserAttributeTypeService
+from static_assets import static_url
 
 templates = Jinja2Templates(directory=Path(__file__).parent.parent.parent / "templates")
 
@@ -34,6 +35,7 @@ def build_filter_query(filter_params: dict) -> str:
 
 # Jinja2グローバル関数として登録
 templates.env.globals['filter_qs'] = build_filter_query
+templates.env.globals['static_url'] = static_url
 
 
 # === 404ヘルパー ===
@@ -86,6 +88,25 @@ def validate_sort_params(
     return sort, order_dir
 
 
+# === ページングユーティリティ ===
+
+# HTML一覧の1回あたりの取得件数（続きはスクロールで追加読み込み）
+LIST_PAGE_SIZE = 100
+
+# JSON APIの既定/最大取得件数
+API_DEFAULT_LIMIT = 100
+API_MAX_LIMIT = 1000
+
+
+def set_next_link(request: Request, response: Response, cursor: str | None):
+    """次ページのLink/X-Next-Cursorヘッダーを設定（最終ページなら何もしない）"""
+    if not cursor:
+        return
+    next_url = request.url.include_query_params(cursor=cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+    response.headers["X-Next-Cursor"] = cursor
+
+
 # === 消化率ユーティリティ ===
 
 def get_rate_class(rate: float) -> str:
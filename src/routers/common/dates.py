@@ -43,6 +43,41 @@ def get_prev_next_month(year_month: str) -> tuple[str, str]:
     return prev_month, next_month
 
 
+def shift_month(year_month: str, months: int) -> str:
+    """年月をmonthsか月ずらす（負数で過去）"""
+    dt = datetime.strptime(year_month, "%Y-%m")
+    index = dt.year * 12 + dt.month - 1 + months
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def get_month_range(start_month: str, end_month: str) -> list[str]:
+    """開始月から終了月まで（両端含む）の年月リスト"""
+    months = []
+    current = start_month
+    while current <= end_month:
+        months.append(current)
+        current = shift_month(current, 1)
+    return months
+
+
+# 期間指定で扱える最大月数
+MAX_MONTH_RANGE = 120
+
+
+def resolve_month_range(start: str | None, end: str | None, default_months: int = 12) -> tuple[str, str]:
+    """期間を検証して (開始月, 終了月) を返す
+
+    未指定時は終了月=今月、開始月=終了月のdefault_months-1か月前。
+    """
+    end_month = parse_month(end) if end else get_current_month()
+    start_month = parse_month(start) if start else shift_month(end_month, -(default_months - 1))
+    if start_month > end_month:
+        raise HTTPException(status_code=400, detail="Start month must not be after end month")
+    if len(get_month_range(start_month, end_month)) > MAX_MONTH_RANGE:
+        raise HTTPException(status_code=400, detail=f"Range must be at most {MAX_MONTH_RANGE} months")
+    return start_month, end_month
+
+
 # === 週関連ユーティリティ ===
 
 WEEKDAY_NAMES = ["月", "火", "水", "木", "金", "土", "日"]
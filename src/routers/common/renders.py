@@ -88,3 +88,15 @@ def render_sortable_th(name: str, label: str, sort: str, order: str,
     active = "active" if sort == name else ""
     classes = f"{css_class} sortable" if css_class else "sortable"
     return f'<th class="{classes}" hx-get="{list_endpoint}?sort={name}&order={next_order}" hx-target="#{target_id}" hx-swap="innerHTML" hx-include="[name=\'q\']">{label}<span class="sort-icon {active}">{icon}</span></th>'
+
+
+# === 追加読み込み部品 ===
+
+def render_load_more_row(url: str, colspan: int) -> str:
+    """スクロールで次ページを読み込む番兵行を生成
+
+    表示領域に入ると url を取得し、この行を次ページの行（+次の番兵行）で置き換える。
+    """
+    return f'''<tr class="load-more-row" hx-get="{escape(url)}" hx-trigger="revealed" hx-target="this" hx-swap="outerHTML">
+        <td colspan="{colspan}" class="loading"><span class="loading-spinner"></span> 読み込み中...</td>
+    </tr>'''
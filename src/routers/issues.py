@@ -4,11 +4,17 @@
 データ操作はIssueServiceに委譲
 """
 from html import escape
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from services import IssueService
-from .common import templates, get_project_or_404, get_rate_class, render_edit_actions, render_sortable_th
+from services.pagination import next_cursor
+from services.fulltext import resolve_sort
+from .common import (
+    templates, get_project_or_404, get_rate_class, render_edit_actions, render_sortable_th,
+    render_load_more_row, validate_sort_params, LIST_PAGE_SIZE
+)
 
 router = APIRouter(prefix="/projects/{project_id}/issues", tags=["issues"])
 
@@ -142,13 +148,28 @@ def page(
 
 
 @router.get("/list", response_class=HTMLResponse)
-def list_all(project_id: int, sort: str = "cd", order: str = "asc", q: str = ""):
-    """案件一覧取得（検索・ソート対応）"""
+def list_all(project_id: int, sort: str = "", order: str = "asc", q: str = "", cursor: str = None):
+    """案件一覧取得（検索・ソート対応、スクロールで追加読み込み）
+
+    cursor指定時は続きの行のみ返す（番兵行を置き換える）
+    """
     get_project_or_404(project_id)
+    sort, _ = validate_sort_params(resolve_sort(sort, q), order, {"cd", "name", "description", "status", "rank"})
     # 1クエリで案件+見積合計+実績合計を取得
-    rows = IssueService.get_all_with_totals(project_id=project_id, sort=sort, order=order, q=q)
+    try:
+        rows = IssueService.get_all_with_totals(
+            project_id=project_id, sort=sort, order=order, q=q, limit=LIST_PAGE_SIZE, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     status_labels = IssueService.get_status_labels(project_id)
     tbody = "".join(render_row(r, project_id, status_labels, r['estimate_total'], r['actual_total']) for r in rows)
+    nc = next_cursor(rows, sort, LIST_PAGE_SIZE)
+    if nc:
+        query = urlencode({"sort": sort, "order": order, "q": q, "cursor": nc})
+        tbody += render_load_more_row(f"/projects/{project_id}/issues/list?{query}", 9)
+    if cursor:
+        return HTMLResponse(tbody)
     thead = render_thead(sort, order, project_id)
     return HTMLResponse(f"<thead>{thead}</thead><tbody>{tbody}</tbody>")
 
@@ -0,0 +1,19 @@
+"""メトリクス
+
+責務: Prometheus形式のメトリクス出力のみ（集計は metrics に委譲）
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheusのテキスト形式
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """全ワーカー合算のメトリクス"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -8,6 +8,7 @@ from html import escape
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
+from instrumentation import timed
 from services import MonthlyAssignmentService, UserService, ProjectService
 from .common import (
     templates, get_current_month, parse_month, get_prev_next_month,
@@ -137,6 +138,7 @@ def _render_total_row(projects, project_totals: dict, grand_totals: dict, mode:
     </tr>'''
 
 
+@timed("render")
 def render_grid(year_month: str, users, projects, assignments, actuals=None, mode: str = "simple"):
     """グリッドHTML生成"""
     if not users:
@@ -4,11 +4,17 @@
 データ操作はProjectServiceに委譲
 """
 from html import escape
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from services import ProjectService
-from .common import templates, render_edit_actions, render_sortable_th, get_project_or_404
+from services.pagination import next_cursor
+from services.fulltext import resolve_sort
+from .common import (
+    templates, render_edit_actions, render_sortable_th, render_load_more_row,
+    get_project_or_404, validate_sort_params, LIST_PAGE_SIZE
+)
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -66,10 +72,23 @@ def page(
 
 
 @router.get("/list", response_class=HTMLResponse)
-def list_all(sort: str = "cd", order: str = "asc", q: str = ""):
-    """プロジェクト一覧取得（検索・ソート対応）"""
-    rows = ProjectService.get_all(sort=sort, order=order, q=q)
+def list_all(sort: str = "", order: str = "asc", q: str = "", cursor: str = None):
+    """プロジェクト一覧取得（検索・ソート対応、スクロールで追加読み込み）
+
+    cursor指定時は続きの行のみ返す（番兵行を置き換える）
+    """
+    sort, _ = validate_sort_params(resolve_sort(sort, q), order, {"cd", "name", "description", "rank"})
+    try:
+        rows = ProjectService.get_all(sort=sort, order=order, q=q, limit=LIST_PAGE_SIZE, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     tbody = "".join(render_row(r) for r in rows)
+    nc = next_cursor(rows, sort, LIST_PAGE_SIZE)
+    if nc:
+        query = urlencode({"sort": sort, "order": order, "q": q, "cursor": nc})
+        tbody += render_load_more_row(f"/projects/list?{query}", 4)
+    if cursor:
+        return HTMLResponse(tbody)
     thead = render_thead(sort, order)
     return HTMLResponse(f"<thead>{thead}</thead><tbody>{tbody}</tbody>")
 
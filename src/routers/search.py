@@ -1,31 +1,24 @@
 """オートコンプリート検索API
 
 責務: エンティティ検索のHTMLフラグメント返却のみ
+検索はプロセス内のオートコンプリート索引に委譲
 """
 from fastapi import APIRouter, Query
 from fastapi.responses import HTMLResponse
 from markupsafe import escape
 
-from services import UserService, ProjectService, IssueService
+from services.autocomplete import user_index, project_index, issue_index
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+# 候補の最大表示件数
+SEARCH_LIMIT = 10
+
 
 @router.get("/users", response_class=HTMLResponse)
 def search_users(q: str = "", exclude: list[int] = Query(default=[])):
     """ユーザー検索（オートコンプリート用）"""
-    users = UserService.get_active_list()
-
-    results = []
-    q_lower = q.lower()
-    for u in users:
-        if u['id'] in exclude:
-            continue
-        if q and q_lower not in u['cd'].lower() and q_lower not in u['name'].lower():
-            continue
-        results.append(u)
-        if len(results) >= 10:
-            break
+    results = user_index.search(q, exclude, SEARCH_LIMIT)
 
     if not results:
         return HTMLResponse('<div class="autocomplete-empty">該当なし</div>')
@@ -41,18 +34,7 @@ def search_users(q: str = "", exclude: list[int] = Query(default=[])):
 @router.get("/projects", response_class=HTMLResponse)
 def search_projects(q: str = "", exclude: list[int] = Query(default=[])):
     """プロジェクト検索（オートコンプリート用）"""
-    projects = ProjectService.get_list()
-
-    results = []
-    q_lower = q.lower()
-    for p in projects:
-        if p['id'] in exclude:
-            continue
-        if q and q_lower not in p['cd'].lower() and q_lower not in p['name'].lower():
-            continue
-        results.append(p)
-        if len(results) >= 10:
-            break
+    results = project_index.search(q, exclude, SEARCH_LIMIT)
 
     if not results:
         return HTMLResponse('<div class="autocomplete-empty">該当なし</div>')
@@ -68,18 +50,7 @@ def search_projects(q: str = "", exclude: list[int] = Query(default=[])):
 @router.get("/issues", response_class=HTMLResponse)
 def search_issues(q: str = "", exclude: list[int] = Query(default=[])):
     """案件検索（オートコンプリート用）"""
-    issues = IssueService.get_list()
-
-    results = []
-    q_lower = q.lower()
-    for i in issues:
-        if i['id'] in exclude:
-            continue
-        if q and q_lower not in i['cd'].lower() and q_lower not in i['name'].lower() and q_lower not in i['project_cd'].lower():
-            continue
-        results.append(i)
-        if len(results) >= 10:
-            break
+    results = issue_index.search(q, exclude, SEARCH_LIMIT)
 
     if not results:
         return HTMLResponse('<div class="autocomplete-empty">該当なし</div>')
@@ -3,16 +3,23 @@
 責務: HTML生成 + HTTPルーティングのみ
 データ操作はTaskAssigneeServiceに委譲
 """
+import json
 from html import escape
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
-from services import TaskAssigneeService, UserService
-from .common import templates, get_project_or_404
+from instrumentation import timed
+from services import TaskAssigneeService, UserService, IssueService, ProjectService
+from .common import templates, get_project_or_404, get_issue_or_404
 
 router = APIRouter(prefix="/projects/{project_id}/assignees", tags=["task_assignees"])
 
+# 表示モード（未指定時はセル数がしきい値を超えるとコンパクト表示）
+MATRIX_VIEWS = {"", "full", "compact"}
+COMPACT_CELL_THRESHOLD = 5000
 
+
+@timed("render")
 def render_matrix(project_id: int, users, tasks, assignments):
     """マトリクスHTML生成"""
     if not users:
@@ -22,7 +29,11 @@ def render_matrix(project_id: int, users, tasks, assignments):
 
     # ヘッダー行
     header_cells = "".join(
-        f'<th class="user-header">{escape(u["cd"])}</th>' for u in users
+        f'''<th class="user-header">{escape(u["cd"])}<div class="bulk-actions">
+            {_bulk_button(project_id, "assign", "+", f"{u['cd']} を全作業に割当", user_id=u["id"])}
+            {_bulk_button(project_id, "unassign", "−", f"{u['cd']} の割当をすべて解除", user_id=u["id"])}
+        </div></th>'''
+        for u in users
     )
     header = f'<tr><th class="task-header">案件 / 作業</th>{header_cells}</tr>'
 
@@ -30,6 +41,7 @@ def render_matrix(project_id: int, users, tasks, assignments):
     rows = []
     current_issue_id = None
     issue_user_counts = {}  # 案件ごとのユーザー別担当数
+    issue_task_count = 0
 
     for task in tasks:
         # 新しい案件の開始
@@ -37,23 +49,25 @@ def render_matrix(project_id: int, users, tasks, assignments):
             # 前の案件の集約行を出力
             if current_issue_id is not None:
                 rows.append(_render_issue_row(
-                    current_issue_id, current_issue_cd, current_issue_name,
-                    users, issue_user_counts
+                    project_id, current_issue_id, current_issue_cd, current_issue_name,
+                    users, issue_user_counts, issue_task_count
                 ))
             # 新しい案件の初期化
             current_issue_id = task['issue_id']
             current_issue_cd = task['issue_cd']
             current_issue_name = task['issue_name']
             issue_user_counts = {u['id']: 0 for u in users}
+            issue_task_count = 0
 
         # 作業行
+        issue_task_count += 1
         rows.append(_render_task_row(project_id, task, users, assignments, issue_user_counts))
 
     # 最後の案件の集約行
     if current_issue_id is not None:
         rows.append(_render_issue_row(
-            current_issue_id, current_issue_cd, current_issue_name,
-            users, issue_user_counts
+            project_id, current_issue_id, current_issue_cd, current_issue_name,
+            users, issue_user_counts, issue_task_count
         ))
 
     # 案件行を適切な位置に挿入（作業行の前に）
@@ -63,13 +77,41 @@ def render_matrix(project_id: int, users, tasks, assignments):
     return f'<table class="matrix-table"><thead>{header}</thead><tbody>{tbody}</tbody></table>'
 
 
-def _render_issue_row(issue_id, issue_cd, issue_name, users, user_counts):
+@timed("render")
+def render_compact_matrix(project_id: int, users, issues):
+    """コンパクト表示のマトリクスHTML生成
+
+    ユーザー列と案件ごとの作業数・担当数（担当のあるユーザーのみ）だけを埋め込む。
+    セルは /static/assignee_matrix.js が見えている列だけ描画し、
+    案件の作業と割当は表示範囲に入った時点で /api/v1 から読み込む。
+    """
+    if not users:
+        return '<p class="empty-message">有効なユーザーがいません</p>'
+    if not issues:
+        return '<p class="empty-message">作業がありません。先に案件と作業を登録してください。</p>'
+
+    users_json = json.dumps([{"id": u["id"], "cd": u["cd"]} for u in users], ensure_ascii=False)
+    sections = "".join(
+        f'''<tbody class="issue-section" data-issue-id="{i["id"]}" data-task-count="{i["task_count"]}"
+            data-counts="{escape(json.dumps(i["user_counts"]))}">
+            <tr class="issue-row"><td class="issue-name">{escape(i["cd"])} {escape(i["name"])}</td></tr>
+        </tbody>'''
+        for i in issues
+    )
+    return f'''<div class="compact-matrix" data-project-id="{project_id}" data-users="{escape(users_json)}">
+        <table class="matrix-table compact">
+            <thead><tr><th class="task-header">案件 / 作業</th></tr></thead>
+            {sections}
+        </table>
+    </div>'''
+
+
+def _render_issue_row(project_id, issue_id, issue_cd, issue_name, users, user_counts, task_count):
     """案件集約行を生成"""
-    cells = []
-    for u in users:
-        count = user_counts.get(u['id'], 0)
-        display = f"({count})" if count > 0 else "-"
-        cells.append(f'<td class="issue-cell">{display}</td>')
+    cells = [
+        _render_issue_cell(project_id, issue_id, u['id'], user_counts.get(u['id'], 0), task_count)
+        for u in users
+    ]
 
     return {
         'type': 'issue',
@@ -89,24 +131,60 @@ def _render_task_row(project_id, task, users, assignments, issue_user_counts):
         if is_assigned:
             issue_user_counts[u['id']] = issue_user_counts.get(u['id'], 0) + 1
 
-        cell_class = "assigned" if is_assigned else ""
-        symbol = "●" if is_assigned else ""
-        cells.append(f'''<td class="task-cell {cell_class}"
-            hx-post="/projects/{project_id}/assignees/toggle"
-            hx-vals='{{"task_id": {task["id"]}, "user_id": {u["id"]}}}'
-            hx-target="#matrix-container"
-            hx-swap="innerHTML">{symbol}</td>''')
+        cells.append(_render_task_cell(project_id, task['id'], u['id'], is_assigned))
 
     return {
         'type': 'task',
         'issue_id': task['issue_id'],
         'html': f'''<tr class="task-row">
-            <td class="task-name">├─ {escape(task["cd"])} {escape(task["name"])}</td>
+            <td class="task-name">├─ {escape(task["cd"])} {escape(task["name"])}<span class="bulk-actions">
+                {_bulk_button(project_id, "assign", "+", "全ユーザーを割当", task_id=task["id"])}
+                {_bulk_button(project_id, "unassign", "−", "割当をすべて解除", task_id=task["id"])}
+            </span></td>
             {"".join(cells)}
         </tr>'''
     }
 
 
+def _render_task_cell(project_id, task_id, user_id, is_assigned):
+    """作業×ユーザーのセルを生成（クリックでこのセルだけを差し替える）"""
+    cell_class = "assigned" if is_assigned else ""
+    symbol = "●" if is_assigned else ""
+    return f'''<td id="assign-{task_id}-{user_id}" class="task-cell {cell_class}"
+            hx-post="/projects/{project_id}/assignees/toggle"
+            hx-vals='{{"task_id": {task_id}, "user_id": {user_id}}}'
+            hx-target="this"
+            hx-swap="outerHTML">{symbol}</td>'''
+
+
+def _render_issue_cell(project_id, issue_id, user_id, count, task_count, oob=False):
+    """案件集約行のユーザー別担当数セルを生成（oob=Trueでout-of-band差し替え用）
+
+    クリックで案件の全作業に割当（全作業に割当済みなら全解除）する。
+    """
+    display = f"({count})" if count > 0 else "-"
+    swap = ' hx-swap-oob="true"' if oob else ""
+    action = "unassign" if task_count and count >= task_count else "assign"
+    title = "案件の割当をすべて解除" if action == "unassign" else "案件の全作業に割当"
+    return f'''<td id="assign-issue-{issue_id}-{user_id}" class="issue-cell bulk-cell"{swap}
+            title="{title}"
+            hx-post="/projects/{project_id}/assignees/bulk"
+            hx-vals='{{"action": "{action}", "issue_id": {issue_id}, "user_id": {user_id}}}'
+            hx-target="#matrix-container"
+            hx-swap="innerHTML">{display}</td>'''
+
+
+def _bulk_button(project_id, action, label, title, **scope):
+    """一括割当/解除ボタンを生成（scope: user_id / task_id）"""
+    vals = ", ".join(f'"{k}": {v}' for k, v in {"action": f'"{action}"', **scope}.items())
+    return f'''<button type="button" class="bulk-btn" title="{escape(title)}"
+                hx-post="/projects/{project_id}/assignees/bulk"
+                hx-vals='{{{vals}}}'
+                hx-confirm="{escape(title)}しますか？"
+                hx-target="#matrix-container"
+                hx-swap="innerHTML">{label}</button>'''
+
+
 def _sort_rows_with_issue_headers(rows):
     """行を案件ヘッダー→作業の順にソート"""
     # issue_id でグループ化
@@ -138,62 +216,147 @@ def _sort_rows_with_issue_headers(rows):
 def page(
     request: Request,
     project_id: int,
+    view: str = Query(default=""),
     user: list[int] = Query(default=[]),
     project: list[int] = Query(default=[]),
     issue: list[int] = Query(default=[])
 ):
     proj = get_project_or_404(project_id)
     filter_params = {"user": user, "project": project, "issue": issue}
+    projects = ProjectService.get_list()
+    # コピー元案件は選んだプロジェクトの分だけ読み込む（初期表示はこのプロジェクトの案件）
+    target_issues = IssueService.get_all(project_id=project_id)
     return templates.TemplateResponse(request, "task_assignees.html", {
         "active": "projects",
         "project": proj,
         "filter_params": filter_params,
+        "view": view if view in MATRIX_VIEWS else "",
+        "projects": projects,
+        "target_issues": target_issues,
+        "source_issue_options": render_issue_options(target_issues),
+        "source_projects": [p for p in projects if p['id'] != project_id],
     })
 
 
-@router.get("/matrix", response_class=HTMLResponse)
-def get_matrix(project_id: int):
-    """マトリクス取得"""
+def render_issue_options(issues) -> str:
+    """コピー元案件の選択肢HTML"""
+    if not issues:
+        return '<option value="" disabled selected>案件がありません</option>'
+    return "".join(
+        f'<option value="{i["id"]}">{escape(i["cd"])} {escape(i["name"])}</option>' for i in issues
+    )
+
+
+@router.get("/source-issues", response_class=HTMLResponse)
+def source_issue_options(project_id: int, source_project_id: int = Query(...)):
+    """コピー元プロジェクトの案件の選択肢（プロジェクト選択時に読み込む）"""
     get_project_or_404(project_id)
+    get_project_or_404(source_project_id)
+    return HTMLResponse(render_issue_options(IssueService.get_all(project_id=source_project_id)))
+
+
+def _matrix_response(project_id: int, view: str = "") -> HTMLResponse:
+    """マトリクス全体を再取得して返す（viewはMATRIX_VIEWSのいずれか）"""
     users = UserService.get_active_list()
-    tasks = TaskAssigneeService.get_project_tasks_with_issues(project_id)
+    tasks = None if view == "compact" else TaskAssigneeService.get_project_tasks_with_issues(project_id)
+    if tasks is None or (view == "" and len(tasks) * len(users) > COMPACT_CELL_THRESHOLD):
+        issues = TaskAssigneeService.get_issue_summaries(project_id)
+        return HTMLResponse(render_compact_matrix(project_id, users, issues))
     assignments = TaskAssigneeService.get_all_assignments(project_id)
     return HTMLResponse(render_matrix(project_id, users, tasks, assignments))
 
 
-@router.post("/toggle", response_class=HTMLResponse)
-def toggle_assignment(project_id: int, task_id: int = Form(...), user_id: int = Form(...)):
-    """担当割当のトグル"""
+@router.get("/matrix", response_class=HTMLResponse)
+def get_matrix(project_id: int, view: str = Query(default="")):
+    """マトリクス取得（view: full=全セル / compact=コンパクト / 未指定=セル数で自動）"""
     get_project_or_404(project_id)
+    if view not in MATRIX_VIEWS:
+        raise HTTPException(status_code=400, detail="Invalid view")
+    return _matrix_response(project_id, view)
 
-    # 作業の存在確認とプロジェクト所属確認
-    task = TaskAssigneeService.get_task_in_project(task_id, project_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
 
-    # ユーザーの存在確認と有効確認
-    user = TaskAssigneeService.get_user_with_status(user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # 既存の割当を確認
-    existing = TaskAssigneeService.get_assignment(task_id, user_id)
+@router.post("/toggle", response_class=HTMLResponse)
+def toggle_assignment(project_id: int, task_id: int = Form(...), user_id: int = Form(...)):
+    """担当割当のトグル
 
-    if existing:
-        # 割当解除
-        TaskAssigneeService.delete(existing['id'])
-    else:
-        # 新規割当（無効ユーザーはブロック）
-        if user['is_active'] == 0:
-            raise HTTPException(status_code=400, detail="無効なユーザーには割当できません")
-        TaskAssigneeService.create(task_id, user_id)
+    トグルしたセルと、同じユーザー列の案件集約セル（hx-swap-oob）だけを返す。
+    集約行は担当数が変わるのがこのユーザーのセルのみなので、行ではなくセル単位で差し替える。
+    """
+    get_project_or_404(project_id)
+    try:
+        result = TaskAssigneeService.toggle(task_id, user_id, project_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return HTMLResponse(
+        _render_task_cell(project_id, task_id, user_id, result['assigned'])
+        + _render_issue_cell(
+            project_id, result['issue_id'], user_id,
+            result['issue_count'], result['issue_task_count'], oob=True
+        )
+    )
 
-    # マトリクス再取得
-    users = UserService.get_active_list()
-    tasks = TaskAssigneeService.get_project_tasks_with_issues(project_id)
-    assignments = TaskAssigneeService.get_all_assignments(project_id)
 
-    return HTMLResponse(render_matrix(project_id, users, tasks, assignments))
+@router.post("/bulk", response_class=HTMLResponse)
+def bulk_assignment(
+    project_id: int,
+    action: str = Form(...),
+    user_id: int = Form(None),
+    issue_id: int = Form(None),
+    task_id: int = Form(None),
+    view: str = Form("")
+):
+    """一括割当/解除（行: task_id、列: user_id、案件: issue_id + user_id）"""
+    get_project_or_404(project_id)
+    if action not in ("assign", "unassign"):
+        raise HTTPException(status_code=400, detail="Invalid action")
+    bulk = TaskAssigneeService.bulk_assign if action == "assign" else TaskAssigneeService.bulk_unassign
+    try:
+        bulk(project_id, user_id=user_id, issue_id=issue_id, task_id=task_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _matrix_response(project_id, view if view in MATRIX_VIEWS else "")
+
+
+@router.post("/copy-issue", response_class=HTMLResponse)
+def copy_from_issue(
+    project_id: int,
+    source_issue_id: int = Form(...),
+    target_issue_id: int = Form(...),
+    replace: bool = Form(False),
+    view: str = Form("")
+):
+    """他の案件の割当をコピー（作業cdで対応付け）"""
+    get_issue_or_404(project_id, target_issue_id)
+    try:
+        TaskAssigneeService.copy_from_issue(source_issue_id, target_issue_id, replace)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _matrix_response(project_id, view if view in MATRIX_VIEWS else "")
+
+
+@router.post("/copy-project", response_class=HTMLResponse)
+def copy_from_project(
+    project_id: int,
+    source_project_id: int = Form(...),
+    replace: bool = Form(False),
+    view: str = Form("")
+):
+    """他のプロジェクトの割当をコピー（案件cd・作業cdで対応付け）"""
+    get_project_or_404(project_id)
+    try:
+        TaskAssigneeService.copy_from_project(source_project_id, project_id, replace)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _matrix_response(project_id, view if view in MATRIX_VIEWS else "")
 
 
 @router.post("", response_class=HTMLResponse)
@@ -4,11 +4,17 @@
 データ操作はTaskServiceに委譲
 """
 from html import escape
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from services import TaskService
-from .common import templates, get_project_or_404, get_issue_or_404, render_edit_actions, render_sortable_th
+from services.pagination import next_cursor
+from services.fulltext import resolve_sort
+from .common import (
+    templates, get_project_or_404, get_issue_or_404, render_edit_actions, render_sortable_th,
+    render_load_more_row, validate_sort_params, LIST_PAGE_SIZE
+)
 
 router = APIRouter(prefix="/projects/{project_id}/issues/{issue_id}/tasks", tags=["tasks"])
 
@@ -75,11 +81,26 @@ def page(
 
 
 @router.get("/list", response_class=HTMLResponse)
-def list_all(project_id: int, issue_id: int, sort: str = "cd", order: str = "asc", q: str = ""):
-    """作業一覧取得（検索・ソート対応）"""
+def list_all(project_id: int, issue_id: int, sort: str = "", order: str = "asc", q: str = "", cursor: str = None):
+    """作業一覧取得（検索・ソート対応、スクロールで追加読み込み）
+
+    cursor指定時は続きの行のみ返す（番兵行を置き換える）
+    """
     get_issue_or_404(project_id, issue_id)
-    rows = TaskService.get_all(issue_id=issue_id, sort=sort, order=order, q=q)
+    sort, _ = validate_sort_params(resolve_sort(sort, q), order, {"cd", "name", "description", "rank"})
+    try:
+        rows = TaskService.get_all(
+            issue_id=issue_id, sort=sort, order=order, q=q, limit=LIST_PAGE_SIZE, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     tbody = "".join(render_row(r, project_id, issue_id) for r in rows)
+    nc = next_cursor(rows, sort, LIST_PAGE_SIZE)
+    if nc:
+        query = urlencode({"sort": sort, "order": order, "q": q, "cursor": nc})
+        tbody += render_load_more_row(f"/projects/{project_id}/issues/{issue_id}/tasks/list?{query}", 4)
+    if cursor:
+        return HTMLResponse(tbody)
     thead = render_thead(sort, order, project_id, issue_id)
     return HTMLResponse(f"<thead>{thead}</thead><tbody>{tbody}</tbody>")
 
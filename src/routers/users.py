@@ -4,11 +4,17 @@
 データ操作はUserServiceに委譲
 """
 from html import escape
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
-from services import UserService
-from .common import templates, render_edit_actions, render_sortable_th, get_user_or_404
+from services import UserService, UserAttributeLoader
+from services.pagination import next_cursor
+from services.fulltext import resolve_sort
+from .common import (
+    templates, render_edit_actions, render_sortable_th, render_load_more_row,
+    get_user_or_404, validate_sort_params, LIST_PAGE_SIZE
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -96,15 +102,32 @@ def page(
 
 
 @router.get("/list", response_class=HTMLResponse)
-def list_all(sort: str = "cd", order: str = "asc", q: str = ""):
-    """ユーザー一覧取得（検索・ソート対応）"""
-    attr_types = UserService.get_attribute_types()
-    rows = UserService.get_all(sort=sort, order=order, q=q)
+def list_all(sort: str = "", order: str = "asc", q: str = "", cursor: str = None):
+    """ユーザー一覧取得（検索・ソート対応、スクロールで追加読み込み）
+
+    cursor指定時は続きの行のみ返す（番兵行を置き換える）
+    """
+    sort, _ = validate_sort_params(resolve_sort(sort, q), order, {"cd", "name", "email", "rank"})
+    try:
+        rows = UserService.get_all(sort=sort, order=order, q=q, limit=LIST_PAGE_SIZE, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 属性タイプ・属性値は一覧分をまとめて読み込み、行描画ではDBに触れない
+    loader = UserAttributeLoader()
+    attr_types = loader.types
+    loader.prime([r['id'] for r in rows])
 
     tbody = ""
     for r in rows:
-        user_attrs = UserService.get_attributes(r['id'])
-        tbody += render_row(r, attr_types=attr_types, user_attrs=user_attrs)
+        tbody += render_row(r, attr_types=attr_types, user_attrs=loader.attributes(r['id']))
+
+    nc = next_cursor(rows, sort, LIST_PAGE_SIZE)
+    if nc:
+        query = urlencode({"sort": sort, "order": order, "q": q, "cursor": nc})
+        tbody += render_load_more_row(f"/users/list?{query}", 4 + len(attr_types))
+    if cursor:
+        return HTMLResponse(tbody)
 
     thead = render_thead(sort, order, attr_types)
     return HTMLResponse(f"<thead>{thead}</thead><tbody>{tbody}</tbody>")
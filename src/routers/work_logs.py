@@ -9,6 +9,7 @@ from html import escape
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse
+from instrumentation import timed
 from services import WorkLogService, UserService, ProjectService, IssueService
 from .common import (
     templates, get_current_month, parse_month, get_prev_next_month,
@@ -300,6 +301,7 @@ def _render_total_row(dates: list[date], date_totals: dict, grand_total: float,
     </tr>'''
 
 
+@timed("render")
 def render_grid(dates: list[date], rows, work_logs, view: str = "week"):
     """グリッドHTML生成（週/月共通）
 
@@ -2,12 +2,21 @@
 
 責務: 日次工数実績をテンプレートで整形し報告書を生成
 """
+import hashlib
+import re
+import zipfile
 from datetime import date
+from functools import lru_cache
 from html import escape
-
-from fastapi import APIRouter, Request, Query
-from fastapi.responses import HTMLResponse
-from services import UserService, WorkLogService
+from itertools import groupby
+from operator import itemgetter
+from typing import NamedTuple
+
+from fastapi import APIRouter, Request, Query, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
+from schemas import TemplateSave
+from schemas.work_report import DEFAULT_TEMPLATE_ID, TEMPLATE_ID_PATTERN
+from services import UserService, WorkLogService, UserSettingService
 from .common import templates
 
 router = APIRouter(prefix="/work-report", tags=["work_report"])
@@ -23,6 +32,12 @@ DEFAULT_TEMPLATE = """業務終了します。
 
 WEEKDAY_NAMES = ["月", "火", "水", "木", "金", "土", "日"]
 
+# 一括出力で指定できる最大日数
+MAX_BATCH_DAYS = 31
+
+# 保存テンプレートのユーザー設定キー（"default" は従来の保存キーをそのまま使う）
+TEMPLATE_SETTING_KEY = "work_report_template"
+
 
 def parse_template(template: str) -> tuple[str, str, str, str]:
     """テンプレートをパースしてループ行を抽出
@@ -65,52 +80,128 @@ def parse_template(template: str) -> tuple[str, str, str, str]:
     return '\n'.join(base_lines), project_fmt, issue_fmt, task_fmt
 
 
-def format_line(fmt: str, log: dict, hide_zero: bool = False) -> str:
-    """1行をフォーマット
+class Field(NamedTuple):
+    """テンプレート中の変数（prefix/suffixは0%非表示時に一緒に消す装飾）"""
+    name: str
+    prefix: str = ""
+    suffix: str = ""
 
-    責務: 単一行の変数展開のみ
-    """
-    progress = log['progress_rate'] if log['progress_rate'] is not None else 0
 
-    result = fmt.replace(
-        "{project_cd}", log['project_cd'] or ""
-    ).replace(
-        "{project_name}", log['project_name'] or ""
-    ).replace(
-        "{issue_cd}", log['issue_cd'] or ""
-    ).replace(
-        "{issue_name}", log['issue_name'] or ""
-    ).replace(
-        "{task_name}", log['task_name'] or ""
-    ).replace(
-        "{hours}", f"{log['hours']:.2f}"
+class CompiledTemplate(NamedTuple):
+    """コンパイル済みテンプレート（各行は リテラル文字列 / Field のタプル）"""
+    base: tuple
+    project: tuple
+    issue: tuple
+    task: tuple
+
+
+# ループ行の変数（{progress} は0%非表示で消す装飾ごと1つの変数として扱う）
+LINE_FIELDS = ("project_cd", "project_name", "issue_cd", "issue_name", "task_name", "hours")
+# ベーステンプレートの変数（{__LOGS__} はループ行の挿入位置）
+BASE_FIELDS = ("total_hours", "__LOGS__", "date", "date_jp", "user_cd", "user_name")
+# ループ行でも展開するベースの変数
+LINE_BASE_FIELDS = tuple(f for f in BASE_FIELDS if f != "__LOGS__")
+# ベースの値がない展開（format_line / format_logs）では、ベースの変数をそのまま残す
+_UNEXPANDED_BASE = {name: f"{{{name}}}" for name in LINE_BASE_FIELDS}
+
+# {progress} と0%非表示時に一緒に消す装飾（" ({progress}%)", " {progress}%", "{progress}" など）
+_PROGRESS_PATTERN = r"(?P<p1> ?\()\{progress\}(?P<s1>%\))|(?P<p2> ?)\{progress\}(?P<s2>%)|\{progress\}"
+
+
+def _field_pattern(fields: tuple[str, ...], progress: bool) -> re.Pattern:
+    names = "|".join(re.escape(f) for f in fields)
+    pattern = rf"\{{(?P<field>{names})\}}"
+    return re.compile(f"{pattern}|{_PROGRESS_PATTERN}" if progress else pattern)
+
+
+_LINE_PATTERN = _field_pattern(LINE_FIELDS + LINE_BASE_FIELDS, progress=True)
+_BASE_PATTERN = _field_pattern(BASE_FIELDS, progress=False)
+
+
+def _compile(fmt: str, pattern: re.Pattern) -> tuple:
+    """書式文字列を リテラル / Field の並びに分解（未知の {変数} はリテラルのまま）"""
+    segments = []
+    pos = 0
+    for m in pattern.finditer(fmt):
+        if m.start() > pos:
+            segments.append(fmt[pos:m.start()])
+        if m.group("field"):
+            segments.append(Field(m.group("field")))
+        else:
+            groups = m.groupdict()
+            segments.append(Field(
+                "progress",
+                groups["p1"] or groups["p2"] or "",
+                groups["s1"] or groups["s2"] or "",
+            ))
+        pos = m.end()
+    if pos < len(fmt):
+        segments.append(fmt[pos:])
+    return tuple(segments)
+
+
+@lru_cache(maxsize=256)
+def compile_line(fmt: str) -> tuple:
+    """ループ行の書式をコンパイル（書式文字列をキーにキャッシュ）"""
+    return _compile(fmt, _LINE_PATTERN)
+
+
+@lru_cache(maxsize=128)
+def compile_template(template: str) -> CompiledTemplate:
+    """テンプレートをコンパイル（テンプレート文字列をキーにキャッシュ）
+
+    責務: パース結果を1パスで展開できるセグメント列に変換するのみ
+    """
+    base_template, project_fmt, issue_fmt, task_fmt = parse_template(template)
+    return CompiledTemplate(
+        _compile(base_template, _BASE_PATTERN),
+        compile_line(project_fmt),
+        compile_line(issue_fmt),
+        compile_line(task_fmt),
     )
 
-    # 0%非表示オプション
-    if hide_zero and progress == 0:
-        # " ({progress}%)" や " {progress}%" を除去
-        result = result.replace(" ({progress}%)", "")
-        result = result.replace("({progress}%)", "")
-        result = result.replace(" {progress}%", "")
-        result = result.replace("{progress}%", "")
-        result = result.replace("{progress}", "")
-    else:
-        result = result.replace("{progress}", str(progress))
 
-    return result
+def render_segments(segments: tuple, values: dict, hide_progress: bool = False) -> str:
+    """セグメント列を1パスで展開"""
+    parts = []
+    for seg in segments:
+        if seg.__class__ is str:
+            parts.append(seg)
+        elif seg.name == "progress" and hide_progress:
+            continue
+        else:
+            parts.append(f"{seg.prefix}{values[seg.name]}{seg.suffix}")
+    return "".join(parts)
 
 
-def format_logs(
-    logs: list[dict],
-    project_fmt: str,
-    issue_fmt: str,
-    task_fmt: str,
-    hide_zero: bool = False
-) -> str:
-    """実績データをフォーマット
+def _line_values(log: dict, base: dict = _UNEXPANDED_BASE) -> dict:
+    """ループ行の変数値（baseはループ行でも展開するベースの変数値）"""
+    progress = log['progress_rate'] if log['progress_rate'] is not None else 0
+    return {
+        **base,
+        "project_cd": log['project_cd'] or "",
+        "project_name": log['project_name'] or "",
+        "issue_cd": log['issue_cd'] or "",
+        "issue_name": log['issue_name'] or "",
+        "task_name": log['task_name'] or "",
+        "hours": f"{log['hours']:.2f}",
+        "progress": progress,
+    }
 
-    責務: ループ処理と行結合のみ
+
+def format_line(fmt: str, log: dict, hide_zero: bool = False) -> str:
+    """1行をフォーマット
+
+    責務: 単一行の変数展開のみ
     """
+    values = _line_values(log)
+    # 0%非表示オプション（" ({progress}%)" などは装飾ごと除去）
+    return render_segments(compile_line(fmt), values, hide_zero and values["progress"] == 0)
+
+
+def _render_logs(logs: list[dict], compiled: CompiledTemplate, hide_zero: bool,
+                 base: dict = _UNEXPANDED_BASE) -> str:
+    """コンパイル済みのループ行で実績を展開"""
     if not logs:
         return "(実績なし)"
 
@@ -119,24 +210,63 @@ def format_logs(
     current_issue = None
 
     for log in logs:
+        values = _line_values(log, base)
+        hide = hide_zero and values["progress"] == 0
+
         # プロジェクトが変わったら出力
-        if project_fmt and log['project_name'] != current_project:
+        if compiled.project and log['project_name'] != current_project:
             current_project = log['project_name']
             current_issue = None
-            lines.append(format_line(project_fmt, log, hide_zero))
+            lines.append(render_segments(compiled.project, values, hide))
 
         # 案件が変わったら出力
-        if issue_fmt and log['issue_cd'] != current_issue:
+        if compiled.issue and log['issue_cd'] != current_issue:
             current_issue = log['issue_cd']
-            lines.append(format_line(issue_fmt, log, hide_zero))
+            lines.append(render_segments(compiled.issue, values, hide))
 
         # 作業を出力
-        if task_fmt:
-            lines.append(format_line(task_fmt, log, hide_zero))
+        if compiled.task:
+            lines.append(render_segments(compiled.task, values, hide))
 
     return "\n".join(lines)
 
 
+def format_logs(
+    logs: list[dict],
+    project_fmt: str,
+    issue_fmt: str,
+    task_fmt: str,
+    hide_zero: bool = False
+) -> str:
+    """実績データをフォーマット
+
+    責務: ループ処理と行結合のみ
+    """
+    compiled = CompiledTemplate((), compile_line(project_fmt), compile_line(issue_fmt), compile_line(task_fmt))
+    return _render_logs(logs, compiled, hide_zero)
+
+
+def render_report(
+    compiled: CompiledTemplate,
+    total_hours: float,
+    logs: list[dict],
+    target_date: date,
+    user_cd: str = "",
+    user_name: str = "",
+    hide_zero: bool = False
+) -> str:
+    """コンパイル済みテンプレートで報告書を生成"""
+    weekday = WEEKDAY_NAMES[target_date.weekday()]
+    base = {
+        "total_hours": f"{total_hours:.1f}",
+        "date": target_date.strftime("%Y/%m/%d"),
+        "date_jp": f"{target_date.strftime('%Y/%m/%d')}({weekday})",
+        "user_cd": user_cd,
+        "user_name": user_name,
+    }
+    return render_segments(compiled.base, {**base, "__LOGS__": _render_logs(logs, compiled, hide_zero, base)})
+
+
 def generate_report(
     template: str,
     total_hours: float,
@@ -150,28 +280,42 @@ def generate_report(
 
     責務: 全体のオーケストレーションのみ
     """
-    weekday = WEEKDAY_NAMES[target_date.weekday()]
-    date_jp = f"{target_date.strftime('%Y/%m/%d')}({weekday})"
+    return render_report(
+        compile_template(template), total_hours, logs,
+        target_date, user_cd, user_name, hide_zero
+    )
 
-    # テンプレートをパース
-    base_template, project_fmt, issue_fmt, task_fmt = parse_template(template)
 
-    # ログをフォーマット
-    logs_text = format_logs(logs, project_fmt, issue_fmt, task_fmt, hide_zero)
-
-    return base_template.replace(
-        "{total_hours}", f"{total_hours:.1f}"
-    ).replace(
-        "{__LOGS__}", logs_text
-    ).replace(
-        "{date}", target_date.strftime("%Y/%m/%d")
-    ).replace(
-        "{date_jp}", date_jp
-    ).replace(
-        "{user_cd}", user_cd
-    ).replace(
-        "{user_name}", user_name
-    )
+def template_setting_key(template_id: str) -> str:
+    """保存テンプレートのユーザー設定キー"""
+    if template_id == DEFAULT_TEMPLATE_ID:
+        return TEMPLATE_SETTING_KEY
+    return f"{TEMPLATE_SETTING_KEY}:{template_id}"
+
+
+def template_hash(template: str) -> str:
+    """テンプレート本文のハッシュ（プレビュー時の照合用）"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=256)
+def _saved_template(user_id: int, template_id: str, hash_value: str) -> CompiledTemplate:
+    """保存テンプレートのコンパイル結果（(ユーザー, テンプレートID, ハッシュ) をキーにキャッシュ）
+
+    ハッシュは本文から決まるため、キャッシュ済みなら設定を読まずに再利用できる。
+
+    Raises:
+        LookupError: 未保存、または保存内容のハッシュが一致しない（例外はキャッシュされない）
+    """
+    template = UserSettingService.get(user_id, template_setting_key(template_id))
+    if template is None or template_hash(template) != hash_value:
+        raise LookupError("保存テンプレートが更新されています")
+    return compile_template(template)
+
+
+def _find_user(user_id: int) -> dict | None:
+    """有効ユーザーから1件取得（カタログキャッシュ）"""
+    return next((u for u in UserService.get_active_list() if u['id'] == user_id), None)
 
 
 @router.get("", response_class=HTMLResponse)
@@ -199,6 +343,8 @@ def page(
     selected_user_info = None
     user_cd = ""
     user_name = ""
+    template = DEFAULT_TEMPLATE
+    saved_hash = None
 
     if user:
         # 選択中ユーザーの情報取得
@@ -209,10 +355,16 @@ def page(
                 user_name = u['name']
                 break
 
+        # 保存テンプレートがあれば初期表示に使う
+        saved = UserSettingService.get(user, template_setting_key(DEFAULT_TEMPLATE_ID))
+        if saved:
+            template = saved
+            saved_hash = template_hash(saved)
+
         logs = WorkLogService.get_user_daily_logs(user, selected_date)
         total_hours = sum(log['hours'] for log in logs)
         preview = generate_report(
-            DEFAULT_TEMPLATE, total_hours, logs,
+            template, total_hours, logs,
             selected_date, user_cd, user_name
         )
 
@@ -225,6 +377,9 @@ def page(
         "selected_user_info": selected_user_info,
         "selected_date": selected_date.isoformat(),
         "default_template": DEFAULT_TEMPLATE,
+        "template": template,
+        "template_id": DEFAULT_TEMPLATE_ID,
+        "template_hash": saved_hash,
         "total_hours": total_hours,
         "preview": preview,
         "user_cd": user_cd,
@@ -238,11 +393,15 @@ def preview(
     user: int = Query(default=None),
     target_date: str = Query(default=None),
     template: str = Query(default=DEFAULT_TEMPLATE),
+    template_id: str = Query(default=None, pattern=TEMPLATE_ID_PATTERN),
+    saved_hash: str = Query(default=None, alias="template_hash"),
     hide_zero_progress: bool = Query(default=False)
 ):
     """報告書プレビューを生成（HTMX用）
 
     責務: HTMLフラグメント返却のみ
+    保存テンプレートは本文の代わりに template_id + template_hash で指定できる
+    （ハッシュが保存内容と一致しなければ409）。
     """
     if not user:
         return HTMLResponse('<p class="empty-preview">ユーザーを選択してください</p>')
@@ -253,20 +412,136 @@ def preview(
     except ValueError:
         selected_date = date.today()
 
-    users = UserService.get_active_list()
-    user_cd = ""
-    user_name = ""
-    for u in users:
-        if u['id'] == user:
-            user_cd = u['cd']
-            user_name = u['name']
-            break
+    if template_id:
+        try:
+            compiled = _saved_template(user, template_id, saved_hash or "")
+        except LookupError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    else:
+        compiled = compile_template(template)
+
+    u = _find_user(user)
+    user_cd = u['cd'] if u else ""
+    user_name = u['name'] if u else ""
 
     logs = WorkLogService.get_user_daily_logs(user, selected_date)
     total_hours = sum(log['hours'] for log in logs)
-    report = generate_report(
-        template, total_hours, logs,
+    report = render_report(
+        compiled, total_hours, logs,
         selected_date, user_cd, user_name, hide_zero_progress
     )
 
     return HTMLResponse(f'<pre id="report-preview-text">{escape(report)}</pre>')
+
+
+@router.post("/templates")
+def save_template(body: TemplateSave):
+    """報告テンプレートをユーザー設定に保存し、プレビュー用のIDとハッシュを返す"""
+    if not UserSettingService.save(body.user_id, template_setting_key(body.template_id), body.template):
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"template_id": body.template_id, "template_hash": template_hash(body.template)}
+
+
+def _iter_reports(compiled: CompiledTemplate, users: list[dict], rows: list[dict], hide_zero: bool):
+    """実績のある (ユーザー, 日付) ごとに (ファイル名, 見出し, 報告書) を生成（ユーザーcd・日付順）
+
+    責務: 取得済み実績のグループ化と報告書生成のみ
+    """
+    by_user = {user_id: list(logs) for user_id, logs in groupby(rows, key=itemgetter('user_id'))}
+    for u in users:
+        for work_date, logs in groupby(by_user.get(u['id'], []), key=itemgetter('work_date')):
+            logs = list(logs)
+            report = render_report(
+                compiled, sum(log['hours'] for log in logs), logs,
+                date.fromisoformat(work_date), u['cd'], u['name'], hide_zero
+            )
+            safe_cd = re.sub(r'[\\/:*?"<>|]', "_", u['cd'])
+            yield f"{work_date}_{safe_cd}.txt", f"{work_date} {u['cd']} {u['name']}", report
+
+
+class _ZipStream:
+    """ZipFileの書き込み先（書き込まれたバイト列を順次取り出してストリーミングする）"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _text_chunks(reports):
+    """報告書を区切り行で連結したテキストとして順次返す"""
+    for _, title, report in reports:
+        yield f"===== {title} =====\n{report}\n\n".encode("utf-8")
+
+
+def _zip_chunks(reports):
+    """報告書を1ファイルずつZIPに書き込み、書き込んだ分を順次返す"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
+        for filename, _, report in reports:
+            zf.writestr(filename, report)
+            yield stream.drain()
+    yield stream.drain()
+
+
+def _parse_date(value: str | None, default: date) -> date:
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日付はYYYY-MM-DD形式で指定してください")
+
+
+@router.get("/batch")
+def batch(
+    start: str = Query(default=None, description="開始日（省略時は今日）"),
+    end: str = Query(default=None, description="終了日（省略時は開始日）"),
+    user: list[int] = Query(default=[], description="対象ユーザー（省略時は有効ユーザー全員）"),
+    template: str = Query(default=DEFAULT_TEMPLATE),
+    hide_zero_progress: bool = Query(default=False),
+    format: str = Query(default="text", description="text / zip")
+):
+    """チーム（複数ユーザー × 期間）の報告書を一括生成
+
+    責務: 実績の一括取得（1クエリ）とテンプレートの1回のコンパイル、ストリーミング返却のみ
+    実績のある (ユーザー, 日付) ごとに1件生成する。
+    """
+    if format not in ("text", "zip"):
+        raise HTTPException(status_code=400, detail="formatはtextかzipを指定してください")
+    start_date = _parse_date(start, date.today())
+    end_date = _parse_date(end, start_date)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="開始日は終了日以前を指定してください")
+    if (end_date - start_date).days + 1 > MAX_BATCH_DAYS:
+        raise HTTPException(status_code=400, detail=f"期間は{MAX_BATCH_DAYS}日以内で指定してください")
+
+    users = UserService.get_active_list()
+    if user:
+        selected = set(user)
+        users = [u for u in users if u['id'] in selected]
+    rows = WorkLogService.get_users_daily_logs([u['id'] for u in users], start_date, end_date)
+    reports = _iter_reports(compile_template(template), users, rows, hide_zero_progress)
+
+    filename = f"work-report_{start_date.isoformat()}_{end_date.isoformat()}"
+    if format == "zip":
+        return StreamingResponse(
+            _zip_chunks(reports),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.zip"'}
+        )
+    return StreamingResponse(
+        _text_chunks(reports),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'inline; filename="{filename}.txt"'}
+    )
@@ -2,27 +2,48 @@
 
 責務: API入出力の型定義のみ
 """
-from .project import ProjectCreate, ProjectUpdate, ProjectOut, ProjectSummary
-from .user import UserCreate, UserUpdate, UserOut
-from .issue import IssueCreate, IssueUpdate, IssueOut
-from .task import TaskCreate, TaskUpdate, TaskOut, TaskProgressUpdate
+from .project import ProjectCreate, ProjectUpdate, ProjectBatchUpdate, ProjectOut, ProjectSummary
+from .user import UserCreate, UserUpdate, UserBatchUpdate, UserOut
+from .issue import IssueCreate, IssueUpdate, IssueBatchUpdate, IssueOut
+from .task import TaskCreate, TaskUpdate, TaskBatchUpdate, TaskOut, TaskProgressUpdate
 from .work_log import WorkLogCreate, WorkLogOut
+from .analytics import AttributeUtilizationOut
+from .batch import BatchItemResult, BatchResult
+from .work_report import TemplateSave
+from .task_assignee import (
+    AssigneeBulkScope, AssigneeCopy, AssigneeBulkResult,
+    AssigneeToggle, AssigneeToggleOut, TaskAssigneesOut,
+)
 
 __all__ = [
     "ProjectCreate",
     "ProjectUpdate",
+    "ProjectBatchUpdate",
     "ProjectOut",
     "ProjectSummary",
     "UserCreate",
     "UserUpdate",
+    "UserBatchUpdate",
     "UserOut",
     "IssueCreate",
     "IssueUpdate",
+    "IssueBatchUpdate",
     "IssueOut",
     "TaskCreate",
     "TaskUpdate",
+    "TaskBatchUpdate",
     "TaskOut",
     "TaskProgressUpdate",
     "WorkLogCreate",
     "WorkLogOut",
+    "AttributeUtilizationOut",
+    "BatchItemResult",
+    "BatchResult",
+    "TemplateSave",
+    "AssigneeBulkScope",
+    "AssigneeCopy",
+    "AssigneeBulkResult",
+    "AssigneeToggle",
+    "AssigneeToggleOut",
+    "TaskAssigneesOut",
 ]
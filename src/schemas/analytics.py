@@ -0,0 +1,14 @@
+"""分析スキーマ"""
+from pydantic import BaseModel
+
+
+class AttributeUtilizationOut(BaseModel):
+    """属性別稼働（選択肢 × プロジェクト × 年月）"""
+    option_id: int | None
+    option_name: str
+    project_id: int
+    project_cd: str
+    project_name: str
+    year_month: str
+    planned_hours: float
+    actual_hours: float
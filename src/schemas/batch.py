@@ -0,0 +1,16 @@
+"""一括作成・更新スキーマ"""
+from pydantic import BaseModel
+
+
+class BatchItemResult(BaseModel):
+    """1項目の結果（エラー時はidなし）"""
+    index: int
+    id: int | None = None
+    error: str | None = None
+
+
+class BatchResult(BaseModel):
+    """一括操作の結果（resultsは入力順）"""
+    succeeded: int
+    failed: int
+    results: list[BatchItemResult]
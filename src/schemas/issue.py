@@ -19,6 +19,11 @@ class IssueUpdate(BaseModel):
     description: str = ""
 
 
+class IssueBatchUpdate(IssueUpdate):
+    """案件一括更新の1項目"""
+    id: int
+
+
 class IssueOut(BaseModel):
     """案件出力"""
     id: int
@@ -16,6 +16,11 @@ class ProjectUpdate(BaseModel):
     description: str = ""
 
 
+class ProjectBatchUpdate(ProjectUpdate):
+    """プロジェクト一括更新の1項目"""
+    id: int
+
+
 class ProjectOut(BaseModel):
     """プロジェクト出力"""
     id: int
@@ -22,6 +22,11 @@ class TaskProgressUpdate(BaseModel):
     progress_rate: int = Field(ge=0, le=100)
 
 
+class TaskBatchUpdate(TaskUpdate):
+    """作業一括更新の1項目"""
+    id: int
+
+
 class TaskOut(BaseModel):
     """作業出力"""
     id: int
@@ -0,0 +1,45 @@
+"""担当割当スキーマ"""
+from pydantic import BaseModel
+
+
+class AssigneeBulkScope(BaseModel):
+    """一括割当/解除の範囲（省略した項目は絞り込まない、user_id省略時は有効ユーザー全員）"""
+    user_id: int | None = None
+    issue_id: int | None = None
+    task_id: int | None = None
+
+
+class AssigneeCopy(BaseModel):
+    """割当コピー（source_issue_id + target_issue_id、または source_project_id のいずれか）"""
+    source_issue_id: int | None = None
+    target_issue_id: int | None = None
+    source_project_id: int | None = None
+    replace: bool = False
+
+
+class AssigneeBulkResult(BaseModel):
+    """一括操作の結果"""
+    added: int = 0
+    removed: int = 0
+
+
+class AssigneeToggle(BaseModel):
+    """担当割当のトグル"""
+    task_id: int
+    user_id: int
+
+
+class AssigneeToggleOut(BaseModel):
+    """トグル結果（案件集約値を含む）"""
+    assigned: bool
+    issue_id: int
+    issue_count: int
+    issue_task_count: int
+
+
+class TaskAssigneesOut(BaseModel):
+    """作業と担当ユーザーID"""
+    id: int
+    cd: str
+    name: str
+    user_ids: list[int]
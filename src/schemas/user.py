@@ -16,6 +16,11 @@ class UserUpdate(BaseModel):
     email: EmailStr
 
 
+class UserBatchUpdate(UserUpdate):
+    """ユーザー一括更新の1項目"""
+    id: int
+
+
 class UserOut(BaseModel):
     """ユーザー出力"""
     id: int
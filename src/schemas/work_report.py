@@ -0,0 +1,13 @@
+"""業務終了報告スキーマ"""
+from pydantic import BaseModel, Field
+
+# 保存テンプレートのID（"default" は従来の保存キーをそのまま使う）
+DEFAULT_TEMPLATE_ID = "default"
+TEMPLATE_ID_PATTERN = r"^[A-Za-z0-9_-]{1,32}$"
+
+
+class TemplateSave(BaseModel):
+    """報告テンプレート保存"""
+    user_id: int
+    template_id: str = Field(default=DEFAULT_TEMPLATE_ID, pattern=TEMPLATE_ID_PATTERN)
+    template: str
@@ -4,7 +4,7 @@
 依存: database
 """
 from .project_service import ProjectService
-from .user_service import UserService
+from .user_service import UserService, UserAttributeLoader
 from .issue_service import IssueService
 from .task_service import TaskService
 from .work_log_service import WorkLogService
@@ -16,10 +16,12 @@ from .user_setting_service import UserSettingService
 from .task_assignee_service import TaskAssigneeService
 from .monthly_assignment_service import MonthlyAssignmentService
 from .dashboard_service import DashboardService
+from .analytics_service import AnalyticsService
 
 __all__ = [
     "ProjectService",
     "UserService",
+    "UserAttributeLoader",
     "IssueService",
     "TaskService",
     "WorkLogService",
@@ -31,4 +33,5 @@ __all__ = [
     "TaskAssigneeService",
     "MonthlyAssignmentService",
     "DashboardService",
+    "AnalyticsService",
 ]
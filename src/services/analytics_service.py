@@ -0,0 +1,48 @@
+"""分析サービス
+
+責務: 集計・分析データの取得のみ
+
+実績は月次集計テーブル work_log_monthly（ユーザー × プロジェクト × 年月、
+work_logのトリガーで差分更新）から読むため、期間が長くてもwork_logを走査しない。
+"""
+from database import get_db
+
+
+class AnalyticsService:
+    """分析関連のデータ取得"""
+
+    @staticmethod
+    def get_attribute_utilization(type_id: int, start_month: str, end_month: str) -> list[dict]:
+        """属性の選択肢 × プロジェクト × 年月 の予定/実績工数を集計
+
+        属性未設定のユーザーはoption_id=Noneの行にまとめる。
+
+        Returns:
+            [{option_id, option_name, project_id, project_cd, project_name,
+              year_month, planned_hours, actual_hours}]（選択肢・プロジェクト・年月順）
+        """
+        with get_db() as conn:
+            rows = conn.execute(
+                """WITH hours AS (
+                       SELECT user_id, project_id, year_month, 0 as planned, hours as actual
+                       FROM work_log_monthly
+                       WHERE year_month BETWEEN :start AND :end
+                       UNION ALL
+                       SELECT user_id, project_id, year_month, planned_hours, 0
+                       FROM monthly_assignment
+                       WHERE year_month BETWEEN :start AND :end
+                   )
+                   SELECT o.id as option_id, COALESCE(o.name, '未設定') as option_name,
+                          p.id as project_id, p.cd as project_cd, p.name as project_name,
+                          h.year_month,
+                          ROUND(SUM(h.planned), 2) as planned_hours,
+                          ROUND(SUM(h.actual), 2) as actual_hours
+                   FROM hours h
+                   JOIN project p ON h.project_id = p.id
+                   LEFT JOIN user_attribute ua ON ua.user_id = h.user_id AND ua.type_id = :type_id
+                   LEFT JOIN user_attribute_option o ON o.id = ua.option_id
+                   GROUP BY o.id, p.id, h.year_month
+                   ORDER BY o.id IS NULL, o.sort_order, o.id, p.cd, h.year_month""",
+                {"type_id": type_id, "start": start_month, "end": end_month}
+            ).fetchall()
+        return [dict(r) for r in rows]
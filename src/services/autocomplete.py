@@ -0,0 +1,208 @@
+"""オートコンプリート索引
+
+責務: cd・名前の部分一致検索用のプロセス内索引の保持のみ
+依存: database, cache
+
+検索文字列はNFKC正規化・小文字化・カタカナ→ひらがなで揃え、
+1〜3文字のn-gramから候補idを引く（4文字以上は最少のtrigram候補を部分一致で検証）。
+索引は依存テーブルの更新バージョンで刻印し、不一致なら次回検索時に再構築する。
+サービスの書き込み後は refresh(id) で該当行だけを差し替える。
+"""
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from database import get_db
+from cache import get_table_versions, register_cache
+
+# n-gramの最大長（これより長い検索語はtrigram候補 + 部分一致検証）
+GRAM_SIZE = 3
+
+# カタカナ（ァ〜ヶ）→ ひらがな
+_KANA_FOLD = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize(text: str | None) -> str:
+    """検索用に正規化（全角半角・大文字小文字・カタカナひらがなを同一視）"""
+    return unicodedata.normalize("NFKC", text or "").casefold().translate(_KANA_FOLD)
+
+
+def _grams(text: str) -> set[str]:
+    """1〜GRAM_SIZE文字の部分文字列"""
+    return {
+        text[i:i + n]
+        for n in range(1, GRAM_SIZE + 1)
+        for i in range(len(text) - n + 1)
+    }
+
+
+class AutocompleteIndex:
+    """cd・名前などの部分一致索引
+
+    Args:
+        tables: 依存テーブル（先頭が索引対象テーブル）
+        select: 索引対象行を取得するSELECT文（表示順、WHERE句は{where}で受ける）
+        id_column: 1行取得時に絞り込むid列（例: p.id）
+        fields: 検索対象の列
+        sort_key: 表示順のキー（行 -> タプル）
+        name: ヒット率の集計に使う名前（ミス = 検索時の再構築）
+    """
+
+    def __init__(self, tables: tuple[str, ...], select: str, id_column: str,
+                 fields: tuple[str, ...], sort_key, name: str | None = None):
+        self.tables = tables
+        self.select = select
+        self.id_column = id_column
+        self.fields = fields
+        self.sort_key = sort_key
+        self._stamp = None
+        self._rows = {}
+        self._keys = {}
+        self._postings = {}
+        self._order = []
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if name:
+            register_cache(name, self)
+
+    def search(self, q: str = "", exclude=(), limit: int = 10) -> list[dict]:
+        """部分一致検索（表示順で最大limit件）"""
+        stamp = get_table_versions(self.tables)
+        with self._lock:
+            if stamp != self._stamp:
+                self.misses += 1
+                self._rebuild(stamp)
+            else:
+                self.hits += 1
+            excluded = set(exclude)
+            nq = normalize(q)
+
+            if not nq:
+                ids = (row_id for _, row_id in self._order)
+            elif len(nq) <= GRAM_SIZE:
+                ids = self._ordered(self._postings.get(nq, set()))
+            else:
+                postings = min(
+                    (self._postings.get(nq[i:i + GRAM_SIZE], set()) for i in range(len(nq) - GRAM_SIZE + 1)),
+                    key=len
+                )
+                ids = (
+                    row_id for row_id in self._ordered(postings)
+                    if nq in self._keys[row_id]
+                )
+
+            results = []
+            for row_id in ids:
+                if row_id in excluded:
+                    continue
+                results.append(dict(self._rows[row_id]))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _ordered(self, candidates: set[int]):
+        """候補idを表示順に列挙（候補が多い場合は全体の表示順を走査して打ち切れるようにする）"""
+        if len(candidates) * 4 > len(self._order):
+            return (row_id for _, row_id in self._order if row_id in candidates)
+        return (row_id for _, row_id in sorted(
+            (self.sort_key(self._rows[row_id]), row_id) for row_id in candidates
+        ))
+
+    def refresh(self, row_id: int):
+        """1行の書き込みを索引に反映
+
+        直前の刻印から対象テーブルが1回だけ更新されている場合のみ差し替える。
+        それ以外（他の書き込みが挟まった等）は何もせず、次回検索時の再構築に任せる。
+        """
+        # バージョンを行より先に読む（取得中の書き込みは次回検索時の再構築で拾う）
+        stamp = get_table_versions(self.tables)
+        with get_db() as conn:
+            row = conn.execute(self.select.format(where=f"WHERE {self.id_column} = ?"), (row_id,)).fetchone()
+
+        with self._lock:
+            if self._stamp is None:
+                return
+            expected = (self._stamp[0] + 1,) + self._stamp[1:]
+            if stamp == self._stamp:
+                return
+            if stamp != expected:
+                self._stamp = None
+                return
+            self._remove(row_id)
+            if row is not None:
+                self._add(dict(row))
+            self._stamp = stamp
+
+    def _rebuild(self, stamp: tuple[int, ...]):
+        """全件から索引を再構築（stampは読み込み前に取得した刻印）"""
+        with get_db() as conn:
+            rows = conn.execute(self.select.format(where="")).fetchall()
+        self._rows, self._keys, self._postings, self._order = {}, {}, {}, []
+        for row in rows:
+            self._add(dict(row))
+        self._stamp = stamp
+
+    def _add(self, row: dict):
+        row_id = row['id']
+        key = "\0".join(normalize(row[f]) for f in self.fields)
+        self._rows[row_id] = row
+        self._keys[row_id] = key
+        for gram in _grams(key):
+            if "\0" not in gram:
+                self._postings.setdefault(gram, set()).add(row_id)
+        insort(self._order, (self.sort_key(row), row_id))
+
+    def _remove(self, row_id: int):
+        row = self._rows.pop(row_id, None)
+        if row is None:
+            return
+        key = self._keys.pop(row_id)
+        for gram in _grams(key):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del self._postings[gram]
+        entry = (self.sort_key(row), row_id)
+        pos = bisect_left(self._order, entry)
+        if pos < len(self._order) and self._order[pos] == entry:
+            del self._order[pos]
+
+
+# 有効ユーザー（cd順）
+user_index = AutocompleteIndex(
+    ("user",),
+    """SELECT * FROM (
+           SELECT u.id, u.cd, u.name FROM user u
+           WHERE u.is_active = 1 OR u.is_active IS NULL
+       ) u {where} ORDER BY u.cd""",
+    "u.id",
+    ("cd", "name"),
+    lambda r: (r['cd'],),
+    name="autocomplete.user",
+)
+
+# プロジェクト（cd順）
+project_index = AutocompleteIndex(
+    ("project",),
+    "SELECT p.id, p.cd, p.name FROM project p {where} ORDER BY p.cd",
+    "p.id",
+    ("cd", "name"),
+    lambda r: (r['cd'],),
+    name="autocomplete.project",
+)
+
+# 案件（プロジェクトcd・案件cd順、プロジェクトcdも検索対象）
+issue_index = AutocompleteIndex(
+    ("issue", "project"),
+    """SELECT i.id, i.cd, i.name, p.cd as project_cd
+       FROM issue i
+       JOIN project p ON i.project_id = p.id
+       {where}
+       ORDER BY p.cd, i.cd""",
+    "i.id",
+    ("cd", "name", "project_cd"),
+    lambda r: (r['project_cd'], r['cd']),
+    name="autocomplete.issue",
+)
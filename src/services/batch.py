@@ -0,0 +1,120 @@
+"""一括作成・更新
+
+責務: 一括操作の入力検証（ID・親の存在、cdの重複）と結果の組み立てのみ
+
+検証はどれも入力全体に対して1回のIN句で行う。検証に失敗した項目はエラーとして返し、
+残りの項目だけを書き込む（呼び出し側で executemany・1トランザクション）。
+cdは (スコープ, cd) で一意（スコープはプロジェクト・ユーザーはなし、案件はproject_id、作業はissue_id）。
+"""
+
+# 1リクエストで受け付ける件数の上限（IN句の変数の数もこれで抑える）
+BATCH_MAX_ITEMS = 1000
+
+
+def _placeholders(values) -> str:
+    return ", ".join("?" * len(values))
+
+
+def existing_scopes(conn, table: str, ids, scope: str | None = None) -> dict[int, int | None]:
+    """存在する行のid -> スコープ列の値（スコープなしはNone）"""
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    column = scope or "NULL"
+    rows = conn.execute(
+        f"SELECT id, {column} FROM {table} WHERE id IN ({_placeholders(ids)})", ids
+    ).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def code_owners(conn, table: str, keys, scope: str | None = None) -> dict[tuple, int]:
+    """(スコープ, cd) -> その行のid（既存行のみ）"""
+    keys = set(keys)
+    cds = list({cd for _, cd in keys})
+    if not cds:
+        return {}
+    if scope:
+        scopes = list({s for s, _ in keys})
+        rows = conn.execute(
+            f"SELECT {scope}, cd, id FROM {table} "
+            f"WHERE {scope} IN ({_placeholders(scopes)}) AND cd IN ({_placeholders(cds)})",
+            scopes + cds
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            f"SELECT NULL, cd, id FROM {table} WHERE cd IN ({_placeholders(cds)})", cds
+        ).fetchall()
+    return {(row[0], row[1]): row[2] for row in rows if (row[0], row[1]) in keys}
+
+
+def check_ids(conn, table: str, ids: list[int], not_found: str, scope: str | None = None,
+              errors: dict[int, str] | None = None) -> tuple[dict[int, str], dict[int, int | None]]:
+    """更新対象のIDの検証（存在しない・入力内で重複）
+
+    Returns:
+        (入力の位置 -> エラー, id -> スコープ列の値)
+    """
+    errors = {} if errors is None else errors
+    scopes = existing_scopes(conn, table, ids, scope)
+    seen = set()
+    for i, row_id in enumerate(ids):
+        if i in errors:
+            continue
+        if row_id not in scopes:
+            errors[i] = not_found
+        elif row_id in seen:
+            errors[i] = f"IDが入力内で重複しています: {row_id}"
+        seen.add(row_id)
+    return errors, scopes
+
+
+def check_parents(conn, table: str, parent_ids: list[int], not_found: str,
+                  errors: dict[int, str] | None = None) -> dict[int, str]:
+    """親（作成時のproject_id・issue_id）の存在の検証"""
+    errors = {} if errors is None else errors
+    found = existing_scopes(conn, table, parent_ids)
+    for i, parent_id in enumerate(parent_ids):
+        if i not in errors and parent_id not in found:
+            errors[i] = not_found
+    return errors
+
+
+def check_codes(conn, table: str, keys: list[tuple], scope: str | None = None, own_ids: list[int] | None = None,
+                errors: dict[int, str] | None = None) -> dict[int, str]:
+    """cdの重複の検証（入力内で重複・他の行が使用中）
+
+    更新時は own_ids に各項目の更新対象IDを渡す（自分自身のcdは重複としない）。
+    入れ替え（AとBのcdを交換）は、相手の更新前のcdと重複するためエラーになる。
+
+    Args:
+        keys: 各項目の (スコープ列の値, cd)
+    """
+    errors = {} if errors is None else errors
+    owners = code_owners(conn, table, [key for i, key in enumerate(keys) if i not in errors], scope)
+    seen = set()
+    for i, key in enumerate(keys):
+        if i in errors:
+            continue
+        owner = owners.get(key)
+        if key in seen:
+            errors[i] = f"コードが入力内で重複しています: {key[1]}"
+        elif owner is not None and (own_ids is None or owner != own_ids[i]):
+            errors[i] = f"コードは既に使われています: {key[1]}"
+        seen.add(key)
+    return errors
+
+
+def batch_results(ids: list[int | None], errors: dict[int, str]) -> dict:
+    """一括操作の結果（resultsは入力順、エラーの項目はidなし）
+
+    Returns:
+        {succeeded, failed, results: [{index, id, error}]}
+    """
+    return {
+        "succeeded": len(ids) - len(errors),
+        "failed": len(errors),
+        "results": [
+            {"index": i, "id": None if i in errors else row_id, "error": errors.get(i)}
+            for i, row_id in enumerate(ids)
+        ],
+    }
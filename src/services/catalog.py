@@ -0,0 +1,22 @@
+"""参照データカタログ
+
+責務: 画面共通の参照データ（ユーザー・プロジェクト・案件・ステータス）のキャッシュ保持のみ
+依存: cache
+
+各エントリは依存テーブルの更新バージョンで刻印し、
+対応するサービスの作成・更新・削除でも明示的に破棄する。
+返す行は共有されるため、呼び出し側で変更しないこと。
+"""
+from cache import VersionedCache
+
+# 有効ユーザー一覧（キー: None）
+active_users = VersionedCache(("user",), name="catalog.active_users")
+
+# プロジェクト一覧（キー: None）
+projects = VersionedCache(("project",), name="catalog.projects")
+
+# 案件一覧（プロジェクトcdを含む、キー: None）
+issues = VersionedCache(("issue", "project"), name="catalog.issues")
+
+# ステータス名（キー: プロジェクトID）
+status_labels = VersionedCache(("project_status",), name="catalog.status_labels")
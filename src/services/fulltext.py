@@ -0,0 +1,55 @@
+"""全文検索
+
+責務: q= 検索条件（FTS5 MATCH / LIKE）とランク順ソートの生成のみ
+
+trigramトークナイザーは3文字未満の語を索引できないため、
+短いキーワードは従来どおりLIKEで部分一致検索する。
+"""
+
+# FTS5（trigram）で検索できる最短文字数
+FTS_MIN_LENGTH = 3
+
+# 関連度順のソートキー（bm25スコア、小さいほど関連度が高い）
+RANK_SORT = "rank"
+
+
+def is_ranked(q: str) -> bool:
+    """キーワードが全文検索（関連度順）の対象か"""
+    return len(q.strip()) >= FTS_MIN_LENGTH
+
+
+def resolve_sort(sort: str, q: str) -> str:
+    """ソート指定を解決（未指定・rank指定は検索時のみrank、それ以外は空文字で既定列に委ねる）"""
+    if sort in ("", RANK_SORT):
+        return RANK_SORT if is_ranked(q) else ""
+    return sort
+
+
+def match_query(q: str) -> str:
+    """キーワードをFTS5のフレーズ検索式に変換（演算子として解釈させない）"""
+    return '"' + q.strip().replace('"', '""') + '"'
+
+
+def build_search(table: str, id_column: str, q: str, columns: tuple[str, ...]) -> tuple[str, str, list, str | None]:
+    """検索条件を生成
+
+    Args:
+        table: 検索対象テーブル（{table}_fts が索引）
+        id_column: 結合する本体側のid列（例: i.id）
+        q: 検索キーワード
+        columns: LIKEフォールバック時の検索列（別名付き）
+
+    Returns:
+        (JOIN句, 条件SQL, パラメータ, ランク式 or None)
+    """
+    if is_ranked(q):
+        fts = f"{table}_fts"
+        return (
+            f"JOIN {fts} ON {fts}.rowid = {id_column}",
+            f"{fts} MATCH ?",
+            [match_query(q)],
+            f"{fts}.rank",
+        )
+    like = f"%{q}%"
+    condition = "(" + " OR ".join(f"{c} LIKE ?" for c in columns) + ")"
+    return "", condition, [like] * len(columns), None
@@ -3,42 +3,62 @@
 責務: 案件のデータ操作のみ
 """
 from database import get_db
+from .pagination import sort_expr, build_seek, order_by
+from .fulltext import build_search, RANK_SORT
+from .autocomplete import issue_index
+from .batch import check_codes, check_ids, check_parents, code_owners, batch_results
+from . import catalog
 
 
 class IssueService:
     """案件関連のデータ操作"""
 
     @staticmethod
-    def get_all(project_id: int = None, sort: str = "cd", order: str = "asc", q: str = "") -> list[dict]:
-        """案件一覧を取得"""
-        allowed_sorts = {"cd", "name", "description", "status"}
-        if sort not in allowed_sorts:
-            sort = "cd"
-        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+    def get_all(project_id: int = None, sort: str = "cd", order: str = "asc", q: str = "",
+                limit: int | None = None, cursor: str | None = None) -> list[dict]:
+        """案件一覧を取得（limit/cursor指定でキーセットページング）
 
-        with get_db() as conn:
-            conditions = []
-            params = []
+        qは全文検索索引（3文字以上）またはLIKE（3文字未満）で絞り込む。
+        sort="rank" は全文検索時のみ関連度順、それ以外はcd順。
+        """
+        join, conditions, params, rank = "", [], [], None
 
-            if project_id:
-                conditions.append("i.project_id = ?")
-                params.append(project_id)
+        if q:
+            join, condition, params, rank = build_search(
+                "issue", "i.id", q, ("i.cd", "i.name", "i.description")
+            )
+            conditions.append(condition)
+
+        if project_id:
+            conditions.append("i.project_id = ?")
+            params.append(project_id)
+
+        expr = _resolve_sort_expr(sort, rank)
+        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        rank_column = f", {rank} as rank" if expr == rank else ""
 
-            if q:
-                like = f"%{q}%"
-                conditions.append("(i.cd LIKE ? OR i.name LIKE ? OR i.description LIKE ?)")
-                params.extend([like, like, like])
+        seek, seek_params = build_seek(expr, "i.id", order_dir, cursor)
+        if seek:
+            conditions.append(seek)
+            params.extend(seek_params)
 
-            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
 
+        with get_db() as conn:
             rows = conn.execute(
                 f"""SELECT i.*, p.cd as project_cd, p.name as project_name,
-                           ps.name as status_name
+                           ps.name as status_name{rank_column}
                     FROM issue i
+                    {join}
                     JOIN project p ON i.project_id = p.id
                     LEFT JOIN project_status ps ON i.project_id = ps.project_id AND i.status = ps.code
                     {where}
-                    ORDER BY i.{sort} {order_dir}""",
+                    {order_by(expr, 'i.id', order_dir)}
+                    {limit_clause}""",
                 params
             ).fetchall()
         return [dict(r) for r in rows]
@@ -70,15 +90,8 @@ class IssueService:
 
     @staticmethod
     def get_list() -> list[dict]:
-        """案件一覧を取得（フィルター用の最小フィールド）"""
-        with get_db() as conn:
-            rows = conn.execute(
-                """SELECT i.id, i.cd, i.name, p.cd as project_cd
-                   FROM issue i
-                   JOIN project p ON i.project_id = p.id
-                   ORDER BY p.cd, i.cd"""
-            ).fetchall()
-        return [dict(r) for r in rows]
+        """案件一覧を取得（フィルター用の最小フィールド、カタログキャッシュ）"""
+        return list(catalog.issues.get(None, _load_list))
 
     @staticmethod
     def create(project_id: int, cd: str, name: str, status: str = "open", description: str = "") -> dict:
@@ -95,6 +108,8 @@ class IssueService:
                    WHERE i.id = ?""",
                 (cur.lastrowid,)
             ).fetchone()
+        issue_index.refresh(row['id'])
+        catalog.issues.invalidate()
         return dict(row)
 
     @staticmethod
@@ -114,13 +129,72 @@ class IssueService:
                    WHERE i.id = ?""",
                 (issue_id,)
             ).fetchone()
+        issue_index.refresh(issue_id)
+        catalog.issues.invalidate()
         return dict(row)
 
+    @staticmethod
+    def create_many(items: list[dict]) -> dict:
+        """案件一括作成（プロジェクトの存在・cdの重複を一括で検証し、通った項目のみ1トランザクションで作成）
+
+        Args:
+            items: [{project_id, cd, name, status, description}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        keys = [(item["project_id"], item["cd"]) for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors = check_parents(
+                conn, "project", [item["project_id"] for item in items], "プロジェクトが見つかりません"
+            )
+            check_codes(conn, "issue", keys, scope="project_id", errors=errors)
+            valid = [i for i in range(len(items)) if i not in errors]
+            conn.executemany(
+                "INSERT INTO issue (cd, project_id, name, status, description) VALUES (?, ?, ?, ?, ?)",
+                [(items[i]["cd"], items[i]["project_id"], items[i]["name"], items[i]["status"],
+                  items[i]["description"]) for i in valid]
+            )
+            owners = code_owners(conn, "issue", [keys[i] for i in valid], scope="project_id")
+        if valid:
+            catalog.issues.invalidate()
+        return batch_results([owners.get(key) for key in keys], errors)
+
+    @staticmethod
+    def update_many(items: list[dict]) -> dict:
+        """案件一括更新（cdはプロジェクト内で重複不可、通った項目のみ1トランザクションで更新）
+
+        Args:
+            items: [{id, cd, name, status, description}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        ids = [item["id"] for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors, projects = check_ids(conn, "issue", ids, "案件が見つかりません", scope="project_id")
+            check_codes(
+                conn, "issue", [(projects.get(item["id"]), item["cd"]) for item in items],
+                scope="project_id", own_ids=ids, errors=errors
+            )
+            valid = [item for i, item in enumerate(items) if i not in errors]
+            conn.executemany(
+                "UPDATE issue SET cd = ?, name = ?, status = ?, description = ? WHERE id = ?",
+                [(item["cd"], item["name"], item["status"], item["description"], item["id"]) for item in valid]
+            )
+        if valid:
+            catalog.issues.invalidate()
+        return batch_results(ids, errors)
+
     @staticmethod
     def delete(issue_id: int) -> bool:
         """案件削除"""
         with get_db() as conn:
             cur = conn.execute("DELETE FROM issue WHERE id = ?", (issue_id,))
+        issue_index.refresh(issue_id)
+        catalog.issues.invalidate()
         return cur.rowcount > 0
 
     @staticmethod
@@ -148,13 +222,9 @@ class IssueService:
 
     @staticmethod
     def get_status_labels(project_id: int) -> dict[str, str]:
-        """プロジェクトのステータス一覧を取得（code -> name辞書）"""
-        with get_db() as conn:
-            rows = conn.execute(
-                "SELECT code, name FROM project_status WHERE project_id = ? ORDER BY sort_order",
-                (project_id,)
-            ).fetchall()
-        return {r['code']: r['name'] for r in rows}
+        """プロジェクトのステータス一覧を取得（code -> name辞書、カタログキャッシュ）"""
+        labels = catalog.status_labels.get(project_id, lambda: _load_status_labels(project_id))
+        return dict(labels)
 
     @staticmethod
     def get_estimate_totals(project_id: int) -> dict[int, float]:
@@ -186,45 +256,70 @@ class IssueService:
         return {r['id']: r['total'] for r in rows}
 
     @staticmethod
-    def get_all_with_totals(project_id: int, sort: str = "cd", order: str = "asc", q: str = "") -> list[dict]:
-        """案件一覧を見積/実績合計付きで取得（1クエリで効率的に取得）"""
-        allowed_sorts = {"cd", "name", "description", "status"}
-        if sort not in allowed_sorts:
-            sort = "cd"
-        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+    def get_all_with_totals(project_id: int, sort: str = "cd", order: str = "asc", q: str = "",
+                            limit: int | None = None, cursor: str | None = None) -> list[dict]:
+        """案件一覧を見積/実績合計付きで取得（1クエリで効率的に取得）
 
-        with get_db() as conn:
-            conditions = ["i.project_id = ?"]
-            params = [project_id]
+        limit/cursor指定時はページ内の案件についてのみ合計を集計する。
+        検索・ソートの扱いは get_all と同じ。
+        """
+        join, conditions, params, rank = "", [], [], None
+
+        if q:
+            join, condition, params, rank = build_search(
+                "issue", "i.id", q, ("i.cd", "i.name", "i.description")
+            )
+            conditions.append(condition)
+
+        conditions.append("i.project_id = ?")
+        params.append(project_id)
+
+        expr = _resolve_sort_expr(sort, rank)
+        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        # ランク順はページ内でrank列として持ち回す
+        rank_column, page_expr = (f", {rank} as rank", "i.rank") if expr == rank else ("", expr)
 
-            if q:
-                like = f"%{q}%"
-                conditions.append("(i.cd LIKE ? OR i.name LIKE ? OR i.description LIKE ?)")
-                params.extend([like, like, like])
+        seek, seek_params = build_seek(expr, "i.id", order_dir, cursor)
+        if seek:
+            conditions.append(seek)
+            params.extend(seek_params)
 
-            where = f"WHERE {' AND '.join(conditions)}"
+        where = f"WHERE {' AND '.join(conditions)}"
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
 
+        with get_db() as conn:
             rows = conn.execute(
-                f"""SELECT i.*, p.cd as project_cd, p.name as project_name,
+                f"""WITH page AS (
+                        SELECT i.*{rank_column} FROM issue i
+                        {join}
+                        {where}
+                        {order_by(expr, 'i.id', order_dir)}
+                        {limit_clause}
+                    )
+                    SELECT i.*, p.cd as project_cd, p.name as project_name,
                            ps.name as status_name,
                            COALESCE(est.total, 0) as estimate_total,
                            COALESCE(act.total, 0) as actual_total
-                    FROM issue i
+                    FROM page i
                     JOIN project p ON i.project_id = p.id
                     LEFT JOIN project_status ps ON i.project_id = ps.project_id AND i.status = ps.code
                     LEFT JOIN (
                         SELECT issue_id, SUM(hours) as total
                         FROM issue_estimate_item
+                        WHERE issue_id IN (SELECT id FROM page)
                         GROUP BY issue_id
                     ) est ON i.id = est.issue_id
                     LEFT JOIN (
                         SELECT t.issue_id, SUM(w.hours) as total
                         FROM task t
-                        LEFT JOIN work_log w ON t.id = w.task_id
+                        JOIN work_log w ON t.id = w.task_id
+                        WHERE t.issue_id IN (SELECT id FROM page)
                         GROUP BY t.issue_id
                     ) act ON i.id = act.issue_id
-                    {where}
-                    ORDER BY i.{sort} {order_dir}""",
+                    {order_by(page_expr, 'i.id', order_dir)}""",
                 params
             ).fetchall()
         return [dict(r) for r in rows]
@@ -254,3 +349,34 @@ class IssueService:
             result['rate'] = (actual / estimate) * 100
             result['is_overrun'] = result['remaining'] < 0
         return result
+
+
+def _load_list() -> list[dict]:
+    """案件一覧（フィルター用）を取得"""
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT i.id, i.cd, i.name, p.cd as project_cd
+               FROM issue i
+               JOIN project p ON i.project_id = p.id
+               ORDER BY p.cd, i.cd"""
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _load_status_labels(project_id: int) -> dict[str, str]:
+    """ステータス名（code -> name）を取得"""
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT code, name FROM project_status WHERE project_id = ? ORDER BY sort_order",
+            (project_id,)
+        ).fetchall()
+    return {r['code']: r['name'] for r in rows}
+
+
+def _resolve_sort_expr(sort: str, rank: str | None) -> str:
+    """ソート式を解決（rankは全文検索時のみ、不正な列はcd）"""
+    if sort == RANK_SORT and rank:
+        return rank
+    if sort not in {"cd", "name", "description", "status"}:
+        sort = "cd"
+    return sort_expr(f"i.{sort}", nullable=sort in ("description", "status"))
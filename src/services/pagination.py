@@ -0,0 +1,63 @@
+"""キーセットページング
+
+責務: カーソルのエンコード/デコードとシーク条件の生成のみ
+
+OFFSETを使わず「ソート列 + id」の直前値から続きを取得する。
+カーソルは最終行の (ソート値, id) をURL安全なbase64 JSONにしたもの。
+"""
+import base64
+import json
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """(ソート値, id) をカーソル文字列に変換"""
+    raw = json.dumps([sort_value, row_id], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """カーソル文字列を (ソート値, id) に変換
+
+    Raises:
+        ValueError: 不正なカーソル
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded).decode("utf-8"))
+    except (ValueError, TypeError):
+        raise ValueError("不正なカーソルです")
+    if not isinstance(row_id, int):
+        raise ValueError("不正なカーソルです")
+    return sort_value, row_id
+
+
+def sort_expr(column: str, nullable: bool) -> str:
+    """シーク用のソート式（NULL許容列は空文字に寄せて順序を全順序にする）"""
+    return f"COALESCE({column}, '')" if nullable else column
+
+
+def build_seek(expr: str, id_column: str, order_dir: str, cursor: str | None) -> tuple[str | None, list]:
+    """カーソル以降を取得するWHERE条件を生成
+
+    Returns:
+        (条件SQL or None, パラメータ)
+    """
+    if not cursor:
+        return None, []
+    sort_value, row_id = decode_cursor(cursor)
+    op = "<" if order_dir == "DESC" else ">"
+    return f"({expr}, {id_column}) {op} (?, ?)", [sort_value, row_id]
+
+
+def order_by(expr: str, id_column: str, order_dir: str) -> str:
+    """ソート列 + id のORDER BY句"""
+    return f"ORDER BY {expr} {order_dir}, {id_column} {order_dir}"
+
+
+def next_cursor(rows: list[dict], sort: str, limit: int | None) -> str | None:
+    """次ページのカーソル（取得件数がlimit未満なら最終ページとしてNone）"""
+    if not limit or len(rows) < limit:
+        return None
+    last = rows[-1]
+    value = last[sort]
+    return encode_cursor(value if value is not None else "", last['id'])
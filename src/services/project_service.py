@@ -3,28 +3,59 @@
 責務: プロジェクトのデータ操作のみ
 """
 from database import get_db, create_default_statuses
+from cache import VersionedCache
+from .pagination import sort_expr, build_seek, order_by
+from .fulltext import build_search, RANK_SORT
+from .autocomplete import project_index
+from .batch import check_codes, check_ids, code_owners, batch_results
+from . import catalog
 
 
 class ProjectService:
     """プロジェクト関連のデータ操作"""
 
     @staticmethod
-    def get_all(sort: str = "cd", order: str = "asc", q: str = "") -> list[dict]:
-        """プロジェクト一覧を取得"""
+    def get_all(sort: str = "cd", order: str = "asc", q: str = "",
+                limit: int | None = None, cursor: str | None = None) -> list[dict]:
+        """プロジェクト一覧を取得（limit/cursor指定でキーセットページング）
+
+        qは全文検索索引（3文字以上）またはLIKE（3文字未満）で絞り込む。
+        sort="rank" は全文検索時のみ関連度順、それ以外はcd順。
+        """
         allowed_sorts = {"cd", "name", "description"}
-        if sort not in allowed_sorts:
-            sort = "cd"
+        join, conditions, params, rank = "", [], [], None
+
+        if q:
+            join, condition, params, rank = build_search(
+                "project", "p.id", q, ("p.cd", "p.name", "p.description")
+            )
+            conditions.append(condition)
+
+        if sort == RANK_SORT and rank:
+            expr = rank
+        else:
+            if sort not in allowed_sorts:
+                sort = "cd"
+            expr = sort_expr(f"p.{sort}", nullable=sort == "description")
         order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        columns = f"p.*, {rank} as rank" if expr == rank else "p.*"
+
+        seek, seek_params = build_seek(expr, "p.id", order_dir, cursor)
+        if seek:
+            conditions.append(seek)
+            params.extend(seek_params)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
 
         with get_db() as conn:
-            if q:
-                like = f"%{q}%"
-                rows = conn.execute(
-                    f"SELECT * FROM project WHERE cd LIKE ? OR name LIKE ? OR description LIKE ? ORDER BY {sort} {order_dir}",
-                    (like, like, like)
-                ).fetchall()
-            else:
-                rows = conn.execute(f"SELECT * FROM project ORDER BY {sort} {order_dir}").fetchall()
+            rows = conn.execute(
+                f"SELECT {columns} FROM project p {join} {where} {order_by(expr, 'p.id', order_dir)} {limit_clause}",
+                params
+            ).fetchall()
         return [dict(r) for r in rows]
 
     @staticmethod
@@ -36,10 +67,8 @@ class ProjectService:
 
     @staticmethod
     def get_list() -> list[dict]:
-        """プロジェクト一覧を取得（フィルター用の最小フィールド）"""
-        with get_db() as conn:
-            rows = conn.execute("SELECT id, cd, name FROM project ORDER BY cd").fetchall()
-        return [dict(r) for r in rows]
+        """プロジェクト一覧を取得（フィルター用の最小フィールド、カタログキャッシュ）"""
+        return list(catalog.projects.get(None, _load_list))
 
     @staticmethod
     def create(cd: str, name: str, description: str = "") -> dict:
@@ -52,6 +81,8 @@ class ProjectService:
             project_id = cur.lastrowid
             create_default_statuses(conn, project_id)
             row = conn.execute("SELECT * FROM project WHERE id = ?", (project_id,)).fetchone()
+        project_index.refresh(project_id)
+        _invalidate_catalog(project_id)
         return dict(row)
 
     @staticmethod
@@ -65,68 +96,161 @@ class ProjectService:
             if cur.rowcount == 0:
                 return None
             row = conn.execute("SELECT * FROM project WHERE id = ?", (project_id,)).fetchone()
+        project_index.refresh(project_id)
+        _invalidate_catalog(project_id)
         return dict(row)
 
+    @staticmethod
+    def create_many(items: list[dict]) -> dict:
+        """プロジェクト一括作成（検証を通った項目のみ1トランザクションで作成）
+
+        Args:
+            items: [{cd, name, description}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        keys = [(None, item["cd"]) for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors = check_codes(conn, "project", keys)
+            valid = [i for i in range(len(items)) if i not in errors]
+            conn.executemany(
+                "INSERT INTO project (cd, name, description) VALUES (?, ?, ?)",
+                [(items[i]["cd"], items[i]["name"], items[i]["description"]) for i in valid]
+            )
+            owners = code_owners(conn, "project", [keys[i] for i in valid])
+            create_default_statuses(conn, *owners.values())
+        if valid:
+            _invalidate_catalog(None)
+        return batch_results([owners.get(key) for key in keys], errors)
+
+    @staticmethod
+    def update_many(items: list[dict]) -> dict:
+        """プロジェクト一括更新（検証を通った項目のみ1トランザクションで更新）
+
+        Args:
+            items: [{id, cd, name, description}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        ids = [item["id"] for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors, _ = check_ids(conn, "project", ids, "プロジェクトが見つかりません")
+            check_codes(conn, "project", [(None, item["cd"]) for item in items], own_ids=ids, errors=errors)
+            valid = [item for i, item in enumerate(items) if i not in errors]
+            conn.executemany(
+                "UPDATE project SET cd = ?, name = ?, description = ? WHERE id = ?",
+                [(item["cd"], item["name"], item["description"], item["id"]) for item in valid]
+            )
+        if valid:
+            _invalidate_catalog(None)
+        return batch_results(ids, errors)
+
     @staticmethod
     def delete(project_id: int) -> bool:
         """プロジェクト削除"""
         with get_db() as conn:
             cur = conn.execute("DELETE FROM project WHERE id = ?", (project_id,))
+        project_index.refresh(project_id)
+        _invalidate_catalog(project_id)
         return cur.rowcount > 0
 
     @staticmethod
     def get_summary(project_id: int) -> dict:
-        """プロジェクトサマリー取得"""
-        with get_db() as conn:
-            issue_count = conn.execute(
-                "SELECT COUNT(*) FROM issue WHERE project_id = ?", (project_id,)
-            ).fetchone()[0]
-
-            task_count = conn.execute(
-                "SELECT COUNT(*) FROM task t JOIN issue i ON t.issue_id = i.id WHERE i.project_id = ?",
-                (project_id,)
-            ).fetchone()[0]
-
-            estimate_total = conn.execute(
-                """SELECT COALESCE(SUM(e.hours), 0)
-                   FROM issue_estimate_item e
-                   JOIN issue i ON e.issue_id = i.id
-                   WHERE i.project_id = ?""",
-                (project_id,)
-            ).fetchone()[0] or 0
-
-            actual_total = conn.execute(
-                """SELECT COALESCE(SUM(w.hours), 0)
-                   FROM work_log w
-                   JOIN task t ON w.task_id = t.id
-                   JOIN issue i ON t.issue_id = i.id
-                   WHERE i.project_id = ?""",
-                (project_id,)
-            ).fetchone()[0] or 0
-
-        consumption_rate = (actual_total / estimate_total * 100) if estimate_total > 0 else 0
-
-        return {
-            "issue_count": issue_count,
-            "task_count": task_count,
-            "estimate_total": estimate_total,
-            "actual_total": actual_total,
-            "consumption_rate": round(consumption_rate, 1),
-        }
+        """プロジェクトサマリー取得（案件・作業・見積・実績の更新で無効化）"""
+        summary = _summary_cache.get(project_id, lambda: _load_summary(project_id))
+        return dict(summary)
 
     @staticmethod
     def get_recent_issues(project_id: int, limit: int = 5) -> list[dict]:
         """最近の案件取得（見積・実績付き）"""
-        with get_db() as conn:
-            issues = conn.execute(
-                """SELECT i.*, ps.name as status_name,
-                          COALESCE((SELECT SUM(hours) FROM issue_estimate_item WHERE issue_id = i.id), 0) as estimate,
-                          COALESCE((SELECT SUM(w.hours) FROM work_log w JOIN task t ON w.task_id = t.id WHERE t.issue_id = i.id), 0) as actual
-                   FROM issue i
-                   LEFT JOIN project_status ps ON i.project_id = ps.project_id AND i.status = ps.code
-                   WHERE i.project_id = ?
-                   ORDER BY i.id DESC
-                   LIMIT ?""",
-                (project_id, limit)
-            ).fetchall()
-        return [dict(row) for row in issues]
+        issues = _recent_issues_cache.get(
+            (project_id, limit), lambda: _load_recent_issues(project_id, limit)
+        )
+        return [dict(i) for i in issues]
+
+
+# プロジェクト詳細用キャッシュ（そのプロジェクト配下の案件・ステータス・作業・見積・実績の更新で無効化）
+_summary_cache = VersionedCache((), name="project.summary", project_key=lambda project_id: project_id)
+_recent_issues_cache = VersionedCache((), name="project.recent_issues", project_key=lambda key: key[0])
+
+
+def _load_list() -> list[dict]:
+    """プロジェクト一覧（フィルター用）を取得"""
+    with get_db() as conn:
+        rows = conn.execute("SELECT id, cd, name FROM project ORDER BY cd").fetchall()
+    return [dict(r) for r in rows]
+
+
+def _invalidate_catalog(project_id: int | None):
+    """プロジェクトの変更で影響する参照データを破棄（案件一覧はプロジェクトcdを含む、Noneはステータス名も全件）"""
+    catalog.projects.invalidate()
+    catalog.issues.invalidate()
+    catalog.status_labels.invalidate(project_id)
+
+
+def _load_summary(project_id: int) -> dict:
+    """サマリーを1クエリで集計"""
+    with get_db() as conn:
+        row = conn.execute(
+            """SELECT
+                   (SELECT COUNT(*) FROM issue WHERE project_id = :pid) as issue_count,
+                   (SELECT COUNT(*)
+                    FROM task t JOIN issue i ON t.issue_id = i.id
+                    WHERE i.project_id = :pid) as task_count,
+                   (SELECT COALESCE(SUM(e.hours), 0)
+                    FROM issue_estimate_item e JOIN issue i ON e.issue_id = i.id
+                    WHERE i.project_id = :pid) as estimate_total,
+                   (SELECT COALESCE(SUM(w.hours), 0)
+                    FROM work_log w
+                    JOIN task t ON w.task_id = t.id
+                    JOIN issue i ON t.issue_id = i.id
+                    WHERE i.project_id = :pid) as actual_total""",
+            {"pid": project_id}
+        ).fetchone()
+
+    estimate_total = row['estimate_total'] or 0
+    actual_total = row['actual_total'] or 0
+    consumption_rate = (actual_total / estimate_total * 100) if estimate_total > 0 else 0
+
+    return {
+        "issue_count": row['issue_count'],
+        "task_count": row['task_count'],
+        "estimate_total": estimate_total,
+        "actual_total": actual_total,
+        "consumption_rate": round(consumption_rate, 1),
+    }
+
+
+def _load_recent_issues(project_id: int, limit: int) -> list[dict]:
+    """最近の案件を見積・実績の集計結合で取得（案件ごとの相関サブクエリなし）"""
+    with get_db() as conn:
+        rows = conn.execute(
+            """WITH recent AS (
+                   SELECT * FROM issue WHERE project_id = ? ORDER BY id DESC LIMIT ?
+               )
+               SELECT r.*, ps.name as status_name,
+                      COALESCE(est.total, 0) as estimate,
+                      COALESCE(act.total, 0) as actual
+               FROM recent r
+               LEFT JOIN project_status ps ON r.project_id = ps.project_id AND r.status = ps.code
+               LEFT JOIN (
+                   SELECT issue_id, SUM(hours) as total
+                   FROM issue_estimate_item
+                   WHERE issue_id IN (SELECT id FROM recent)
+                   GROUP BY issue_id
+               ) est ON r.id = est.issue_id
+               LEFT JOIN (
+                   SELECT t.issue_id, SUM(w.hours) as total
+                   FROM task t
+                   JOIN work_log w ON w.task_id = t.id
+                   WHERE t.issue_id IN (SELECT id FROM recent)
+                   GROUP BY t.issue_id
+               ) act ON r.id = act.issue_id
+               ORDER BY r.id DESC""",
+            (project_id, limit)
+        ).fetchall()
+    return [dict(r) for r in rows]
@@ -3,6 +3,7 @@
 責務: プロジェクトステータスのデータ操作のみ
 """
 from database import get_db
+from . import catalog
 
 
 class StatusService:
@@ -37,6 +38,7 @@ class StatusService:
                 (project_id, code, name, sort_order)
             )
             row = conn.execute("SELECT * FROM project_status WHERE id = ?", (cur.lastrowid,)).fetchone()
+        catalog.status_labels.invalidate(project_id)
         return dict(row)
 
     @staticmethod
@@ -50,6 +52,7 @@ class StatusService:
             if cur.rowcount == 0:
                 return None
             row = conn.execute("SELECT * FROM project_status WHERE id = ?", (status_id,)).fetchone()
+        catalog.status_labels.invalidate(project_id)
         return dict(row)
 
     @staticmethod
@@ -60,6 +63,7 @@ class StatusService:
                 "DELETE FROM project_status WHERE id = ? AND project_id = ?",
                 (status_id, project_id)
             )
+        catalog.status_labels.invalidate(project_id)
         return cur.rowcount > 0
 
     @staticmethod
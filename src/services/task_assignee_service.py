@@ -40,6 +40,66 @@ class TaskAssigneeService:
             ).fetchall()
         return {(r['task_id'], r['user_id']): r['id'] for r in rows}
 
+    @staticmethod
+    def get_issue_summaries(project_id: int) -> list[dict]:
+        """プロジェクトの案件ごとの作業数とユーザー別担当数を取得（作業のある案件のみ）
+
+        Returns:
+            [{id, cd, name, task_count, user_counts: {user_id: 担当数}}]（案件cd順、担当数は担当のあるユーザーのみ）
+        """
+        with get_db() as conn:
+            issues = conn.execute(
+                """SELECT i.id, i.cd, i.name, COUNT(t.id) as task_count
+                   FROM issue i
+                   JOIN task t ON t.issue_id = i.id
+                   WHERE i.project_id = ?
+                   GROUP BY i.id
+                   ORDER BY i.cd""",
+                (project_id,)
+            ).fetchall()
+            counts = conn.execute(
+                """SELECT t.issue_id, ta.user_id, COUNT(*) as count
+                   FROM task_assignee ta
+                   JOIN task t ON ta.task_id = t.id
+                   JOIN issue i ON t.issue_id = i.id
+                   WHERE i.project_id = ?
+                   GROUP BY t.issue_id, ta.user_id""",
+                (project_id,)
+            ).fetchall()
+        result = [{**dict(r), 'user_counts': {}} for r in issues]
+        by_id = {r['id']: r for r in result}
+        for c in counts:
+            by_id[c['issue_id']]['user_counts'][c['user_id']] = c['count']
+        return result
+
+    @staticmethod
+    def get_issue_tasks_with_assignees(issue_id: int) -> list[dict]:
+        """案件の作業と担当ユーザーIDを取得
+
+        Returns:
+            [{id, cd, name, user_ids: [user_id]}]（表示順）
+        """
+        with get_db() as conn:
+            tasks = conn.execute(
+                """SELECT id, cd, name FROM task
+                   WHERE issue_id = ?
+                   ORDER BY sort_order, cd""",
+                (issue_id,)
+            ).fetchall()
+            assignments = conn.execute(
+                """SELECT ta.task_id, ta.user_id
+                   FROM task_assignee ta
+                   JOIN task t ON ta.task_id = t.id
+                   WHERE t.issue_id = ?
+                   ORDER BY ta.user_id""",
+                (issue_id,)
+            ).fetchall()
+        result = [{**dict(r), 'user_ids': []} for r in tasks]
+        by_id = {r['id']: r for r in result}
+        for a in assignments:
+            by_id[a['task_id']]['user_ids'].append(a['user_id'])
+        return result
+
     @staticmethod
     def get_task_in_project(task_id: int, project_id: int) -> dict | None:
         """作業の存在確認とプロジェクト所属確認"""
@@ -103,24 +163,249 @@ class TaskAssigneeService:
         return cur.rowcount > 0
 
     @staticmethod
-    def toggle(task_id: int, user_id: int) -> bool:
+    def toggle(task_id: int, user_id: int, project_id: int | None = None) -> dict:
         """担当割当のトグル（存在すれば削除、なければ追加）
 
+        作業・ユーザーの検証、割当の追加/削除、案件集約値の再計算を
+        1トランザクション（BEGIN IMMEDIATE）で行う。
+
+        Args:
+            project_id: 指定時は作業がこのプロジェクトに属することも検証
+
         Returns:
-            True if assigned after toggle, False if unassigned
+            {assigned: トグル後に割当済みか, issue_id,
+             issue_count: 案件内のこのユーザーの担当数, issue_task_count: 案件の作業数}
+
+        Raises:
+            LookupError: 作業（プロジェクト外を含む）またはユーザーが存在しない
+            ValueError: 無効なユーザーへの新規割当
         """
         with get_db() as conn:
-            existing = conn.execute(
-                "SELECT id FROM task_assignee WHERE task_id = ? AND user_id = ?",
-                (task_id, user_id)
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """SELECT t.issue_id, u.id as user_id, u.is_active
+                   FROM task t
+                   JOIN issue i ON t.issue_id = i.id
+                   LEFT JOIN user u ON u.id = :user_id
+                   WHERE t.id = :task_id AND (:project_id IS NULL OR i.project_id = :project_id)""",
+                {"task_id": task_id, "user_id": user_id, "project_id": project_id}
             ).fetchone()
+            if row is None:
+                raise LookupError("作業が見つかりません")
+            if row['user_id'] is None:
+                raise LookupError("ユーザーが見つかりません")
 
-            if existing:
-                conn.execute("DELETE FROM task_assignee WHERE id = ?", (existing['id'],))
-                return False
-            else:
+            cur = conn.execute(
+                "DELETE FROM task_assignee WHERE task_id = ? AND user_id = ?",
+                (task_id, user_id)
+            )
+            assigned = cur.rowcount == 0
+            if assigned:
+                if row['is_active'] == 0:
+                    raise ValueError("無効なユーザーには割当できません")
                 conn.execute(
                     "INSERT INTO task_assignee (task_id, user_id) VALUES (?, ?)",
                     (task_id, user_id)
                 )
-                return True
+
+            counts = conn.execute(
+                """SELECT COUNT(ta.id) as issue_count, COUNT(*) as issue_task_count
+                   FROM task t
+                   LEFT JOIN task_assignee ta ON ta.task_id = t.id AND ta.user_id = ?
+                   WHERE t.issue_id = ?""",
+                (user_id, row['issue_id'])
+            ).fetchone()
+        return {"assigned": assigned, "issue_id": row['issue_id'], **dict(counts)}
+
+    @staticmethod
+    def bulk_assign(project_id: int, user_id: int | None = None, issue_id: int | None = None,
+                    task_id: int | None = None) -> int:
+        """範囲内の作業 × ユーザーを一括割当（既存の割当はそのまま）
+
+        範囲はプロジェクト内の作業を issue_id / task_id で、ユーザーを user_id で絞り込む
+        （user_id省略時は有効ユーザー全員）。1文のINSERT ... SELECTで処理する。
+
+        Returns:
+            追加した割当数
+
+        Raises:
+            LookupError: 案件・作業（プロジェクト外を含む）またはユーザーが存在しない
+            ValueError: 無効なユーザーを指定
+        """
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            task_where, params = _validate_scope(conn, project_id, issue_id, task_id)
+            user_where = "(u.is_active = 1 OR u.is_active IS NULL)"
+            if user_id is not None:
+                user = conn.execute("SELECT is_active FROM user WHERE id = ?", (user_id,)).fetchone()
+                if user is None:
+                    raise LookupError("ユーザーが見つかりません")
+                if user['is_active'] == 0:
+                    raise ValueError("無効なユーザーには割当できません")
+                user_where += " AND u.id = ?"
+                params.append(user_id)
+
+            cur = conn.execute(
+                f"""INSERT INTO task_assignee (task_id, user_id)
+                    SELECT t.id, u.id
+                    FROM task t
+                    JOIN issue i ON t.issue_id = i.id
+                    CROSS JOIN user u
+                    WHERE {task_where} AND {user_where}
+                    ON CONFLICT (task_id, user_id) DO NOTHING""",
+                params
+            )
+        return cur.rowcount
+
+    @staticmethod
+    def bulk_unassign(project_id: int, user_id: int | None = None, issue_id: int | None = None,
+                      task_id: int | None = None) -> int:
+        """範囲内の作業 × ユーザーの割当を一括解除（範囲指定はbulk_assignと同じ、無効ユーザーも対象）
+
+        Returns:
+            解除した割当数
+
+        Raises:
+            LookupError: 案件・作業（プロジェクト外を含む）が存在しない
+        """
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            task_where, params = _validate_scope(conn, project_id, issue_id, task_id)
+            user_where = ""
+            if user_id is not None:
+                user_where = "AND user_id = ?"
+                params.append(user_id)
+
+            cur = conn.execute(
+                f"""DELETE FROM task_assignee
+                    WHERE task_id IN (
+                        SELECT t.id FROM task t
+                        JOIN issue i ON t.issue_id = i.id
+                        WHERE {task_where}
+                    ) {user_where}""",
+                params
+            )
+        return cur.rowcount
+
+    @staticmethod
+    def copy_from_issue(source_issue_id: int, target_issue_id: int, replace: bool = False) -> dict:
+        """他の案件の割当を作業cdの一致する作業へコピー（有効ユーザーのみ）
+
+        Args:
+            replace: Trueならコピー先案件の既存割当を先に解除する
+
+        Returns:
+            {added: 追加した割当数, removed: 解除した割当数}
+
+        Raises:
+            LookupError: 案件が存在しない
+            ValueError: コピー元とコピー先が同じ
+        """
+        if source_issue_id == target_issue_id:
+            raise ValueError("コピー元とコピー先が同じです")
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            found = conn.execute(
+                "SELECT COUNT(*) FROM issue WHERE id IN (?, ?)",
+                (source_issue_id, target_issue_id)
+            ).fetchone()[0]
+            if found < 2:
+                raise LookupError("案件が見つかりません")
+
+            removed = 0
+            if replace:
+                removed = conn.execute(
+                    """DELETE FROM task_assignee
+                       WHERE task_id IN (SELECT id FROM task WHERE issue_id = ?)""",
+                    (target_issue_id,)
+                ).rowcount
+            added = conn.execute(
+                """INSERT INTO task_assignee (task_id, user_id)
+                   SELECT tt.id, ta.user_id
+                   FROM task_assignee ta
+                   JOIN task st ON ta.task_id = st.id
+                   JOIN task tt ON tt.issue_id = :target AND tt.cd = st.cd
+                   JOIN user u ON ta.user_id = u.id
+                   WHERE st.issue_id = :source AND (u.is_active = 1 OR u.is_active IS NULL)
+                   ON CONFLICT (task_id, user_id) DO NOTHING""",
+                {"source": source_issue_id, "target": target_issue_id}
+            ).rowcount
+        return {"added": added, "removed": removed}
+
+    @staticmethod
+    def copy_from_project(source_project_id: int, target_project_id: int, replace: bool = False) -> dict:
+        """他のプロジェクトの割当を案件cd・作業cdの一致する作業へコピー（有効ユーザーのみ）
+
+        Args:
+            replace: Trueならコピー先プロジェクトの既存割当を先に解除する
+
+        Returns:
+            {added: 追加した割当数, removed: 解除した割当数}
+
+        Raises:
+            LookupError: プロジェクトが存在しない
+            ValueError: コピー元とコピー先が同じ
+        """
+        if source_project_id == target_project_id:
+            raise ValueError("コピー元とコピー先が同じです")
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            found = conn.execute(
+                "SELECT COUNT(*) FROM project WHERE id IN (?, ?)",
+                (source_project_id, target_project_id)
+            ).fetchone()[0]
+            if found < 2:
+                raise LookupError("プロジェクトが見つかりません")
+
+            removed = 0
+            if replace:
+                removed = conn.execute(
+                    """DELETE FROM task_assignee
+                       WHERE task_id IN (
+                           SELECT t.id FROM task t
+                           JOIN issue i ON t.issue_id = i.id
+                           WHERE i.project_id = ?
+                       )""",
+                    (target_project_id,)
+                ).rowcount
+            added = conn.execute(
+                """INSERT INTO task_assignee (task_id, user_id)
+                   SELECT tt.id, ta.user_id
+                   FROM task_assignee ta
+                   JOIN task st ON ta.task_id = st.id
+                   JOIN issue si ON st.issue_id = si.id
+                   JOIN issue ti ON ti.project_id = :target AND ti.cd = si.cd
+                   JOIN task tt ON tt.issue_id = ti.id AND tt.cd = st.cd
+                   JOIN user u ON ta.user_id = u.id
+                   WHERE si.project_id = :source AND (u.is_active = 1 OR u.is_active IS NULL)
+                   ON CONFLICT (task_id, user_id) DO NOTHING""",
+                {"source": source_project_id, "target": target_project_id}
+            ).rowcount
+        return {"added": added, "removed": removed}
+
+
+def _validate_scope(conn, project_id: int, issue_id: int | None, task_id: int | None) -> tuple[str, list]:
+    """一括操作の作業範囲を検証し、task t / issue i に対するWHERE条件を返す
+
+    Raises:
+        LookupError: 案件・作業がプロジェクト内に存在しない
+    """
+    conditions = ["i.project_id = ?"]
+    params = [project_id]
+    if issue_id is not None:
+        if not conn.execute(
+            "SELECT 1 FROM issue WHERE id = ? AND project_id = ?", (issue_id, project_id)
+        ).fetchone():
+            raise LookupError("案件が見つかりません")
+        conditions.append("t.issue_id = ?")
+        params.append(issue_id)
+    if task_id is not None:
+        if not conn.execute(
+            """SELECT 1 FROM task t JOIN issue i ON t.issue_id = i.id
+               WHERE t.id = ? AND i.project_id = ?""",
+            (task_id, project_id)
+        ).fetchone():
+            raise LookupError("作業が見つかりません")
+        conditions.append("t.id = ?")
+        params.append(task_id)
+    return " AND ".join(conditions), params
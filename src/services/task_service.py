@@ -3,46 +3,70 @@
 責務: 作業のデータ操作のみ
 """
 from database import get_db
+from .pagination import sort_expr, build_seek, order_by
+from .fulltext import build_search, RANK_SORT
+from .batch import check_codes, check_ids, check_parents, code_owners, batch_results
 
 
 class TaskService:
     """作業関連のデータ操作"""
 
     @staticmethod
-    def get_all(issue_id: int = None, project_id: int = None, sort: str = "cd", order: str = "asc", q: str = "") -> list[dict]:
-        """作業一覧を取得"""
+    def get_all(issue_id: int = None, project_id: int = None, sort: str = "cd", order: str = "asc", q: str = "",
+                limit: int | None = None, cursor: str | None = None) -> list[dict]:
+        """作業一覧を取得（limit/cursor指定でキーセットページング）
+
+        qは全文検索索引（3文字以上）またはLIKE（3文字未満）で絞り込む。
+        sort="rank" は全文検索時のみ関連度順、それ以外はcd順。
+        """
         allowed_sorts = {"cd", "name", "description"}
-        if sort not in allowed_sorts:
-            sort = "cd"
-        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        join, conditions, params, rank = "", [], [], None
 
-        with get_db() as conn:
-            conditions = []
-            params = []
+        if q:
+            join, condition, params, rank = build_search(
+                "task", "t.id", q, ("t.cd", "t.name", "t.description")
+            )
+            conditions.append(condition)
+
+        if sort == RANK_SORT and rank:
+            expr = rank
+        else:
+            if sort not in allowed_sorts:
+                sort = "cd"
+            expr = sort_expr(f"t.{sort}", nullable=sort == "description")
+        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        rank_column = f", {rank} as rank" if expr == rank else ""
 
-            if issue_id:
-                conditions.append("t.issue_id = ?")
-                params.append(issue_id)
+        if issue_id:
+            conditions.append("t.issue_id = ?")
+            params.append(issue_id)
 
-            if project_id:
-                conditions.append("i.project_id = ?")
-                params.append(project_id)
+        if project_id:
+            conditions.append("i.project_id = ?")
+            params.append(project_id)
 
-            if q:
-                like = f"%{q}%"
-                conditions.append("(t.cd LIKE ? OR t.name LIKE ? OR t.description LIKE ?)")
-                params.extend([like, like, like])
+        seek, seek_params = build_seek(expr, "t.id", order_dir, cursor)
+        if seek:
+            conditions.append(seek)
+            params.extend(seek_params)
 
-            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
 
+        with get_db() as conn:
             rows = conn.execute(
                 f"""SELECT t.*, i.cd as issue_cd, i.name as issue_name,
-                           p.id as project_id, p.cd as project_cd, p.name as project_name
+                           p.id as project_id, p.cd as project_cd, p.name as project_name{rank_column}
                     FROM task t
+                    {join}
                     JOIN issue i ON t.issue_id = i.id
                     JOIN project p ON i.project_id = p.id
                     {where}
-                    ORDER BY t.{sort} {order_dir}""",
+                    {order_by(expr, 't.id', order_dir)}
+                    {limit_clause}""",
                 params
             ).fetchall()
         return [dict(r) for r in rows]
@@ -102,6 +126,54 @@ class TaskService:
             ).fetchone()
         return dict(row)
 
+    @staticmethod
+    def create_many(items: list[dict]) -> dict:
+        """作業一括作成（案件の存在・cdの重複を一括で検証し、通った項目のみ1トランザクションで作成）
+
+        Args:
+            items: [{issue_id, cd, name, description}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        keys = [(item["issue_id"], item["cd"]) for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors = check_parents(conn, "issue", [item["issue_id"] for item in items], "案件が見つかりません")
+            check_codes(conn, "task", keys, scope="issue_id", errors=errors)
+            valid = [i for i in range(len(items)) if i not in errors]
+            conn.executemany(
+                "INSERT INTO task (cd, issue_id, name, description) VALUES (?, ?, ?, ?)",
+                [(items[i]["cd"], items[i]["issue_id"], items[i]["name"], items[i]["description"]) for i in valid]
+            )
+            owners = code_owners(conn, "task", [keys[i] for i in valid], scope="issue_id")
+        return batch_results([owners.get(key) for key in keys], errors)
+
+    @staticmethod
+    def update_many(items: list[dict]) -> dict:
+        """作業一括更新（cdは案件内で重複不可、通った項目のみ1トランザクションで更新）
+
+        Args:
+            items: [{id, cd, name, description}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        ids = [item["id"] for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors, issues = check_ids(conn, "task", ids, "作業が見つかりません", scope="issue_id")
+            check_codes(
+                conn, "task", [(issues.get(item["id"]), item["cd"]) for item in items],
+                scope="issue_id", own_ids=ids, errors=errors
+            )
+            conn.executemany(
+                "UPDATE task SET cd = ?, name = ?, description = ? WHERE id = ?",
+                [(item["cd"], item["name"], item["description"], item["id"])
+                 for i, item in enumerate(items) if i not in errors]
+            )
+        return batch_results(ids, errors)
+
     @staticmethod
     def update_progress(task_id: int, progress_rate: int) -> bool:
         """進捗率更新"""
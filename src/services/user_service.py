@@ -3,34 +3,59 @@
 責務: ユーザーのデータ操作のみ
 """
 from database import get_db
+from .pagination import build_seek, order_by
+from .fulltext import build_search, RANK_SORT
+from .autocomplete import user_index
+from .batch import check_codes, check_ids, code_owners, batch_results
+from . import catalog
 
 
 class UserService:
     """ユーザー関連のデータ操作"""
 
     @staticmethod
-    def get_all(sort: str = "cd", order: str = "asc", q: str = "", active_only: bool = False) -> list[dict]:
-        """ユーザー一覧を取得"""
+    def get_all(sort: str = "cd", order: str = "asc", q: str = "", active_only: bool = False,
+                limit: int | None = None, cursor: str | None = None) -> list[dict]:
+        """ユーザー一覧を取得（limit/cursor指定でキーセットページング）
+
+        qは全文検索索引（3文字以上）またはLIKE（3文字未満）で絞り込む。
+        sort="rank" は全文検索時のみ関連度順、それ以外はcd順。
+        """
         allowed_sorts = {"cd", "name", "email"}
-        if sort not in allowed_sorts:
-            sort = "cd"
-        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        join, conditions, params, rank = "", [], [], None
 
-        with get_db() as conn:
-            conditions = []
-            params = []
+        if q:
+            join, condition, params, rank = build_search(
+                "user", "u.id", q, ("u.cd", "u.name", "u.email")
+            )
+            conditions.append(condition)
+
+        if active_only:
+            conditions.append("(u.is_active = 1 OR u.is_active IS NULL)")
 
-            if active_only:
-                conditions.append("(is_active = 1 OR is_active IS NULL)")
+        if sort == RANK_SORT and rank:
+            expr = rank
+        else:
+            if sort not in allowed_sorts:
+                sort = "cd"
+            expr = f"u.{sort}"
+        order_dir = "DESC" if order.lower() == "desc" else "ASC"
+        columns = f"u.*, {rank} as rank" if expr == rank else "u.*"
+
+        seek, seek_params = build_seek(expr, "u.id", order_dir, cursor)
+        if seek:
+            conditions.append(seek)
+            params.extend(seek_params)
 
-            if q:
-                like = f"%{q}%"
-                conditions.append("(cd LIKE ? OR name LIKE ? OR email LIKE ?)")
-                params.extend([like, like, like])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
 
-            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with get_db() as conn:
             rows = conn.execute(
-                f"SELECT * FROM user {where} ORDER BY {sort} {order_dir}",
+                f"SELECT {columns} FROM user u {join} {where} {order_by(expr, 'u.id', order_dir)} {limit_clause}",
                 params
             ).fetchall()
         return [dict(r) for r in rows]
@@ -42,12 +67,8 @@ class UserService:
 
     @staticmethod
     def get_active_list() -> list[dict]:
-        """有効なユーザー一覧を取得（フィルター用の最小フィールド）"""
-        with get_db() as conn:
-            rows = conn.execute(
-                "SELECT id, cd, name FROM user WHERE is_active = 1 OR is_active IS NULL ORDER BY cd"
-            ).fetchall()
-        return [dict(r) for r in rows]
+        """有効なユーザー一覧を取得（フィルター用の最小フィールド、カタログキャッシュ）"""
+        return list(catalog.active_users.get(None, _load_active_list))
 
     @staticmethod
     def get_by_id(user_id: int) -> dict | None:
@@ -65,6 +86,8 @@ class UserService:
                 (cd, name, email)
             )
             row = conn.execute("SELECT * FROM user WHERE id = ?", (cur.lastrowid,)).fetchone()
+        user_index.refresh(row['id'])
+        catalog.active_users.invalidate()
         return dict(row)
 
     @staticmethod
@@ -78,27 +101,92 @@ class UserService:
             if cur.rowcount == 0:
                 return None
             row = conn.execute("SELECT * FROM user WHERE id = ?", (user_id,)).fetchone()
+        user_index.refresh(user_id)
+        catalog.active_users.invalidate()
         return dict(row)
 
+    @staticmethod
+    def create_many(items: list[dict]) -> dict:
+        """ユーザー一括作成（検証を通った項目のみ1トランザクションで作成）
+
+        Args:
+            items: [{cd, name, email}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        keys = [(None, item["cd"]) for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors = check_codes(conn, "user", keys)
+            valid = [i for i in range(len(items)) if i not in errors]
+            conn.executemany(
+                "INSERT INTO user (cd, name, email) VALUES (?, ?, ?)",
+                [(items[i]["cd"], items[i]["name"], items[i]["email"]) for i in valid]
+            )
+            owners = code_owners(conn, "user", [keys[i] for i in valid])
+        if valid:
+            catalog.active_users.invalidate()
+        return batch_results([owners.get(key) for key in keys], errors)
+
+    @staticmethod
+    def update_many(items: list[dict]) -> dict:
+        """ユーザー一括更新（検証を通った項目のみ1トランザクションで更新）
+
+        Args:
+            items: [{id, cd, name, email}]
+
+        Returns:
+            {succeeded, failed, results: 入力順の [{index, id, error}]}
+        """
+        ids = [item["id"] for item in items]
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            errors, _ = check_ids(conn, "user", ids, "ユーザーが見つかりません")
+            check_codes(conn, "user", [(None, item["cd"]) for item in items], own_ids=ids, errors=errors)
+            valid = [item for i, item in enumerate(items) if i not in errors]
+            conn.executemany(
+                "UPDATE user SET cd = ?, name = ?, email = ? WHERE id = ?",
+                [(item["cd"], item["name"], item["email"], item["id"]) for item in valid]
+            )
+        if valid:
+            catalog.active_users.invalidate()
+        return batch_results(ids, errors)
+
     @staticmethod
     def delete(user_id: int) -> bool:
         """ユーザー削除"""
         with get_db() as conn:
             cur = conn.execute("DELETE FROM user WHERE id = ?", (user_id,))
+        user_index.refresh(user_id)
+        catalog.active_users.invalidate()
         return cur.rowcount > 0
 
     @staticmethod
     def get_attributes(user_id: int) -> dict:
         """ユーザーの属性値を取得（type_id -> {option_id, option_name}）"""
+        return UserService.get_attributes_for_users([user_id]).get(user_id, {})
+
+    @staticmethod
+    def get_attributes_for_users(user_ids: list[int]) -> dict[int, dict]:
+        """複数ユーザーの属性値を1クエリで取得（user_id -> type_id -> {option_id, option_name}）"""
+        if not user_ids:
+            return {}
+        placeholders = ",".join("?" * len(user_ids))
         with get_db() as conn:
             attrs = conn.execute(
-                """SELECT ua.type_id, ua.option_id, uao.name as option_name
-                   FROM user_attribute ua
-                   JOIN user_attribute_option uao ON ua.option_id = uao.id
-                   WHERE ua.user_id = ?""",
-                (user_id,)
+                f"""SELECT ua.user_id, ua.type_id, ua.option_id, uao.name as option_name
+                    FROM user_attribute ua
+                    JOIN user_attribute_option uao ON ua.option_id = uao.id
+                    WHERE ua.user_id IN ({placeholders})""",
+                list(user_ids)
             ).fetchall()
-        return {a['type_id']: {'option_id': a['option_id'], 'option_name': a['option_name']} for a in attrs}
+        result = {}
+        for a in attrs:
+            result.setdefault(a['user_id'], {})[a['type_id']] = {
+                'option_id': a['option_id'], 'option_name': a['option_name']
+            }
+        return result
 
     @staticmethod
     def set_attribute(user_id: int, type_id: int, option_id: int | None) -> bool:
@@ -120,21 +208,64 @@ class UserService:
 
     @staticmethod
     def get_attribute_types() -> list[dict]:
-        """全属性タイプと選択肢を取得"""
+        """全属性タイプと選択肢を1クエリで取得"""
         with get_db() as conn:
-            types = conn.execute(
-                "SELECT * FROM user_attribute_type ORDER BY sort_order ASC, id ASC"
+            rows = conn.execute(
+                """SELECT t.id, t.code, t.name,
+                          o.id as option_id, o.code as option_code, o.name as option_name
+                   FROM user_attribute_type t
+                   LEFT JOIN user_attribute_option o ON o.type_id = t.id
+                   ORDER BY t.sort_order ASC, t.id ASC, o.sort_order ASC, o.id ASC"""
             ).fetchall()
-            result = []
-            for t in types:
-                options = conn.execute(
-                    "SELECT * FROM user_attribute_option WHERE type_id = ? ORDER BY sort_order ASC, id ASC",
-                    (t['id'],)
-                ).fetchall()
-                result.append({
-                    'id': t['id'],
-                    'code': t['code'],
-                    'name': t['name'],
-                    'options': [{'id': o['id'], 'code': o['code'], 'name': o['name']} for o in options]
-                })
+        result = []
+        by_id = {}
+        for r in rows:
+            t = by_id.get(r['id'])
+            if t is None:
+                t = by_id[r['id']] = {'id': r['id'], 'code': r['code'], 'name': r['name'], 'options': []}
+                result.append(t)
+            if r['option_id'] is not None:
+                t['options'].append({'id': r['option_id'], 'code': r['option_code'], 'name': r['option_name']})
         return result
+
+
+class UserAttributeLoader:
+    """リクエスト内の属性ローダー（identity map）
+
+    属性タイプは初回参照時に1回、属性値はprimeで一覧分を1クエリで読み込み、
+    以降は同じリクエスト内で保持した値を返す。
+    """
+
+    def __init__(self):
+        self._types = None
+        self._attrs = {}
+
+    @property
+    def types(self) -> list[dict]:
+        """全属性タイプと選択肢"""
+        if self._types is None:
+            self._types = UserService.get_attribute_types()
+        return self._types
+
+    def prime(self, user_ids: list[int]):
+        """未読込のユーザーの属性値をまとめて読み込む"""
+        missing = [uid for uid in user_ids if uid not in self._attrs]
+        if not missing:
+            return
+        loaded = UserService.get_attributes_for_users(missing)
+        for uid in missing:
+            self._attrs[uid] = loaded.get(uid, {})
+
+    def attributes(self, user_id: int) -> dict:
+        """ユーザーの属性値（未読込なら単独で読み込む）"""
+        self.prime([user_id])
+        return self._attrs[user_id]
+
+
+def _load_active_list() -> list[dict]:
+    """有効ユーザー一覧（フィルター用）を取得"""
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT id, cd, name FROM user WHERE is_active = 1 OR is_active IS NULL ORDER BY cd"
+        ).fetchall()
+    return [dict(r) for r in rows]
@@ -4,6 +4,7 @@
 """
 from datetime import date
 from database import get_db
+from .pagination import build_seek, order_by
 
 
 class WorkLogService:
@@ -16,9 +17,14 @@ class WorkLogService:
         project_id: int = None,
         issue_id: int = None,
         start_date: date = None,
-        end_date: date = None
+        end_date: date = None,
+        limit: int | None = None,
+        cursor: str | None = None
     ) -> list[dict]:
-        """実績一覧を取得"""
+        """実績一覧を取得
+
+        limit/cursor指定時は (work_date, id) の降順でキーセットページングする。
+        """
         with get_db() as conn:
             conditions = []
             params = []
@@ -47,8 +53,22 @@ class WorkLogService:
                 conditions.append("wl.work_date <= ?")
                 params.append(end_date.isoformat())
 
+            seek, seek_params = build_seek("wl.work_date", "wl.id", "DESC", cursor)
+            if seek:
+                conditions.append(seek)
+                params.extend(seek_params)
+
             where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
+            if limit or cursor:
+                order = order_by("wl.work_date", "wl.id", "DESC")
+            else:
+                order = "ORDER BY wl.work_date DESC, p.cd, i.cd, t.cd"
+            limit_clause = ""
+            if limit:
+                limit_clause = "LIMIT ?"
+                params.append(limit)
+
             rows = conn.execute(
                 f"""SELECT wl.*,
                            t.cd as task_cd, t.name as task_name,
@@ -61,7 +81,8 @@ class WorkLogService:
                     JOIN project p ON i.project_id = p.id
                     JOIN user u ON wl.user_id = u.id
                     {where}
-                    ORDER BY wl.work_date DESC, p.cd, i.cd, t.cd""",
+                    {order}
+                    {limit_clause}""",
                 params
             ).fetchall()
         return [dict(r) for r in rows]
@@ -285,3 +306,36 @@ class WorkLogService:
                 (user_id, target_date.isoformat())
             ).fetchall()
         return [dict(r) for r in rows]
+
+    @staticmethod
+    def get_users_daily_logs(user_ids: list[int], start_date: date, end_date: date) -> list[dict]:
+        """複数ユーザーの期間内の実績を1クエリで取得（業務終了報告の一括出力用）
+
+        Returns:
+            [{user_id, work_date, hours, task_name, progress_rate, issue_cd, issue_name,
+              project_cd, project_name}]（ユーザー・日付・プロジェクト・案件・作業順）
+        """
+        if not user_ids:
+            return []
+        placeholders = ",".join("?" * len(user_ids))
+        with get_db() as conn:
+            rows = conn.execute(
+                f"""SELECT
+                    wl.user_id,
+                    wl.work_date,
+                    wl.hours,
+                    t.name as task_name,
+                    t.progress_rate,
+                    i.cd as issue_cd,
+                    i.name as issue_name,
+                    p.cd as project_cd,
+                    p.name as project_name
+                FROM work_log wl
+                JOIN task t ON wl.task_id = t.id
+                JOIN issue i ON t.issue_id = i.id
+                JOIN project p ON i.project_id = p.id
+                WHERE wl.work_date BETWEEN ? AND ? AND wl.user_id IN ({placeholders})
+                ORDER BY wl.user_id, wl.work_date, p.cd, i.cd, t.name""",
+                (start_date.isoformat(), end_date.isoformat(), *user_ids)
+            ).fetchall()
+        return [dict(r) for r in rows]
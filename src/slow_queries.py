@@ -0,0 +1,190 @@
+"""スロークエリログ
+
+責務: しきい値を超えたSQL文の記録（正規化SQLごとの集約・実行計画の取得）のみ
+
+SQLはリテラル・空白・IN句の?の並びを正規化した文字列で集約し、
+初回（と計画の取得からPLAN_REFRESH秒以上経過後）だけ同じ接続で EXPLAIN QUERY PLAN を実行する。
+トランザクション制御（BEGIN等）・PRAGMAは記録しない。BEGINの時間は書き込みロックの待ち時間なので、
+スロークエリとは別にロック待ちとして集計する。
+記録はワーカー（プロセス）ごとのメモリ上に保持し、同時にloggerへも警告を出す。
+
+設定（環境変数）:
+    SLOW_QUERY_MS: 記録するしきい値(ミリ秒)。"off"で無効 既定: 200
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+_setting = os.getenv("SLOW_QUERY_MS", "200")
+SLOW_QUERY_THRESHOLD = None if _setting == "off" else float(_setting) / 1000
+
+# 保持する正規化SQLの上限（超えたら最終記録が最も古いものから破棄）
+MAX_ENTRIES = 200
+
+# 実行計画を取り直す間隔（秒）
+PLAN_REFRESH = 600
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"[:@$]\w+")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+# スロークエリとして記録しない文（実行計画がなく、時間の大半がロック待ち）
+_NOT_RECORDED = re.compile(r"\s*(?:BEGIN|COMMIT|END|ROLLBACK|SAVEPOINT|RELEASE|PRAGMA)\b", re.IGNORECASE)
+_BEGIN = re.compile(r"\s*BEGIN\b", re.IGNORECASE)
+
+
+def is_recorded(sql: str) -> bool:
+    """スロークエリとして記録する文か（トランザクション制御・PRAGMA以外）"""
+    return _NOT_RECORDED.match(sql) is None
+
+
+def is_lock_wait(sql: str) -> bool:
+    """時間をロック待ちとして集計する文か（BEGIN）"""
+    return _BEGIN.match(sql) is not None
+
+
+def normalize_sql(sql: str) -> str:
+    """集約用にSQLを正規化（リテラル・名前付きパラメータを?に、?の並びを1つに、空白を1つに）"""
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _NAMED_PARAM.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _PARAM_LIST.sub("?, ...", text)
+
+
+def param_shape(parameters) -> str:
+    """バインドパラメータの形（値は含めない）
+
+    例: (1, 2, 3, "a") -> "int×3, str" / {"start": "2026-01"} -> "start: str"
+    """
+    if isinstance(parameters, dict):
+        return ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items())
+    shape = []
+    for value in parameters:
+        name = type(value).__name__
+        if shape and shape[-1][0] == name:
+            shape[-1][1] += 1
+        else:
+            shape.append([name, 1])
+    return ", ".join(name if count == 1 else f"{name}×{count}" for name, count in shape)
+
+
+def explain(conn: sqlite3.Connection, sql: str, parameters) -> list[str]:
+    """EXPLAIN QUERY PLAN の結果（親子関係をインデントで表した行）"""
+    try:
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"(取得失敗: {e})"]
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+@dataclass
+class SlowQuery:
+    """正規化SQL 1件分の記録（時間は秒）"""
+    normalized: str
+    sql: str
+    params: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_seen: float = 0.0
+    plan: list[str] = field(default_factory=list)
+    planned_at: float = 0.0
+
+
+@dataclass
+class LockWait:
+    """しきい値を超えたロック待ち（BEGIN）の集計（時間は秒）"""
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_seen: float = 0.0
+
+
+class SlowQueryLog:
+    """しきい値を超えたSQL文の記録
+
+    Args:
+        threshold: 記録するしきい値（秒、Noneは無効）
+        max_entries: 保持する正規化SQLの上限
+    """
+
+    def __init__(self, threshold: float | None = SLOW_QUERY_THRESHOLD, max_entries: int = MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = {}
+        self.lock_wait = LockWait()
+        self._lock = threading.Lock()
+
+    def record(self, conn: sqlite3.Connection, sql: str, parameters, duration: float) -> SlowQuery:
+        """しきい値を超えた文を記録（必要なら実行計画を取得）"""
+        normalized = normalize_sql(sql)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(normalized, None)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+                entry = SlowQuery(normalized, sql, param_shape(parameters))
+            # 最終記録順に並べる（先頭が最も古い）
+            self._entries[normalized] = entry
+            entry.count += 1
+            entry.total_time += duration
+            entry.max_time = max(entry.max_time, duration)
+            entry.last_seen = now
+            needs_plan = now - entry.planned_at >= PLAN_REFRESH
+            if needs_plan:
+                entry.planned_at = now
+
+        if needs_plan:
+            entry.plan = explain(conn, sql, parameters)
+        logger.warning("スロークエリ %.1fms: %s [%s]", duration * 1000, normalized, entry.params)
+        return entry
+
+    def record_lock_wait(self, sql: str, duration: float):
+        """しきい値を超えたロック待ちを記録"""
+        with self._lock:
+            self.lock_wait.count += 1
+            self.lock_wait.total_time += duration
+            self.lock_wait.max_time = max(self.lock_wait.max_time, duration)
+            self.lock_wait.last_seen = time.time()
+        logger.warning("ロック待ち %.1fms: %s", duration * 1000, normalize_sql(sql))
+
+    def extend(self, entry: SlowQuery, duration: float, added: float):
+        """記録済みの文の時間を取得完了までの時間に更新（durationは更新後の文全体の時間）"""
+        with self._lock:
+            entry.total_time += added
+            entry.max_time = max(entry.max_time, duration)
+
+    def entries(self, sort: str = "total") -> list[SlowQuery]:
+        """記録一覧（sort: total / max / count / recent の降順）"""
+        keys = {
+            "total": lambda e: e.total_time,
+            "max": lambda e: e.max_time,
+            "count": lambda e: e.count,
+            "recent": lambda e: e.last_seen,
+        }
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=keys.get(sort, keys["total"]), reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.lock_wait = LockWait()
+
+
+# このプロセスのスロークエリログ
+slow_query_log = SlowQueryLog()
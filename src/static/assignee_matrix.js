@@ -0,0 +1,319 @@
+/**
+ * 担当割当マトリクス（コンパクト表示）
+ *
+ * サーバーからはユーザー列と案件ごとの集約値だけを受け取り、
+ * 案件の作業と割当は表示範囲に入った案件だけ /api/v1 から読み込む。
+ * ユーザー列は横スクロール位置から見えている範囲だけを描画し、
+ * セルと一括割当ボタンのクリックはテーブルに置いた1つのハンドラーで処理する。
+ */
+
+const MATRIX_CELL_WIDTH = 64;   // ユーザー列の幅(px)（styles.cssと揃える）
+const MATRIX_ROW_HEIGHT = 37;   // 作業行の高さ(px)（未読み込み案件の高さの見積もり）
+const MATRIX_OVERSCAN = 4;      // 表示範囲の外に余分に描画する列数
+
+/**
+ * HTMLエスケープ
+ * @param {*} value - 対象の値
+ * @returns {string} エスケープ済み文字列
+ */
+function escapeHtml(value) {
+    const entities = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+    return String(value).replace(/[&<>"']/g, (c) => entities[c]);
+}
+
+/**
+ * 一括割当/解除ボタン
+ * @param {string} action - assign / unassign
+ * @param {string} label - ボタンの表示
+ * @param {string} title - 操作の説明（確認メッセージにも使う）
+ * @param {string} scope - task / user
+ * @param {number} id - 作業ID / ユーザーID
+ * @returns {string} ボタンHTML
+ */
+function bulkButton(action, label, title, scope, id) {
+    return `<button type="button" class="bulk-btn" title="${escapeHtml(title)}" ` +
+        `data-action="${action}" data-${scope}="${id}">${label}</button>`;
+}
+
+class CompactMatrix {
+    /**
+     * @param {HTMLElement} root - .compact-matrix 要素
+     */
+    constructor(root) {
+        this.root = root;
+        this.table = root.querySelector('table');
+        this.head = root.querySelector('thead tr');
+        this.apiBase = `/api/v1/projects/${root.dataset.projectId}/assignees`;
+        this.users = JSON.parse(root.dataset.users);
+        this.range = null;
+        this.frame = null;
+        this.visible = new Set();
+        this.sections = new Map();
+
+        root.querySelectorAll('tbody.issue-section').forEach((el) => {
+            const counts = Object.entries(JSON.parse(el.dataset.counts));
+            this.sections.set(el, {
+                issueId: Number(el.dataset.issueId),
+                label: el.querySelector('.issue-name').innerHTML,
+                taskCount: Number(el.dataset.taskCount),
+                counts: new Map(counts.map(([userId, count]) => [Number(userId), count])),
+                tasks: null,
+                loading: false,
+                paintedRange: null,
+            });
+        });
+
+        this.onResize = () => this.schedulePaint();
+        this.observer = new IntersectionObserver(
+            (entries) => this.onIntersect(entries),
+            { rootMargin: '300px 0px' }
+        );
+        this.sections.forEach((_, el) => this.observer.observe(el));
+        root.addEventListener('scroll', () => this.schedulePaint());
+        window.addEventListener('resize', this.onResize);
+        this.table.addEventListener('click', (e) => this.onClick(e));
+
+        this.paint(true);
+    }
+
+    /**
+     * 横スクロール位置から描画するユーザー列の範囲を求める
+     * @returns {number[]} [開始index, 終了index)
+     */
+    columnRange() {
+        const taskColumn = this.head.firstElementChild.offsetWidth;
+        const width = Math.max(this.root.clientWidth - taskColumn, MATRIX_CELL_WIDTH);
+        const left = this.root.scrollLeft;
+        const start = Math.max(0, Math.floor(left / MATRIX_CELL_WIDTH) - MATRIX_OVERSCAN);
+        const end = Math.min(this.users.length, Math.ceil((left + width) / MATRIX_CELL_WIDTH) + MATRIX_OVERSCAN);
+        return [start, end];
+    }
+
+    schedulePaint() {
+        if (!this.root.isConnected) {
+            this.destroy();
+            return;
+        }
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.paint(false);
+        });
+    }
+
+    /**
+     * 見えている列の範囲が変わったらヘッダーと表示中の案件を描き直す
+     * @param {boolean} force - 範囲が同じでも描画する
+     */
+    paint(force) {
+        const range = this.columnRange();
+        if (!force && this.range && range[0] === this.range[0] && range[1] === this.range[1]) return;
+        this.range = range;
+
+        const taskColumn = this.head.firstElementChild.offsetWidth;
+        this.table.style.width = `${taskColumn + this.users.length * MATRIX_CELL_WIDTH}px`;
+        this.head.innerHTML = '<th class="task-header">案件 / 作業</th>' + this.rowCells('th', (u) =>
+            `<th class="user-header" title="${escapeHtml(u.cd)}">${escapeHtml(u.cd)}<div class="bulk-actions">` +
+            bulkButton('assign', '+', `${u.cd} を全作業に割当`, 'user', u.id) +
+            bulkButton('unassign', '−', `${u.cd} の割当をすべて解除`, 'user', u.id) +
+            '</div></th>'
+        );
+        this.sections.forEach((section, el) => {
+            if (force || this.visible.has(el)) this.paintSection(el, section);
+        });
+    }
+
+    /**
+     * 表示範囲の列だけセルを生成し、範囲外は幅だけのスペーサーで埋める
+     * @param {string} tag - スペーサーのタグ（th / td）
+     * @param {function} render - ユーザー -> セルHTML
+     * @returns {string} セルHTML
+     */
+    rowCells(tag, render) {
+        const [start, end] = this.range;
+        const rest = this.users.length - end;
+        let html = start > 0 ? `<${tag} class="col-spacer" style="width: ${start * MATRIX_CELL_WIDTH}px"></${tag}>` : '';
+        for (let i = start; i < end; i++) {
+            html += render(this.users[i]);
+        }
+        if (rest > 0) {
+            html += `<${tag} class="col-spacer" style="width: ${rest * MATRIX_CELL_WIDTH}px"></${tag}>`;
+        }
+        return html;
+    }
+
+    /**
+     * 案件1件分（集約行 + 作業行）を描画
+     */
+    paintSection(el, section) {
+        section.paintedRange = this.range;
+        let html = `<tr class="issue-row"><td class="issue-name">${section.label}</td>` +
+            this.rowCells('td', (u) => {
+                const count = section.counts.get(u.id) || 0;
+                const full = section.taskCount > 0 && count >= section.taskCount;
+                const title = full ? '案件の割当をすべて解除' : '案件の全作業に割当';
+                return `<td class="issue-cell bulk-cell" data-user="${u.id}" title="${title}">${count > 0 ? `(${count})` : '-'}</td>`;
+            }) + '</tr>';
+
+        if (section.tasks) {
+            for (const task of section.tasks) {
+                html += `<tr class="task-row" data-task="${task.id}">` +
+                    `<td class="task-name">├─ ${escapeHtml(task.cd)} ${escapeHtml(task.name)}<span class="bulk-actions">` +
+                    bulkButton('assign', '+', '全ユーザーを割当', 'task', task.id) +
+                    bulkButton('unassign', '−', '割当をすべて解除', 'task', task.id) +
+                    '</span></td>' +
+                    this.rowCells('td', (u) => task.userIds.has(u.id)
+                        ? `<td class="task-cell assigned" data-user="${u.id}">●</td>`
+                        : `<td class="task-cell" data-user="${u.id}"></td>`
+                    ) + '</tr>';
+            }
+        } else {
+            html += `<tr class="section-placeholder"><td style="height: ${section.taskCount * MATRIX_ROW_HEIGHT}px"></td></tr>`;
+        }
+        el.innerHTML = html;
+    }
+
+    onIntersect(entries) {
+        for (const entry of entries) {
+            const section = this.sections.get(entry.target);
+            if (!entry.isIntersecting) {
+                this.visible.delete(entry.target);
+                continue;
+            }
+            this.visible.add(entry.target);
+            if (!section.tasks) {
+                this.load(entry.target, section).catch(() => {});
+            } else if (section.paintedRange !== this.range) {
+                this.paintSection(entry.target, section);
+            }
+        }
+    }
+
+    /**
+     * 案件の作業と割当を読み込んで描画
+     */
+    async load(el, section) {
+        if (section.loading) return;
+        section.loading = true;
+        try {
+            const tasks = await this.request('GET', `/issues/${section.issueId}`);
+            section.tasks = tasks.map((t) => ({ id: t.id, cd: t.cd, name: t.name, userIds: new Set(t.user_ids) }));
+            section.taskCount = section.tasks.length;
+            section.counts = new Map();
+            for (const task of section.tasks) {
+                task.userIds.forEach((userId) => section.counts.set(userId, (section.counts.get(userId) || 0) + 1));
+            }
+            this.paintSection(el, section);
+        } finally {
+            section.loading = false;
+        }
+    }
+
+    /**
+     * セルクリック（作業セル: トグル、集約セル: 案件単位の一括割当/解除）
+     */
+    async onClick(e) {
+        const button = e.target.closest('button.bulk-btn');
+        if (button) {
+            this.onBulk(button).catch((err) => console.error(err));
+            return;
+        }
+        const cell = e.target.closest('td[data-user]');
+        if (!cell) return;
+        const el = cell.closest('tbody.issue-section');
+        const section = this.sections.get(el);
+        const userId = Number(cell.dataset.user);
+
+        try {
+            if (cell.classList.contains('task-cell')) {
+                const taskId = Number(cell.parentElement.dataset.task);
+                const result = await this.request('POST', '/toggle', { task_id: taskId, user_id: userId });
+                const task = section.tasks.find((t) => t.id === taskId);
+                if (result.assigned) {
+                    task.userIds.add(userId);
+                } else {
+                    task.userIds.delete(userId);
+                }
+                section.counts.set(userId, result.issue_count);
+                section.taskCount = result.issue_task_count;
+                this.paintSection(el, section);
+            } else {
+                const count = section.counts.get(userId) || 0;
+                const action = count >= section.taskCount ? 'bulk-unassign' : 'bulk-assign';
+                await this.request('POST', `/${action}`, { issue_id: section.issueId, user_id: userId });
+                await this.load(el, section);
+            }
+        } catch (err) {
+            console.error(err);
+        }
+    }
+
+    /**
+     * 一括割当ボタン（作業行: 作業 × 全ユーザー、ユーザー列: ユーザー × 全作業）
+     *
+     * 作業行は案件を読み込み直す。ユーザー列はプロジェクトの全作業が対象なので、
+     * 読み込み済みの案件は手元の割当を、未読み込みの案件は集約値だけを更新する。
+     */
+    async onBulk(button) {
+        if (!confirm(`${button.title}しますか？`)) return;
+        const action = button.dataset.action;
+        if (button.dataset.task) {
+            const el = button.closest('tbody.issue-section');
+            await this.request('POST', `/bulk-${action}`, { task_id: Number(button.dataset.task) });
+            await this.load(el, this.sections.get(el));
+            return;
+        }
+
+        const userId = Number(button.dataset.user);
+        await this.request('POST', `/bulk-${action}`, { user_id: userId });
+        this.sections.forEach((section, el) => {
+            for (const task of section.tasks || []) {
+                if (action === 'assign') {
+                    task.userIds.add(userId);
+                } else {
+                    task.userIds.delete(userId);
+                }
+            }
+            section.counts.set(userId, action === 'assign' ? section.taskCount : 0);
+            section.paintedRange = null;
+            if (this.visible.has(el)) this.paintSection(el, section);
+        });
+    }
+
+    /**
+     * API呼び出し（エラー時はメッセージを表示して例外）
+     */
+    async request(method, path, body) {
+        const options = { method, headers: { 'Accept': 'application/json' } };
+        if (body) {
+            options.headers['Content-Type'] = 'application/json';
+            options.body = JSON.stringify(body);
+        }
+        const response = await fetch(this.apiBase + path, options);
+        const data = await response.json();
+        if (!response.ok) {
+            const message = typeof data.detail === 'string' ? data.detail : '更新に失敗しました';
+            alert(message);
+            throw new Error(message);
+        }
+        return data;
+    }
+
+    destroy() {
+        this.observer.disconnect();
+        window.removeEventListener('resize', this.onResize);
+    }
+}
+
+/**
+ * 未初期化のコンパクト表示マトリクスを初期化
+ */
+function initCompactMatrices() {
+    document.querySelectorAll('.compact-matrix:not([data-ready])').forEach((root) => {
+        root.dataset.ready = '1';
+        new CompactMatrix(root);
+    });
+}
+
+// HTMXでマトリクスが読み込まれた後に初期化
+document.addEventListener('htmx:afterSettle', initCompactMatrices);
@@ -0,0 +1,137 @@
+"""静的ファイル
+
+責務: ハッシュ付きファイル名・事前圧縮ファイルの生成（ビルド時）と、その配信・URL解決のみ
+依存: middleware.compression
+
+ビルド（python static_assets.py）で static/*.css, *.js を
+static/dist/{名前}.{内容ハッシュ}.{拡張子} にコピーし、.gz（と brotli導入時は .br）を並べて置く。
+テンプレートは static_url('styles.css') でハッシュ付きのURLを得る。
+ビルドしていない環境（開発・テスト）では元のファイルのURLを返す。
+
+配信時は Accept-Encoding に応じて事前圧縮ファイルを返し、
+ハッシュ付きファイル（dist/ 配下）には長期の immutable キャッシュヘッダーを付ける。
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from middleware.compression import available_encodings, brotli, negotiate_encoding
+
+STATIC_DIR = Path(__file__).parent / "static"
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST_NAME = "manifest.json"
+STATIC_URL = "/static"
+
+# ハッシュ付きファイル名・事前圧縮の対象
+BUILD_SUFFIXES = (".css", ".js")
+
+# ファイル名に含める内容ハッシュの長さ
+HASH_LENGTH = 12
+
+# ハッシュ付きファイルのキャッシュ指定（内容が変わればURLが変わる）
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 事前圧縮ファイルの拡張子
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def build(static_dir: Path = STATIC_DIR, dist_dir: Path = DIST_DIR) -> dict[str, str]:
+    """ハッシュ付きファイルと事前圧縮ファイルを生成
+
+    dist_dirは作り直す。manifest.jsonに 元の名前 -> dist_dirからの相対名 を書き出す。
+
+    Returns:
+        マニフェスト（{"styles.css": "styles.0123456789ab.css"}）
+    """
+    if dist_dir.exists():
+        shutil.rmtree(dist_dir)
+    dist_dir.mkdir(parents=True)
+
+    manifest = {}
+    for path in sorted(static_dir.iterdir()):
+        if not path.is_file() or path.suffix not in BUILD_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        name = f"{path.stem}.{digest}{path.suffix}"
+        (dist_dir / name).write_bytes(data)
+        (dist_dir / f"{name}.gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            (dist_dir / f"{name}.br").write_bytes(brotli.compress(data, quality=11))
+        manifest[path.name] = name
+
+    (dist_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return manifest
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> dict[str, str]:
+    """ビルド済みマニフェスト（未ビルドは空）"""
+    try:
+        return json.loads((DIST_DIR / MANIFEST_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def static_url(name: str) -> str:
+    """静的ファイルのURL（ビルド済みならハッシュ付き）"""
+    hashed = load_manifest().get(name)
+    if hashed:
+        return f"{STATIC_URL}/dist/{hashed}"
+    return f"{STATIC_URL}/{name}"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """事前圧縮ファイルをコンテンツネゴシエーションで返すStaticFiles
+
+    foo.css へのリクエストに対し、foo.css.br / foo.css.gz があり受理されればそれを返す。
+    dist/ 配下（ビルド済みのハッシュ付きファイル）には immutable のキャッシュヘッダーを付ける。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encodings = available_encodings("br,gzip")
+        self.immutable_dir = os.path.join(os.path.realpath(self.directory), DIST_DIR.name, "")
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        response = None
+
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), self.encodings)
+        if encoding:
+            compressed_path = full_path + PRECOMPRESSED_SUFFIXES[encoding]
+            try:
+                compressed_stat = os.stat(compressed_path)
+            except FileNotFoundError:
+                compressed_stat = None
+            if compressed_stat is not None:
+                media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+                response = FileResponse(
+                    compressed_path, status_code=status_code, stat_result=compressed_stat,
+                    media_type=media_type, headers={"Content-Encoding": encoding},
+                )
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        if full_path.startswith(self.immutable_dir):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["Vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    for source, hashed in build().items():
+        print(f"{source} -> dist/{hashed}")
@@ -14,6 +14,8 @@ _test_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
 _test_db_path = _test_db_file.name
 _test_db_file.close()
 os.environ["DATABASE_PATH"] = _test_db_path
+# メトリクスもテストごとの一時ディレクトリに書き出す（過去の実行分を合算しない）
+os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="metrics-")
 
 from fastapi.testclient import TestClient
 from main import app
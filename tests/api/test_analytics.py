@@ -0,0 +1,93 @@
+"""属性別稼働分析テスト"""
+import uuid
+import pytest
+
+from database import get_db
+
+
+@pytest.fixture
+def utilization(client):
+    """属性（PM）を持つユーザーの予定・実績"""
+    suffix = uuid.uuid4().hex[:6]
+    with get_db() as conn:
+        project_id = conn.execute(
+            "INSERT INTO project (cd, name) VALUES (?, '分析PJ')", (f"AN-{suffix}",)
+        ).lastrowid
+        issue_id = conn.execute(
+            "INSERT INTO issue (cd, project_id, name) VALUES ('I1', ?, '案件')", (project_id,)
+        ).lastrowid
+        task_id = conn.execute(
+            "INSERT INTO task (cd, issue_id, name) VALUES ('T1', ?, '作業')", (issue_id,)
+        ).lastrowid
+        user_id = conn.execute(
+            "INSERT INTO user (cd, name, email) VALUES (?, '分析', ?)", (f"AN-{suffix}", f"{suffix}@example.com")
+        ).lastrowid
+        type_id = conn.execute(
+            "INSERT INTO user_attribute_type (code, name) VALUES (?, '役割')", (f"role_{suffix}",)
+        ).lastrowid
+        option_id = conn.execute(
+            "INSERT INTO user_attribute_option (type_id, code, name) VALUES (?, 'pm', 'PM')", (type_id,)
+        ).lastrowid
+        conn.execute("INSERT INTO user_attribute (user_id, type_id, option_id) VALUES (?, ?, ?)",
+                     (user_id, type_id, option_id))
+        conn.execute("INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, '2025-03-10', 6)",
+                     (task_id, user_id))
+        conn.execute(
+            "INSERT INTO monthly_assignment (user_id, project_id, year_month, planned_hours) VALUES (?, ?, '2025-03', 8)",
+            (user_id, project_id)
+        )
+    return {"type_id": type_id, "project_id": project_id}
+
+
+class TestAttributeUtilizationApi:
+    """JSON API"""
+
+    def test_returns_grouped_hours(self, client, utilization):
+        res = client.get("/api/v1/analytics/attribute-utilization", params={
+            "type_id": utilization["type_id"], "start": "2025-01", "end": "2025-06"
+        })
+        assert res.status_code == 200
+        rows = [r for r in res.json() if r["project_id"] == utilization["project_id"]]
+        assert rows == [{
+            "option_id": rows[0]["option_id"], "option_name": "PM",
+            "project_id": utilization["project_id"], "project_cd": rows[0]["project_cd"],
+            "project_name": "分析PJ", "year_month": "2025-03",
+            "planned_hours": 8.0, "actual_hours": 6.0,
+        }]
+
+    def test_unknown_type_404(self, client):
+        res = client.get("/api/v1/analytics/attribute-utilization", params={"type_id": 999999})
+        assert res.status_code == 404
+
+    def test_invalid_range_400(self, client, utilization):
+        res = client.get("/api/v1/analytics/attribute-utilization", params={
+            "type_id": utilization["type_id"], "start": "2025-06", "end": "2025-01"
+        })
+        assert res.status_code == 400
+
+
+class TestAttributeUtilizationHtml:
+    """ピボット表"""
+
+    def test_page(self, client, utilization):
+        res = client.get("/analytics", params={"type_id": utilization["type_id"]})
+        assert res.status_code == 200
+        assert "属性別稼働" in res.text
+
+    def test_pivot(self, client, utilization):
+        res = client.get("/analytics/pivot", params={
+            "type_id": utilization["type_id"], "start": "2025-02", "end": "2025-04"
+        })
+        assert res.status_code == 200
+        assert "PM" in res.text
+        assert "分析PJ" in res.text
+        assert "実績: 6.0h" in res.text
+        assert "予定: 8.0h" in res.text
+        for month in ("2025-02", "2025-03", "2025-04"):
+            assert month in res.text
+
+    def test_pivot_empty(self, client, utilization):
+        res = client.get("/analytics/pivot", params={
+            "type_id": utilization["type_id"], "start": "2020-01", "end": "2020-02"
+        })
+        assert "期間内の予定・実績がありません" in res.text
@@ -120,3 +120,37 @@ def test_delete_issue(client, project):
     # 確認
     response = client.get(f"/api/v1/issues/{issue_id}")
     assert response.status_code == 404
+
+
+def test_create_issues_batch(client, project):
+    """一括作成: プロジェクトが存在しない項目・プロジェクト内でcdが重複する項目だけエラー"""
+    client.post("/api/v1/issues", json={"project_id": project["id"], "cd": "EXIST", "name": "既存"})
+    res = client.post("/api/v1/issues/batch", json=[
+        {"project_id": project["id"], "cd": "B1", "name": "一括1"},
+        {"project_id": 99999, "cd": "B2", "name": "プロジェクトなし"},
+        {"project_id": project["id"], "cd": "EXIST", "name": "既存と重複"},
+        {"project_id": project["id"], "cd": "B3", "name": "一括3", "status": "in_progress"},
+    ])
+    assert res.status_code == 200
+    results = res.json()["results"]
+    assert results[1]["error"] == "プロジェクトが見つかりません"
+    assert results[2]["id"] is None
+    created = client.get(f"/api/v1/issues/{results[3]['id']}").json()
+    assert (created["cd"], created["status"], created["project_id"]) == ("B3", "in_progress", project["id"])
+
+
+def test_update_issues_batch(client, project):
+    """一括更新: cdの重複はプロジェクト内で判定"""
+    other = client.post("/api/v1/projects", json={"cd": "OTHER", "name": "別", "description": ""}).json()
+    ids = [r["id"] for r in client.post("/api/v1/issues/batch", json=[
+        {"project_id": project["id"], "cd": "A", "name": "案件A"},
+        {"project_id": project["id"], "cd": "B", "name": "案件B"},
+        {"project_id": other["id"], "cd": "C", "name": "案件C"},
+    ]).json()["results"]]
+    res = client.put("/api/v1/issues/batch", json=[
+        {"id": ids[0], "cd": "B", "name": "重複", "status": "open"},
+        {"id": ids[2], "cd": "A", "name": "別プロジェクトなら可", "status": "closed"},
+    ])
+    assert [r["error"] is None for r in res.json()["results"]] == [False, True]
+    updated = client.get(f"/api/v1/issues/{ids[2]}").json()
+    assert (updated["cd"], updated["status"]) == ("A", "closed")
@@ -131,3 +131,99 @@ def test_list_projects_with_search(client, clean_db):
     assert response.status_code == 200
     results = response.json()
     assert any(p["cd"] == "SRCH" for p in results)
+
+
+def test_project_summary_reflects_writes(client, clean_db):
+    """サマリーは案件追加後に更新される"""
+    before = client.get("/api/v1/projects/1/summary").json()
+    client.post("/api/v1/issues", json={"project_id": 1, "cd": "SUM-I", "name": "Summary Issue"})
+    after = client.get("/api/v1/projects/1/summary").json()
+    assert after["issue_count"] == before["issue_count"] + 1
+
+
+def test_list_projects_pagination(client, clean_db):
+    """limit指定でLinkヘッダーから続きを取得できる"""
+    first = client.get("/api/v1/projects?limit=1")
+    assert first.status_code == 200
+    assert [p["cd"] for p in first.json()] == ["PJ001"]
+    assert 'rel="next"' in first.headers["link"]
+
+    cursor = first.headers["x-next-cursor"]
+    second = client.get(f"/api/v1/projects?limit=1&cursor={cursor}")
+    assert [p["cd"] for p in second.json()] == ["PJ002"]
+
+
+def test_list_projects_last_page_has_no_link(client, clean_db):
+    """最終ページにはLinkヘッダーがない"""
+    response = client.get("/api/v1/projects?limit=100")
+    assert "link" not in response.headers
+
+
+def test_list_projects_invalid_cursor(client, clean_db):
+    """不正なカーソルは400"""
+    response = client.get("/api/v1/projects?cursor=%%%")
+    assert response.status_code == 400
+
+
+def test_list_projects_search_defaults_to_rank(client, clean_db):
+    """検索語が3文字以上なら関連度順で、続きも同じ順で取得できる"""
+    for n in range(3):
+        client.post("/api/v1/projects", json={"cd": f"RNK{n}", "name": f"rankapi{n}", "description": ""})
+    res = client.get("/api/v1/projects", params={"q": "rankapi", "limit": 2})
+    assert res.status_code == 200
+    assert len(res.json()) == 2
+    cursor = res.headers["X-Next-Cursor"]
+
+    res = client.get("/api/v1/projects", params={"q": "rankapi", "limit": 2, "cursor": cursor})
+    assert len(res.json()) == 1
+    assert "X-Next-Cursor" not in res.headers
+
+
+def test_create_projects_batch(client, clean_db):
+    """一括作成: 入力順にIDを返し、cdの重複はその項目だけエラー"""
+    client.post("/api/v1/projects", json={"cd": "EXIST", "name": "既存", "description": ""})
+    res = client.post("/api/v1/projects/batch", json=[
+        {"cd": "B1", "name": "一括1"},
+        {"cd": "EXIST", "name": "既存と重複"},
+        {"cd": "B2", "name": "一括2"},
+        {"cd": "B1", "name": "入力内で重複"},
+    ])
+    assert res.status_code == 200
+    data = res.json()
+    assert (data["succeeded"], data["failed"]) == (2, 2)
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["error"] is None for r in results] == [True, False, True, False]
+    assert client.get(f"/api/v1/projects/{results[0]['id']}").json()["cd"] == "B1"
+    assert client.get(f"/api/v1/projects/{results[2]['id']}").json()["cd"] == "B2"
+    # デフォルトステータスも作成される
+    from database import get_db
+    with get_db() as conn:
+        count = conn.execute(
+            "SELECT COUNT(*) FROM project_status WHERE project_id = ?", (results[2]["id"],)
+        ).fetchone()[0]
+    assert count > 0
+
+
+def test_update_projects_batch(client, clean_db):
+    """一括更新: 存在しないID・他のプロジェクトのcdはエラー、自分のcdはそのまま使える"""
+    ids = [r["id"] for r in client.post("/api/v1/projects/batch", json=[
+        {"cd": "U1", "name": "更新前1"},
+        {"cd": "U2", "name": "更新前2"},
+    ]).json()["results"]]
+    res = client.put("/api/v1/projects/batch", json=[
+        {"id": ids[0], "cd": "U1", "name": "更新後1"},
+        {"id": ids[1], "cd": "U1", "name": "他と重複"},
+        {"id": 99999, "cd": "U9", "name": "なし"},
+    ])
+    assert res.status_code == 200
+    assert [r["error"] is None for r in res.json()["results"]] == [True, False, False]
+    assert client.get(f"/api/v1/projects/{ids[0]}").json()["name"] == "更新後1"
+    assert client.get(f"/api/v1/projects/{ids[1]}").json()["name"] == "更新前2"
+
+
+def test_projects_batch_too_many(client, clean_db):
+    """件数の上限を超えると422"""
+    from services.batch import BATCH_MAX_ITEMS
+    items = [{"cd": f"M{n}", "name": "多すぎ"} for n in range(BATCH_MAX_ITEMS + 1)]
+    assert client.post("/api/v1/projects/batch", json=items).status_code == 422
@@ -146,3 +146,35 @@ def test_delete_task(client, issue):
     # 確認
     response = client.get(f"/api/v1/tasks/{task_id}")
     assert response.status_code == 404
+
+
+def test_create_tasks_batch(client, issue):
+    """一括作成: 案件が存在しない項目・案件内でcdが重複する項目だけエラー"""
+    res = client.post("/api/v1/tasks/batch", json=[
+        {"issue_id": issue["id"], "cd": "T1", "name": "作業1"},
+        {"issue_id": 99999, "cd": "T2", "name": "案件なし"},
+        {"issue_id": issue["id"], "cd": "T1", "name": "入力内で重複"},
+        {"issue_id": issue["id"], "cd": "T3", "name": "作業3"},
+    ])
+    assert res.status_code == 200
+    data = res.json()
+    assert (data["succeeded"], data["failed"]) == (2, 2)
+    assert data["results"][1]["error"] == "案件が見つかりません"
+    tasks = client.get(f"/api/v1/tasks?issue_id={issue['id']}").json()
+    assert sorted(t["id"] for t in tasks) == [data["results"][0]["id"], data["results"][3]["id"]]
+
+
+def test_update_tasks_batch(client, issue):
+    """一括更新: 存在しない・入力内で重複するIDはエラー"""
+    task_id = client.post("/api/v1/tasks/batch", json=[
+        {"issue_id": issue["id"], "cd": "T1", "name": "作業1"},
+    ]).json()["results"][0]["id"]
+    res = client.put("/api/v1/tasks/batch", json=[
+        {"id": task_id, "cd": "T1", "name": "更新後"},
+        {"id": task_id, "cd": "T1", "name": "重複"},
+        {"id": 99999, "cd": "T9", "name": "なし"},
+    ])
+    assert [r["error"] for r in res.json()["results"]] == [
+        None, f"IDが入力内で重複しています: {task_id}", "作業が見つかりません"
+    ]
+    assert client.get(f"/api/v1/tasks/{task_id}").json()["name"] == "更新後"
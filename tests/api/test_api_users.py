@@ -89,3 +89,30 @@ def test_list_users_active_only(client, clean_db):
     """有効ユーザーのみ"""
     response = client.get("/api/v1/users?active_only=true")
     assert response.status_code == 200
+
+
+def test_create_users_batch(client, clean_db):
+    """一括作成: 既存のcdと重複する項目だけエラー、メール形式はリクエスト全体で検証"""
+    res = client.post("/api/v1/users/batch", json=[
+        {"cd": "B1", "name": "一括1", "email": "b1@test.com"},
+        {"cd": "U001", "name": "既存と重複", "email": "dup@test.com"},
+    ])
+    assert res.status_code == 200
+    results = res.json()["results"]
+    assert results[1]["error"] == "コードは既に使われています: U001"
+    assert client.get(f"/api/v1/users/{results[0]['id']}").json()["email"] == "b1@test.com"
+
+    res = client.post("/api/v1/users/batch", json=[{"cd": "B2", "name": "不正", "email": "invalid"}])
+    assert res.status_code == 422
+
+
+def test_update_users_batch(client, clean_db):
+    """一括更新"""
+    user_id = client.post("/api/v1/users/batch", json=[
+        {"cd": "B1", "name": "更新前", "email": "b1@test.com"},
+    ]).json()["results"][0]["id"]
+    res = client.put("/api/v1/users/batch", json=[
+        {"id": user_id, "cd": "B1X", "name": "更新後", "email": "b1x@test.com"},
+    ])
+    assert res.json()["succeeded"] == 1
+    assert client.get(f"/api/v1/users/{user_id}").json()["cd"] == "B1X"
@@ -0,0 +1,164 @@
+"""レスポンス圧縮・静的ファイル配信のテスト"""
+import gzip
+import json
+
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.testclient import TestClient
+
+import static_assets
+from middleware.compression import CompressionMiddleware, negotiate_encoding
+from static_assets import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles, build
+
+
+class TestNegotiateEncoding:
+    """Accept-Encodingの解釈"""
+
+    def test_prefers_configured_order(self):
+        assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+        assert negotiate_encoding("gzip, deflate", ("br", "gzip")) == "gzip"
+
+    def test_q_zero_is_rejected(self):
+        assert negotiate_encoding("gzip;q=0, identity", ("gzip",)) is None
+
+    def test_wildcard(self):
+        assert negotiate_encoding("*", ("gzip",)) == "gzip"
+        assert negotiate_encoding("*, gzip;q=0", ("gzip",)) is None
+
+    def test_unsupported_only(self):
+        assert negotiate_encoding("deflate", ("br", "gzip")) is None
+
+
+def _html_app(size: int, streaming: bool = False):
+    async def page(request):
+        body = "<td>" + "x" * size + "</td>"
+        if streaming:
+            async def chunks():
+                for _ in range(3):
+                    yield body
+            return StreamingResponse(chunks(), media_type="text/html")
+        return HTMLResponse(body)
+
+    async def css(request):
+        return HTMLResponse("body {}" * 500, media_type="text/css")
+
+    app = Starlette(routes=[Route("/page", page), Route("/style", css)])
+    return CompressionMiddleware(app, encodings="gzip", minimum_size=500)
+
+
+class TestCompressionMiddleware:
+    """圧縮ミドルウェア"""
+
+    def test_large_html_is_gzipped(self):
+        client = TestClient(_html_app(2000))
+        response = client.get("/page", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < 2000
+        assert response.text == "<td>" + "x" * 2000 + "</td>"
+
+    def test_small_html_is_not_compressed(self):
+        client = TestClient(_html_app(100))
+        response = client.get("/page", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    def test_not_accepted(self):
+        client = TestClient(_html_app(2000))
+        response = client.get("/page", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert len(response.content) == 2009
+
+    def test_other_content_type_is_not_compressed(self):
+        client = TestClient(_html_app(0))
+        response = client.get("/style", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_streaming_response_is_compressed_per_chunk(self):
+        client = TestClient(_html_app(100, streaming=True))
+        response = client.get("/page", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == ("<td>" + "x" * 100 + "</td>") * 3
+
+    def test_app_pages_are_compressed(self, client):
+        """アプリのHTMLページに適用されている"""
+        response = client.get("/users", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "ユーザー" in response.text
+
+
+class TestStaticAssets:
+    """ハッシュ付き・事前圧縮の静的ファイル"""
+
+    def _build(self, tmp_path):
+        static_dir = tmp_path / "static"
+        static_dir.mkdir()
+        (static_dir / "app.css").write_text("body { color: red; }\n" * 100)
+        (static_dir / "app.js").write_text("console.log(1);\n")
+        (static_dir / "note.txt").write_text("not built")
+        manifest = build(static_dir, static_dir / "dist")
+        app = Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=static_dir))])
+        return static_dir, manifest, TestClient(app)
+
+    def test_build_writes_hashed_and_gzip_files(self, tmp_path):
+        static_dir, manifest, _ = self._build(tmp_path)
+        assert set(manifest) == {"app.css", "app.js"}
+        name = manifest["app.css"]
+        assert name.startswith("app.") and name.endswith(".css")
+        dist = static_dir / "dist"
+        assert (dist / name).read_bytes() == (static_dir / "app.css").read_bytes()
+        assert gzip.decompress((dist / f"{name}.gz").read_bytes()) == (static_dir / "app.css").read_bytes()
+        assert json.loads((dist / "manifest.json").read_text()) == manifest
+
+    def test_hash_changes_with_content(self, tmp_path):
+        static_dir, manifest, _ = self._build(tmp_path)
+        (static_dir / "app.css").write_text("body { color: blue; }\n")
+        rebuilt = build(static_dir, static_dir / "dist")
+        assert rebuilt["app.css"] != manifest["app.css"]
+        assert rebuilt["app.js"] == manifest["app.js"]
+        assert not (static_dir / "dist" / manifest["app.css"]).exists()
+
+    def test_serves_precompressed_with_immutable_cache(self, tmp_path):
+        static_dir, manifest, client = self._build(tmp_path)
+        response = client.get(f"/static/dist/{manifest['app.css']}", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/css")
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == (static_dir / "app.css").read_text()
+
+    def test_serves_original_when_not_accepted(self, tmp_path):
+        static_dir, manifest, client = self._build(tmp_path)
+        response = client.get(f"/static/dist/{manifest['app.css']}", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.text == (static_dir / "app.css").read_text()
+
+    def test_unhashed_file_is_not_immutable(self, tmp_path):
+        _, _, client = self._build(tmp_path)
+        response = client.get("/static/app.css", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+    def test_static_url_falls_back_without_manifest(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(static_assets, "DIST_DIR", tmp_path / "missing")
+        static_assets.load_manifest.cache_clear()
+        try:
+            assert static_assets.static_url("styles.css") == "/static/styles.css"
+        finally:
+            static_assets.load_manifest.cache_clear()
+
+    def test_static_url_uses_manifest(self, monkeypatch, tmp_path):
+        static_dir, manifest, _ = self._build(tmp_path)
+        monkeypatch.setattr(static_assets, "DIST_DIR", static_dir / "dist")
+        static_assets.load_manifest.cache_clear()
+        try:
+            assert static_assets.static_url("app.css") == f"/static/dist/{manifest['app.css']}"
+        finally:
+            static_assets.load_manifest.cache_clear()
@@ -201,3 +201,79 @@ class TestCascadeDelete:
             # 工数記録も削除されていることを確認
             count = conn.execute("SELECT COUNT(*) FROM work_log WHERE task_id = ?", (task_id,)).fetchone()[0]
             assert count == 0
+
+
+class TestWorkLogBulkLoad:
+    """実績の一括投入（トリガー・インデックスを外して最後に作り直す）"""
+
+    def _schema(self, conn):
+        return sorted(
+            r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE tbl_name = 'work_log' AND sql IS NOT NULL"
+            ).fetchall()
+        )
+
+    def _setup(self, issue_cd):
+        from database import get_db
+        with get_db() as conn:
+            conn.execute("INSERT INTO issue (cd, project_id, name, status) VALUES (?, 1, 'テスト案件', 'open')", (issue_cd,))
+            issue_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.execute("INSERT INTO task (cd, issue_id, name) VALUES ('T001', ?, 'テスト作業')", (issue_id,))
+            task_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            schema = self._schema(conn)
+            version = conn.execute("SELECT version FROM table_version WHERE name = 'work_log'").fetchone()[0]
+        return task_id, schema, version
+
+    def test_rebuilds_monthly_and_restores_schema(self, client):
+        """投入中はトリガーが動かず、終了後に月次集計・トリガー・インデックスが揃う"""
+        import sqlite3
+        from database import DB_PATH, get_db, work_log_bulk_load
+        task_id, schema, version = self._setup("BULK-1")
+
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            with work_log_bulk_load(conn):
+                assert "idx_work_log_date_user" not in self._schema(conn)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, 1, ?, ?)",
+                        [(task_id, "2031-01-05", 2.0), (task_id, "2031-01-06", 3.5), (task_id, "2031-02-02", 1.0)]
+                    )
+        finally:
+            conn.close()
+
+        with get_db() as conn:
+            assert self._schema(conn) == schema
+            assert conn.execute("SELECT version FROM table_version WHERE name = 'work_log'").fetchone()[0] > version
+            rows = conn.execute(
+                "SELECT year_month, hours FROM work_log_monthly WHERE user_id = 1 AND year_month LIKE '2031-%' "
+                "ORDER BY year_month"
+            ).fetchall()
+            assert [tuple(r) for r in rows] == [("2031-01", 5.5), ("2031-02", 1.0)]
+            # 作り直したトリガーで以降の書き込みも集計される
+            conn.execute("DELETE FROM work_log WHERE task_id = ?", (task_id,))
+            assert conn.execute(
+                "SELECT COUNT(*) FROM work_log_monthly WHERE year_month LIKE '2031-%'"
+            ).fetchone()[0] == 0
+
+    def test_restores_schema_on_error(self, client):
+        """途中で失敗しても未コミット分は捨て、トリガー・インデックスを作り直す"""
+        import sqlite3
+        from database import DB_PATH, get_db, work_log_bulk_load
+        task_id, schema, _ = self._setup("BULK-2")
+
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            with pytest.raises(RuntimeError):
+                with work_log_bulk_load(conn):
+                    conn.execute(
+                        "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, 1, '2032-01-05', 2.0)",
+                        (task_id,)
+                    )
+                    raise RuntimeError("中断")
+        finally:
+            conn.close()
+
+        with get_db() as conn:
+            assert self._schema(conn) == schema
+            assert conn.execute("SELECT COUNT(*) FROM work_log WHERE task_id = ?", (task_id,)).fetchone()[0] == 0
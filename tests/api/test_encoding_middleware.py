@@ -92,3 +92,50 @@ class TestEncodingMiddleware:
             "email": "john@example.com"
         })
         assert response.status_code == 200
+
+    def test_percent_encoded_mojibake_post_is_rejected(self, client):
+        """%エンコードされたMojibakeも拒否される"""
+        mojibake_name = "テスト太郎".encode('shift_jis').decode('latin-1')
+        response = client.post("/users", data={
+            "cd": "TEST03",
+            "name": mojibake_name,
+            "email": "test3@example.com"
+        })
+        assert response.status_code == 400
+        assert "'name'" in response.json()["detail"]
+
+    def test_invalid_utf8_body_is_rejected(self, client):
+        """UTF-8としてデコードできないフォームは拒否される"""
+        response = client.post(
+            "/users",
+            content="cd=TEST04&name=テスト".encode('shift_jis'),
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == 400
+        assert "デコードできません" in response.json()["detail"]
+
+    def test_api_json_mojibake_is_rejected(self, client):
+        """/api/v1 へのJSONの文字列値も検証される（\\uエスケープを含む）"""
+        mojibake_name = "テスト太郎".encode('shift_jis').decode('latin-1')
+        response = client.post("/api/v1/users", json={
+            "cd": "TEST05",
+            "name": mojibake_name,
+            "email": "test5@example.com"
+        })
+        assert response.status_code == 400
+        assert "'name'" in response.json()["detail"]
+
+    def test_api_json_japanese_succeeds(self, client):
+        """正しい日本語のJSONは下流に同じボディが渡る"""
+        response = client.post("/api/v1/users", json={
+            "cd": "TEST06",
+            "name": "テスト六郎",
+            "email": "test6@example.com"
+        })
+        assert response.status_code == 201
+        assert response.json()["name"] == "テスト六郎"
+
+    def test_get_passes_through(self, client):
+        """GETは検証せずに下流へ渡す"""
+        response = client.get("/users")
+        assert response.status_code == 200
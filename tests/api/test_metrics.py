@@ -0,0 +1,112 @@
+"""メトリクスのテスト"""
+import json
+
+import pytest
+
+from instrumentation import RequestStats
+from metrics import LATENCY_BUCKETS, Metrics
+
+# 存在しないプロセスID（終了したワーカーの想定）
+DEAD_PID = 2 ** 22 + 12345
+
+
+def _write_worker(directory, pid: int, counters=(), histograms=(), gauges=()):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{pid}.json").write_text(json.dumps({
+        "pid": pid, "counters": list(counters), "histograms": list(histograms), "gauges": list(gauges),
+    }))
+
+
+class TestMetrics:
+    """プロセス内集計とワーカー間の合算"""
+
+    def test_observe_request(self, tmp_path):
+        m = Metrics(tmp_path, flush_interval=3600)
+        stats = RequestStats(statements=3, rows=10, db_time=0.002)
+        m.observe_request("GET", "/users", 200, 0.02, stats)
+        m.observe_request("GET", "/users", 200, 20.0)
+
+        data = m.collect()
+        assert data["counters"][("http_requests_total", (("method", "GET"), ("route", "/users"), ("status", "200")))] == 2
+        assert data["counters"][("db_statements_total", ())] == 3
+        assert data["counters"][("db_rows_total", ())] == 10
+        buckets = data["histograms"][("http_request_duration_seconds", (("method", "GET"), ("route", "/users")))]
+        assert buckets[LATENCY_BUCKETS.index(0.025)] == 1
+        assert buckets[len(LATENCY_BUCKETS)] == 1  # +Inf
+        assert buckets[-1] == pytest.approx(20.02)
+
+    def test_sums_workers_and_skips_dead_gauges(self, tmp_path):
+        m = Metrics(tmp_path, flush_interval=3600)
+        m.observe_request("GET", "/users", 200, 0.01)
+        _write_worker(
+            tmp_path, DEAD_PID,
+            counters=[["http_requests_total", {"method": "GET", "route": "/users", "status": "200"}, 4]],
+            gauges=[["db_connections_in_flight", {}, 7]],
+        )
+
+        data = m.collect()
+        assert data["counters"][("http_requests_total", (("method", "GET"), ("route", "/users"), ("status", "200")))] == 5
+        assert data["gauges"][("db_connections_in_flight", ())] == 0
+        assert data["workers"] == 1
+
+    def test_cleanup_removes_dead_workers(self, tmp_path):
+        m = Metrics(tmp_path, flush_interval=3600)
+        m.flush()
+        _write_worker(tmp_path, DEAD_PID)
+        m.cleanup()
+        assert not (tmp_path / f"{DEAD_PID}.json").exists()
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+    def test_render_histogram(self, tmp_path):
+        m = Metrics(tmp_path, flush_interval=3600)
+        m.observe_request("GET", "/projects/{project_id}", 200, 0.003)
+        m.observe_request("GET", "/projects/{project_id}", 200, 0.2)
+        text = m.render()
+
+        labels = 'method="GET",route="/projects/{project_id}"'
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.25"}} 2' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+        lines = text.splitlines()
+        assert lines.index(f'http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1') < \
+            lines.index(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2') < \
+            lines.index(f"http_request_duration_seconds_count{{{labels}}} 2")
+
+
+class TestMetricsEndpoint:
+    """GET /metrics"""
+
+    def test_exposes_route_templates(self, client):
+        client.get("/users")
+        client.get("/projects/1")
+        client.get("/no-such-page")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert 'http_requests_total{method="GET",route="/users",status="200"}' in text
+        assert 'route="/projects/{id}"' in text
+        assert 'route="<unmatched>",status="404"' in text
+
+    def test_distinguishes_router_prefixes(self, client):
+        """同じテンプレートでもprefixの異なるルート（/api/v1 と画面）は別のラベル"""
+        client.get("/api/v1/projects")
+        client.get("/projects")
+        client.get("/api/v1/projects/999999")
+        text = client.get("/metrics").text
+        assert 'http_requests_total{method="GET",route="/api/v1/projects",status="200"}' in text
+        assert 'http_requests_total{method="GET",route="/projects",status="200"}' in text
+        assert 'route="/api/v1/projects/{project_id}",status="404"' in text
+
+    def test_exposes_db_cache_and_file_sizes(self, client):
+        client.get("/work-logs/grid?month=2026-01")
+        text = client.get("/metrics").text
+        assert "db_connections_total " in text
+        assert "db_connections_in_flight " in text
+        assert "db_statements_total " in text
+        assert 'cache_requests_total{cache="catalog.active_users",result="hit"}' in text
+        assert 'cache_hit_ratio{cache="catalog.active_users"}' in text
+        assert 'sqlite_file_size_bytes{file="db"}' in text
+        assert 'sqlite_file_size_bytes{file="wal"}' in text
@@ -0,0 +1,116 @@
+"""プロファイリングのテスト"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import profiling
+from main import app
+from middleware import ProfilingMiddleware
+from profiling import Sampler, list_profiles, save_profile, top_functions
+
+
+def _busy(seconds: float):
+    """サンプルが採れるようにアプリのフレームでCPUを使う"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _client(directory, **options) -> TestClient:
+    """ProfilingMiddleware だけを通すアプリ（main の他のミドルウェアは通さない）"""
+    test_app = FastAPI()
+    test_app.router.routes.extend(app.routes)
+    test_app.add_middleware(ProfilingMiddleware, directory=directory, interval=0.001, **options)
+    return TestClient(test_app)
+
+
+class TestProfilingMiddleware:
+    """指定されたリクエストだけ採取する"""
+
+    def test_header_saves_profile(self, tmp_path):
+        response = _client(tmp_path).get("/work-logs/grid?month=2026-01", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        name = response.headers["x-profile"]
+        assert (tmp_path / name).is_file()
+        assert "_GET_work-logs-grid." in name
+        assert [p["name"] for p in list_profiles(tmp_path)] == [name]
+
+    def test_query_flag(self, tmp_path):
+        response = _client(tmp_path).get("/users?_profile=1")
+        assert response.status_code == 200
+        assert "x-profile" in response.headers
+
+    def test_not_requested(self, tmp_path):
+        response = _client(tmp_path).get("/users")
+        assert "x-profile" not in response.headers
+        assert list_profiles(tmp_path) == []
+
+    def test_token_must_match(self, tmp_path):
+        client = _client(tmp_path, token="secret")
+        assert "x-profile" not in client.get("/users", headers={"X-Profile": "1"}).headers
+        assert list_profiles(tmp_path) == []
+        assert "x-profile" in client.get("/users?_profile=secret").headers
+
+
+class TestProfiles:
+    """保存・集計"""
+
+    def test_counts_only_app_stacks(self, tmp_path):
+        sampler = Sampler(0.001)
+        sampler.start()
+        _busy(0.05)
+        sampler.stop()
+        name = save_profile(sampler, "GET", "/busy", 0.05, tmp_path)
+
+        # tests/ のフレームだけのスタックは数えない
+        assert sampler.samples > 0
+        assert (tmp_path / name).read_text() == ""
+
+    def test_top_functions_own_and_total(self, tmp_path):
+        name = "20260101-000000-000000_GET_x.1ms.collapsed"
+        (tmp_path / name).write_text(
+            "run (~threading.py:1);handler (routers/a.py:1);query (services/b.py:1);execute (~sqlite3.py:1) 3\n"
+            "run (~threading.py:1);handler (routers/a.py:1) 2\n"
+        )
+        assert top_functions(name, directory=tmp_path) == [
+            ("handler (routers/a.py:1)", 2, 5),
+            ("query (services/b.py:1)", 3, 3),
+        ]
+
+    def test_keeps_newest(self, tmp_path):
+        names = [save_profile(Sampler(), "GET", f"/p{i}", 0.0, tmp_path, keep=2) for i in range(3)]
+        assert [p["name"] for p in list_profiles(tmp_path)] == names[:0:-1]
+
+
+class TestAdminProfiles:
+    """GET /admin/profiles"""
+
+    @pytest.fixture
+    def profiles_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+        monkeypatch.setattr("routers.admin.list_profiles", lambda: list_profiles(tmp_path))
+        monkeypatch.setattr("routers.admin.profile_path", lambda name: profiling.profile_path(name, tmp_path))
+        monkeypatch.setattr("routers.admin.top_functions", lambda name, limit: top_functions(name, limit, tmp_path))
+        return tmp_path
+
+    def test_list_and_download(self, client, profiles_dir):
+        name = _client(profiles_dir).get("/users", headers={"X-Profile": "1"}).headers["x-profile"]
+
+        response = client.get("/admin/profiles")
+        assert response.status_code == 200
+        assert name in response.text
+
+        response = client.get(f"/admin/profiles/{name}")
+        assert response.status_code == 200
+        assert response.text == (profiles_dir / name).read_text()
+
+        assert client.get(f"/admin/profiles/{name}/top").status_code == 200
+
+    def test_invalid_name(self, client, profiles_dir):
+        assert client.get("/admin/profiles/..%2Fapp.db").status_code == 404
+        assert client.get("/admin/profiles/20260101-000000-000000_GET_x.1ms.collapsed").status_code == 404
+
+    def test_empty(self, client, profiles_dir):
+        assert "保存されたプロファイルはありません" in client.get("/admin/profiles").text
@@ -181,3 +181,28 @@ class TestProjectDelete:
         """存在しないプロジェクトの削除は404"""
         response = client.delete("/projects/99999")
         assert response.status_code == 404
+
+
+class TestProjectListPaging:
+    """一覧の追加読み込みテスト"""
+
+    def test_load_more_row_when_page_full(self, client, clean_db, monkeypatch):
+        """ページ件数に達したら番兵行を付ける"""
+        import routers.projects
+        monkeypatch.setattr(routers.projects, "LIST_PAGE_SIZE", 1)
+        response = client.get("/projects/list?sort=cd&order=asc")
+        assert "PJ001" in response.text
+        assert "PJ002" not in response.text
+        assert 'hx-trigger="revealed"' in response.text
+
+    def test_cursor_returns_rows_only(self, client, clean_db, monkeypatch):
+        """cursor指定時は続きの行のみ返す"""
+        import re
+        import routers.projects
+        monkeypatch.setattr(routers.projects, "LIST_PAGE_SIZE", 1)
+        first = client.get("/projects/list?sort=cd&order=asc")
+        next_url = re.search(r'hx-get="([^"]+cursor=[^"]+)"', first.text).group(1).replace("&amp;", "&")
+
+        response = client.get(next_url)
+        assert "PJ002" in response.text
+        assert "<thead>" not in response.text
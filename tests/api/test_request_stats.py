@@ -0,0 +1,100 @@
+"""リクエスト計測のテスト"""
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import get_db
+from instrumentation import collect, timed
+from main import app
+from middleware.request_stats import RequestStatsMiddleware
+
+
+class TestCollect:
+    """instrumentation.collect()"""
+
+    def test_counts_connections_statements_and_rows(self):
+        with collect() as stats:
+            with get_db() as conn:
+                rows = conn.execute("SELECT cd FROM project ORDER BY cd").fetchall()
+                conn.execute("SELECT cd FROM user WHERE cd = ?", ("U001",)).fetchone()
+            with get_db() as conn:
+                count = sum(1 for _ in conn.execute("SELECT id FROM user"))
+
+        assert stats.connections == 2
+        # PRAGMA foreign_keys を含む
+        assert stats.statements == 5
+        assert stats.rows == len(rows) + 1 + count
+        assert stats.db_time > 0
+        sqls = [s.sql for s in stats.log]
+        assert "SELECT cd FROM project ORDER BY cd" in sqls
+        project_stmt = stats.log[sqls.index("SELECT cd FROM project ORDER BY cd")]
+        assert project_stmt.rows == len(rows)
+
+    def test_rows_are_sqlite_rows(self):
+        with collect():
+            with get_db() as conn:
+                row = conn.execute("SELECT cd, name FROM project WHERE cd = 'PJ001'").fetchone()
+        assert row['name'] == 'プロジェクト1'
+
+    def test_not_collected_outside(self):
+        with get_db() as conn:
+            assert getattr(conn, "stats", None) is None
+
+    def test_timed_adds_phase(self):
+        @timed("render")
+        def render():
+            return "ok"
+
+        assert render() == "ok"
+        with collect() as stats:
+            render()
+            render()
+        assert stats.phases["render"] > 0
+
+
+def _client(**options) -> TestClient:
+    """アプリのルートを、設定を変えたRequestStatsMiddlewareだけで包んだクライアント"""
+    test_app = FastAPI()
+    test_app.router.routes.extend(app.routes)
+    test_app.add_middleware(RequestStatsMiddleware, **options)
+    return TestClient(test_app)
+
+
+class TestRequestStatsMiddleware:
+    """Server-Timingヘッダー・フッター・警告"""
+
+    def test_server_timing_header(self, client):
+        response = client.get("/users")
+        timing = response.headers["server-timing"]
+        assert timing.startswith("db;dur=")
+        assert "conn" in timing and "stmt" in timing
+        assert "total;dur=" in timing
+
+    def test_grid_render_phase(self, client):
+        response = client.get("/work-logs/grid?month=2026-01")
+        assert response.status_code == 200
+        assert "render;dur=" in response.headers["server-timing"]
+
+    def test_footer_inserted_into_pages(self):
+        client = _client(footer=True)
+        response = client.get("/users")
+        assert '<footer class="request-stats">' in response.text
+        assert response.text.index("request-stats") < response.text.index("</body>")
+        assert int(response.headers["content-length"]) == len(response.content)
+
+    def test_footer_not_inserted_into_fragments(self):
+        client = _client(footer=True)
+        response = client.get("/work-logs/grid?month=2026-01")
+        assert "request-stats" not in response.text
+
+    def test_warns_on_many_connections(self, caplog):
+        client = _client(connection_warn=0)
+        with caplog.at_level(logging.WARNING, logger="middleware.request_stats"):
+            client.get("/work-logs/grid?month=2026-01")
+        assert any("GET /work-logs/grid: DB接続" in r.getMessage() for r in caplog.records)
+
+    def test_disabled(self):
+        client = _client(enabled=False)
+        response = client.get("/users")
+        assert "server-timing" not in response.headers
@@ -0,0 +1,134 @@
+"""スロークエリログのテスト"""
+import pytest
+
+from database import get_db
+from instrumentation import collect
+from slow_queries import SlowQueryLog, normalize_sql, param_shape, slow_query_log
+
+
+@pytest.fixture
+def log_all(monkeypatch):
+    """全ての文を記録する（しきい値0）"""
+    monkeypatch.setattr(slow_query_log, "threshold", 0.0)
+    slow_query_log.clear()
+    yield slow_query_log
+    slow_query_log.clear()
+
+
+class TestNormalize:
+    """SQLの正規化・パラメータの形"""
+
+    def test_literals_and_whitespace(self):
+        sql = """SELECT * FROM work_log
+                 WHERE user_id = 12 AND work_date >= '2026-01-01' AND hours > 1.5"""
+        assert normalize_sql(sql) == "SELECT * FROM work_log WHERE user_id = ? AND work_date >= ? AND hours > ?"
+
+    def test_in_list_collapsed(self):
+        assert normalize_sql("SELECT id FROM user WHERE id IN (?, ?,?)") == normalize_sql(
+            "SELECT id FROM user WHERE id IN (?, ?)"
+        ) == "SELECT id FROM user WHERE id IN (?, ...)"
+
+    def test_named_params_and_identifiers(self):
+        assert normalize_sql("SELECT t1.id FROM task t1 WHERE t1.cd = :cd") == "SELECT t1.id FROM task t1 WHERE t1.cd = ?"
+
+    def test_param_shape(self):
+        assert param_shape((1, 2, 3, "a")) == "int×3, str"
+        assert param_shape({"start": "2026-01", "type_id": 1}) == "start: str, type_id: int"
+        assert param_shape(()) == ""
+
+
+class TestSlowQueryLog:
+    """DB層での記録"""
+
+    def test_records_with_plan_and_dedupes(self, log_all):
+        with get_db() as conn:
+            conn.execute("SELECT * FROM project WHERE cd = 'PJ001'").fetchall()
+            conn.execute("SELECT * FROM project WHERE cd = 'PJ002'").fetchall()
+            conn.execute("SELECT * FROM user WHERE id IN (?, ?)", (1, 2)).fetchall()
+
+        entries = {e.normalized: e for e in log_all.entries()}
+        project = entries["SELECT * FROM project WHERE cd = ?"]
+        assert project.count == 2
+        assert project.sql == "SELECT * FROM project WHERE cd = 'PJ001'"
+        assert any("project" in line for line in project.plan)
+
+        user = entries["SELECT * FROM user WHERE id IN (?, ...)"]
+        assert user.params == "int×2"
+        assert any("USING INTEGER PRIMARY KEY" in line for line in user.plan)
+
+    def test_duration_includes_fetch(self, log_all):
+        with get_db() as conn:
+            cursor = conn.execute("SELECT id FROM user")
+            for _ in cursor:
+                pass
+        entry = next(e for e in log_all.entries() if e.normalized == "SELECT id FROM user")
+        assert entry.count == 1
+        assert entry.total_time >= entry.max_time > 0
+
+    def test_skips_transaction_control_and_pragma(self, log_all):
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("SELECT * FROM project").fetchall()
+            conn.execute("PRAGMA table_info(project)").fetchall()
+        normalized = [e.normalized for e in log_all.entries()]
+        assert "SELECT * FROM project" in normalized
+        assert not any(sql.startswith(("BEGIN", "PRAGMA")) for sql in normalized)
+        assert log_all.lock_wait.count == 1
+
+    def test_write_lock_wait_recorded_separately(self, log_all):
+        """暗黙のトランザクションを開始する書き込みは、ロック待ち（BEGIN IMMEDIATE）と文を分けて記録する"""
+        with collect() as stats:
+            with get_db() as conn:
+                conn.execute("UPDATE project SET name = name WHERE cd = 'PJ001'")
+                conn.execute("UPDATE project SET name = name WHERE cd = 'PJ002'")
+        assert [s.sql for s in stats.log][-3:] == [
+            "BEGIN IMMEDIATE",
+            "UPDATE project SET name = name WHERE cd = 'PJ001'",
+            "UPDATE project SET name = name WHERE cd = 'PJ002'",
+        ]
+        assert stats.lock_wait > 0
+        assert log_all.lock_wait.count == 1
+        entry = next(e for e in log_all.entries() if e.normalized.startswith("UPDATE project"))
+        assert entry.count == 2
+
+    def test_below_threshold_not_recorded(self, monkeypatch):
+        log = SlowQueryLog(threshold=60)
+        monkeypatch.setattr("instrumentation.slow_query_log", log)
+        with get_db() as conn:
+            conn.execute("SELECT * FROM project").fetchall()
+        assert log.entries() == []
+
+    def test_evicts_oldest(self):
+        log = SlowQueryLog(threshold=0, max_entries=2)
+        with get_db() as conn:
+            for table in ("project", "user", "issue"):
+                log.record(conn, f"SELECT * FROM {table}", (), 0.5)
+        assert [e.normalized for e in log.entries("recent")] == ["SELECT * FROM issue", "SELECT * FROM user"]
+
+
+class TestAdminPage:
+    """GET /admin/slow-queries"""
+
+    def test_page_lists_entries(self, client, log_all):
+        with get_db() as conn:
+            conn.execute("SELECT * FROM project WHERE cd = 'PJ001'").fetchall()
+        response = client.get("/admin/slow-queries")
+        assert response.status_code == 200
+        assert "SELECT * FROM project WHERE cd = ?" in response.text
+        assert "実行計画" in response.text
+
+    def test_page_shows_lock_wait(self, client, log_all):
+        with get_db() as conn:
+            conn.execute("UPDATE project SET name = name WHERE cd = 'PJ001'")
+        response = client.get("/admin/slow-queries")
+        assert "ロック待ち（BEGIN） 1回" in response.text
+
+    def test_sorted_list_and_clear(self, client, log_all):
+        with get_db() as conn:
+            conn.execute("SELECT * FROM project").fetchall()
+        response = client.get("/admin/slow-queries/list?sort=count")
+        assert "SELECT * FROM project" in response.text
+
+        response = client.post("/admin/slow-queries/clear")
+        assert "記録されたスロークエリはありません" in response.text
+        assert log_all.entries() == []
@@ -72,6 +72,26 @@ class TestAssigneePage:
         response = client.get("/projects/99999/assignees")
         assert response.status_code == 404
 
+    def test_page_renders_only_own_project_issues(self, client):
+        """コピー元案件の初期表示はこのプロジェクトの案件のみ（他プロジェクトは選択時に読み込む）"""
+        own, other = f"OWN-{uuid.uuid4().hex[:6]}", f"OTH-{uuid.uuid4().hex[:6]}"
+        with get_db() as conn:
+            conn.execute("INSERT INTO issue (project_id, cd, name) VALUES (1, ?, '自案件')", (own,))
+            conn.execute("INSERT INTO issue (project_id, cd, name) VALUES (2, ?, '他案件')", (other,))
+        text = client.get("/projects/1/assignees").text
+        assert f">{own} 自案件</option>" in text
+        assert other not in text
+
+    def test_source_issue_options(self, client):
+        """コピー元プロジェクトの案件の選択肢"""
+        with get_db() as conn:
+            issue_id = conn.execute("INSERT INTO issue (project_id, cd, name) VALUES (2, ?, 'コピー元')",
+                                    (f"SRC-{uuid.uuid4().hex[:6]}",)).lastrowid
+        response = client.get("/projects/1/assignees/source-issues?source_project_id=2")
+        assert response.status_code == 200
+        assert f'<option value="{issue_id}">' in response.text
+        assert client.get("/projects/1/assignees/source-issues?source_project_id=99999").status_code == 404
+
 
 class TestAssigneeMatrix:
     """マトリクス取得テスト"""
@@ -126,6 +146,31 @@ class TestAssigneeToggle:
         })
         assert response.status_code == 200
         # 解除後、該当セルに●がないことを確認（マトリクス全体を検証）
+        assert "●" not in response.text
+
+    def test_toggle_returns_cell_and_issue_summary_only(self, client, task_id, issue_id, user_id):
+        """トグルはセルと案件集約セル（out-of-band）だけを返す"""
+        response = client.post("/projects/1/assignees/toggle", data={
+            "task_id": task_id,
+            "user_id": user_id
+        })
+        assert response.status_code == 200
+        assert response.text.startswith(f'<td id="assign-{task_id}-{user_id}"')
+        assert f'id="assign-issue-{issue_id}-{user_id}" class="issue-cell bulk-cell" hx-swap-oob="true"' in response.text
+        assert ">(1)</td>" in response.text
+        assert "<table" not in response.text
+        assert "<tr" not in response.text
+
+    def test_toggle_task_in_other_project_returns_404(self, client, task_id, user_id):
+        """他プロジェクトの作業は404"""
+        with get_db() as conn:
+            conn.execute("INSERT OR IGNORE INTO project (cd, name) VALUES ('ASN-OTHER', '別プロジェクト')")
+            other_id = conn.execute("SELECT id FROM project WHERE cd = 'ASN-OTHER'").fetchone()[0]
+        response = client.post(f"/projects/{other_id}/assignees/toggle", data={
+            "task_id": task_id,
+            "user_id": user_id
+        })
+        assert response.status_code == 404
 
     def test_toggle_invalid_task_returns_404(self, client, user_id):
         """存在しない作業は404"""
@@ -255,3 +300,159 @@ class TestIssueSummary:
         assert response.status_code == 200
         # 担当数(1)が表示される
         assert "(1)" in response.text
+
+
+class TestAssigneeBulk:
+    """一括割当・コピーテスト"""
+
+    def test_bulk_assign_issue_returns_matrix(self, client, task_id, issue_id, user_id):
+        """案件単位の一括割当後にマトリクス全体を返す"""
+        response = client.post("/projects/1/assignees/bulk", data={
+            "action": "assign",
+            "issue_id": issue_id,
+            "user_id": user_id
+        })
+        assert response.status_code == 200
+        assert 'class="matrix-table"' in response.text
+        assert f'id="assign-{task_id}-{user_id}" class="task-cell assigned"' in response.text
+        # 全作業に割当済みの案件セルは一括解除になる
+        assert f'"action": "unassign", "issue_id": {issue_id}, "user_id": {user_id}' in response.text
+
+    def test_bulk_unassign_user(self, client, task_id, user_id):
+        """ユーザー列の一括解除"""
+        client.post("/projects/1/assignees/toggle", data={"task_id": task_id, "user_id": user_id})
+        response = client.post("/projects/1/assignees/bulk", data={"action": "unassign", "user_id": user_id})
+        assert response.status_code == 200
+        assert f'id="assign-{task_id}-{user_id}" class="task-cell "' in response.text
+
+    def test_bulk_invalid_action_returns_400(self, client, user_id):
+        """不正なactionは400"""
+        response = client.post("/projects/1/assignees/bulk", data={"action": "toggle", "user_id": user_id})
+        assert response.status_code == 400
+
+    def test_bulk_inactive_user_returns_400(self, client, issue_id, inactive_user_id):
+        """無効ユーザーへの一括割当は400"""
+        response = client.post("/projects/1/assignees/bulk", data={
+            "action": "assign",
+            "issue_id": issue_id,
+            "user_id": inactive_user_id
+        })
+        assert response.status_code == 400
+
+    def test_copy_issue(self, client, task_id, issue_id, user_id):
+        """他の案件の割当をコピー"""
+        client.post("/projects/1/assignees/toggle", data={"task_id": task_id, "user_id": user_id})
+        target = client.post("/projects/1/issues", data={
+            "cd": f"ASN-{uuid.uuid4().hex[:6]}", "name": "コピー先案件", "status": "open", "description": ""
+        })
+        target_id = int(re.search(r'id="issue-(\d+)"', target.text).group(1))
+        with get_db() as conn:
+            cd = conn.execute("SELECT cd FROM task WHERE id = ?", (task_id,)).fetchone()[0]
+            target_task = conn.execute(
+                "INSERT INTO task (issue_id, cd, name) VALUES (?, ?, 'コピー先作業')", (target_id, cd)
+            ).lastrowid
+
+        response = client.post("/projects/1/assignees/copy-issue", data={
+            "source_issue_id": issue_id,
+            "target_issue_id": target_id
+        })
+        assert response.status_code == 200
+        assert f'id="assign-{target_task}-{user_id}" class="task-cell assigned"' in response.text
+
+    def test_copy_issue_target_in_other_project_returns_404(self, client, issue_id):
+        """コピー先案件がプロジェクト外なら404"""
+        response = client.post("/projects/2/assignees/copy-issue", data={
+            "source_issue_id": issue_id,
+            "target_issue_id": issue_id
+        })
+        assert response.status_code == 404
+
+    def test_api_bulk_assign_and_unassign(self, client, task_id, issue_id, user_id):
+        """API: 一括割当・解除の件数を返す"""
+        response = client.post("/api/v1/projects/1/assignees/bulk-assign", json={
+            "issue_id": issue_id, "user_id": user_id
+        })
+        assert response.status_code == 200
+        assert response.json() == {"added": 1, "removed": 0}
+
+        response = client.post("/api/v1/projects/1/assignees/bulk-unassign", json={"task_id": task_id})
+        assert response.status_code == 200
+        assert response.json()["removed"] >= 1
+
+    def test_api_bulk_assign_unknown_task_returns_404(self, client):
+        """API: プロジェクト外の作業は404"""
+        response = client.post("/api/v1/projects/1/assignees/bulk-assign", json={"task_id": 99999})
+        assert response.status_code == 404
+
+    def test_api_copy_requires_source(self, client, issue_id):
+        """API: コピー元未指定は400"""
+        response = client.post("/api/v1/projects/1/assignees/copy", json={"target_issue_id": issue_id})
+        assert response.status_code == 400
+
+    def test_api_copy_same_project_returns_400(self, client):
+        """API: 同じプロジェクトからのコピーは400"""
+        response = client.post("/api/v1/projects/1/assignees/copy", json={"source_project_id": 1})
+        assert response.status_code == 400
+
+
+class TestAssigneeCompactMatrix:
+    """コンパクト表示テスト"""
+
+    def test_compact_matrix_has_no_cells(self, client, task_id, issue_id, user_id):
+        """コンパクト表示は案件の集約値だけを返し、セルを含まない"""
+        client.post("/projects/1/assignees/toggle", data={"task_id": task_id, "user_id": user_id})
+        response = client.get("/projects/1/assignees/matrix?view=compact")
+        assert response.status_code == 200
+        assert 'class="compact-matrix"' in response.text
+        assert f'data-issue-id="{issue_id}" data-task-count="1"' in response.text
+        assert f'data-counts="{{&quot;{user_id}&quot;: 1}}"' in response.text
+        assert "task-cell" not in response.text
+        assert "hx-post" not in response.text
+
+    def test_matrix_switches_to_compact_over_threshold(self, client, task_id, monkeypatch):
+        """セル数がしきい値を超えると自動でコンパクト表示"""
+        from routers import task_assignees
+        monkeypatch.setattr(task_assignees, "COMPACT_CELL_THRESHOLD", 0)
+        assert 'class="compact-matrix"' in client.get("/projects/1/assignees/matrix").text
+        assert 'class="compact-matrix"' not in client.get("/projects/1/assignees/matrix?view=full").text
+
+    def test_matrix_invalid_view_returns_400(self, client):
+        """不正なviewは400"""
+        response = client.get("/projects/1/assignees/matrix?view=huge")
+        assert response.status_code == 400
+
+    def test_api_issue_assignees(self, client, task_id, issue_id, user_id):
+        """API: 案件の作業と担当ユーザーID"""
+        client.post("/projects/1/assignees/toggle", data={"task_id": task_id, "user_id": user_id})
+        response = client.get(f"/api/v1/projects/1/assignees/issues/{issue_id}")
+        assert response.status_code == 200
+        assert response.json() == [{
+            "id": task_id, "cd": response.json()[0]["cd"], "name": "担当割当テスト用作業", "user_ids": [user_id]
+        }]
+
+    def test_api_issue_assignees_other_project_returns_404(self, client, issue_id):
+        """API: プロジェクト外の案件は404"""
+        response = client.get(f"/api/v1/projects/2/assignees/issues/{issue_id}")
+        assert response.status_code == 404
+
+    def test_api_toggle(self, client, task_id, issue_id, user_id):
+        """API: トグル結果と案件集約値"""
+        response = client.post("/api/v1/projects/1/assignees/toggle", json={"task_id": task_id, "user_id": user_id})
+        assert response.status_code == 200
+        assert response.json() == {"assigned": True, "issue_id": issue_id, "issue_count": 1, "issue_task_count": 1}
+
+        response = client.post("/api/v1/projects/1/assignees/toggle", json={"task_id": task_id, "user_id": 99999})
+        assert response.status_code == 404
+
+    def test_api_row_and_column_bulk(self, client, task_id, issue_id, user_id):
+        """API: コンパクト表示の行（作業 × 全ユーザー）・列（ユーザー × 全作業）の一括割当/解除"""
+        response = client.post("/api/v1/projects/1/assignees/bulk-assign", json={"task_id": task_id})
+        assert response.status_code == 200
+        assignees = client.get(f"/api/v1/projects/1/assignees/issues/{issue_id}").json()[0]["user_ids"]
+        assert user_id in assignees and len(assignees) >= 2
+
+        response = client.post("/api/v1/projects/1/assignees/bulk-unassign", json={"user_id": user_id})
+        assert response.status_code == 200
+        assert response.json()["removed"] >= 1
+        assignees = client.get(f"/api/v1/projects/1/assignees/issues/{issue_id}").json()[0]["user_ids"]
+        assert user_id not in assignees
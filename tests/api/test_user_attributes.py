@@ -58,6 +58,24 @@ class TestUserAttributeDisplay:
         assert response.status_code == 200
         assert 'badge-empty' in response.text or '-' in response.text
 
+    def test_list_loads_attributes_in_batch(self, client, attr_type_with_options, monkeypatch):
+        """一覧は属性値をまとめて読み込み、行ごとの取得をしない"""
+        from services import UserService
+
+        user = client.post("/api/v1/users", json={"cd": "BATCH", "name": "Batch", "email": "batch@example.com"}).json()
+        client.put(f"/users/{user['id']}", data={
+            "cd": "BATCH", "name": "Batch", "email": "batch@example.com",
+            f"attr_{attr_type_with_options['type_id']}": str(attr_type_with_options["options"][1]["id"])
+        })
+
+        def fail(user_id):
+            raise AssertionError("行ごとの属性取得が発生")
+        monkeypatch.setattr(UserService, "get_attributes", staticmethod(fail))
+
+        response = client.get("/users/list", params={"q": "BATCH"})
+        assert response.status_code == 200
+        assert '<span class="badge">BP</span>' in response.text
+
 
 class TestUserAttributeUpdate:
     """ユーザー属性更新テスト"""
@@ -1,11 +1,16 @@
 """業務終了報告APIテスト"""
+import io
 import re
 import uuid
+import zipfile
 from datetime import date
 import pytest
 
+from database import get_db
+
 from routers.work_report import (
     parse_template,
+    compile_template,
     format_line,
     format_logs,
     generate_report,
@@ -106,6 +111,36 @@ class TestFormatLine:
         assert result == "テスト作業 (30%)"
 
 
+class TestCompileTemplate:
+    """テンプレートコンパイルの単体テスト"""
+
+    LOG = {
+        'project_cd': 'P001', 'project_name': 'テストPJ',
+        'issue_cd': 'I001', 'issue_name': 'テスト案件',
+        'task_name': 'テスト作業', 'progress_rate': 0, 'hours': 1.5,
+    }
+
+    def test_compiled_template_is_cached(self):
+        """同じテンプレート文字列はコンパイル結果を再利用する"""
+        template = f"報告 {uuid.uuid4().hex}\n@task {{task_name}}"
+        assert compile_template(template) is compile_template(template)
+
+    @pytest.mark.parametrize("fmt,expected", [
+        ("{task_name} ({progress}%)", "テスト作業"),
+        ("{task_name}({progress}%)!", "テスト作業!"),
+        ("{task_name} {progress}% 完了", "テスト作業 完了"),
+        ("{task_name}{progress}", "テスト作業"),
+    ])
+    def test_hide_zero_progress_variants(self, fmt, expected):
+        """0%非表示は {progress} の装飾ごと除去する"""
+        assert format_line(fmt, self.LOG, hide_zero=True) == expected
+
+    def test_unknown_placeholder_and_values_are_literal(self):
+        """未知の変数はそのまま、展開した値の中の {変数} は再展開しない"""
+        log = {**self.LOG, 'task_name': '{hours}'}
+        assert format_line("{task_name} {hours}h {unknown}", log) == "{hours} 1.50h {unknown}"
+
+
 class TestFormatLogs:
     """実績フォーマットの単体テスト"""
 
@@ -188,6 +223,29 @@ class TestGenerateReport:
         # 木曜日（曜日が括弧付きで含まれていることを確認）
         assert "(" in result and ")" in result
 
+    def test_base_vars_in_loop_lines(self):
+        """ループ行の中のベースの変数（日付・ユーザー）も展開する"""
+        logs = [{
+            'project_cd': 'P001', 'project_name': 'proj',
+            'issue_cd': 'I001', 'issue_name': 'iss',
+            'task_name': 'T', 'progress_rate': 0, 'hours': 1.0,
+        }]
+        template = "@project {project_name} {user_name}\n@task {task_name} {date_jp} {user_cd}"
+        result = generate_report(
+            template, total_hours=1.0, logs=logs, target_date=date(2026, 1, 5),
+            user_cd="U9", user_name="bob"
+        )
+        assert result == "proj bob\nT 2026/01/05(月) U9"
+
+    def test_format_logs_keeps_base_vars(self):
+        """ベースの値がないformat_logsではベースの変数をそのまま残す"""
+        logs = [{
+            'project_cd': 'P001', 'project_name': 'proj',
+            'issue_cd': 'I001', 'issue_name': 'iss',
+            'task_name': 'T', 'progress_rate': 0, 'hours': 1.0,
+        }]
+        assert format_logs(logs, "", "", "{task_name} {date}") == "T {date}"
+
 
 class TestWorkReportPage:
     """ページ表示テスト"""
@@ -252,6 +310,140 @@ class TestWorkReportPreview:
         assert response.status_code == 200
 
 
+@pytest.fixture
+def team_logs():
+    """2ユーザー × 2日の実績を作成して (user_cds, user_ids) を返す"""
+    suffix = uuid.uuid4().hex[:6]
+    with get_db() as conn:
+        project_id = conn.execute(
+            "INSERT INTO project (cd, name) VALUES (?, '一括PJ')", (f"WRB-{suffix}",)
+        ).lastrowid
+        issue_id = conn.execute(
+            "INSERT INTO issue (cd, project_id, name) VALUES ('I1', ?, '一括案件')", (project_id,)
+        ).lastrowid
+        task_id = conn.execute(
+            "INSERT INTO task (cd, issue_id, name, progress_rate) VALUES ('T1', ?, '一括作業', 40)", (issue_id,)
+        ).lastrowid
+        cds = [f"WRB-{suffix}-A", f"WRB-{suffix}-B"]
+        user_ids = [
+            conn.execute(
+                "INSERT INTO user (cd, name, email) VALUES (?, ?, ?)", (cd, f"一括{cd[-1]}", f"{cd}@example.com")
+            ).lastrowid
+            for cd in cds
+        ]
+        for user_id in user_ids:
+            for work_date in ("2031-04-01", "2031-04-02"):
+                conn.execute(
+                    "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, ?, 3.5)",
+                    (task_id, user_id, work_date)
+                )
+    return cds, user_ids
+
+
+class TestWorkReportBatch:
+    """一括生成テスト"""
+
+    def test_batch_text(self, client, team_logs, monkeypatch):
+        """指定ユーザー × 期間の報告書をテキストで返す（ユーザーごとの個別取得はしない）"""
+        from services import WorkLogService
+
+        def fail(*args):
+            raise AssertionError("ユーザーごとに実績を取得している")
+        monkeypatch.setattr(WorkLogService, "get_user_daily_logs", fail)
+        cds, user_ids = team_logs
+
+        response = client.get("/work-report/batch", params={
+            "start": "2031-04-01", "end": "2031-04-02", "user": user_ids,
+            "template": "{user_cd} {date} {total_hours}H\n@task {task_name} ({progress}%)"
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text.count("=====") == 8
+        assert f"{cds[0]} 2031/04/01 3.5H\n一括作業 (40%)" in response.text
+        assert response.text.index(cds[0]) < response.text.index(cds[1])
+
+    def test_batch_zip(self, client, team_logs):
+        """ZIPでは (日付, ユーザー) ごとに1ファイル"""
+        cds, user_ids = team_logs
+        response = client.get("/work-report/batch", params={
+            "start": "2031-04-01", "end": "2031-04-02", "user": user_ids, "format": "zip"
+        })
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            names = sorted(zf.namelist())
+            assert names == sorted(f"{d}_{cd}.txt" for d in ("2031-04-01", "2031-04-02") for cd in cds)
+            assert "3.5H" in zf.read(names[0]).decode("utf-8")
+
+    def test_batch_all_active_users(self, client, team_logs):
+        """ユーザー未指定時は有効ユーザー全員"""
+        cds, _ = team_logs
+        response = client.get("/work-report/batch", params={"start": "2031-04-02"})
+        assert response.status_code == 200
+        assert all(cd in response.text for cd in cds)
+
+    @pytest.mark.parametrize("params", [
+        {"start": "2031-04-02", "end": "2031-04-01"},
+        {"start": "2031-01-01", "end": "2031-03-01"},
+        {"start": "invalid"},
+        {"format": "pdf"},
+    ])
+    def test_batch_invalid_params_return_400(self, client, params):
+        """不正な期間・形式は400"""
+        response = client.get("/work-report/batch", params=params)
+        assert response.status_code == 400
+
+
+class TestSavedTemplate:
+    """保存テンプレートテスト"""
+
+    def test_save_and_preview_by_id_and_hash(self, client, team_logs, monkeypatch):
+        """保存したテンプレートはIDとハッシュだけでプレビューでき、2回目以降は設定を読まない"""
+        from services import UserSettingService
+        _, user_ids = team_logs
+        template = f"保存 {uuid.uuid4().hex[:6]} {{total_hours}}H\n@task {{task_name}}"
+        response = client.post("/work-report/templates", json={"user_id": user_ids[0], "template": template})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["template_id"] == "default"
+
+        params = {
+            "user": user_ids[0], "target_date": "2031-04-01",
+            "template_id": "default", "template_hash": body["template_hash"],
+        }
+        response = client.get("/work-report/preview", params=params)
+        assert response.status_code == 200
+        assert "保存" in response.text and "3.5H" in response.text
+
+        def fail(*args):
+            raise AssertionError("キャッシュ済みテンプレートを再読込している")
+        monkeypatch.setattr(UserSettingService, "get", fail)
+        assert client.get("/work-report/preview", params=params).status_code == 200
+
+    def test_preview_with_stale_hash_returns_409(self, client, team_logs):
+        """保存内容とハッシュが一致しなければ409"""
+        _, user_ids = team_logs
+        client.post("/work-report/templates", json={"user_id": user_ids[1], "template": "新しい内容"})
+        response = client.get("/work-report/preview", params={
+            "user": user_ids[1], "template_id": "default", "template_hash": "0" * 16,
+        })
+        assert response.status_code == 409
+
+    def test_page_uses_saved_template(self, client, team_logs):
+        """ページは保存テンプレートを初期表示する"""
+        _, user_ids = team_logs
+        client.post("/work-report/templates", json={"user_id": user_ids[0], "template": "ページ用テンプレート"})
+        response = client.get(f"/work-report?user={user_ids[0]}&target_date=2031-04-01")
+        assert response.status_code == 200
+        assert ">ページ用テンプレート</textarea>" in response.text
+
+    def test_save_template_invalid(self, client):
+        """存在しないユーザーは404、不正なテンプレートIDは422"""
+        response = client.post("/work-report/templates", json={"user_id": 99999, "template": "x"})
+        assert response.status_code == 404
+        response = client.post("/work-report/templates", json={"user_id": 1, "template_id": "a/b", "template": "x"})
+        assert response.status_code == 422
+
+
 class TestNavigationLink:
     """ナビゲーションリンクテスト"""
 
@@ -0,0 +1,129 @@
+"""分析サービスのテスト"""
+import uuid
+
+import pytest
+from database import get_db, rebuild_work_log_monthly
+from services.analytics_service import AnalyticsService
+
+
+@pytest.fixture
+def setup(clean_db):
+    """プロジェクト・作業・ユーザー・属性（PM/開発、1名は未設定）"""
+    with get_db() as conn:
+        project_id = conn.execute("INSERT INTO project (cd, name) VALUES ('AN', 'Analytics')").lastrowid
+        issue_id = conn.execute(
+            "INSERT INTO issue (cd, project_id, name) VALUES ('I1', ?, '案件')", (project_id,)
+        ).lastrowid
+        task_ids = [
+            conn.execute("INSERT INTO task (cd, issue_id, name) VALUES (?, ?, '作業')", (cd, issue_id)).lastrowid
+            for cd in ("T1", "T2")
+        ]
+        type_id = conn.execute(
+            "INSERT INTO user_attribute_type (code, name) VALUES (?, '役割')",
+            (f"role_{uuid.uuid4().hex[:8]}",)
+        ).lastrowid
+        pm = conn.execute(
+            "INSERT INTO user_attribute_option (type_id, code, name, sort_order) VALUES (?, 'pm', 'PM', 0)",
+            (type_id,)
+        ).lastrowid
+        dev = conn.execute(
+            "INSERT INTO user_attribute_option (type_id, code, name, sort_order) VALUES (?, 'dev', '開発', 1)",
+            (type_id,)
+        ).lastrowid
+        user_ids = [r[0] for r in conn.execute("SELECT id FROM user ORDER BY id").fetchall()]
+        user_ids.append(conn.execute(
+            "INSERT INTO user (cd, name, email) VALUES ('U003', '未設定', 'u3@example.com')"
+        ).lastrowid)
+        conn.execute("INSERT INTO user_attribute (user_id, type_id, option_id) VALUES (?, ?, ?)",
+                     (user_ids[0], type_id, pm))
+        conn.execute("INSERT INTO user_attribute (user_id, type_id, option_id) VALUES (?, ?, ?)",
+                     (user_ids[1], type_id, dev))
+    return {"project_id": project_id, "issue_id": issue_id, "task_ids": task_ids,
+            "type_id": type_id, "user_ids": user_ids}
+
+
+def _monthly():
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT user_id, project_id, year_month, hours FROM work_log_monthly ORDER BY 1, 2, 3"
+        ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def _log(task_id, user_id, work_date, hours):
+    with get_db() as conn:
+        return conn.execute(
+            "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, ?, ?)",
+            (task_id, user_id, work_date, hours)
+        ).lastrowid
+
+
+def test_monthly_rollup_follows_work_log_writes(setup):
+    """月次集計は実績の追加・更新・削除に追従する"""
+    u1 = setup["user_ids"][0]
+    t1, t2 = setup["task_ids"]
+    pid = setup["project_id"]
+    log_id = _log(t1, u1, "2025-04-01", 3)
+    _log(t2, u1, "2025-04-15", 2)
+    assert _monthly() == [(u1, pid, "2025-04", 5.0)]
+
+    with get_db() as conn:
+        conn.execute("UPDATE work_log SET work_date = '2025-05-01', hours = 4 WHERE id = ?", (log_id,))
+    assert _monthly() == [(u1, pid, "2025-04", 2.0), (u1, pid, "2025-05", 4.0)]
+
+    with get_db() as conn:
+        conn.execute("DELETE FROM work_log WHERE id = ?", (log_id,))
+    assert _monthly() == [(u1, pid, "2025-04", 2.0)]
+
+
+def test_monthly_rollup_follows_cascade_delete(setup):
+    """作業・案件の削除（連鎖削除）でも集計が二重に減らない"""
+    u1 = setup["user_ids"][0]
+    t1, t2 = setup["task_ids"]
+    _log(t1, u1, "2025-04-01", 3)
+    _log(t2, u1, "2025-04-02", 2)
+
+    with get_db() as conn:
+        conn.execute("DELETE FROM task WHERE id = ?", (t1,))
+    assert _monthly() == [(u1, setup["project_id"], "2025-04", 2.0)]
+
+    with get_db() as conn:
+        conn.execute("DELETE FROM issue WHERE id = ?", (setup["issue_id"],))
+    assert _monthly() == []
+
+
+def test_rebuild_matches_incremental(setup):
+    """再構築結果は差分更新の結果と一致する"""
+    u1, u2, _ = setup["user_ids"]
+    t1, t2 = setup["task_ids"]
+    _log(t1, u1, "2025-04-01", 1.5)
+    _log(t2, u2, "2025-06-30", 8)
+    incremental = _monthly()
+    with get_db() as conn:
+        rebuild_work_log_monthly(conn)
+    assert _monthly() == incremental
+
+
+def test_attribute_utilization(setup):
+    """選択肢 × プロジェクト × 年月で予定/実績を集計（未設定は最後）"""
+    u1, u2, u3 = setup["user_ids"]
+    t1, _ = setup["task_ids"]
+    pid = setup["project_id"]
+    _log(t1, u1, "2025-04-01", 3)
+    _log(t1, u2, "2025-04-01", 5)
+    _log(t1, u3, "2025-05-01", 1)
+    _log(t1, u1, "2024-12-01", 9)  # 期間外
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO monthly_assignment (user_id, project_id, year_month, planned_hours) VALUES (?, ?, '2025-04', 10)",
+            (u1, pid)
+        )
+
+    rows = AnalyticsService.get_attribute_utilization(setup["type_id"], "2025-01", "2025-12")
+    assert [(r["option_name"], r["year_month"], r["planned_hours"], r["actual_hours"]) for r in rows] == [
+        ("PM", "2025-04", 10.0, 3.0),
+        ("開発", "2025-04", 0.0, 5.0),
+        ("未設定", "2025-05", 0.0, 1.0),
+    ]
+    assert rows[-1]["option_id"] is None
+    assert all(r["project_cd"] == "AN" for r in rows)
@@ -0,0 +1,72 @@
+"""オートコンプリート索引のテスト"""
+from database import get_db
+from services.autocomplete import normalize, user_index, project_index, issue_index
+from services.project_service import ProjectService
+from services.issue_service import IssueService
+from services.user_service import UserService
+
+
+def test_normalize_folds_width_case_and_kana():
+    """全角半角・大文字小文字・カタカナひらがなを同一視"""
+    assert normalize("ＡＢＣ１") == "abc1"
+    assert normalize("ｶﾀｶﾅ") == normalize("かたかな")
+    assert normalize("システム") == "しすてむ"
+
+
+def test_search_prefix_and_substring(clean_db):
+    """1〜3文字・4文字以上のどちらも部分一致"""
+    ProjectService.create("ACP1", "在庫システム", "")
+    ProjectService.create("ACP2", "販売システム刷新", "")
+
+    assert {p["cd"] for p in project_index.search("シス")} >= {"ACP1", "ACP2"}
+    assert [p["cd"] for p in project_index.search("しすてむ刷新")] == ["ACP2"]
+    assert [p["cd"] for p in project_index.search("acp1")] == ["ACP1"]
+    assert project_index.search("存在しない語") == []
+
+
+def test_search_order_limit_and_exclude(clean_db):
+    """表示順（cd順）・件数上限・除外ID"""
+    created = [ProjectService.create(f"ORD{n}", f"order{n}", "") for n in range(5)]
+    results = project_index.search("ord", exclude=[created[0]["id"]], limit=3)
+    assert [p["cd"] for p in results] == ["ORD1", "ORD2", "ORD3"]
+
+
+def test_refresh_on_service_write(clean_db):
+    """サービス経由の更新・削除が反映される"""
+    project = ProjectService.create("REF", "before", "")
+    assert [p["cd"] for p in project_index.search("before")] == ["REF"]
+
+    ProjectService.update(project["id"], "REF", "after", "")
+    assert project_index.search("before") == []
+    assert [p["cd"] for p in project_index.search("after")] == ["REF"]
+
+    ProjectService.delete(project["id"])
+    assert project_index.search("after") == []
+
+
+def test_rebuild_on_external_write(clean_db):
+    """サービス外の書き込みでも再構築される"""
+    project_index.search("")
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('EXT', 'external')")
+    assert [p["cd"] for p in project_index.search("external")] == ["EXT"]
+
+
+def test_issue_search_by_project_cd(clean_db):
+    """案件はプロジェクトcdでも検索でき、プロジェクトcd変更に追従する"""
+    project = ProjectService.create("ISP", "Issue Project", "")
+    IssueService.create(project["id"], "I1", "案件1")
+    assert [i["cd"] for i in issue_index.search("isp")] == ["I1"]
+
+    ProjectService.update(project["id"], "RENAMED", "Issue Project", "")
+    assert issue_index.search("isp") == []
+    assert [i["project_cd"] for i in issue_index.search("renamed")] == ["RENAMED"]
+
+
+def test_user_search_excludes_inactive(clean_db):
+    """無効ユーザーは候補に出ない"""
+    user = UserService.create("INA", "inactive user", "ina@example.com")
+    assert [u["cd"] for u in user_index.search("inactive")] == ["INA"]
+    with get_db() as conn:
+        conn.execute("UPDATE user SET is_active = 0 WHERE id = ?", (user["id"],))
+    assert user_index.search("inactive") == []
@@ -0,0 +1,161 @@
+"""クエリ結果キャッシュのテスト"""
+from cache import VersionedCache, get_table_versions
+from database import get_db
+
+
+def test_table_version_incremented_by_write(clean_db):
+    """書き込みでテーブルバージョンが加算される"""
+    before = get_table_versions(("project",))
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('VER', 'Version')")
+    after = get_table_versions(("project",))
+    assert after[0] == before[0] + 1
+
+
+def test_cache_hit_skips_loader(clean_db):
+    """バージョンが変わらなければloaderを呼ばない"""
+    cache = VersionedCache(("project",))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert cache.get("key", loader) == "value"
+    assert cache.get("key", loader) == "value"
+    assert len(calls) == 1
+
+
+def test_cache_reloads_after_write(clean_db):
+    """依存テーブルへの書き込みで再取得される"""
+    cache = VersionedCache(("project",))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get("key", loader) == 1
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('RELOAD', 'Reload')")
+    assert cache.get("key", loader) == 2
+
+
+def test_cache_ignores_unrelated_write(clean_db):
+    """依存外テーブルへの書き込みでは無効化されない"""
+    cache = VersionedCache(("work_log",))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    cache.get("key", loader)
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('OTHER', 'Other')")
+    assert cache.get("key", loader) == 1
+
+
+def test_cache_maxsize(clean_db):
+    """上限を超えると古いエントリから破棄"""
+    cache = VersionedCache(("project",), maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("c", lambda: 3)
+    assert cache.get("a", lambda: "reloaded") == "reloaded"
+
+
+def test_invalidate(clean_db):
+    """invalidateで破棄される"""
+    cache = VersionedCache(("project",))
+    cache.get("key", lambda: "old")
+    cache.invalidate("key")
+    assert cache.get("key", lambda: "new") == "new"
+
+
+def test_watcher_poll_detects_other_connection_commit(clean_db):
+    """pollモードは他の接続のコミットをdata_versionで検知する"""
+    from cache import TableVersionWatcher
+    watcher = TableVersionWatcher("poll")
+    before = watcher.get(("project",))
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('POLL', 'Poll')")
+    assert watcher.get(("project",)) == (before[0] + 1,)
+
+
+def test_watcher_poll_interval_throttles_checks(clean_db):
+    """poll間隔内は他の接続のコミットを確認せず、自プロセスのコミット通知では即時に再読込する"""
+    from cache import TableVersionWatcher
+    watcher = TableVersionWatcher("poll", poll_interval=60)
+    before = watcher.get(("project",))
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('THROTTLE1', 'Throttle')")
+    assert watcher.get(("project",)) == before
+
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('THROTTLE2', 'Throttle')")
+        conn.commit()
+        watcher.committed(conn)
+    assert watcher.get(("project",)) == (before[0] + 2,)
+
+
+def test_watcher_local_reloads_only_on_commit_hook(clean_db):
+    """localモードはコミット通知でのみ再読込する"""
+    from cache import TableVersionWatcher
+    watcher = TableVersionWatcher("local")
+    before = watcher.get(("project",))
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name) VALUES ('LOCAL', 'Local')")
+        conn.commit()
+        assert watcher.get(("project",)) == before
+        watcher.reload(conn)
+    assert watcher.get(("project",)) == (before[0] + 1,)
+
+
+def _project_with_task(cd: str) -> tuple[int, int]:
+    """プロジェクト・案件・作業を作成（プロジェクトID, 作業ID）"""
+    with get_db() as conn:
+        project_id = conn.execute("INSERT INTO project (cd, name) VALUES (?, ?)", (cd, cd)).lastrowid
+        issue_id = conn.execute(
+            "INSERT INTO issue (project_id, cd, name) VALUES (?, 'I', 'I')", (project_id,)
+        ).lastrowid
+        task_id = conn.execute("INSERT INTO task (issue_id, cd, name) VALUES (?, 'T', 'T')", (issue_id,)).lastrowid
+    return project_id, task_id
+
+
+def test_project_cache_invalidated_only_by_own_project(clean_db):
+    """project_key指定時は、そのプロジェクト配下への書き込みでのみ無効化される"""
+    cache = VersionedCache((), project_key=lambda key: key)
+    project_a, task_a = _project_with_task("PVA")
+    project_b, task_b = _project_with_task("PVB")
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get(project_a, loader) == 1
+    with get_db() as conn:
+        user_id = conn.execute("SELECT id FROM user WHERE cd = 'U001'").fetchone()[0]
+        conn.execute(
+            "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, '2026-01-05', 1)",
+            (task_b, user_id)
+        )
+    assert cache.get(project_a, loader) == 1
+
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, '2026-01-05', 1)",
+            (task_a, user_id)
+        )
+    assert cache.get(project_a, loader) == 2
+
+
+def test_project_version_bumped_by_cascade_delete(clean_db):
+    """案件の削除（作業・実績の連鎖削除）でもプロジェクトのバージョンが加算される"""
+    from cache import get_project_version
+    project_id, _ = _project_with_task("PVC")
+    before = get_project_version(project_id)
+    with get_db() as conn:
+        conn.execute("DELETE FROM issue WHERE project_id = ?", (project_id,))
+    assert get_project_version(project_id) > before
@@ -0,0 +1,156 @@
+"""実績の一括インポート（scripts/import_work_logs.py）のテスト"""
+import csv
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from database import DB_PATH, get_db
+from services.issue_service import IssueService
+from services.project_service import ProjectService
+from services.task_service import TaskService
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+from import_work_logs import COLUMNS, RejectWriter, Resolver, import_work_logs, read_rows
+
+
+@pytest.fixture
+def task(clean_db):
+    """インポート先の作業（PJ-IMP / ISS / TSK）"""
+    project = ProjectService.create("PJ-IMP", "移行先", "")
+    issue = IssueService.create(project["id"], "ISS", "移行案件")
+    return TaskService.create(issue["id"], "TSK", "移行作業")
+
+
+def _user_id(cd: str) -> int:
+    with get_db() as conn:
+        return conn.execute("SELECT id FROM user WHERE cd = ?", (cd,)).fetchone()[0]
+
+
+def _write_csv(path: Path, rows: list[tuple]) -> Path:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    return path
+
+
+def _import(path: Path, **options) -> tuple[dict, RejectWriter]:
+    rejects = RejectWriter(path)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        counts = import_work_logs(conn, read_rows(path, "utf-8"), rejects=rejects, progress=lambda message: None,
+                                  **options)
+    finally:
+        conn.close()
+        rejects.close()
+    return counts, rejects
+
+
+def _work_logs() -> list[tuple]:
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT u.cd, w.work_date, w.hours FROM work_log w JOIN user u ON w.user_id = u.id ORDER BY w.work_date, u.cd"
+        ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+class TestResolver:
+    """コードからIDへの変換と値の検証"""
+
+    def test_convert(self, task):
+        with get_db() as conn:
+            resolver = Resolver(conn)
+        row = {"user_cd": " U001 ", "project_cd": "PJ-IMP", "issue_cd": "ISS", "task_cd": "TSK",
+               "work_date": "2026-04-01", "hours": "7.5"}
+        assert resolver.convert(row) == (task["id"], _user_id("U001"), "2026-04-01", 7.5)
+
+    @pytest.mark.parametrize("changes, message", [
+        ({"user_cd": "NOBODY"}, "ユーザーが見つかりません: NOBODY"),
+        ({"task_cd": "NONE"}, "作業が見つかりません: PJ-IMP/ISS/NONE"),
+        ({"work_date": "2026/04/01"}, "日付が不正です"),
+        ({"hours": "abc"}, "工数が数値ではありません"),
+        ({"hours": "25"}, "工数は0より大きく24以下"),
+        ({"hours": ""}, "値がありません: hours"),
+    ])
+    def test_convert_rejects(self, task, changes, message):
+        with get_db() as conn:
+            resolver = Resolver(conn)
+        row = {"user_cd": "U001", "project_cd": "PJ-IMP", "issue_cd": "ISS", "task_cd": "TSK",
+               "work_date": "2026-04-01", "hours": "1", **changes}
+        with pytest.raises(ValueError, match=message):
+            resolver.convert(row)
+
+
+class TestImport:
+    """CSV / JSONL の投入"""
+
+    def test_csv_writes_rows_and_rejects(self, task, tmp_path):
+        path = _write_csv(tmp_path / "old.csv", [
+            ("U001", "PJ-IMP", "ISS", "TSK", "2026-04-01", "7.5"),
+            ("U002", "PJ-IMP", "ISS", "TSK", "2026-04-01", "3"),
+            ("NOBODY", "PJ-IMP", "ISS", "TSK", "2026-04-02", "1"),
+            ("U001", "PJ-IMP", "ISS", "TSK", "2026-04-31", "1"),
+        ])
+        counts, rejects = _import(path)
+
+        assert counts == {"read": 4, "written": 2, "skipped": 0, "rejected": 2}
+        assert _work_logs() == [("U001", "2026-04-01", 7.5), ("U002", "2026-04-01", 3.0)]
+        # 取り込めなかった行は入力の行番号と理由を付けて書き出す
+        assert rejects.path == tmp_path / "old.rejected.csv"
+        with rejects.path.open(encoding="utf-8", newline="") as f:
+            rejected = list(csv.DictReader(f))
+        assert [(r["line"], r["user_cd"]) for r in rejected] == [("4", "NOBODY"), ("5", "U001")]
+        assert rejected[0]["error"] == "ユーザーが見つかりません: NOBODY"
+        # 実績のユーザーは作業の担当者になり、月次集計も再構築される
+        with get_db() as conn:
+            assignees = conn.execute("SELECT COUNT(*) FROM task_assignee WHERE task_id = ?", (task["id"],)).fetchone()[0]
+            monthly = conn.execute("SELECT SUM(hours) FROM work_log_monthly WHERE year_month = '2026-04'").fetchone()[0]
+        assert assignees == 2
+        assert monthly == 10.5
+
+    def test_jsonl_rejects_unparsable_lines(self, task, tmp_path):
+        path = tmp_path / "export.jsonl"
+        row = {"user_cd": "U001", "project_cd": "PJ-IMP", "issue_cd": "ISS", "task_cd": "TSK",
+               "work_date": "2026-04-01", "hours": 2}
+        path.write_text("\n".join([json.dumps(row), "{broken", "[1, 2]", ""]) + "\n", encoding="utf-8")
+        counts, rejects = _import(path)
+
+        assert counts == {"read": 3, "written": 1, "skipped": 0, "rejected": 2}
+        assert rejects.path == tmp_path / "export.rejected.jsonl"
+        rejected = [json.loads(line) for line in rejects.path.read_text(encoding="utf-8").splitlines()]
+        assert [r["line"] for r in rejected] == [2, 3]
+        assert rejected[0]["error"].startswith("JSONとして解釈できません")
+        assert rejected[1]["error"] == "オブジェクトではありません"
+
+    def test_no_rejects_file_when_all_valid(self, task, tmp_path):
+        path = _write_csv(tmp_path / "ok.csv", [("U001", "PJ-IMP", "ISS", "TSK", "2026-04-01", "1")])
+        counts, rejects = _import(path, assign=False)
+        assert counts["rejected"] == 0
+        assert not rejects.path.exists()
+        with get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM task_assignee").fetchone()[0] == 0
+
+    @pytest.mark.parametrize("on_conflict, hours, counts", [
+        ("replace", 5.0, {"written": 2, "skipped": 0}),
+        ("skip", 1.0, {"written": 1, "skipped": 1}),
+    ])
+    def test_on_conflict(self, task, tmp_path, on_conflict, hours, counts):
+        _import(_write_csv(tmp_path / "first.csv", [("U001", "PJ-IMP", "ISS", "TSK", "2026-04-01", "1")]))
+        path = _write_csv(tmp_path / "second.csv", [
+            ("U001", "PJ-IMP", "ISS", "TSK", "2026-04-01", "5"),
+            ("U001", "PJ-IMP", "ISS", "TSK", "2026-04-02", "2"),
+        ])
+        result, _ = _import(path, on_conflict=on_conflict)
+        assert {key: result[key] for key in counts} == counts
+        assert _work_logs() == [("U001", "2026-04-01", hours), ("U001", "2026-04-02", 2.0)]
+
+    def test_csv_missing_columns(self, tmp_path):
+        path = tmp_path / "bad.csv"
+        path.write_text("user_cd,hours\nU001,1\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="列がありません: project_cd, issue_cd, task_cd, work_date"):
+            list(read_rows(path, "utf-8"))
@@ -89,3 +89,15 @@ def test_get_actual_total_zero(clean_db, project):
     issue = IssueService.create(project["id"], "ACT", "Actual Test")
     total = IssueService.get_actual_total(issue["id"])
     assert total == 0
+
+
+def test_get_all_with_totals_fulltext_rank(clean_db, project):
+    """合計付き一覧も全文検索で絞り込み・関連度順"""
+    IssueService.create(project["id"], "FTI1", "請求書発行", "open", "")
+    IssueService.create(project["id"], "FTI2", "請求書発行の改修", "open", "請求書発行の画面")
+    IssueService.create(project["id"], "FTI3", "別件", "open", "")
+
+    issues = IssueService.get_all_with_totals(project["id"], sort="rank", q="請求書")
+    assert {i["cd"] for i in issues} == {"FTI1", "FTI2"}
+    assert issues == sorted(issues, key=lambda i: (i["rank"], i["id"]))
+    assert all(i["estimate_total"] == 0 for i in issues)
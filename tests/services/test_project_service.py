@@ -1,6 +1,7 @@
 """プロジェクトサービスのテスト"""
 import pytest
 from services.project_service import ProjectService
+from database import get_db
 
 
 def test_get_all_empty(clean_db):
@@ -94,3 +95,180 @@ def test_get_summary(clean_db):
     assert "estimate_total" in summary
     assert "actual_total" in summary
     assert "consumption_rate" in summary
+
+
+def _setup_project_with_logs():
+    """テスト用プロジェクト・案件・作業・見積・実績作成"""
+    project = ProjectService.create("SUMX", "Summary Data", "")
+    with get_db() as conn:
+        conn.execute("INSERT INTO issue (project_id, cd, name) VALUES (?, 'I1', 'Issue1')", (project["id"],))
+        issue_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        conn.execute("INSERT INTO task (issue_id, cd, name) VALUES (?, 'T1', 'Task1')", (issue_id,))
+        task_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        conn.execute("INSERT INTO issue_estimate_item (issue_id, name, hours) VALUES (?, '設計', 10)", (issue_id,))
+        user_id = conn.execute("SELECT id FROM user WHERE cd = 'U001'").fetchone()[0]
+        conn.execute(
+            "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, '2025-01-06', 4)",
+            (task_id, user_id)
+        )
+    return project["id"], issue_id, task_id, user_id
+
+
+def test_get_summary_values(clean_db):
+    """サマリーの集計値"""
+    project_id, _, _, _ = _setup_project_with_logs()
+    summary = ProjectService.get_summary(project_id)
+
+    assert summary["issue_count"] == 1
+    assert summary["task_count"] == 1
+    assert summary["estimate_total"] == 10
+    assert summary["actual_total"] == 4
+    assert summary["consumption_rate"] == 40.0
+
+
+def test_get_summary_invalidated_by_work_log(clean_db):
+    """実績の書き込みでサマリーキャッシュが無効化される"""
+    project_id, _, task_id, user_id = _setup_project_with_logs()
+    assert ProjectService.get_summary(project_id)["actual_total"] == 4
+
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO work_log (task_id, user_id, work_date, hours) VALUES (?, ?, '2025-01-07', 2)",
+            (task_id, user_id)
+        )
+
+    assert ProjectService.get_summary(project_id)["actual_total"] == 6
+
+
+def test_get_summary_invalidated_by_estimate(clean_db):
+    """見積の書き込みでサマリーキャッシュが無効化される"""
+    project_id, issue_id, _, _ = _setup_project_with_logs()
+    assert ProjectService.get_summary(project_id)["estimate_total"] == 10
+
+    with get_db() as conn:
+        conn.execute("INSERT INTO issue_estimate_item (issue_id, name, hours) VALUES (?, '実装', 6)", (issue_id,))
+
+    summary = ProjectService.get_summary(project_id)
+    assert summary["estimate_total"] == 16
+    assert summary["consumption_rate"] == 25.0
+
+
+def test_get_recent_issues_with_totals(clean_db):
+    """最近の案件に見積・実績が付く"""
+    project_id, issue_id, _, _ = _setup_project_with_logs()
+    issues = ProjectService.get_recent_issues(project_id)
+
+    assert len(issues) == 1
+    assert issues[0]["id"] == issue_id
+    assert issues[0]["estimate"] == 10
+    assert issues[0]["actual"] == 4
+    assert issues[0]["status_name"] == "未着手"
+
+
+def test_get_recent_issues_order_and_limit(clean_db):
+    """最近の案件は新しい順に件数制限"""
+    project = ProjectService.create("RECENT", "Recent", "")
+    with get_db() as conn:
+        for n in range(7):
+            conn.execute(
+                "INSERT INTO issue (project_id, cd, name) VALUES (?, ?, ?)",
+                (project["id"], f"I{n}", f"Issue{n}")
+            )
+
+    issues = ProjectService.get_recent_issues(project["id"], limit=5)
+    assert [i["cd"] for i in issues] == ["I6", "I5", "I4", "I3", "I2"]
+
+
+def test_get_all_keyset_pages(clean_db):
+    """キーセットページングで全件を重複なく取得"""
+    from services.pagination import next_cursor
+    for n in range(5):
+        ProjectService.create(f"PG{n}", f"Page{n}", "")
+    expected = [p["cd"] for p in ProjectService.get_all(sort="cd", order="desc")]
+
+    seen = []
+    cursor = None
+    while True:
+        page = ProjectService.get_all(sort="cd", order="desc", limit=2, cursor=cursor)
+        seen.extend(p["cd"] for p in page)
+        cursor = next_cursor(page, "cd", 2)
+        if not cursor:
+            break
+    assert seen == expected
+
+
+def test_get_all_keyset_nullable_sort(clean_db):
+    """NULLを含む列でのページングでも欠落しない"""
+    from services.pagination import next_cursor
+    with get_db() as conn:
+        conn.execute("INSERT INTO project (cd, name, description) VALUES ('N1', 'Null1', NULL)")
+        conn.execute("INSERT INTO project (cd, name, description) VALUES ('N2', 'Null2', NULL)")
+    total = len(ProjectService.get_all())
+
+    seen = []
+    cursor = None
+    while True:
+        page = ProjectService.get_all(sort="description", limit=1, cursor=cursor)
+        seen.extend(p["id"] for p in page)
+        cursor = next_cursor(page, "description", 1)
+        if not cursor:
+            break
+    assert len(seen) == total
+    assert len(set(seen)) == total
+
+
+def test_get_all_invalid_cursor(clean_db):
+    """不正なカーソルはValueError"""
+    with pytest.raises(ValueError):
+        ProjectService.get_all(limit=10, cursor="invalid!!")
+
+
+def test_get_all_fulltext_japanese(clean_db):
+    """日本語キーワードを全文検索索引で検索（関連度順）"""
+    ProjectService.create("FT1", "基幹システム刷新", "販売管理の刷新")
+    ProjectService.create("FT2", "社内ポータル", "販売管理システム連携")
+    ProjectService.create("FT3", "別件", "関係なし")
+
+    results = ProjectService.get_all(sort="rank", q="販売管理")
+    assert {p["cd"] for p in results} == {"FT1", "FT2"}
+    assert all("rank" in p for p in results)
+    assert results == sorted(results, key=lambda p: (p["rank"], p["id"]))
+
+
+def test_get_all_short_query_falls_back_to_like(clean_db):
+    """3文字未満のキーワードはLIKEで部分一致（rank指定はcd順）"""
+    ProjectService.create("SQ1", "刷新", "")
+    results = ProjectService.get_all(sort="rank", q="刷新")
+    assert any(p["cd"] == "SQ1" for p in results)
+    assert all("rank" not in p for p in results)
+
+
+def test_get_all_fulltext_follows_writes(clean_db):
+    """索引はトリガーで更新・削除に追従する"""
+    project = ProjectService.create("FTW", "before_keyword", "")
+    ProjectService.update(project["id"], "FTW", "after_keyword", "")
+    assert ProjectService.get_all(q="before_keyword") == []
+    assert [p["cd"] for p in ProjectService.get_all(q="after_keyword")] == ["FTW"]
+
+    with get_db() as conn:
+        conn.execute("DELETE FROM project WHERE id = ?", (project["id"],))
+    assert ProjectService.get_all(q="after_keyword") == []
+
+
+def test_get_all_fulltext_keyset_by_rank(clean_db):
+    """関連度順でもキーセットページングで重複なく取得"""
+    from services.pagination import next_cursor
+    for n in range(5):
+        ProjectService.create(f"RK{n}", f"ranked{n}", "ranked " * (n + 1))
+    expected = [p["id"] for p in ProjectService.get_all(sort="rank", q="ranked")]
+
+    seen = []
+    cursor = None
+    while True:
+        page = ProjectService.get_all(sort="rank", q="ranked", limit=2, cursor=cursor)
+        seen.extend(p["id"] for p in page)
+        cursor = next_cursor(page, "rank", 2)
+        if not cursor:
+            break
+    assert seen == expected
+    assert len(expected) == 5
@@ -120,3 +120,17 @@ def test_is_in_use_true(clean_db):
 
     result = StatusService.is_in_use(created["id"])
     assert result is True
+
+
+def test_status_labels_follow_status_writes(clean_db):
+    """ステータス名（キャッシュ）は作成・更新・削除に追従する"""
+    from services.issue_service import IssueService
+    project_id = _create_project()
+    status = StatusService.create(project_id, "todo", "TODO", 1)
+    assert IssueService.get_status_labels(project_id) == {"todo": "TODO"}
+
+    StatusService.update(status["id"], project_id, "todo", "未着手", 1)
+    assert IssueService.get_status_labels(project_id) == {"todo": "未着手"}
+
+    StatusService.delete(status["id"], project_id)
+    assert IssueService.get_status_labels(project_id) == {}
@@ -1,4 +1,6 @@
 """担当割当サービスのテスト"""
+import pytest
+
 from services.task_assignee_service import TaskAssigneeService
 from database import get_db
 
@@ -148,7 +150,7 @@ def test_toggle_add(clean_db):
     project_id, task_id, user_id = _setup_project_with_task()
 
     result = TaskAssigneeService.toggle(task_id, user_id)
-    assert result is True  # 追加された
+    assert result["assigned"] is True  # 追加された
 
     # 割当が存在することを確認
     assert TaskAssigneeService.get_assignment(task_id, user_id) is not None
@@ -160,7 +162,7 @@ def test_toggle_remove(clean_db):
     TaskAssigneeService.create(task_id, user_id)
 
     result = TaskAssigneeService.toggle(task_id, user_id)
-    assert result is False  # 削除された
+    assert result["assigned"] is False  # 削除された
 
     # 割当が存在しないことを確認
     assert TaskAssigneeService.get_assignment(task_id, user_id) is None
@@ -172,12 +174,213 @@ def test_toggle_twice(clean_db):
 
     # 追加
     result1 = TaskAssigneeService.toggle(task_id, user_id)
-    assert result1 is True
+    assert result1["assigned"] is True
 
     # 削除
     result2 = TaskAssigneeService.toggle(task_id, user_id)
-    assert result2 is False
+    assert result2["assigned"] is False
 
     # 再追加
     result3 = TaskAssigneeService.toggle(task_id, user_id)
-    assert result3 is True
+    assert result3["assigned"] is True
+
+
+def test_toggle_returns_issue_count(clean_db):
+    """トグル: 案件内のユーザー担当数を返す"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    with get_db() as conn:
+        issue_id = conn.execute("SELECT issue_id FROM task WHERE id = ?", (task_id,)).fetchone()[0]
+        conn.execute("INSERT INTO task (issue_id, cd, name) VALUES (?, 'T2', 'Task2')", (issue_id,))
+        task2_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    TaskAssigneeService.create(task2_id, user_id)
+
+    result = TaskAssigneeService.toggle(task_id, user_id, project_id)
+    assert result == {"assigned": True, "issue_id": issue_id, "issue_count": 2, "issue_task_count": 2}
+
+    result = TaskAssigneeService.toggle(task_id, user_id, project_id)
+    assert result == {"assigned": False, "issue_id": issue_id, "issue_count": 1, "issue_task_count": 2}
+
+
+def test_toggle_task_in_other_project(clean_db):
+    """トグル: 他プロジェクトの作業はLookupError"""
+    project_id, task_id, user_id = _setup_project_with_task()
+
+    with pytest.raises(LookupError):
+        TaskAssigneeService.toggle(task_id, user_id, project_id + 1)
+    assert TaskAssigneeService.get_assignment(task_id, user_id) is None
+
+
+def test_toggle_user_not_found(clean_db):
+    """トグル: 存在しないユーザーはLookupError"""
+    project_id, task_id, _ = _setup_project_with_task()
+
+    with pytest.raises(LookupError):
+        TaskAssigneeService.toggle(task_id, 99999, project_id)
+
+
+def test_toggle_inactive_user(clean_db):
+    """トグル: 無効ユーザーへの新規割当はValueError、既存割当の解除は可能"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    with get_db() as conn:
+        conn.execute("UPDATE user SET is_active = 0 WHERE id = ?", (user_id,))
+
+    with pytest.raises(ValueError):
+        TaskAssigneeService.toggle(task_id, user_id, project_id)
+    assert TaskAssigneeService.get_assignment(task_id, user_id) is None
+
+    TaskAssigneeService.create(task_id, user_id)
+    result = TaskAssigneeService.toggle(task_id, user_id, project_id)
+    assert result["assigned"] is False
+
+
+def _setup_issue_tasks(project_id, issue_cd, task_cds):
+    """案件と作業をまとめて作成して (issue_id, [task_id]) を返す"""
+    with get_db() as conn:
+        issue_id = conn.execute(
+            "INSERT INTO issue (project_id, cd, name) VALUES (?, ?, ?)", (project_id, issue_cd, issue_cd)
+        ).lastrowid
+        task_ids = [
+            conn.execute(
+                "INSERT INTO task (issue_id, cd, name) VALUES (?, ?, ?)", (issue_id, cd, cd)
+            ).lastrowid
+            for cd in task_cds
+        ]
+    return issue_id, task_ids
+
+
+def _assigned_pairs(project_id):
+    return set(TaskAssigneeService.get_all_assignments(project_id))
+
+
+def test_bulk_assign_user_to_issue(clean_db):
+    """一括割当: 案件の全作業にユーザーを割当（既存割当は重複しない）"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    issue_id, task_ids = _setup_issue_tasks(project_id, "I2", ["T1", "T2", "T3"])
+    TaskAssigneeService.create(task_ids[0], user_id)
+
+    added = TaskAssigneeService.bulk_assign(project_id, user_id=user_id, issue_id=issue_id)
+    assert added == 2
+    assert _assigned_pairs(project_id) == {(t, user_id) for t in task_ids}
+
+
+def test_bulk_assign_task_to_active_users(clean_db):
+    """一括割当: 作業に有効ユーザー全員を割当（無効ユーザーは除外）"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    with get_db() as conn:
+        inactive_id = conn.execute(
+            "INSERT INTO user (cd, name, email, is_active) VALUES ('OFF', 'Off', 'off@test.com', 0)"
+        ).lastrowid
+        active_ids = {r[0] for r in conn.execute(
+            "SELECT id FROM user WHERE is_active = 1 OR is_active IS NULL"
+        )}
+
+    added = TaskAssigneeService.bulk_assign(project_id, task_id=task_id)
+    assert added == len(active_ids)
+    assert (task_id, inactive_id) not in _assigned_pairs(project_id)
+
+
+def test_bulk_assign_validates_scope(clean_db):
+    """一括割当: 他プロジェクトの案件・存在しないユーザー・無効ユーザーはエラー"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    with get_db() as conn:
+        other_project = conn.execute("INSERT INTO project (cd, name) VALUES ('OTHER', 'Other')").lastrowid
+        other_issue = conn.execute(
+            "INSERT INTO issue (project_id, cd, name) VALUES (?, 'OTHER', 'Other')", (other_project,)
+        ).lastrowid
+        conn.execute("UPDATE user SET is_active = 0 WHERE id = ?", (user_id,))
+
+    with pytest.raises(LookupError):
+        TaskAssigneeService.bulk_assign(project_id, issue_id=other_issue)
+    with pytest.raises(LookupError):
+        TaskAssigneeService.bulk_assign(project_id, user_id=99999)
+    with pytest.raises(ValueError):
+        TaskAssigneeService.bulk_assign(project_id, user_id=user_id)
+    assert _assigned_pairs(project_id) == set()
+
+
+def test_bulk_unassign(clean_db):
+    """一括解除: 列（ユーザー）・行（作業）単位で解除"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    issue_id, task_ids = _setup_issue_tasks(project_id, "I2", ["T1", "T2"])
+    TaskAssigneeService.bulk_assign(project_id)
+    total = len(_assigned_pairs(project_id))
+
+    removed = TaskAssigneeService.bulk_unassign(project_id, user_id=user_id, issue_id=issue_id)
+    assert removed == 2
+    removed = TaskAssigneeService.bulk_unassign(project_id, task_id=task_id)
+    assert removed == total // 3
+    assert all(t in task_ids for t, _ in _assigned_pairs(project_id))
+
+
+def test_copy_from_issue(clean_db):
+    """コピー: 作業cdが一致する作業へ有効ユーザーの割当をコピー"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    source_id, source_tasks = _setup_issue_tasks(project_id, "SRC", ["T1", "T2", "T3"])
+    target_id, target_tasks = _setup_issue_tasks(project_id, "DST", ["T1", "T2", "TX"])
+    with get_db() as conn:
+        inactive_id = conn.execute(
+            "INSERT INTO user (cd, name, email, is_active) VALUES ('OFF', 'Off', 'off@test.com', 0)"
+        ).lastrowid
+    TaskAssigneeService.create(source_tasks[0], user_id)
+    TaskAssigneeService.create(source_tasks[2], user_id)
+    TaskAssigneeService.create(source_tasks[1], inactive_id)
+    TaskAssigneeService.create(target_tasks[1], user_id)
+
+    result = TaskAssigneeService.copy_from_issue(source_id, target_id)
+    assert result == {"added": 1, "removed": 0}
+    assert TaskAssigneeService.get_assignment(target_tasks[0], user_id) is not None
+    assert TaskAssigneeService.get_assignment(target_tasks[1], user_id) is not None
+
+    result = TaskAssigneeService.copy_from_issue(source_id, target_id, replace=True)
+    assert result == {"added": 1, "removed": 2}
+    assert TaskAssigneeService.get_assignment(target_tasks[1], user_id) is None
+
+
+def test_copy_from_issue_same_issue(clean_db):
+    """コピー: コピー元とコピー先が同じならValueError"""
+    project_id, task_id, _ = _setup_project_with_task()
+    issue_id, _ = _setup_issue_tasks(project_id, "I2", ["T1"])
+
+    with pytest.raises(ValueError):
+        TaskAssigneeService.copy_from_issue(issue_id, issue_id, replace=True)
+    with pytest.raises(LookupError):
+        TaskAssigneeService.copy_from_issue(issue_id, 99999)
+
+
+def test_copy_from_project(clean_db):
+    """コピー: 案件cd・作業cdが一致する作業へプロジェクトの割当をコピー"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    with get_db() as conn:
+        target_project = conn.execute("INSERT INTO project (cd, name) VALUES ('COPY', 'Copy')").lastrowid
+    _, target_tasks = _setup_issue_tasks(target_project, "I1", ["T1", "T2"])
+    TaskAssigneeService.create(task_id, user_id)
+
+    result = TaskAssigneeService.copy_from_project(project_id, target_project)
+    assert result == {"added": 1, "removed": 0}
+    assert _assigned_pairs(target_project) == {(target_tasks[0], user_id)}
+
+
+def test_get_issue_summaries(clean_db):
+    """案件ごとの作業数とユーザー別担当数（作業のない案件は除外）"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    issue_id, task_ids = _setup_issue_tasks(project_id, "I2", ["T1", "T2"])
+    _setup_issue_tasks(project_id, "I3", [])
+    TaskAssigneeService.create(task_ids[0], user_id)
+    TaskAssigneeService.create(task_ids[1], user_id)
+
+    result = TaskAssigneeService.get_issue_summaries(project_id)
+    assert [r["cd"] for r in result] == ["I1", "I2"]
+    assert result[0]["task_count"] == 1
+    assert result[0]["user_counts"] == {}
+    assert result[1]["task_count"] == 2
+    assert result[1]["user_counts"] == {user_id: 2}
+
+
+def test_get_issue_tasks_with_assignees(clean_db):
+    """案件の作業と担当ユーザーID"""
+    project_id, task_id, user_id = _setup_project_with_task()
+    issue_id, task_ids = _setup_issue_tasks(project_id, "I2", ["T1", "T2"])
+    TaskAssigneeService.create(task_ids[1], user_id)
+
+    result = TaskAssigneeService.get_issue_tasks_with_assignees(issue_id)
+    assert [(r["id"], r["user_ids"]) for r in result] == [(task_ids[0], []), (task_ids[1], [user_id])]
@@ -79,3 +79,51 @@ def test_get_attributes_empty(clean_db):
     created = UserService.create("ATTR", "Attr Test", "attr@test.com")
     attrs = UserService.get_attributes(created["id"])
     assert attrs == {}
+
+
+def test_get_all_fulltext_email(clean_db):
+    """メールアドレスも全文検索索引の対象"""
+    UserService.create("FTU", "全文検索", "fulltext-user@example.com")
+    results = UserService.get_all(q="fulltext-user")
+    assert [u["cd"] for u in results] == ["FTU"]
+
+
+def test_get_active_list_reflects_writes(clean_db):
+    """有効ユーザー一覧（キャッシュ）は作成・サービス外の更新に追従する"""
+    from database import get_db
+    user = UserService.create("CAT", "Catalog", "cat@example.com")
+    assert any(u["cd"] == "CAT" for u in UserService.get_active_list())
+
+    with get_db() as conn:
+        conn.execute("UPDATE user SET is_active = 0 WHERE id = ?", (user["id"],))
+    assert all(u["cd"] != "CAT" for u in UserService.get_active_list())
+
+
+def test_get_attributes_for_users_and_loader(clean_db):
+    """複数ユーザーの属性値をまとめて取得し、ローダーは再取得しない"""
+    from database import get_db
+    from services.user_service import UserAttributeLoader
+    with get_db() as conn:
+        type_id = conn.execute(
+            "INSERT INTO user_attribute_type (code, name, sort_order) VALUES ('batch_role', '役割', 0)"
+        ).lastrowid
+        option_id = conn.execute(
+            "INSERT INTO user_attribute_option (type_id, code, name, sort_order) VALUES (?, 'pm', 'PM', 0)",
+            (type_id,)
+        ).lastrowid
+    with_attr = UserService.create("BA1", "Batch1", "ba1@example.com")
+    without_attr = UserService.create("BA2", "Batch2", "ba2@example.com")
+    UserService.set_attribute(with_attr["id"], type_id, option_id)
+
+    attrs = UserService.get_attributes_for_users([with_attr["id"], without_attr["id"]])
+    assert attrs == {with_attr["id"]: {type_id: {"option_id": option_id, "option_name": "PM"}}}
+
+    role = next(t for t in UserService.get_attribute_types() if t["id"] == type_id)
+    assert role["options"] == [{"id": option_id, "code": "pm", "name": "PM"}]
+
+    loader = UserAttributeLoader()
+    loader.prime([with_attr["id"], without_attr["id"]])
+    with get_db() as conn:
+        conn.execute("DELETE FROM user_attribute")
+    assert loader.attributes(with_attr["id"])[type_id]["option_name"] == "PM"
+    assert loader.attributes(without_attr["id"]) == {}